@@ -8,6 +8,7 @@ from typing import Callable, Optional
 logger = logging.getLogger(__name__)
 
 ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
+ASSEMBLYAI_WS_URL = os.getenv("ASSEMBLYAI_WS_URL", "wss://streaming.assemblyai.com/v3/ws")
 
 class AssemblyAIStreamingService:
     """
@@ -76,7 +77,7 @@ class AssemblyAIStreamingService:
             "max_turn_silence": max_turn_silence,
         }
         
-        url = f"wss://streaming.assemblyai.com/v3/ws?{urlencode(params)}"
+        url = f"{ASSEMBLYAI_WS_URL}?{urlencode(params)}"
         
         extra_headers = {
             "Authorization": self.api_key
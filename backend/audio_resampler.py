@@ -89,3 +89,70 @@ def convert_mulaw_8khz_to_pcm_16khz(mulaw_data: bytes) -> bytes:
     linear_pcm_16khz = resample_audio(linear_pcm_8khz, 8000, 16000)
     
     return linear_pcm_16khz
+
+
+def linear_pcm_to_mulaw(pcm_data: bytes) -> bytes:
+    """
+    Convert linear PCM (16-bit signed) to μ-law (G.711 PCMU)
+    
+    Args:
+        pcm_data: Linear PCM audio bytes (16-bit signed, little-endian)
+    
+    Returns:
+        Raw μ-law encoded audio bytes
+    """
+    # μ-law constants
+    MULAW_BIAS = 0x84
+    MULAW_CLIP = 32635
+    
+    samples = np.frombuffer(pcm_data, dtype=np.int16).astype(np.int32)
+    
+    # Extract sign and clip magnitude
+    sign = (samples < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + MULAW_BIAS
+    
+    # Exponent = position of highest set bit above bit 7
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    
+    # Compose and invert bits
+    mulaw = ~(sign | (exponent << 4) | mantissa) & 0xFF
+    return mulaw.astype(np.uint8).tobytes()
+
+
+def resample_audio_poly(pcm_data: bytes, original_rate: int, target_rate: int) -> bytes:
+    """
+    Resample PCM audio with a polyphase filter (anti-aliased, fast for telephony ratios
+    such as 16k/22.05k/24k/44.1k → 8k)
+    
+    Args:
+        pcm_data: Linear PCM audio bytes (16-bit signed)
+        original_rate: Original sample rate
+        target_rate: Target sample rate
+    
+    Returns:
+        Resampled PCM audio as bytes
+    """
+    if original_rate == target_rate:
+        return pcm_data
+    
+    audio_array = np.frombuffer(pcm_data, dtype=np.int16)
+    divisor = np.gcd(original_rate, target_rate)
+    resampled = signal.resample_poly(audio_array, target_rate // divisor, original_rate // divisor)
+    return np.clip(resampled, -32768, 32767).astype(np.int16).tobytes()
+
+
+def convert_pcm_to_mulaw_8khz(pcm_data: bytes, original_rate: int) -> bytes:
+    """
+    Convert 16-bit linear PCM at any rate to 8kHz μ-law in one step
+    
+    This is the in-process replacement for `ffmpeg -f mulaw -ar 8000`.
+    
+    Args:
+        pcm_data: Linear PCM audio bytes (16-bit signed, mono)
+        original_rate: Sample rate of pcm_data
+    
+    Returns:
+        Raw μ-law encoded audio bytes at 8kHz
+    """
+    return linear_pcm_to_mulaw(resample_audio_poly(pcm_data, original_rate, 8000))
@@ -9,12 +9,16 @@ emotional analysis including:
 - Hesitation and confidence markers
 - Emotional undertones not captured in text
 
+Recordings are decoded and cut into agent-turn clips locally
+(tonality_preprocessing); clips are analyzed concurrently and merged, so
+long calls no longer hit the 25MB upload limit.
+
 Integrates with the QC learning system for continuous improvement.
 """
 
 import logging
 import os
-import httpx
+from http_client_registry import http_client_registry
 import base64
 import tempfile
 import json
@@ -22,11 +26,23 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 import asyncio
 
+from audio_transcoder import TranscodeError
+from tonality_preprocessing import TonalitySegment, tonality_preprocessor
+
 logger = logging.getLogger(__name__)
 
 # Supported audio formats for OpenAI
 SUPPORTED_AUDIO_FORMATS = ['mp3', 'wav', 'webm', 'mp4', 'm4a', 'mpga', 'mpeg']
 
+# Clips analyzed concurrently per recording
+TONALITY_MAX_CONCURRENCY = int(os.environ.get("TONALITY_MAX_CONCURRENCY", "4"))
+
+# OpenAI request limit for a single audio upload (whole-recording fallback only)
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+# Recordings larger than this are not downloaded
+MAX_RECORDING_BYTES = int(os.environ.get("TONALITY_MAX_RECORDING_MB", "200")) * 1024 * 1024
+
 
 class AudioTonalityAnalyzer:
     """
@@ -39,17 +55,29 @@ class AudioTonalityAnalyzer:
     - Frustration or satisfaction markers
     """
     
-    def __init__(self, api_key: str, model: str = "gpt-4o-audio-preview"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-audio-preview",
+        base_url: str = "https://api.openai.com/v1",
+        max_concurrency: int = TONALITY_MAX_CONCURRENCY,
+        preprocessor=None
+    ):
         """
         Initialize the analyzer.
         
         Args:
             api_key: OpenAI API key (or Emergent LLM key for universal access)
             model: Audio model to use (default: gpt-4o-audio-preview)
+            base_url: API base URL
+            max_concurrency: Clips of one recording analyzed at once
+            preprocessor: Recording segmenter (default: the shared tonality_preprocessor)
         """
         self.api_key = api_key
         self.model = model
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.preprocessor = preprocessor or tonality_preprocessor
     
     async def analyze_audio_segment(
         self, 
@@ -121,7 +149,7 @@ class AudioTonalityAnalyzer:
                 "temperature": 0.3  # Lower temp for more consistent analysis
             }
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with http_client_registry.session(timeout=60.0) as client:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
                     headers=headers,
@@ -163,14 +191,127 @@ class AudioTonalityAnalyzer:
                 "error": str(e)
             }
     
+    async def download_recording(
+        self,
+        recording_url: str,
+        auth_headers: Dict[str, str] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream a recording into memory through the shared HTTP client.
+        
+        Returns:
+            {"success": True, "audio_data", "audio_format"} or {"success": False, "error", ...}
+        """
+        logger.info(f"Downloading audio from: {recording_url}")
+        download_headers = dict(auth_headers or {})
+        
+        async with http_client_registry.session(timeout=120.0, follow_redirects=True) as client:
+            for attempt_headers in (download_headers, {}):
+                async with client.stream("GET", recording_url, headers=attempt_headers) as response:
+                    if response.status_code == 403 and attempt_headers and '?' not in recording_url:
+                        # Some URLs work without auth after the redirect
+                        logger.warning("403 Forbidden when downloading audio. Retrying without auth headers...")
+                        continue
+                    if response.status_code == 403:
+                        return {
+                            "success": False,
+                            "error": "Failed to download audio: 403 Forbidden. The recording URL may have expired or require authentication.",
+                            "suggestion": "Please ensure the recording URL is accessible. Some services require regenerating the URL or providing an API key."
+                        }
+                    if response.status_code != 200:
+                        return {
+                            "success": False,
+                            "error": f"Failed to download audio: {response.status_code}"
+                        }
+                    
+                    chunks = []
+                    size = 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > MAX_RECORDING_BYTES:
+                            return {
+                                "success": False,
+                                "error": f"Recording too large (over {MAX_RECORDING_BYTES // 1024 // 1024}MB)"
+                            }
+                        chunks.append(chunk)
+                    content_type = response.headers.get('content-type', '')
+                    break
+        
+        # Determine format from URL or content-type
+        if 'mp3' in recording_url.lower() or 'mpeg' in content_type:
+            audio_format = 'mp3'
+        elif 'wav' in recording_url.lower() or 'wav' in content_type:
+            audio_format = 'wav'
+        elif 'webm' in recording_url.lower() or 'webm' in content_type:
+            audio_format = 'webm'
+        else:
+            audio_format = 'mp3'  # Default to mp3
+        
+        audio_data = b"".join(chunks)
+        logger.info(f"Downloaded {len(audio_data)} bytes, format: {audio_format}")
+        return {"success": True, "audio_data": audio_data, "audio_format": audio_format}
+    
+    async def analyze_recording(
+        self,
+        audio_data: bytes,
+        audio_format: str,
+        system_prompt: str,
+        analysis_prompt: str,
+        context: Dict[str, Any] = None,
+        transcript: List[Dict] = None,
+        focus_areas: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze a full recording as agent-turn clips (see tonality_preprocessing).
+        
+        Clips are analyzed concurrently (at most self.max_concurrency in flight)
+        and merged into the single-recording result schema. Recordings that
+        can't be decoded locally are sent whole with analysis_prompt, as before.
+        """
+        try:
+            segments = await self.preprocessor.prepare(audio_data, transcript)
+        except TranscodeError as e:
+            logger.warning(f"⚠️ Could not preprocess recording, sending it whole: {e}")
+            if len(audio_data) > MAX_UPLOAD_BYTES:
+                return {
+                    "success": False,
+                    "error": f"Audio file too large ({len(audio_data) / 1024 / 1024:.1f}MB). Max: {MAX_UPLOAD_BYTES // 1024 // 1024}MB"
+                }
+            return await self.analyze_audio_segment(
+                audio_data=audio_data,
+                audio_format=audio_format,
+                system_prompt=system_prompt,
+                analysis_prompt=analysis_prompt,
+                context=context
+            )
+        
+        if not segments:
+            return {"success": False, "error": "No speech found in the recording"}
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def analyze(segment: TonalitySegment) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_audio_segment(
+                    audio_data=segment.audio,
+                    audio_format=segment.audio_format,
+                    system_prompt=system_prompt,
+                    analysis_prompt=build_segment_prompt(segment, transcript, focus_areas),
+                    context=context
+                )
+        
+        results = await asyncio.gather(*(analyze(s) for s in segments))
+        return merge_segment_analyses(segments, results)
+    
     async def analyze_recording_url(
         self,
         recording_url: str,
         system_prompt: str,
         analysis_prompt: str,
         context: Dict[str, Any] = None,
-        max_duration_seconds: int = 300,  # 5 minutes max
-        auth_headers: Dict[str, str] = None  # Authentication headers for protected URLs
+        auth_headers: Dict[str, str] = None,  # Authentication headers for protected URLs
+        transcript: List[Dict] = None,
+        focus_areas: List[str] = None
     ) -> Dict[str, Any]:
         """
         Download and analyze a recording from URL.
@@ -178,80 +319,28 @@ class AudioTonalityAnalyzer:
         Args:
             recording_url: URL to the audio recording
             system_prompt: System instructions for analysis
-            analysis_prompt: Specific analysis request
+            analysis_prompt: Whole-recording analysis request (used when the recording can't be segmented)
             context: Additional context
-            max_duration_seconds: Maximum audio duration to process
             auth_headers: Optional auth headers for protected recording URLs
+            transcript: Call transcript, used to cut agent turns
+            focus_areas: Specific areas to focus analysis on
         
         Returns:
             Analysis results
         """
         try:
-            # Download the audio file
-            logger.info(f"Downloading audio from: {recording_url}")
-            
-            # Build headers for download
-            download_headers = {}
-            if auth_headers:
-                download_headers.update(auth_headers)
-            
-            async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-                response = await client.get(recording_url, headers=download_headers)
-                
-                if response.status_code == 403:
-                    # Try with common auth patterns
-                    logger.warning("403 Forbidden when downloading audio. Trying alternative methods...")
-                    
-                    # Some services need the URL to be accessed with specific query params
-                    # Try adding common access tokens if the URL has them
-                    if '?' not in recording_url:
-                        # Try without auth as some URLs work after redirect
-                        response = await client.get(recording_url, follow_redirects=True)
-                    
-                    if response.status_code == 403:
-                        return {
-                            "success": False,
-                            "error": "Failed to download audio: 403 Forbidden. The recording URL may have expired or require authentication.",
-                            "suggestion": "Please ensure the recording URL is accessible. Some services require regenerating the URL or providing an API key."
-                        }
-                
-                if response.status_code != 200:
-                    return {
-                        "success": False,
-                        "error": f"Failed to download audio: {response.status_code}"
-                    }
-                
-                audio_data = response.content
-                
-                # Determine format from URL or content-type
-                content_type = response.headers.get('content-type', '')
-                if 'mp3' in recording_url.lower() or 'mpeg' in content_type:
-                    audio_format = 'mp3'
-                elif 'wav' in recording_url.lower() or 'wav' in content_type:
-                    audio_format = 'wav'
-                elif 'webm' in recording_url.lower() or 'webm' in content_type:
-                    audio_format = 'webm'
-                else:
-                    audio_format = 'mp3'  # Default to mp3
-                
-                logger.info(f"Downloaded {len(audio_data)} bytes, format: {audio_format}")
-                
-                # Check file size (OpenAI has limits)
-                max_size_mb = 25  # OpenAI limit
-                if len(audio_data) > max_size_mb * 1024 * 1024:
-                    return {
-                        "success": False,
-                        "error": f"Audio file too large ({len(audio_data) / 1024 / 1024:.1f}MB). Max: {max_size_mb}MB"
-                    }
-                
-                # Analyze the audio
-                return await self.analyze_audio_segment(
-                    audio_data=audio_data,
-                    audio_format=audio_format,
-                    system_prompt=system_prompt,
-                    analysis_prompt=analysis_prompt,
-                    context=context
-                )
+            download = await self.download_recording(recording_url, auth_headers)
+            if not download.get("success"):
+                return download
+            return await self.analyze_recording(
+                audio_data=download["audio_data"],
+                audio_format=download["audio_format"],
+                system_prompt=system_prompt,
+                analysis_prompt=analysis_prompt,
+                context=context,
+                transcript=transcript,
+                focus_areas=focus_areas
+            )
         
         except Exception as e:
             logger.error(f"Error analyzing recording URL: {str(e)}")
@@ -261,6 +350,107 @@ class AudioTonalityAnalyzer:
             }
 
 
+def _weighted_mean(values: List[tuple]) -> float:
+    total = sum(w for _, w in values) or 1.0
+    return round(sum(v * w for v, w in values) / total, 1)
+
+
+def _merge_values(values: List[tuple]) -> Any:
+    """
+    Merge one field across segments; values are (value, weight) pairs.
+    Numbers → duration-weighted mean, booleans → any, strings → most common
+    (by weight), lists → concatenated without duplicates, dicts → per key.
+    """
+    present = [(v, w) for v, w in values if v is not None]
+    if not present:
+        return None
+    first = present[0][0]
+    if isinstance(first, bool):
+        return any(bool(v) for v, _ in present)
+    if isinstance(first, (int, float)):
+        return _weighted_mean([(v, w) for v, w in present if isinstance(v, (int, float)) and not isinstance(v, bool)])
+    if isinstance(first, dict):
+        keys = []
+        for v, _ in present:
+            if isinstance(v, dict):
+                keys.extend(k for k in v if k not in keys)
+        return {k: _merge_values([(v.get(k), w) for v, w in present if isinstance(v, dict)]) for k in keys}
+    if isinstance(first, list):
+        merged = []
+        for v, _ in present:
+            for item in v if isinstance(v, list) else [v]:
+                if item not in merged:
+                    merged.append(item)
+        return merged
+    votes: Dict[str, float] = {}
+    for v, w in present:
+        votes[str(v)] = votes.get(str(v), 0.0) + w
+    return max(votes, key=votes.get)
+
+
+def merge_segment_analyses(segments: List[TonalitySegment], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-clip results into the whole-recording result schema.
+    
+    Scores are weighted by each clip's speech length; the emotional journey
+    lists each clip's moments in call order, labelled with the clip's time.
+    """
+    succeeded = [(s, r) for s, r in zip(segments, results) if r.get("success")]
+    segment_info = [
+        {**s.describe(), "success": bool(r.get("success")), **({"error": r.get("error")} if not r.get("success") else {})}
+        for s, r in zip(segments, results)
+    ]
+    if not succeeded:
+        failure = results[0] if results else {"error": "No segments analyzed"}
+        return {**failure, "success": False, "segments": segment_info}
+    
+    analyses = [(r.get("analysis") or {}, max(s.speech_seconds, 0.1)) for s, r in succeeded]
+    merged = _merge_values([({k: v for k, v in a.items() if k != "emotional_journey"}, w) for a, w in analyses]) or {}
+    
+    journey = []
+    for segment, result in succeeded:
+        minutes, seconds = divmod(int(segment.start), 60)
+        label = f"{minutes}:{seconds:02d}" + (f" (agent turn {segment.turn_index})" if segment.turn_index is not None else "")
+        for moment in (result.get("analysis") or {}).get("emotional_journey") or []:
+            if isinstance(moment, dict):
+                journey.append({**moment, "timestamp_description": f"{label} {moment.get('timestamp_description', '')}".strip()})
+    merged["emotional_journey"] = journey
+    
+    raw = "\n\n".join(
+        f"[segment {s.index} @ {s.start:.1f}s] {r.get('raw_response', '')}" for s, r in succeeded
+    )
+    return {
+        "success": True,
+        "analysis": merged,
+        "raw_response": raw,
+        "segments": segment_info,
+        "segments_analyzed": len(succeeded),
+        "segments_failed": len(segments) - len(succeeded),
+        "bytes_uploaded": sum(len(s.audio) for s in segments),
+    }
+
+
+def build_segment_prompt(
+    segment: TonalitySegment,
+    transcript: List[Dict] = None,
+    focus_areas: List[str] = None
+) -> str:
+    """Analysis request for one agent clip, with the turns around it as reference"""
+    nearby = []
+    if transcript and segment.turn_index is not None:
+        nearby = transcript[max(0, segment.turn_index - 1): segment.turn_index + 1]
+    prompt = build_analysis_prompt(transcript=nearby, focus_areas=focus_areas)
+    if segment.turn_index is not None:
+        prompt += f"""
+
+This clip contains only the agent's speech for one turn ({segment.start:.0f}s-{segment.end:.0f}s into the call). Score the agent's delivery from the audio; infer the user's state only from the reference transcript."""
+    else:
+        prompt += f"""
+
+This clip is one part of the call ({segment.start:.0f}s-{segment.end:.0f}s). Analyze it on its own."""
+    return prompt
+
+
 def build_tonality_system_prompt(
     agent_config: Dict[str, Any] = None,
     knowledge_base: str = None,
@@ -440,6 +630,8 @@ async def analyze_call_audio_tonality(
     Main function to analyze call audio for tonality.
     
     This is the primary entry point for audio-based tonality analysis.
+    The recording is split into agent-turn clips (by transcript timestamps)
+    that are analyzed in parallel and merged into one result.
     
     Args:
         recording_url: URL to the call recording (optional if audio_data provided)
@@ -481,12 +673,14 @@ async def analyze_call_audio_tonality(
     # If we have pre-downloaded audio data, use it directly
     if audio_data:
         logger.info(f"Analyzing pre-downloaded audio ({len(audio_data)} bytes, format: {audio_format})")
-        result = await analyzer.analyze_audio_segment(
+        result = await analyzer.analyze_recording(
             audio_data=audio_data,
             audio_format=audio_format,
             system_prompt=system_prompt,
             analysis_prompt=analysis_prompt,
-            context=context if context else None
+            context=context if context else None,
+            transcript=transcript,
+            focus_areas=focus_areas
         )
     elif recording_url:
         # Download from URL
@@ -495,7 +689,9 @@ async def analyze_call_audio_tonality(
             system_prompt=system_prompt,
             analysis_prompt=analysis_prompt,
             context=context if context else None,
-            auth_headers=auth_headers
+            auth_headers=auth_headers,
+            transcript=transcript,
+            focus_areas=focus_areas
         )
     else:
         return {
@@ -0,0 +1,208 @@
+"""
+Async Audio Transcoding Service
+Non-blocking replacement for `subprocess.run(['ffmpeg', ...])` in async handlers
+
+- ffmpeg runs as an asyncio subprocess with stdin/stdout pipes (no /tmp round-trips)
+- A bounded semaphore caps concurrent ffmpeg processes per worker
+- WAV/PCM → mulaw runs in-process with NumPy (no ffmpeg at all)
+- Every conversion is timed and aggregated per label for /health
+"""
+import asyncio
+import io
+import logging
+import os
+import time
+import wave
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from audio_resampler import convert_pcm_to_mulaw_8khz
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent ffmpeg processes per worker
+FFMPEG_MAX_CONCURRENCY = int(os.environ.get("FFMPEG_MAX_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+
+# Per-conversion timeout (seconds)
+FFMPEG_TIMEOUT = float(os.environ.get("FFMPEG_TIMEOUT", "10"))
+
+
+class TranscodeError(Exception):
+    """Raised when a conversion fails or times out"""
+    pass
+
+
+class AudioTranscoder:
+    """
+    Shared transcoding service (one per worker)
+    """
+
+    def __init__(self, max_concurrency: int = FFMPEG_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _record(self, label: str, elapsed_ms: float, in_bytes: int, out_bytes: int, ok: bool, queued_ms: float = 0.0):
+        m = self.metrics.setdefault(label, {
+            "count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "last_ms": 0.0, "queued_ms": 0.0, "bytes_in": 0, "bytes_out": 0
+        })
+        m["count"] += 1
+        if not ok:
+            m["failures"] += 1
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
+        m["last_ms"] = elapsed_ms
+        m["queued_ms"] += queued_ms
+        m["bytes_in"] += in_bytes
+        m["bytes_out"] += out_bytes
+
+    def get_stats(self) -> dict:
+        """Per-label conversion counts and timings"""
+        stats = {}
+        for label, m in self.metrics.items():
+            stats[label] = {
+                **m,
+                "avg_ms": round(m["total_ms"] / m["count"], 1) if m["count"] else 0.0,
+                "avg_queued_ms": round(m["queued_ms"] / m["count"], 1) if m["count"] else 0.0,
+            }
+        return {"max_concurrency": self.max_concurrency, "conversions": stats}
+
+    async def run_ffmpeg(
+        self,
+        input_bytes: bytes,
+        input_args: List[str],
+        output_args: List[str],
+        label: str = "ffmpeg",
+        timeout: float = FFMPEG_TIMEOUT
+    ) -> bytes:
+        """
+        Pipe input_bytes through ffmpeg and return stdout
+
+        Args:
+            input_bytes: Source audio
+            input_args: Args placed before `-i pipe:0` (e.g. ['-f', 's16le', '-ar', '16000', '-ac', '1'])
+            output_args: Args placed before `pipe:1` (must include '-f <format>')
+            label: Metrics label
+            timeout: Seconds before the process is killed
+
+        Raises:
+            TranscodeError on non-zero exit or timeout
+        """
+        queued_at = time.time()
+        async with self.semaphore:
+            start = time.time()
+            queued_ms = (start - queued_at) * 1000
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-hide_banner", "-loglevel", "error",
+                    *input_args, "-i", "pipe:0",
+                    *output_args, "pipe:1",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                self._record(label, 0.0, len(input_bytes), 0, ok=False, queued_ms=queued_ms)
+                raise TranscodeError(f"ffmpeg could not be started ({label}): {e}")
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(input_bytes), timeout=timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                elapsed_ms = (time.time() - start) * 1000
+                self._record(label, elapsed_ms, len(input_bytes), 0, ok=False, queued_ms=queued_ms)
+                raise TranscodeError(f"ffmpeg timeout after {timeout}s ({label})")
+
+            elapsed_ms = (time.time() - start) * 1000
+            if process.returncode != 0:
+                self._record(label, elapsed_ms, len(input_bytes), 0, ok=False, queued_ms=queued_ms)
+                raise TranscodeError(f"ffmpeg failed ({label}): {stderr.decode(errors='ignore')[:300]}")
+
+            self._record(label, elapsed_ms, len(input_bytes), len(stdout), ok=True, queued_ms=queued_ms)
+            logger.debug(f"⏱️ [TRANSCODE] {label}: {elapsed_ms:.0f}ms (queued {queued_ms:.0f}ms), {len(input_bytes)} → {len(stdout)} bytes")
+            return stdout
+
+    async def to_mp3(
+        self,
+        audio_bytes: bytes,
+        input_args: Optional[List[str]] = None,
+        sample_rate: int = 8000,
+        bitrate: str = "64k",
+        label: str = "to_mp3"
+    ) -> bytes:
+        """Convert any ffmpeg-readable audio (or raw PCM via input_args) to mono MP3"""
+        return await self.run_ffmpeg(
+            audio_bytes,
+            input_args or [],
+            ["-ar", str(sample_rate), "-ac", "1", "-b:a", bitrate, "-f", "mp3"],
+            label=label
+        )
+
+    async def pcm_to_mp3(self, pcm_bytes: bytes, sample_rate: int = 16000, bitrate: str = "64k", label: str = "pcm_to_mp3") -> bytes:
+        """Convert raw 16-bit mono PCM to MP3 (keeps source sample rate)"""
+        return await self.to_mp3(
+            pcm_bytes,
+            input_args=["-f", "s16le", "-ar", str(sample_rate), "-ac", "1"],
+            sample_rate=sample_rate,
+            bitrate=bitrate,
+            label=label
+        )
+
+    def pcm_to_mulaw(self, pcm_bytes: bytes, sample_rate: int, label: str = "pcm_to_mulaw") -> bytes:
+        """
+        In-process fast path: 16-bit mono PCM → 8kHz mulaw (NumPy, ~1ms per second of audio)
+        """
+        start = time.time()
+        mulaw = convert_pcm_to_mulaw_8khz(pcm_bytes, sample_rate)
+        self._record(label, (time.time() - start) * 1000, len(pcm_bytes), len(mulaw), ok=True)
+        return mulaw
+
+    def wav_to_mulaw(self, wav_bytes: bytes, label: str = "wav_to_mulaw") -> Optional[bytes]:
+        """
+        In-process fast path for 16-bit PCM WAV → 8kHz mulaw
+        Returns None if the WAV isn't plain 16-bit PCM (caller should use ffmpeg)
+        """
+        try:
+            with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+                if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+                    return None
+                channels = wav.getnchannels()
+                sample_rate = wav.getframerate()
+                frames = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError):
+            return None
+
+        if channels > 1:
+            samples = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)
+            frames = samples.mean(axis=1).astype(np.int16).tobytes()
+
+        return self.pcm_to_mulaw(frames, sample_rate, label=label)
+
+    async def to_mulaw(self, audio_bytes: bytes, label: str = "to_mulaw") -> bytes:
+        """
+        Convert audio to 8kHz mono mulaw
+        WAV uses the in-process fast path; anything else (MP3, ...) goes through ffmpeg pipes
+        """
+        if audio_bytes[:4] == b"RIFF":
+            mulaw = self.wav_to_mulaw(audio_bytes, label=f"{label}_wav_fast")
+            if mulaw is not None:
+                return mulaw
+        return await self.run_ffmpeg(
+            audio_bytes,
+            [],
+            ["-ar", "8000", "-ac", "1", "-f", "mulaw"],
+            label=label
+        )
+
+
+# Global transcoder instance
+audio_transcoder = AudioTranscoder()
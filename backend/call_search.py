@@ -0,0 +1,136 @@
+"""
+Call Search Keys
+Indexed phone-number and call-id filters for /call-analytics and /call-history,
+replacing unanchored case-insensitive $regex filters that scanned every call
+log of the tenant.
+
+- Each call log carries search_terms: tagged, normalized keys written when
+  the log is created
+  - "f:" / "t:" digits-only from/to numbers (E.164 digits, the raw digits and,
+    for +1 numbers, the 10-digit national number)
+  - "fr:" / "tr:" the same digits reversed, so "ends with 0102" is a prefix
+  - "c:" / "cr:" the lowercased call id and its reverse
+- A filter matches keys that start or end with the typed value; both sides are
+  anchored prefix regexes on one multikey field, so Mongo walks index ranges
+  on (user_id, search_terms, start_time) instead of the collection
+- Substring matches in the middle of a number or call id are no longer found
+- backfill_search_terms adds the keys to logs that predate them (once,
+  recorded in `migrations`: later starts don't rescan call_logs)
+"""
+import logging
+import re
+import time
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+import data_migrations
+from lead_import import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+CALL_SEARCH_INDEX = "user_search_start"
+SEARCH_TERMS_MIGRATION = "call_logs_search_terms"
+BACKFILL_BATCH_SIZE = 1000
+
+_NON_DIGITS = re.compile(r"\D")
+
+# Query parameter → search-term tag
+FILTER_TAGS = {"from_number": "f", "to_number": "t", "call_id": "c"}
+
+
+def phone_digit_forms(number: Optional[str]) -> List[str]:
+    """Digit strings a phone number can be searched by (full international form first)"""
+    if not number:
+        return []
+    forms = []
+    e164 = normalize_phone(number)
+    if e164:
+        forms.append(e164[1:])
+        if e164.startswith("+1") and len(e164) == 12:
+            forms.append(e164[2:])
+    raw = _NON_DIGITS.sub("", number)
+    if raw:
+        forms.append(raw)
+    return list(dict.fromkeys(forms))
+
+
+def search_terms(call_id: Optional[str], from_number: Optional[str], to_number: Optional[str]) -> List[str]:
+    """search_terms for a call log"""
+    terms = []
+    for tag, number in (("f", from_number), ("t", to_number)):
+        for digits in phone_digit_forms(number):
+            terms += [f"{tag}:{digits}", f"{tag}r:{digits[::-1]}"]
+    if call_id:
+        key = str(call_id).lower()
+        terms += [f"c:{key}", f"cr:{key[::-1]}"]
+    return list(dict.fromkeys(terms))
+
+
+def with_search_terms(call_log: Dict) -> Dict:
+    """Set search_terms on a call log document about to be inserted"""
+    call_log["search_terms"] = search_terms(
+        call_log.get("call_id"), call_log.get("from_number"), call_log.get("to_number")
+    )
+    return call_log
+
+
+def term_filter(field: str, value: str) -> Dict:
+    """
+    Anchored condition for one filter: keys starting or ending with value.
+    An empty phone filter (no digits typed) matches nothing.
+    """
+    tag = FILTER_TAGS[field]
+    key = _NON_DIGITS.sub("", value) if tag in ("f", "t") else value.strip().lower()
+    if not key:
+        return {"search_terms": {"$in": []}}
+    return {"search_terms": {"$in": [
+        re.compile(f"^{tag}:{re.escape(key)}"),
+        re.compile(f"^{tag}r:{re.escape(key[::-1])}"),
+    ]}}
+
+
+def apply_search_filters(query: Dict, **filters: Optional[str]) -> Dict:
+    """Add the anchored call_id / from_number / to_number conditions that are set"""
+    conditions = [term_filter(field, value) for field, value in filters.items() if value]
+    if len(conditions) == 1:
+        query.update(conditions[0])
+    elif conditions:
+        query.setdefault("$and", []).extend(conditions)
+    return query
+
+
+async def ensure_search_indexes(db):
+    await db.call_logs.create_index(
+        [("user_id", 1), ("search_terms", 1), ("start_time", -1)], name=CALL_SEARCH_INDEX
+    )
+
+
+async def backfill_search_terms(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Write search_terms on call logs created before they existed"""
+    try:
+        await ensure_search_indexes(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure call search index: {e}")
+    if await data_migrations.is_done(db, SEARCH_TERMS_MIGRATION):
+        return 0
+    started = time.time()
+    updated = 0
+    ops: List[UpdateOne] = []
+    async for doc in db.call_logs.find(
+        {"search_terms": {"$exists": False}}, {"_id": 1, "call_id": 1, "from_number": 1, "to_number": 1}
+    ):
+        terms = search_terms(doc.get("call_id"), doc.get("from_number"), doc.get("to_number"))
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": terms}}))
+        if len(ops) >= batch_size:
+            await db.call_logs.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await db.call_logs.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    if updated:
+        logger.info(f"🔎 Backfilled search keys on {updated} call logs in {time.time() - started:.0f}s")
+    await data_migrations.mark_done(db, SEARCH_TERMS_MIGRATION, updated=updated)
+    return updated
+
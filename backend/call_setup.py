@@ -0,0 +1,248 @@
+"""
+Call Setup Rendezvous
+Hands call setup from the Telnyx webhook (call.answered builds the
+CallSession) to the media WebSocket, replacing the 200ms call-data poll and
+the blind 0.5s sleep before the media worker rebuilt the session itself.
+
+- One asyncio.Event per call_control_id; the webhook reports each stage
+  (building → ready | failed) and the media socket wakes on it immediately
+- Stages are also published on a Redis pub/sub channel so every worker
+  learns where the session is being built. Same worker → wait for it and use
+  it. Another worker → a CallSession is per-process, so the media worker
+  starts its own build as soon as it hears "building", in parallel with the
+  webhook's, instead of after a timeout
+- Webhook and media-socket builds go through one single-flight build per
+  call, so a session is never built twice on one worker (e.g. when the media
+  socket gives up waiting while the webhook is still building)
+- If a pub/sub message is missed, the persisted session owner
+  (redis session_ready key) is re-checked every CALL_SETUP_RECHECK seconds
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest the media socket waits for the webhook before building the session itself
+CALL_SETUP_TIMEOUT = float(os.environ.get("CALL_SETUP_TIMEOUT", "5"))
+CALL_SETUP_CHANNEL = "call_setup"
+# Safety net for a missed pub/sub message: how often the persisted owner is re-read
+CALL_SETUP_RECHECK = 1.0
+# Stages nobody waited on are forgotten after this long
+CALL_SETUP_OUTCOME_TTL = 120.0
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+BUILDING, READY, FAILED = "building", "ready", "failed"
+
+
+@dataclass
+class SetupResult:
+    status: str                 # "local" | "remote" | "failed" | "timeout"
+    owner: Optional[str]        # worker that built (or is building) the webhook's session
+    waited_ms: int
+    started_at: float
+
+
+class RedisSetupChannel:
+    """Cross-worker setup notifications over Redis pub/sub"""
+
+    def __init__(self, url: str, name: str = CALL_SETUP_CHANNEL):
+        import redis.asyncio as aioredis
+        self.name = name
+        self._client = aioredis.from_url(url, decode_responses=True)
+
+    async def publish(self, message: Dict):
+        await self._client.publish(self.name, json.dumps(message))
+
+    async def listen(self, deliver: Callable[[Dict], None]):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self.name)
+        try:
+            async for msg in pubsub.listen():
+                if msg.get("type") == "message":
+                    deliver(json.loads(msg["data"]))
+        finally:
+            await pubsub.close()
+
+    async def close(self):
+        await self._client.close()
+
+
+class CallSetupRendezvous:
+    """Per-call rendezvous between the webhook that builds a session and the media socket that needs it"""
+
+    def __init__(self, worker_id: str = WORKER_ID, timeout: float = CALL_SETUP_TIMEOUT):
+        self.worker_id = worker_id
+        self.timeout = timeout
+        self.channel = None
+        # Persisted owner lookup (e.g. redis session_ready key) for stages published before we listened
+        self.owner_source: Optional[Callable[[str], Optional[str]]] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self._stages: Dict[str, Tuple[str, str, float]] = {}     # call_control_id → (stage, worker, at)
+        self._builds: Dict[str, asyncio.Task] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._gaps: Deque[int] = deque(maxlen=500)
+        self.stats = {"local": 0, "remote": 0, "failed": 0, "timeout": 0, "builds": 0, "joined_builds": 0}
+
+    async def start(self, channel=None):
+        """Subscribe to other workers' setup stages (no channel → same-worker rendezvous only)"""
+        self.channel = channel
+        if channel is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self.channel is not None:
+            try:
+                await self.channel.close()
+            except Exception:
+                pass
+
+    async def _listen(self):
+        while True:
+            try:
+                await self.channel.listen(self._deliver)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Call setup channel lost ({e}), resubscribing in 1s")
+                await asyncio.sleep(1.0)
+
+    def _deliver(self, message: Dict):
+        if message.get("worker") == self.worker_id:
+            return  # already settled locally
+        self._settle(message.get("call_control_id"), message.get("stage"), message.get("worker"))
+
+    def _settle(self, call_control_id: Optional[str], stage: Optional[str], worker: Optional[str]):
+        if not call_control_id or stage not in (BUILDING, READY, FAILED):
+            return
+        now = time.time()
+        self._stages[call_control_id] = (stage, worker, now)
+        event = self._events.get(call_control_id)
+        if event:
+            event.set()
+        for cid in [c for c, (_, _, at) in self._stages.items() if now - at > CALL_SETUP_OUTCOME_TTL]:
+            if cid not in self._events:
+                del self._stages[cid]
+
+    async def _announce(self, call_control_id: str, stage: str):
+        self._settle(call_control_id, stage, self.worker_id)
+        if self.channel is not None:
+            try:
+                await self.channel.publish({"call_control_id": call_control_id, "stage": stage, "worker": self.worker_id})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not publish call setup stage {stage} for {call_control_id}: {e}")
+
+    async def building(self, call_control_id: str):
+        """Webhook is about to build the session on this worker"""
+        await self._announce(call_control_id, BUILDING)
+
+    async def ready(self, call_control_id: str):
+        """Webhook's session is registered in this worker's active_sessions"""
+        await self._announce(call_control_id, READY)
+
+    async def failed(self, call_control_id: str):
+        """Webhook couldn't build the session: whoever has the media socket should"""
+        await self._announce(call_control_id, FAILED)
+
+    def _resolve(self, call_control_id: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(status, owner) once the media socket can proceed, else None"""
+        stage = self._stages.get(call_control_id)
+        if stage is None:
+            return None
+        kind, worker, _ = stage
+        if kind == FAILED:
+            return "failed", worker
+        if worker != self.worker_id:
+            return "remote", worker  # building or ready elsewhere: this worker needs its own
+        if kind == READY:
+            return "local", worker
+        return None  # building here: wait for ready
+
+    def _recheck_owner(self, call_control_id: str):
+        if self.owner_source is None:
+            return
+        try:
+            owner = self.owner_source(call_control_id)
+        except Exception:
+            return
+        if owner and call_control_id not in self._stages:
+            self._settle(call_control_id, READY, owner)
+
+    async def wait_for_session(self, call_control_id: str, timeout: Optional[float] = None) -> SetupResult:
+        """Wait until this worker has the webhook's session, or knows it must build one"""
+        started = time.time()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        event = self._events.setdefault(call_control_id, asyncio.Event())
+        try:
+            self._recheck_owner(call_control_id)
+            while True:
+                resolved = self._resolve(call_control_id)
+                if resolved:
+                    status, owner = resolved
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    status, owner = "timeout", None
+                    break
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(remaining, CALL_SETUP_RECHECK))
+                except asyncio.TimeoutError:
+                    self._recheck_owner(call_control_id)
+        finally:
+            self._events.pop(call_control_id, None)
+        self.stats[status] += 1
+        return SetupResult(status, owner, int((time.time() - started) * 1000), started)
+
+    async def build_once(self, call_control_id: str, factory: Callable[[], Awaitable]):
+        """Build this worker's session for a call; concurrent callers share one build"""
+        task = self._builds.get(call_control_id)
+        if task is None:
+            self.stats["builds"] += 1
+            task = asyncio.create_task(factory())
+            self._builds[call_control_id] = task
+            task.add_done_callback(lambda t: self._builds.pop(call_control_id, None)
+                                   if t.cancelled() or t.exception() else None)  # failed builds may be retried
+        else:
+            self.stats["joined_builds"] += 1
+        return await asyncio.shield(task)
+
+    def session_available(self, setup: SetupResult):
+        """Media socket has its session: record the setup gap since the stream 'start' event"""
+        self._gaps.append(int((time.time() - setup.started_at) * 1000))
+
+    def discard(self, call_control_id: str):
+        """Call ended: forget its stages and finished build"""
+        self._stages.pop(call_control_id, None)
+        task = self._builds.pop(call_control_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def get_stats(self) -> dict:
+        gaps = sorted(self._gaps)
+        return {
+            **self.stats,
+            "worker": self.worker_id,
+            "cross_worker": self.channel is not None,
+            "pending": len(self._events),
+            "setup_gap_ms_p50": gaps[len(gaps) // 2] if gaps else None,
+            "setup_gap_ms_p95": gaps[int(len(gaps) * 0.95)] if gaps else None,
+        }
+
+
+# Global call setup rendezvous instance
+call_setup = CallSetupRendezvous()
@@ -0,0 +1,384 @@
+"""
+Campaign Pattern Accumulator
+Persisted per-campaign state behind detect_campaign_patterns, which used to
+re-walk every analyzed call's node_analyses each time it ran.
+
+- Each analyzed call is reduced to a digest (turn qualities, issues,
+  positives, prompt suggestions) kept on its campaign_calls document as
+  pattern_digest. Folding a call swaps the digest atomically and applies
+  (new - old) to the campaign state, so re-analysis and removal stay exact
+- Quality-per-turn and suggestion-type counts are plain mergeable counters;
+  issues and positives go through a SpaceSaving top-K sketch, exact while a
+  campaign has at most PATTERN_SKETCH_CAPACITY distinct entries
+- Evidence samples are the PATTERN_SAMPLE_SIZE smallest (call_id, turn)
+  entries per key, so they don't depend on fold order; a removed sample is
+  refilled from the digests with one bounded query
+- The state document is written under a version check and read with one
+  fetch by pattern detection
+- recompute rebuilds a campaign from campaign_calls; check compares the
+  stored state against a recompute
+"""
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PATTERN_STATE_COLLECTION = "campaign_pattern_state"
+# Distinct issues/positives tracked per campaign before the sketch starts approximating
+PATTERN_SKETCH_CAPACITY = int(os.environ.get("PATTERN_SKETCH_CAPACITY", "256"))
+PATTERN_SAMPLE_SIZE = 5
+PATTERN_FOLD_RETRIES = 10
+
+POOR_QUALITIES = ("poor", "needs_improvement")
+
+
+def call_digest(call_id: str, script_results: Optional[Dict]) -> Optional[Dict]:
+    """What one call's script QC results contribute to its campaign's patterns"""
+    if not script_results:
+        return None
+    turns, issues, positives, suggestions = [], [], [], []
+    for analysis in script_results.get("node_analyses", []) or []:
+        if not analysis:
+            continue
+        turn = analysis.get("turn_number", 0)
+        turns.append([turn, analysis.get("quality", "good")])
+        issues.extend(str(i) for i in analysis.get("issues") or [])
+        positives.extend(str(p) for p in analysis.get("positives") or [])
+        prompt_sugg = analysis.get("prompt_suggestions")
+        if prompt_sugg and isinstance(prompt_sugg, dict):
+            suggestions.append([prompt_sugg.get("type", "unknown"), turn, prompt_sugg.get("suggestion", "")])
+    keys = {f"suggestion:{s[0]}" for s in suggestions}
+    keys.update(f"bottleneck:{turn}" for turn, quality in turns if quality in POOR_QUALITIES)
+    return {"call_id": call_id, "turns": turns, "issues": issues, "positives": positives,
+            "suggestions": suggestions, "keys": sorted(keys)}
+
+
+def digest_samples(digest: Dict) -> Dict[str, List[list]]:
+    """Sample entries ([call_id, turn, text]) a digest offers, per key"""
+    samples = defaultdict(list)
+    call_id = digest["call_id"]
+    for sugg_type, turn, text in digest["suggestions"]:
+        samples[f"suggestion:{sugg_type}"].append([call_id, turn, text])
+    for turn, quality in digest["turns"]:
+        if quality in POOR_QUALITIES:
+            entry = [call_id, turn, None]
+            if entry not in samples[f"bottleneck:{turn}"]:
+                samples[f"bottleneck:{turn}"].append(entry)
+    return samples
+
+
+def _sample_key(entry: list) -> Tuple[str, str]:
+    return str(entry[0]), str(entry[1])
+
+
+class TopK:
+    """SpaceSaving heavy-hitter sketch; a count overestimates by at most its recorded error"""
+
+    def __init__(self, capacity: int = PATTERN_SKETCH_CAPACITY, counts: Dict[str, int] = None,
+                 errors: Dict[str, int] = None):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = dict(counts or {})
+        self.errors: Dict[str, int] = dict(errors or {})
+
+    def add(self, item: str, n: int = 1):
+        if item in self.counts:
+            self.counts[item] += n
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = n
+            self.errors[item] = 0
+        else:
+            victim = min(self.counts, key=lambda k: (self.counts[k], k))
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim, None)
+            self.counts[item] = floor + n
+            self.errors[item] = floor
+
+    def remove(self, item: str, n: int = 1):
+        if item not in self.counts:
+            return  # already evicted: nothing left to take back
+        self.counts[item] -= n
+        if self.counts[item] <= 0:
+            del self.counts[item]
+            self.errors.pop(item, None)
+
+    def merge(self, other: "TopK") -> "TopK":
+        merged = TopK(self.capacity)
+        for item in set(self.counts) | set(other.counts):
+            merged.counts[item] = self.counts.get(item, 0) + other.counts.get(item, 0)
+            merged.errors[item] = self.errors.get(item, 0) + other.errors.get(item, 0)
+        for item in sorted(merged.counts, key=lambda k: (-merged.counts[k], k))[self.capacity:]:
+            del merged.counts[item]
+            del merged.errors[item]
+        return merged
+
+    def most_common(self, k: int) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+    def to_doc(self) -> List[list]:
+        return [[item, count, self.errors.get(item, 0)] for item, count in sorted(self.counts.items())]
+
+    @classmethod
+    def from_doc(cls, doc: Iterable[list], capacity: int = PATTERN_SKETCH_CAPACITY) -> "TopK":
+        sketch = cls(capacity)
+        for item, count, error in doc or []:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        return sketch
+
+
+class PatternState:
+    """Accumulated pattern inputs for one campaign"""
+
+    def __init__(self, capacity: int = PATTERN_SKETCH_CAPACITY):
+        self.analyzed_calls = 0
+        self.turn_quality: Dict[Tuple, int] = {}            # (turn, quality) → analyses
+        self.suggestion_counts: Dict[str, int] = {}         # suggestion type → suggestions
+        self.issues = TopK(capacity)
+        self.positives = TopK(capacity)
+        self.samples: Dict[str, List[list]] = {}            # key → smallest [call_id, turn, text]
+
+    def apply(self, digest: Optional[Dict], sign: int) -> Set[str]:
+        """Add (sign=1) or take back (sign=-1) a digest; returns sample keys that need a refill"""
+        if not digest:
+            return set()
+        self.analyzed_calls += sign
+        for turn, quality in digest["turns"]:
+            key = (turn, quality)
+            self.turn_quality[key] = self.turn_quality.get(key, 0) + sign
+            if not self.turn_quality[key]:
+                del self.turn_quality[key]
+        for sketch, items in ((self.issues, digest["issues"]), (self.positives, digest["positives"])):
+            for item in items:
+                if sign > 0:
+                    sketch.add(item)
+                else:
+                    sketch.remove(item)
+        for sugg_type, _, _ in digest["suggestions"]:
+            self.suggestion_counts[sugg_type] = self.suggestion_counts.get(sugg_type, 0) + sign
+            if not self.suggestion_counts[sugg_type]:
+                del self.suggestion_counts[sugg_type]
+
+        refill = set()
+        for key, entries in digest_samples(digest).items():
+            current = self.samples.get(key, [])
+            if sign > 0:
+                current = sorted(current + entries, key=_sample_key)[:PATTERN_SAMPLE_SIZE]
+            else:
+                kept = [e for e in current if e[0] != digest["call_id"]]
+                if len(kept) < len(current):
+                    refill.add(key)
+                current = kept
+            if current:
+                self.samples[key] = current
+            else:
+                self.samples.pop(key, None)
+        return refill
+
+    def patterns(self, campaign_id: str, total_calls: int) -> List[Dict]:
+        """Campaign patterns from the accumulated state"""
+        patterns = []
+        if self.analyzed_calls < 2:
+            return patterns
+        total_calls = max(total_calls, self.analyzed_calls, 1)
+        now = datetime.utcnow().isoformat()
+
+        def pattern(pattern_type, description, affected_nodes, evidence_calls, confidence):
+            return {"id": str(uuid.uuid4()), "campaign_id": campaign_id, "pattern_type": pattern_type,
+                    "description": description, "affected_nodes": affected_nodes,
+                    "evidence_calls": evidence_calls, "confidence_score": confidence, "created_at": now}
+
+        # Pattern 1: consistently problematic turns
+        by_turn = defaultdict(dict)
+        for (turn, quality), count in self.turn_quality.items():
+            by_turn[turn][quality] = count
+        for turn in sorted(by_turn, key=str):
+            qualities = by_turn[turn]
+            analyses = sum(qualities.values())
+            poor_count = sum(qualities.get(q, 0) for q in POOR_QUALITIES)
+            if poor_count >= analyses * 0.6:  # 60%+ of calls have issues at this turn
+                patterns.append(pattern(
+                    "bottleneck",
+                    f"Turn {turn} consistently underperforms across {poor_count}/{analyses} calls",
+                    [f"Turn {turn}"],
+                    [e[0] for e in self.samples.get(f"bottleneck:{turn}", [])],
+                    poor_count / analyses,
+                ))
+
+        # Pattern 2: recurring issues
+        for issue, count in self.issues.most_common(5):
+            if count >= 3:
+                patterns.append(pattern("recurring_issue", f"Recurring issue: {issue}", [], [],
+                                        min(count / total_calls, 1.0)))
+
+        # Pattern 3: common prompt improvement needs
+        for sugg_type in sorted(self.suggestion_counts):
+            count = self.suggestion_counts[sugg_type]
+            if count >= 3:
+                samples = self.samples.get(f"suggestion:{sugg_type}", [])
+                first = samples[0][2] if samples else ""
+                patterns.append(pattern(
+                    "improvement_opportunity",
+                    f"Multiple calls need {sugg_type}: {(first or '')[:100]}...",
+                    [f"Turn {e[1]}" for e in samples],
+                    [e[0] for e in samples],
+                    min(count / total_calls, 1.0),
+                ))
+
+        # Pattern 4: success patterns
+        for positive, count in self.positives.most_common(3):
+            if count >= total_calls * 0.7:
+                patterns.append(pattern("success", f"Consistent success: {positive}", [], [],
+                                        count / total_calls))
+        return patterns
+
+    def to_doc(self) -> Dict:
+        # Issue text and turn labels aren't safe Mongo field names: store pairs, not dicts
+        return {
+            "analyzed_calls": self.analyzed_calls,
+            "turn_quality": [[turn, quality, count] for (turn, quality), count in
+                             sorted(self.turn_quality.items(), key=lambda kv: (str(kv[0][0]), kv[0][1]))],
+            "suggestion_counts": sorted([t, c] for t, c in self.suggestion_counts.items()),
+            "issues": self.issues.to_doc(),
+            "positives": self.positives.to_doc(),
+            "samples": sorted([key, entries] for key, entries in self.samples.items()),
+        }
+
+    @classmethod
+    def from_doc(cls, doc: Dict, capacity: int = PATTERN_SKETCH_CAPACITY) -> "PatternState":
+        state = cls(capacity)
+        state.analyzed_calls = doc.get("analyzed_calls", 0)
+        state.turn_quality = {(turn, quality): count for turn, quality, count in doc.get("turn_quality", [])}
+        state.suggestion_counts = {t: c for t, c in doc.get("suggestion_counts", [])}
+        state.issues = TopK.from_doc(doc.get("issues"), capacity)
+        state.positives = TopK.from_doc(doc.get("positives"), capacity)
+        state.samples = {key: entries for key, entries in doc.get("samples", [])}
+        return state
+
+
+class CampaignPatternAccumulator:
+    """Folds analyzed calls into persisted per-campaign PatternState"""
+
+    def __init__(self, collection: str = PATTERN_STATE_COLLECTION, capacity: int = PATTERN_SKETCH_CAPACITY):
+        self.collection = collection
+        self.capacity = capacity
+        self.stats = {"folds": 0, "conflicts": 0, "refills": 0, "recomputes": 0}
+
+    async def fold_call(self, db, campaign_id: str, call_id: str, script_results: Optional[Dict]):
+        """A call's script QC results changed (None: cleared or leaving the campaign)"""
+        try:
+            new = call_digest(call_id, script_results)
+            before = await db.campaign_calls.find_one_and_update(
+                {"campaign_id": campaign_id, "call_id": call_id},
+                {"$set": {"pattern_digest": new}},
+                projection={"_id": 0, "pattern_digest": 1}
+            )  # returns the digest this call contributed until now
+            if before is None:
+                return  # not (or no longer) in the campaign
+            old = (before or {}).get("pattern_digest")
+            if old == new:
+                return
+            self.stats["folds"] += 1
+            await self._update(db, campaign_id, old, new)
+        except Exception as e:
+            logger.error(f"Error folding call {call_id} into campaign {campaign_id} patterns: {e}")
+
+    async def _update(self, db, campaign_id: str, old: Optional[Dict], new: Optional[Dict]):
+        states = db[self.collection]
+        for _ in range(PATTERN_FOLD_RETRIES):
+            doc = await states.find_one({"campaign_id": campaign_id}, {"_id": 0})
+            if doc is None:
+                await self.recompute(db, campaign_id)  # first fold: build from every call (includes this one)
+                return
+            state = PatternState.from_doc(doc, self.capacity)
+            refill = state.apply(old, -1)
+            state.apply(new, 1)
+            if refill:
+                await self._refill(db, campaign_id, state, refill)
+            result = await states.update_one(
+                {"campaign_id": campaign_id, "version": doc.get("version", 0)},
+                {"$set": {**state.to_doc(), "version": doc.get("version", 0) + 1, "updated_at": datetime.utcnow()}}
+            )
+            if result.matched_count:
+                return
+            self.stats["conflicts"] += 1
+        logger.warning(f"⚠️ Pattern state for campaign {campaign_id} kept changing underneath; recomputing")
+        await self.recompute(db, campaign_id)
+
+    async def _refill(self, db, campaign_id: str, state: PatternState, keys: Set[str]):
+        """Re-derive sample lists that lost an entry from the digests that still offer one"""
+        for key in keys:
+            self.stats["refills"] += 1
+            entries = []
+            async for cc in db.campaign_calls.find(
+                {"campaign_id": campaign_id, "pattern_digest.keys": key},
+                {"_id": 0, "pattern_digest": 1}
+            ).sort("call_id", 1).limit(PATTERN_SAMPLE_SIZE):
+                entries.extend(digest_samples(cc["pattern_digest"]).get(key, []))
+            entries = sorted(entries, key=_sample_key)[:PATTERN_SAMPLE_SIZE]
+            if entries:
+                state.samples[key] = entries
+            else:
+                state.samples.pop(key, None)
+
+    async def load(self, db, campaign_id: str) -> PatternState:
+        """Accumulated state (built from campaign_calls the first time)"""
+        doc = await db[self.collection].find_one({"campaign_id": campaign_id}, {"_id": 0})
+        if doc is None:
+            return await self.recompute(db, campaign_id)
+        return PatternState.from_doc(doc, self.capacity)
+
+    async def compute(self, db, campaign_id: str, write_digests: bool = False) -> PatternState:
+        """Full recompute from campaign_calls script results"""
+        state = PatternState(self.capacity)
+        async for cc in db.campaign_calls.find(
+            {"campaign_id": campaign_id}, {"_id": 0, "call_id": 1, "script_qc_results": 1, "pattern_digest": 1}
+        ).sort("call_id", 1):
+            digest = call_digest(cc.get("call_id"), cc.get("script_qc_results"))
+            state.apply(digest, 1)
+            if write_digests and cc.get("pattern_digest") != digest:
+                await db.campaign_calls.update_one(
+                    {"campaign_id": campaign_id, "call_id": cc.get("call_id")},
+                    {"$set": {"pattern_digest": digest}}
+                )
+        return state
+
+    async def recompute(self, db, campaign_id: str) -> PatternState:
+        """Rebuild and store a campaign's state (backfill, resets, repair)"""
+        self.stats["recomputes"] += 1
+        state = await self.compute(db, campaign_id, write_digests=True)
+        await db[self.collection].update_one(
+            {"campaign_id": campaign_id},
+            {"$set": {**state.to_doc(), "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            upsert=True
+        )
+        return state
+
+    async def check(self, db, campaign_id: str, repair: bool = False) -> bool:
+        """True if the stored state equals a full recompute (optionally replacing it when not)"""
+        doc = await db[self.collection].find_one({"campaign_id": campaign_id}, {"_id": 0})
+        stored = PatternState.from_doc(doc, self.capacity).to_doc() if doc else None
+        consistent = stored == (await self.compute(db, campaign_id)).to_doc()
+        if not consistent:
+            logger.warning(f"⚠️ Pattern state for campaign {campaign_id} differs from a full recompute")
+            if repair:
+                await self.recompute(db, campaign_id)
+        return consistent
+
+    async def drop(self, db, campaign_id: str):
+        await db[self.collection].delete_one({"campaign_id": campaign_id})
+
+    async def ensure_indexes(self, db):
+        await db[self.collection].create_index("campaign_id", unique=True, name="campaign_id")
+        await db.campaign_calls.create_index([("campaign_id", 1), ("pattern_digest.keys", 1), ("call_id", 1)],
+                                             name="campaign_pattern_keys")
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
+
+
+# Global campaign pattern accumulator instance
+campaign_patterns = CampaignPatternAccumulator()
@@ -0,0 +1,269 @@
+"""
+Campaign QC View
+Materialized per-campaign QC results, replacing the per-call reconciliation
+get_campaign_qc_results used to do on every page view (one call_logs read
+per call with incomplete results, capped at 1000 calls).
+
+- One row per campaign call in campaign_qc_view, holding the reconciled
+  results summary (campaign_calls results, falling back to call_logs when
+  they lack real node names) in the shape the QC results tab renders
+- Running counters live on the campaign document (qc_summary); each row
+  refresh applies the difference between the row it replaced and the new
+  one, so the summary never needs a scan
+- Rows are refreshed whenever a call's QC results or analysis status change;
+  rebuild_campaign recomputes a campaign from scratch (backfill, resets)
+- Rows page by (created_at, id) through the shared keyset pagination
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_QC_VIEW = "campaign_qc_view"
+# Bump when the row shape changes: campaigns on an older version are rebuilt
+CAMPAIGN_QC_VIEW_VERSION = 1
+
+RESULT_FIELDS = ("script_qc_results", "tech_qc_results", "tonality_qc_results")
+CAMPAIGN_CALL_PROJECTION = {
+    "_id": 0, "call_id": 1, "analysis_status": 1, "analysis_error": 1, "updated_at": 1,
+    "added_at": 1, "analyzed_at": 1, "audio_tonality_results": 1, **{f: 1 for f in RESULT_FIELDS},
+}
+SUMMARY_COUNTERS = ("total_calls", "analyzed", "pending", "failed",
+                    "tech_analyzed", "script_analyzed", "tonality_analyzed")
+OPTIONAL_ROW_FIELDS = ("script_summary", "tech_summary", "tonality_summary")
+
+
+def has_valid_node_names(results: Optional[Dict]) -> bool:
+    """True if the results' node analyses carry real node names (not None / "Turn X")"""
+    if not results or not results.get("node_analyses"):
+        return False
+    node_name = results["node_analyses"][0].get("node_name")
+    if not node_name or node_name == "None" or node_name.startswith("Turn ") or node_name.startswith("Turn-"):
+        return False
+    return True
+
+
+def needs_call_log(campaign_call: Dict) -> bool:
+    return not all(has_valid_node_names(campaign_call.get(f)) for f in RESULT_FIELDS)
+
+
+def reconcile(campaign_call: Dict, call_log: Optional[Dict] = None) -> Dict:
+    """View row for a campaign call; call_log results win where they have better node names"""
+    results = {f: campaign_call.get(f) for f in RESULT_FIELDS}
+    merged = []
+    if call_log and needs_call_log(campaign_call):
+        for field in RESULT_FIELDS:
+            if has_valid_node_names(call_log.get(field)):
+                results[field] = call_log[field]
+                merged.append(field)
+    script, tech, tonality = (results[f] for f in RESULT_FIELDS)
+
+    row = {
+        "call_id": campaign_call.get("call_id"),
+        "analysis_status": campaign_call.get("analysis_status", "pending"),
+        "analysis_error": campaign_call.get("analysis_error"),
+        "updated_at": campaign_call.get("updated_at"),
+        "has_tech_qc": bool(tech and tech.get("node_analyses")),
+        "has_script_qc": bool(script and script.get("node_analyses")),
+        "has_tonality_qc": bool(tonality and tonality.get("node_analyses")),
+        "has_audio_tonality": bool(campaign_call.get("audio_tonality_results")),
+        "merged_from_call_log": merged,
+    }
+    if row["has_script_qc"]:
+        summary = (script.get("bulk_suggestions") or {}).get("summary")
+        if summary:
+            row["script_summary"] = {
+                "total_turns": summary.get("total_turns", 0),
+                "good_quality": summary.get("good_quality", 0),
+                "needs_improvement": summary.get("needs_improvement", 0),
+                "poor_quality": summary.get("poor_quality", 0),
+            }
+    if tech:
+        analysis_summary = tech.get("analysis_summary", {})
+        row["tech_summary"] = {
+            "avg_latency": analysis_summary.get("average_total_latency", 0),
+            "nodes_analyzed": analysis_summary.get("nodes_analyzed", 0),
+        }
+    if tonality:
+        row["tonality_summary"] = {
+            "overall": tonality.get("overall_tone", "unknown"),
+            "sentiment": tonality.get("sentiment", "unknown"),
+        }
+    return row
+
+
+def contribution(row: Optional[Dict]) -> Dict[str, int]:
+    """What a row adds to the campaign's qc_summary counters"""
+    counts = dict.fromkeys(SUMMARY_COUNTERS, 0)
+    if not row:
+        return counts
+    counts["total_calls"] = 1
+    status = row.get("analysis_status", "pending")
+    if status == "completed" or row.get("has_tech_qc") or row.get("has_script_qc"):
+        counts["analyzed"] = 1
+    elif status == "failed":
+        counts["failed"] = 1
+    else:
+        counts["pending"] = 1
+    counts["script_analyzed"] = int(bool(row.get("has_script_qc")))
+    counts["tech_analyzed"] = int("tech_summary" in row)
+    counts["tonality_analyzed"] = int("tonality_summary" in row)
+    return counts
+
+
+def summarize(rows: Iterable[Dict]) -> Dict[str, int]:
+    totals = dict.fromkeys(SUMMARY_COUNTERS, 0)
+    for row in rows:
+        for key, value in contribution(row).items():
+            totals[key] += value
+    return totals
+
+
+class CampaignQCView:
+    """Keeps campaign_qc_view rows and campaign qc_summary counters in step with campaign_calls"""
+
+    def __init__(self, collection: str = CAMPAIGN_QC_VIEW):
+        self.collection = collection
+        self.stats = {"refreshes": 0, "call_log_reads": 0, "rebuilds": 0}
+
+    async def ensure_indexes(self, db):
+        view = db[self.collection]
+        await view.create_index([("campaign_id", 1), ("call_id", 1)], unique=True, name="campaign_call")
+        await view.create_index([("campaign_id", 1), ("created_at", -1), ("id", -1)], name="campaign_created_id")
+        await db.campaign_calls.create_index([("campaign_id", 1), ("call_id", 1)], name="campaign_call")
+        await db.campaign_calls.create_index("call_id", name="call_id")
+
+    async def _call_log(self, db, call_id: str) -> Optional[Dict]:
+        self.stats["call_log_reads"] += 1
+        return await db.call_logs.find_one(
+            {"call_id": call_id}, {"_id": 0, **{f: 1 for f in RESULT_FIELDS}}
+        )
+
+    async def _apply(self, db, campaign_id: str, old: Optional[Dict], new: Optional[Dict]):
+        before, after = contribution(old), contribution(new)
+        delta = {f"qc_summary.{k}": after[k] - before[k] for k in SUMMARY_COUNTERS if after[k] != before[k]}
+        if delta:
+            await db.campaigns.update_one({"id": campaign_id}, {"$inc": delta})
+
+    async def refresh_call(self, db, campaign_id: str, call_id: str):
+        """Re-materialize one campaign call (removes its row if the call left the campaign)"""
+        try:
+            self.stats["refreshes"] += 1
+            campaign_call = await db.campaign_calls.find_one(
+                {"campaign_id": campaign_id, "call_id": call_id}, CAMPAIGN_CALL_PROJECTION
+            )
+            if campaign_call is None:
+                await self.remove_call(db, campaign_id, call_id)
+                return
+            call_log = await self._call_log(db, call_id) if needs_call_log(campaign_call) else None
+            row = reconcile(campaign_call, call_log)
+            absent = {f: "" for f in OPTIONAL_ROW_FIELDS if f not in row}
+            update = {
+                "$set": {**row, "campaign_id": campaign_id, "id": call_id},
+                "$setOnInsert": {"created_at": campaign_call.get("added_at") or campaign_call.get("analyzed_at")
+                                 or datetime.utcnow()},
+            }
+            if absent:
+                update["$unset"] = absent
+            old = await db[self.collection].find_one_and_update(
+                {"campaign_id": campaign_id, "call_id": call_id}, update,
+                upsert=True, projection={"_id": 0}
+            )  # returns the row as it was before this refresh
+            await self._apply(db, campaign_id, old, row)
+        except Exception as e:
+            logger.error(f"Error refreshing campaign QC view for {campaign_id}/{call_id}: {e}")
+
+    async def refresh_call_everywhere(self, db, call_id: str):
+        """A call's call_logs results changed: refresh it in every campaign that holds it"""
+        try:
+            campaign_ids = [doc["campaign_id"] async for doc in db.campaign_calls.find(
+                {"call_id": call_id}, {"_id": 0, "campaign_id": 1}
+            )]
+        except Exception as e:
+            logger.error(f"Error finding campaigns of call {call_id}: {e}")
+            return
+        for campaign_id in campaign_ids:
+            await self.refresh_call(db, campaign_id, call_id)
+
+    async def remove_call(self, db, campaign_id: str, call_id: str):
+        old = await db[self.collection].find_one_and_delete(
+            {"campaign_id": campaign_id, "call_id": call_id}, projection={"_id": 0}
+        )
+        if old:
+            await self._apply(db, campaign_id, old, None)
+
+    async def drop_campaign(self, db, campaign_id: str):
+        await db[self.collection].delete_many({"campaign_id": campaign_id})
+
+    async def rebuild_campaign(self, db, campaign_id: str, batch_size: int = 200) -> Dict[str, int]:
+        """Recompute every row and the summary of a campaign; call_logs are read in batches"""
+        self.stats["rebuilds"] += 1
+        view = db[self.collection]
+        totals = dict.fromkeys(SUMMARY_COUNTERS, 0)
+        seen: List[str] = []
+        batch: List[Dict] = []
+
+        async def flush():
+            wanted = [c["call_id"] for c in batch if needs_call_log(c)]
+            call_logs = {}
+            if wanted:
+                self.stats["call_log_reads"] += 1
+                async for log in db.call_logs.find(
+                    {"call_id": {"$in": wanted}}, {"_id": 0, "call_id": 1, **{f: 1 for f in RESULT_FIELDS}}
+                ):
+                    call_logs.setdefault(log["call_id"], log)
+            for campaign_call in batch:
+                call_id = campaign_call["call_id"]
+                row = reconcile(campaign_call, call_logs.get(call_id))
+                created_at = campaign_call.get("added_at") or campaign_call.get("analyzed_at") or datetime.utcnow()
+                await view.replace_one(
+                    {"campaign_id": campaign_id, "call_id": call_id},
+                    {**row, "campaign_id": campaign_id, "id": call_id, "created_at": created_at},
+                    upsert=True,
+                )
+                for key, value in contribution(row).items():
+                    totals[key] += value
+                seen.append(call_id)
+            batch.clear()
+
+        async for campaign_call in db.campaign_calls.find({"campaign_id": campaign_id}, CAMPAIGN_CALL_PROJECTION):
+            if not campaign_call.get("call_id"):
+                continue
+            batch.append(campaign_call)
+            if len(batch) >= batch_size:
+                await flush()
+        await flush()
+
+        await view.delete_many({"campaign_id": campaign_id, "call_id": {"$nin": seen}})
+        await db.campaigns.update_one(
+            {"id": campaign_id},
+            {"$set": {"qc_summary": totals, "qc_view_version": CAMPAIGN_QC_VIEW_VERSION}}
+        )
+        return totals
+
+    async def backfill(self, db) -> int:
+        """Rebuild every campaign whose view is missing or from an older row version"""
+        try:
+            await self.ensure_indexes(db)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not ensure campaign QC view indexes: {e}")
+        rebuilt = 0
+        async for campaign in db.campaigns.find(
+            {"qc_view_version": {"$ne": CAMPAIGN_QC_VIEW_VERSION}}, {"_id": 0, "id": 1}
+        ):
+            try:
+                await self.rebuild_campaign(db, campaign["id"])
+                rebuilt += 1
+            except Exception as e:
+                logger.error(f"Error rebuilding campaign QC view for {campaign['id']}: {e}")
+        if rebuilt:
+            logger.info(f"📊 Rebuilt the QC view of {rebuilt} campaigns")
+        return rebuilt
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
+
+
+# Global campaign QC view instance
+campaign_qc_view = CampaignQCView()
@@ -5,6 +5,7 @@ Supports multiple instances for load balancing
 """
 
 import httpx
+from http_client_registry import http_client_registry
 import logging
 import random
 import os
@@ -95,7 +96,7 @@ class ChatTTSClient:
         logger.info(f"Payload: text='{text[:50]}...', voice={voice}, speed={speed}, temp={temperature}")
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with http_client_registry.session(timeout=self.timeout) as client:
                 response = await client.post(endpoint, json=payload)
                 response.raise_for_status()
                 
@@ -142,7 +143,7 @@ class ChatTTSClient:
         for api_url in urls_to_check:
             try:
                 endpoint = f"{api_url}/health"
-                async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
+                async with http_client_registry.session(timeout=httpx.Timeout(5.0)) as client:
                     response = await client.get(endpoint)
                     response.raise_for_status()
                     data = response.json()
@@ -188,54 +188,22 @@ def generate_comfort_noise_mulaw() -> bytes:
     """
     Generate comfort noise as raw mulaw bytes for WebSocket mixing.
     Returns 30 seconds of mulaw comfort noise at 8kHz.
+    Encoded in-process with NumPy (no ffmpeg subprocess or temp files).
     """
     try:
-        import subprocess
-        import tempfile
-        import os as os_module
+        from audio_resampler import convert_pcm_to_mulaw_8khz
         
         # Generate comfort noise as AudioSegment
         sample = generate_comfort_noise_sample(duration_seconds=30)
         if not sample:
             return None
         
-        # Export to temporary WAV
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-            wav_path = wav_file.name
+        # 16-bit mono PCM straight from the AudioSegment
+        sample = sample.set_sample_width(2).set_channels(1)
+        mulaw_data = convert_pcm_to_mulaw_8khz(sample.raw_data, sample.frame_rate)
         
-        with tempfile.NamedTemporaryFile(suffix='.mulaw', delete=False) as mulaw_file:
-            mulaw_path = mulaw_file.name
-        
-        try:
-            # Export AudioSegment to WAV
-            sample.export(wav_path, format='wav')
-            
-            # Convert WAV to mulaw using ffmpeg
-            result = subprocess.run([
-                'ffmpeg', '-y',
-                '-i', wav_path,
-                '-ar', '8000',        # 8kHz sample rate
-                '-ac', '1',           # Mono
-                '-f', 'mulaw',        # mulaw codec
-                mulaw_path
-            ], capture_output=True, timeout=10)
-            
-            if result.returncode == 0:
-                with open(mulaw_path, 'rb') as f:
-                    mulaw_data = f.read()
-                logger.info(f"✅ Generated mulaw comfort noise: {len(mulaw_data)} bytes")
-                return mulaw_data
-            else:
-                logger.error(f"❌ ffmpeg error: {result.stderr.decode()}")
-                return None
-                
-        finally:
-            # Clean up temp files
-            try:
-                os_module.remove(wav_path)
-                os_module.remove(mulaw_path)
-            except:
-                pass
+        logger.info(f"✅ Generated mulaw comfort noise: {len(mulaw_data)} bytes")
+        return mulaw_data
                 
     except Exception as e:
         logger.error(f"❌ Error generating mulaw comfort noise: {e}")
@@ -9,6 +9,13 @@ import logging
 from dotenv import load_dotenv
 from pathlib import Path
 import httpx
+from http_client_registry import http_client_registry
+from llm_client_pool import llm_client_pool, PROVIDER_BASE_URLS
+from utterance_analyzer import utterance_analyzer
+from turn_tracing import turn_tracer
+from history_manager import ConversationHistory, build_summary_prompt, SUMMARY_MAX_TOKENS
+from speculation import speculation_manager, is_speculation_enabled, elevenlabs_synthesizer
+from log_pipeline import call_log_control
 
 logger = logging.getLogger(__name__)
 
@@ -35,21 +42,14 @@ ELEVEN_API_KEY = os.environ.get('ELEVEN_API_KEY')
 _global_http_client = None
 
 def get_global_http_client():
-    """Get or create the global HTTP/2 client for LLM API calls"""
+    """Get the shared HTTP/2 client for LLM API calls (owned by http_client_registry)"""
     global _global_http_client
-    if _global_http_client is None:
-        _global_http_client = httpx.AsyncClient(
-            http2=True,
-            timeout=httpx.Timeout(60.0, connect=5.0),
-            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
-        )
-        logger.info("🚀 Created global HTTP/2 client for LLM calls")
+    if _global_http_client is None or _global_http_client.is_closed:
+        _global_http_client = http_client_registry.get_client("https://api.x.ai")
     return _global_http_client
 
 # Initialize OpenAI client lazily
 _openai_client = None
-_grok_client = None
-_gemini_client = None
 
 def get_openai_client():
     global _openai_client
@@ -60,20 +60,17 @@ def get_openai_client():
 async def get_llm_client(provider: str = "openai", api_key: str = None, session=None):
     """Get LLM client based on provider (openai, grok, or gemini)
     
-    Uses cached clients with shared HTTP/2 connection pool for lower latency.
+    Clients come from the per-tenant pool (keyed on provider + API key) and share
+    the pooled HTTP/2 transports, so each user's key gets its own client.
     
     Args:
         provider: "openai", "grok", or "gemini"
         api_key: Optional API key (if not provided, retrieves from session)
         session: CallSession instance (used to retrieve user API keys)
     """
-    global _grok_client, _gemini_client
-    
     if provider == "grok":
         # Use OpenAI library with xAI base URL for Grok
         try:
-            import openai
-            
             # Get API key from parameter, session, or environment (fallback)
             if api_key:
                 grok_key = api_key
@@ -90,15 +87,8 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
                 logger.error("Grok API key not found")
                 return None
             
-            # 🚀 Use cached client with shared HTTP/2 connection pool
-            if _grok_client is None:
-                http_client = get_global_http_client()
-                _grok_client = openai.AsyncOpenAI(
-                    api_key=grok_key,
-                    base_url="https://api.x.ai/v1",
-                    http_client=http_client
-                )
-                logger.info("🚀 Created cached Grok client with HTTP/2")
+            # 🚀 Per-tenant pooled client on the shared HTTP/2 transport
+            grok_client = llm_client_pool.get_client("grok", grok_key)
             
             # Create a wrapper to match our interface
             class GrokClient:
@@ -121,7 +111,7 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
                         logger.error(f"Error with Grok API: {e}")
                         return None
                         
-            return GrokClient(_grok_client)
+            return GrokClient(grok_client)
             
         except ImportError as e:
             logger.error(f"OpenAI library not available: {e}")
@@ -132,8 +122,6 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
     elif provider == "gemini":
         # Use OpenAI library with Google's OpenAI-compatible API for Gemini
         try:
-            import openai
-            
             # Get API key from parameter, session, or environment (fallback)
             if api_key:
                 gemini_key = api_key
@@ -150,15 +138,8 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
                 logger.error("Gemini API key not found")
                 return None
             
-            # 🚀 Use cached client with shared HTTP/2 connection pool
-            if _gemini_client is None:
-                http_client = get_global_http_client()
-                _gemini_client = openai.AsyncOpenAI(
-                    api_key=gemini_key,
-                    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-                    http_client=http_client
-                )
-                logger.info("🚀 Created cached Gemini client with HTTP/2")
+            # 🚀 Per-tenant pooled client on the shared HTTP/2 transport
+            gemini_client = llm_client_pool.get_client("gemini", gemini_key)
             
             # Create a wrapper to match our interface
             class GeminiClient:
@@ -181,7 +162,7 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
                         logger.error(f"Error with Gemini API: {e}")
                         return None
                         
-            return GeminiClient(_gemini_client)
+            return GeminiClient(gemini_client)
             
         except ImportError as e:
             logger.error(f"OpenAI library not available: {e}")
@@ -192,11 +173,11 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
     else:
         # Default to OpenAI
         if api_key:
-            return AsyncOpenAI(api_key=api_key)
+            return llm_client_pool.get_client("openai", api_key)
         elif session:
             try:
                 openai_key = await session.get_api_key("openai")
-                return AsyncOpenAI(api_key=openai_key)
+                return llm_client_pool.get_client("openai", openai_key)
             except ValueError as e:
                 logger.error(f"Failed to get OpenAI API key: {e}")
                 return None
@@ -204,6 +185,28 @@ async def get_llm_client(provider: str = "openai", api_key: str = None, session=
             # Fallback to environment (for backward compatibility)
             return get_openai_client()
 
+GROK_MODELS = ["grok-4-1-fast-non-reasoning", "grok-4-fast-non-reasoning", "grok-4-fast-reasoning", "grok-3", "grok-2-1212", "grok-beta", "grok-4-fast"]
+GEMINI_MODELS = ["gemini-3-flash-preview", "gemini-3-pro-preview"]
+
+def resolve_llm_model(llm_provider: str, model: str) -> str:
+    """The agent's model if it belongs to the provider, else the provider's default"""
+    if llm_provider == "grok":
+        if model not in GROK_MODELS:
+            logger.warning(f"⚠️  Model '{model}' not valid for Grok, using 'grok-3'")
+            model = "grok-3"
+    elif llm_provider == "gemini":
+        if model not in GEMINI_MODELS:
+            logger.warning(f"⚠️  Model '{model}' not valid for Gemini, using 'gemini-3-flash-preview'")
+            model = "gemini-3-flash-preview"
+    else:
+        if model in GROK_MODELS:
+            logger.warning(f"⚠️  Model '{model}' is a Grok model but provider is OpenAI, using 'gpt-4-turbo'")
+            model = "gpt-4-turbo"
+        elif model in GEMINI_MODELS:
+            logger.warning(f"⚠️  Model '{model}' is a Gemini model but provider is OpenAI, using 'gpt-4-turbo'")
+            model = "gpt-4-turbo"
+    return model
+
 class CallSession:
     """Manages a single call session with STT, LLM, and TTS pipeline"""
     
@@ -214,6 +217,11 @@ class CallSession:
         self.user_id = user_id or agent_config.get("user_id")  # Store user_id for API key retrieval
         self.db = db  # Database connection for retrieving user API keys
         self.conversation_history = []
+        # Token-budgeted view of conversation_history sent to the LLM (see history_manager.py)
+        history_settings = agent_config.get("settings", {}).get("history_settings") or {}
+        self.history = ConversationHistory(**{
+            k: history_settings[k] for k in ("budget_tokens", "keep_turns", "hard_limit_tokens") if history_settings.get(k)
+        })
         self.current_node_id = None  # Track current position in flow
         self.current_node_label = None  # Track current node label for QC reports
         self.should_end_call = False  # Flag for ending nodes
@@ -228,6 +236,14 @@ class CallSession:
         self.last_transition_time_ms = 0  # Time spent evaluating transitions
         self.last_kb_time_ms = 0  # Time spent on KB retrieval (if any)
         
+        # Early response started on a local VAD end-of-turn hint (see early_response.py)
+        self.early_response = None
+        self.early_stats = {"started": 0, "committed": 0, "discarded": 0, "saved_ms": 0}
+        
+        # Speculative openings for the likely next nodes (see speculation.py), created on first use
+        self.speculator = None
+        self._speculation_task = None
+        
         # Voicemail/IVR detection
         from voicemail_detector import VoicemailDetector
         self.voicemail_detector = VoicemailDetector(agent_config.get("settings", {}))
@@ -471,13 +487,127 @@ class CallSession:
         
     
     def _detect_hold_on_phrase(self, text: str) -> bool:
-        """Detect if user said 'hold on' or similar phrase"""
-        hold_on_phrases = [
-            "hold on", "wait", "one moment", "give me a second", 
-            "hang on", "just a sec", "one sec", "hold please"
-        ]
-        text_lower = text.lower()
-        return any(phrase in text_lower for phrase in hold_on_phrases)
+        """Detect if user said 'hold on' or similar phrase (the turn's cached feature record is shared with KB routing, voicemail, etc.)"""
+        return utterance_analyzer.analyze(text).hold_on
+    
+    async def _summarize_history(self, previous_summary: str, messages: list):
+        """Rolling-summary writer for self.history (runs after a turn, off the caller's path)"""
+        llm_provider = self.agent_config.get("settings", {}).get("llm_provider") or "openai"
+        client = await self.get_llm_client_for_session(llm_provider)
+        if not client:
+            return None
+        model = resolve_llm_model(llm_provider, self.agent_config.get("model", "gpt-4-turbo"))
+        prompt = build_summary_prompt(previous_summary, messages)
+        if llm_provider == "grok" or llm_provider == "gemini":
+            response = await client.create_completion(
+                messages=prompt, model=model, temperature=0.2, max_tokens=SUMMARY_MAX_TOKENS, stream=False
+            )
+        else:
+            response = await client.chat.completions.create(
+                model=model, messages=prompt, temperature=0.2, max_tokens=SUMMARY_MAX_TOKENS
+            )
+        if not response or not response.choices:
+            return None
+        return response.choices[0].message.content
+    
+    def schedule_speculation(self):
+        """Prepare the likely next nodes' openings in the background (one preparation at a time)"""
+        if not is_speculation_enabled(self.agent_config) or not self.current_node_id:
+            return
+        if self._speculation_task and not self._speculation_task.done():
+            self._speculation_task.cancel()
+        self._speculation_task = asyncio.create_task(self._speculate(self.current_node_id))
+    
+    async def _speculate(self, node_id: str):
+        try:
+            settings = self.agent_config.get("settings", {})
+            elevenlabs_settings = settings.get("elevenlabs_settings", {}) or {}
+            voice_id = elevenlabs_settings.get("voice_id", "21m00Tcm4TlvDq8ikWAM")
+            if self.speculator is None:
+                api_key = await self.get_api_key("elevenlabs")
+                if not api_key:
+                    return
+                speculation_settings = settings.get("speculation_settings", {}) or {}
+                synthesize = elevenlabs_synthesizer(
+                    api_key,
+                    voice_id,
+                    elevenlabs_settings.get("model", "eleven_flash_v2_5"),
+                    {
+                        "stability": elevenlabs_settings.get("stability", 0.4),
+                        "similarity_boost": elevenlabs_settings.get("similarity_boost", 0.75),
+                        "style": elevenlabs_settings.get("style", 0.2),
+                        "use_speaker_boost": elevenlabs_settings.get("use_speaker_boost", True)
+                    }
+                )
+                self.speculator = speculation_manager.create(self.call_id, synthesize, **{
+                    k: speculation_settings[k] for k in ("top_n", "min_probability", "budget_chars")
+                    if speculation_settings.get(k) is not None
+                })
+            
+            flow_nodes = self.agent_config.get("call_flow", [])
+            history = await speculation_manager.transition_stats.get(self.db, self.agent_id)
+            if node_id != self.current_node_id:
+                return  # the conversation moved on while history loaded
+            self.speculator.prepare(
+                self._get_node_by_id(node_id, flow_nodes),
+                flow_nodes,
+                self.session_variables,
+                history.get(node_id, {}),
+                voice_id=voice_id
+            )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Speculation failed: {e}")
+    
+    def early_turn_allowed(self) -> bool:
+        """Whether a speculative response may start now (nothing else in flight, no side-effecting flow)"""
+        if self.is_processing or self.executing_webhook or self.was_interrupted_by_agent:
+            return False
+        if self.agent_config.get("agent_type", "single_prompt") == "call_flow":
+            # Call-flow turns can fire webhooks, which can't be rolled back
+            early_settings = self.agent_config.get("settings", {}).get("early_turn_settings", {}) or {}
+            return bool(early_settings.get("allow_call_flow"))
+        return True
+    
+    async def start_early_response(self, text: str):
+        """Start generating a response for `text` before the STT endpoint confirms the turn"""
+        from early_response import EarlyResponse
+        
+        if self.early_response is not None:
+            if self.early_response.matches(text):
+                return self.early_response
+            await self.cancel_early_response("transcript changed")
+        if not text.strip() or not self.early_turn_allowed():
+            return None
+        
+        self.early_response = EarlyResponse(self, text)
+        self.early_stats["started"] += 1
+        logger.info(f"⚡ EARLY RESPONSE: probable end of turn - starting LLM for '{text[:50]}'")
+        return self.early_response
+    
+    async def cancel_early_response(self, reason: str = ""):
+        early, self.early_response = self.early_response, None
+        if early is not None and not early.committed:
+            await early.cancel(reason)
+            self.early_stats["discarded"] += 1
+    
+    async def take_early_response(self, text: str):
+        """
+        The STT endpoint arrived: hand over the early response if it was generated
+        for the same transcript (caller commits it), otherwise discard it.
+        """
+        early = self.early_response
+        if early is None:
+            return None
+        if not early.matches(text):
+            await self.cancel_early_response("final transcript differs")
+            return None
+        self.early_response = None
+        self.early_stats["committed"] += 1
+        self.early_stats["saved_ms"] += int((time.time() - early.started_at) * 1000)
+        logger.info(f"⚡ EARLY RESPONSE: committed, started {int((time.time() - early.started_at) * 1000)}ms before the STT endpoint")
+        return early
     
     def start_silence_tracking(self):
         """Start tracking silence after agent stops speaking"""
@@ -684,12 +814,86 @@ class CallSession:
         """Handle Deepgram errors"""
         logger.error(f"Deepgram error: {error}")
     
-    async def process_user_input(self, user_text: str, stream_callback=None):
+    def schedule_turn_background_work(self):
+        """Background work after a completed turn (a committed early response runs it on commit)"""
+        # Fold turns that left the history window into the rolling summary
+        self.history.schedule_summary(self.conversation_history, self._summarize_history)
+        # Pre-synthesize openings of the likely next nodes while this response plays. Not from
+        # a speculative run: prepare() would discard the clip the committed turn is about to take
+        if self.agent_config.get("agent_type", "single_prompt") == "call_flow":
+            self.schedule_speculation()
+    
+    async def intercept_barge_in(self, user_text: str):
+        """Stop a silence greeting the caller is talking over and clear its redis flag"""
+        # ═══════════════════════════════════════════════════════════════════
+        # 🚨 BARGE-IN INTERCEPTOR 🚨
+        # Check if we generated a silence greeting that the user is now interrupting
+        # IMPORTANT: Only trigger barge-in if user_text is NOT the silence marker ("...")
+        # The silence marker indicates this IS the silence greeting being generated,
+        # not a user interruption.
+        # ═══════════════════════════════════════════════════════════════════
+        try:
+            from redis_service import redis_service
+            call_data = redis_service.get_call_data(self.call_id)
+            
+            # CRITICAL FIX: Skip barge-in if this IS the silence greeting being generated
+            # Server passes "" for silence timeout, but sometimes we use "..."
+            is_silence_timeout = user_text.strip() in ["...", "…", ""]
+            
+            if call_data and call_data.get("silence_greeting_triggered") and not is_silence_timeout:
+                logger.warning(f"🚨 BARGE-IN DETECTED for call {self.call_id}: User spoke while Silence Greeting was triggering")
+                
+                # 1. Stop Audio Immediately (CONDITIONAL - Smart Barge-In)
+                # Check if we should allow the greeting to finish (Smart Barge-In)
+                # If user spoke very shortly after greeting started, they likely haven't heard it yet
+                # or are responding to the "connection" rather than the content.
+                # In this case, letting the greeting finish is more natural than cutting it off.
+                try:
+                    from server import call_states
+                    
+                    should_stop_audio = True
+                    if self.call_id in call_states:
+                        playback_started = call_states[self.call_id].get("greeting_playback_started_at", 0)
+                        current_time = time.time()
+                        # Buffer: 2.5 seconds (Covers generation + network + short greeting playback)
+                        # if playback_started > 0 and (current_time - playback_started) < 2.5:
+                        #     logger.info(f"⏳ Smart Barge-In: User spoke early ({current_time - playback_started:.2f}s) - LETTING GREETING FINISH")
+                        #     should_stop_audio = False
+                    
+                    if should_stop_audio:
+                        from telnyx_service import TelnyxService
+                        # TelnyxService will use env vars for api_key and connection_id
+                        # This is safe because we're just stopping playback, not initiating calls
+                        ts = TelnyxService()
+                        await ts.stop_audio_playback(self.call_id)
+                        logger.info("✅ BARGE-IN: Audio playback STOPPED")
+                except Exception as e:
+                    # This is expected if audio already finished or never started
+                    logger.warning(f"⚠️ BARGE-IN: Audio stop logic error: {e}")
+
+                # 2. History Preservation
+                # PREVIOUSLY: We removed the silence greeting from history to "undo" it.
+                # PROBLEMS: This caused the LLM to think it hadn't greeted the user, leading to re-greeting.
+                # FIX: We now PRESERVE the history.
+                # History: [Agent: "Kendrick?"], [User: "Hello?"] -> LLM Response: "Hi, I'm calling..."
+                logger.info(f"✅ BARGE-IN: Preserving silence greeting in history to maintain context")
+                
+                # 3. Clear the flag so we don't trigger this again
+                redis_service.update_call_data(self.call_id, {"silence_greeting_triggered": False})
+                logger.info("✅ BARGE-IN: Reset silence_greeting_triggered flag")
+                # NOTE: The caller falls through to normal processing (no return)
+        except Exception as e:
+            logger.error(f"⚠️ Error in Barge-In Interceptor: {e}")
+    
+    async def process_user_input(self, user_text: str, stream_callback=None, speculative: bool = False):
         """Process user input through LLM and generate response
         
         Args:
             user_text: User's transcribed text
             stream_callback: Optional callback for streaming sentences as they're generated
+            speculative: Early response run (early_response.py) - side effects that can't be
+                         rolled back (barge-in playback stop, background summary) are left
+                         to EarlyResponse.commit()
         """
         # Set processing flag to preventing silence timer race conditions
         self.is_processing = True
@@ -698,6 +902,7 @@ class CallSession:
             from datetime import datetime
             import asyncio
             latency_start = time.time()
+            turn_tracer.mark(self.call_id, "processing_start", latency_start)
             timestamp_str = datetime.now().strftime("%H:%M:%S.%f")[:-3]
             logger.info(f"⏱️ [{timestamp_str}] 📥 process_user_input() ENTRY - text: '{user_text[:50]}...'")
             
@@ -711,69 +916,9 @@ class CallSession:
                 self.was_interrupted_by_agent = False  # Reset flag
                 return None
             
-            # ═══════════════════════════════════════════════════════════════════
-            # 🚨 BARGE-IN INTERCEPTOR 🚨
-            # Check if we generated a silence greeting that the user is now interrupting
-            # IMPORTANT: Only trigger barge-in if user_text is NOT the silence marker ("...")
-            # The silence marker indicates this IS the silence greeting being generated,
-            # not a user interruption.
-            # ═══════════════════════════════════════════════════════════════════
-            try:
-                from redis_service import redis_service
-                call_data = redis_service.get_call_data(self.call_id)
-                
-                # CRITICAL FIX: Skip barge-in if this IS the silence greeting being generated
-                # Server passes "" for silence timeout, but sometimes we use "..."
-                is_silence_timeout = user_text.strip() in ["...", "…", ""]
-                
-                if call_data and call_data.get("silence_greeting_triggered") and not is_silence_timeout:
-                    logger.warning(f"🚨 BARGE-IN DETECTED for call {self.call_id}: User spoke while Silence Greeting was triggering")
-                    
-                    # 1. Stop Audio Immediately (CONDITIONAL - Smart Barge-In)
-                    # Check if we should allow the greeting to finish (Smart Barge-In)
-                    # If user spoke very shortly after greeting started, they likely haven't heard it yet
-                    # or are responding to the "connection" rather than the content.
-                    # In this case, letting the greeting finish is more natural than cutting it off.
-                    try:
-                        from server import call_states
-                        
-                        should_stop_audio = True
-                        if self.call_id in call_states:
-                            playback_started = call_states[self.call_id].get("greeting_playback_started_at", 0)
-                            current_time = time.time()
-                            # Buffer: 2.5 seconds (Covers generation + network + short greeting playback)
-                            # if playback_started > 0 and (current_time - playback_started) < 2.5:
-                            #     logger.info(f"⏳ Smart Barge-In: User spoke early ({current_time - playback_started:.2f}s) - LETTING GREETING FINISH")
-                            #     should_stop_audio = False
-                        
-                        if should_stop_audio:
-                            from telnyx_service import TelnyxService
-                            # TelnyxService will use env vars for api_key and connection_id
-                            # This is safe because we're just stopping playback, not initiating calls
-                            ts = TelnyxService()
-                            await ts.stop_audio_playback(self.call_id)
-                            logger.info("✅ BARGE-IN: Audio playback STOPPED")
-                    except Exception as e:
-                        # This is expected if audio already finished or never started
-                        logger.warning(f"⚠️ BARGE-IN: Audio stop logic error: {e}")
-
-                    # 2. History Preservation
-                    # PREVIOUSLY: We removed the silence greeting from history to "undo" it.
-                    # PROBLEMS: This caused the LLM to think it hadn't greeted the user, leading to re-greeting.
-                    # FIX: We now PRESERVE the history.
-                    # History: [Agent: "Kendrick?"], [User: "Hello?"] -> LLM Response: "Hi, I'm calling..."
-                    logger.info(f"✅ BARGE-IN: Preserving silence greeting in history to maintain context")
-                    
-                    # 3. Clear the flag so we don't trigger this again
-                    redis_service.update_call_data(self.call_id, {"silence_greeting_triggered": False})
-                    logger.info("✅ BARGE-IN: Reset silence_greeting_triggered flag")
-                    
-                        # NOTE: We fall through to normal processing below (no return)
-
-
-                    
-            except Exception as e:
-                logger.error(f"⚠️ Error in Barge-In Interceptor: {e}")
+            # 🚨 BARGE-IN INTERCEPTOR (deferred to commit for a speculative early response)
+            if not speculative:
+                await self.intercept_barge_in(user_text)
 
             
             # ═══════════════════════════════════════════════════════════════════
@@ -861,6 +1006,9 @@ class CallSession:
             
             self.conversation_history.append(assistant_msg)
             
+            if not speculative:
+                self.schedule_turn_background_work()
+            
             # Calculate LLM latency
             llm_latency = time.time() - latency_start
             logger.info(f"LLM response ({llm_latency:.2f}s): {assistant_response}")
@@ -1247,28 +1395,8 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
         if not llm_provider:
             logger.error("❌ No LLM provider configured for agent")
             return None
-        model = self.agent_config.get("model", "gpt-4-turbo")
-        
         # Validate model matches provider and fix if mismatched
-        grok_models = ["grok-4-1-fast-non-reasoning", "grok-4-fast-non-reasoning", "grok-4-fast-reasoning", "grok-3", "grok-2-1212", "grok-beta", "grok-4-fast"]
-        openai_models = ["gpt-4.1-2025-04-14", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
-        gemini_models = ["gemini-3-flash-preview", "gemini-3-pro-preview"]
-        
-        if llm_provider == "grok":
-            if model not in grok_models:
-                logger.warning(f"⚠️  Model '{model}' not valid for Grok, using 'grok-3'")
-                model = "grok-3"
-        elif llm_provider == "gemini":
-            if model not in gemini_models:
-                logger.warning(f"⚠️  Model '{model}' not valid for Gemini, using 'gemini-3-flash-preview'")
-                model = "gemini-3-flash-preview"
-        else:
-            if model in grok_models:
-                logger.warning(f"⚠️  Model '{model}' is a Grok model but provider is OpenAI, using 'gpt-4-turbo'")
-                model = "gpt-4-turbo"
-            elif model in gemini_models:
-                logger.warning(f"⚠️  Model '{model}' is a Gemini model but provider is OpenAI, using 'gpt-4-turbo'")
-                model = "gpt-4-turbo"
+        model = resolve_llm_model(llm_provider, self.agent_config.get("model", "gpt-4-turbo"))
         
         logger.info(f"🤖 Using LLM provider: {llm_provider}, model: {model}")
         
@@ -1285,6 +1413,7 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
         
         # Stream LLM response and process sentence by sentence
         llm_request_start = time.time()
+        turn_tracer.mark(self.call_id, "llm_request", llm_request_start)
         
         if llm_provider == "grok" or llm_provider == "gemini":
             response = await client.create_completion(
@@ -1319,6 +1448,7 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
                 timestamp_str = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
                 logger.info(f"⏱️ [{timestamp_str}] 💬 LLM FIRST TOKEN: {ttft_ms}ms ({llm_provider} {model})")
                 first_token_received = True
+                turn_tracer.mark(self.call_id, "llm_first_token")
             
             # Extract content from chunk
             if llm_provider == "grok" or llm_provider == "gemini":
@@ -1355,7 +1485,7 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
                         if sentence and stream_callback:
                             # Stream this sentence immediately to TTS
                             await stream_callback(sentence)
-                            logger.info(f"📤 Streamed sentence: {sentence[:50]}...")
+                            call_log_control.hot(logger, self.call_id, "📤 Streamed sentence: %s...", sentence[:50])
                 
                 # Keep the last incomplete part in buffer
                 sentence_buffer = sentences[-1] if len(sentences) % 2 != 0 else ""
@@ -1363,10 +1493,11 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
         # Send any remaining text
         if sentence_buffer.strip() and stream_callback:
             await stream_callback(sentence_buffer.strip())
-            logger.info(f"📤 Streamed final fragment: {sentence_buffer[:50]}...")
+            call_log_control.hot(logger, self.call_id, "📤 Streamed final fragment: %s...", sentence_buffer[:50])
         
         # ⏱️ TIMING: Total LLM response time
         llm_total_ms = int((time.time() - llm_request_start) * 1000)
+        turn_tracer.mark(self.call_id, "llm_complete")
         logger.info(f"⏱️ [TIMING] LLM_TOTAL: {llm_total_ms}ms for {len(full_response)} chars ({llm_provider} {model})")
         
         return full_response
@@ -1381,9 +1512,11 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
             if self.knowledge_base:
                 system_prompt += f"\n\n=== KNOWLEDGE BASE ===\nYou have access to multiple reference sources below. Each source serves a different purpose.\n\n🧠 HOW TO USE THE KNOWLEDGE BASE:\n1. When user asks a question, FIRST identify which knowledge base source(s) are relevant based on their descriptions\n2. Read ONLY the relevant source(s) to find the answer\n3. Use ONLY information from the knowledge base - do NOT make up or improvise ANY factual details\n4. If the knowledge base doesn't contain the answer, say: \"I don't have that specific information available\"\n5. Different sources contain different types of information - match the user's question to the right source\n\n⚠️ NEVER invent: company names, product names, prices, processes, methodologies, or any factual information not in the knowledge base\n\n{self.knowledge_base}\n=== END KNOWLEDGE BASE ===\n"
             
+            # Budgeted history: recent turns verbatim, older ones as a summary after the stable system prompt
+            summary_messages, history_messages = self.history.llm_messages(self.conversation_history)
             messages = [
                 {"role": "system", "content": system_prompt}
-            ] + self.conversation_history  # Full history with 2M context window
+            ] + summary_messages + history_messages
             
             # Get LLM provider from agent settings
             llm_provider = self.agent_config.get("settings", {}).get("llm_provider")
@@ -1500,9 +1633,11 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
             if self.knowledge_base:
                 system_prompt += f"\n\n=== KNOWLEDGE BASE ===\nYou have access to multiple reference sources below. Each source serves a different purpose.\n\n🧠 HOW TO USE THE KNOWLEDGE BASE:\n1. When user asks a question, FIRST identify which knowledge base source(s) are relevant based on their descriptions\n2. Read ONLY the relevant source(s) to find the answer\n3. Use ONLY information from the knowledge base - do NOT make up or improvise ANY factual details\n4. If the knowledge base doesn't contain the answer, say: \"I don't have that specific information available\"\n5. Different sources contain different types of information - match the user's question to the right source\n\n⚠️ NEVER invent: company names, product names, prices, processes, methodologies, or any factual information not in the knowledge base\n\n{self.knowledge_base}\n=== END KNOWLEDGE BASE ===\n"
             
+            # Budgeted history: recent turns verbatim, older ones as a summary after the stable system prompt
+            summary_messages, history_messages = self.history.llm_messages(self.conversation_history)
             messages = [
                 {"role": "system", "content": system_prompt}
-            ] + self.conversation_history  # Full history with 2M context window
+            ] + summary_messages + history_messages
             
             # Get LLM provider from agent settings
             llm_provider = self.agent_config.get("settings", {}).get("llm_provider")
@@ -1617,7 +1752,7 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
                                 self.mark_agent_speaking_start()
                                 # Stream this sentence immediately to TTS
                                 await stream_callback(sentence)
-                                logger.info(f"📤 Streamed sentence: {sentence[:50]}...")
+                                call_log_control.hot(logger, self.call_id, "📤 Streamed sentence: %s...", sentence[:50])
                     
                     # Keep the last incomplete part in buffer
                     sentence_buffer = sentences[-1] if len(sentences) % 2 != 0 else ""
@@ -1627,7 +1762,7 @@ Use these sparingly and naturally - only when they genuinely fit the moment.
                 # Mark agent as speaking (if not already marked)
                 self.mark_agent_speaking_start()
                 await stream_callback(sentence_buffer.strip())
-                logger.info(f"📤 Streamed final fragment: {sentence_buffer[:50]}...")
+                call_log_control.hot(logger, self.call_id, "📤 Streamed final fragment: %s...", sentence_buffer[:50])
             
             llm_total_ms = int((time.time() - llm_request_start) * 1000)
             logger.info(f"⏱️ [TIMING] LLM_TOTAL: {llm_total_ms}ms")
@@ -3044,11 +3179,8 @@ Use your natural conversational style to handle this smoothly with NEW phrasing.
                 options_text += f"\nOption {i}:\n"
                 options_text += f"  Condition: {opt['condition']}\n"
             
-            # Get full conversation context
-            full_context = "\n".join([
-                f"{msg['role']}: {msg['content']}"
-                for msg in self.conversation_history[-10:]  # Last 10 messages (matching webhook extraction)
-            ])
+            # Get conversation context (last 10 messages within the token budget, older turns summarized)
+            full_context = self.history.transcript(self.conversation_history, max_messages=10)
             
             # Check if this is a function/webhook node - if so, include webhook response in evaluation
             is_function_node = current_node.get("type") == "function"
@@ -3621,11 +3753,10 @@ Your response:"""
             # Get last 10 conversation turns for better context (matching webhook extraction)
             recent_conversation = ""
             if self.conversation_history:
-                recent_turns = self.conversation_history[-10:]  # Last 10 messages
-                for msg in recent_turns:
-                    role = "User" if msg.get("role") == "user" else "Assistant"
-                    content = msg.get("content", "")
-                    recent_conversation += f"{role}: {content}\n"
+                # Last 10 messages within the token budget (older turns summarized)
+                recent_conversation = self.history.transcript(
+                    self.conversation_history, max_messages=10, user_label="User", assistant_label="Assistant"
+                ) + "\n"
             
             # Include existing session variables for reference in calculations
             existing_vars_str = ""
@@ -4385,7 +4516,7 @@ Return ONLY a JSON object with the extracted values. If a value cannot be determ
                     if attempt > 0:
                         logger.warning(f"🔄 Webhook retry attempt {attempt + 1}/{max_retries + 1} with {current_timeout}s timeout...")
                     
-                    async with httpx.AsyncClient(timeout=current_timeout) as client:
+                    async with http_client_registry.session(timeout=current_timeout) as client:
                         if webhook_method == "GET":
                             response = await client.get(webhook_url, headers=webhook_headers)
                         else:  # POST
@@ -5128,10 +5259,9 @@ But the agent just said this exact phrase. Generate a natural variation that:
                 return response.content[0].text.strip()
             else:
                 # Default to OpenAI-compatible
-                from openai import AsyncOpenAI
                 from api_key_service import get_api_key
                 api_key = await get_api_key(self.user_id, llm_provider)
-                client = AsyncOpenAI(api_key=api_key)
+                client = llm_client_pool.get_client(llm_provider, api_key)
                 
                 # OpenAI format
                 response = await client.chat.completions.create(
@@ -5337,22 +5467,26 @@ Respond naturally to the user based on these instructions. Remember: DO NOT repe
         # Construct messages with caching hint
         # For parallel-enabled nodes: Use condensed history for speed
         # For regular nodes: Use full history for context
+        # Both modes use the token-budgeted window: recent turns verbatim, older turns as a
+        # rolling summary placed right after the cached prompt so the cached prefix never changes
         if use_parallel:
-            # Parallel mode: Use last 10 messages only for speed
-            conversation_history = self.conversation_history[-10:] if len(self.conversation_history) > 10 else self.conversation_history
+            # Parallel mode: at most the last 10 messages for speed
+            summary_messages, conversation_history = self.history.llm_messages(self.conversation_history, max_messages=10)
             logger.info(f"⚡ Parallel mode: Using condensed history ({len(conversation_history)}/{len(self.conversation_history)} messages)")
         else:
-            # Regular mode: Full history
-            conversation_history = self.conversation_history
+            summary_messages, conversation_history = self.history.llm_messages(self.conversation_history)
         
         messages = [
-            {"role": "system", "content": cached_system_prompt, "cache_control": {"type": "ephemeral"}},
+            {"role": "system", "content": cached_system_prompt, "cache_control": {"type": "ephemeral"}}
+        ] + summary_messages + [
             {"role": "system", "content": dynamic_context}
         ] + conversation_history
         
         # Log context usage
         history_count = len(self.conversation_history)
         total_prompt_chars = len(cached_system_prompt) + len(dynamic_context)
+        logger.info(f"🗜️ History window: {len(conversation_history)}/{history_count} messages verbatim, "
+                    f"summary={'yes' if summary_messages else 'no'} (covers {self.history.summarized_upto})")
         import datetime
         timestamp_str = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
         logger.info(f"⏱️ [{timestamp_str}] 💬 LLM REQUEST START: {history_count} conversation turns, {total_prompt_chars} system chars (KB cached)")
@@ -5378,6 +5512,7 @@ Respond naturally to the user based on these instructions. Remember: DO NOT repe
         
         # Stream LLM response and process sentence by sentence
         llm_request_start = time.time()
+        turn_tracer.mark(self.call_id, "llm_request", llm_request_start)
         
         # Call LLM based on provider with streaming
         if llm_provider == "grok" or llm_provider == "gemini":
@@ -5413,6 +5548,7 @@ Respond naturally to the user based on these instructions. Remember: DO NOT repe
                 timestamp_str = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
                 logger.info(f"⏱️ [{timestamp_str}] 💬 LLM FIRST TOKEN: {ttft_ms}ms ({llm_provider} {model})")
                 first_token_received = True
+                turn_tracer.mark(self.call_id, "llm_first_token")
             
             # Extract content from chunk
             if llm_provider == "grok" or llm_provider == "gemini":
@@ -5451,7 +5587,7 @@ Respond naturally to the user based on these instructions. Remember: DO NOT repe
                             self.mark_agent_speaking_start()
                             # Stream this sentence immediately to TTS
                             await stream_callback(sentence)
-                            logger.info(f"📤 Streamed sentence: {sentence[:50]}...")
+                            call_log_control.hot(logger, self.call_id, "📤 Streamed sentence: %s...", sentence[:50])
                 
                 # Keep the last incomplete part in buffer
                 sentence_buffer = sentences[-1] if len(sentences) % 2 != 0 else ""
@@ -5459,10 +5595,11 @@ Respond naturally to the user based on these instructions. Remember: DO NOT repe
         # Send any remaining text
         if sentence_buffer.strip() and stream_callback:
             await stream_callback(sentence_buffer.strip())
-            logger.info(f"📤 Streamed final fragment: {sentence_buffer[:50]}...")
+            call_log_control.hot(logger, self.call_id, "📤 Streamed final fragment: %s...", sentence_buffer[:50])
         
         # ⏱️ TIMING: Total LLM response time
         llm_total_ms = int((time.time() - llm_request_start) * 1000)
+        turn_tracer.mark(self.call_id, "llm_complete")
         logger.info(f"⏱️ [TIMING] LLM_TOTAL: {llm_total_ms}ms for {len(full_response)} chars ({llm_provider} {model})")
         
         return full_response
@@ -5891,6 +6028,11 @@ If none match well, respond with "0"."""
     async def close(self):
         """Close the call session"""
         self.is_active = False
+        await self.history.close()
+        if self._speculation_task and not self._speculation_task.done():
+            self._speculation_task.cancel()
+        speculation_manager.close(self.call_id)
+        call_log_control.end_call(self.call_id)
         if self.deepgram_connection:
             await self.deepgram_connection.finish()
         logger.info(f"Call session {self.call_id} closed")
@@ -5938,6 +6080,10 @@ async def create_call_session(call_id: str, agent_config: dict, agent_id: str =
         logger.info(f"🔥 Pre-warming LLM client ({llm_provider})...")
         prewarm_start = time.time()
         await session.get_llm_client_for_session(provider=llm_provider)
+        # Open (or confirm) the upstream connection in the background so turn 1 skips the TLS handshake
+        if llm_provider in PROVIDER_BASE_URLS:
+            llm_key = await session.get_api_key(llm_provider)
+            asyncio.create_task(llm_client_pool.prewarm(llm_provider, llm_key))
         prewarm_ms = int((time.time() - prewarm_start) * 1000)
         logger.info(f"✅ LLM client pre-warmed in {prewarm_ms}ms")
     except Exception as e:
@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
 from typing import List, Optional
 from datetime import datetime
 import logging
-import csv
-import io
+import os
+import tempfile
+
+from pymongo.errors import DuplicateKeyError
 
 from crm_models import (
     Lead, LeadCreate, LeadStatus, LeadSource,
@@ -11,9 +13,11 @@ from crm_models import (
     QCAgentConfig, QCAgentConfigUpdate, QCAgentType,
     CallAnalytics,
     AppointmentWebhook,
-    LeadImportRequest, LeadImportItem
+    LeadImportRequest
 )
 from auth_middleware import get_current_user
+from lead_import import import_items, lead_import_jobs, normalize_phone
+from pagination import paginate, InvalidCursor
 
 logger = logging.getLogger(__name__)
 
@@ -33,22 +37,31 @@ async def create_lead(lead_data: LeadCreate, current_user: dict = Depends(get_cu
     """Create a new lead"""
     lead = Lead(
         user_id=current_user['id'],
-        **lead_data.dict()
+        **{**lead_data.dict(), "phone": normalize_phone(lead_data.phone) or lead_data.phone}
     )
-    await db.leads.insert_one(lead.dict())
+    try:
+        await db.leads.insert_one(lead.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"A lead with phone {lead.phone} already exists")
     logger.info(f"Created lead: {lead.id} for user: {current_user['email']}")
     return lead
 
-@crm_router.get("/leads", response_model=List[Lead])
+@crm_router.get("/leads")
 async def list_leads(
     status: Optional[str] = None,
     source: Optional[str] = None,
     search: Optional[str] = None,
     limit: int = 100,
     skip: int = 0,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """List leads with filters"""
+    """List leads with filters
+
+    With cursor or view: a keyset page {leads, next_cursor, total} of summary rows
+    (view=full for whole documents). Without them: a skip/limit list, as before.
+    """
     query = {"user_id": current_user['id']}
     
     if status:
@@ -63,6 +76,14 @@ async def list_leads(
             {"phone": {"$regex": search, "$options": "i"}}
         ]
     
+    if cursor is not None or view is not None:
+        try:
+            page = await paginate(db.leads, query, limit, cursor, view or "summary")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page["leads"] = page.pop("items")
+        return page
+    
     leads = await db.leads.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
     return [Lead(**lead) for lead in leads]
 
@@ -127,66 +148,41 @@ async def delete_lead(lead_id: str, current_user: dict = Depends(get_current_use
 
 @crm_router.post("/leads/import")
 async def import_leads(import_data: LeadImportRequest, current_user: dict = Depends(get_current_user)):
-    """Bulk import leads"""
-    imported = 0
-    skipped = 0
-    errors = []
-    
-    for lead_item in import_data.leads:
-        try:
-            # Check for duplicates by phone
-            if import_data.skip_duplicates:
-                existing = await db.leads.find_one({
-                    "user_id": current_user['id'],
-                    "phone": lead_item.phone
-                })
-                if existing:
-                    skipped += 1
-                    continue
-            
-            # Create lead
-            lead = Lead(
-                user_id=current_user['id'],
-                **lead_item.dict()
-            )
-            await db.leads.insert_one(lead.dict())
-            imported += 1
-        except Exception as e:
-            errors.append({"phone": lead_item.phone, "error": str(e)})
-    
-    return {
-        "imported": imported,
-        "skipped": skipped,
-        "errors": errors
-    }
+    """Bulk import leads (chunked unordered upserts on user_id + phone)"""
+    report = await import_items(db, current_user['id'], import_data.leads, import_data.skip_duplicates)
+    return report.summary()
 
 @crm_router.post("/leads/import-csv")
-async def import_leads_from_csv(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Import leads from CSV file"""
+async def import_leads_from_csv(
+    file: UploadFile = File(...),
+    skip_duplicates: bool = True,
+    current_user: dict = Depends(get_current_user)
+):
+    """Import leads from CSV file as a background job; poll /leads/import-jobs/{job_id}"""
+    # Spool the upload to disk: the job outlives the request (and its UploadFile)
+    fd, path = tempfile.mkstemp(prefix="lead_import_", suffix=".csv")
     try:
-        content = await file.read()
-        csv_data = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_data))
-        
-        leads = []
-        for row in csv_reader:
-            lead_item = LeadImportItem(
-                name=row.get('name', ''),
-                email=row.get('email'),
-                phone=row.get('phone', ''),
-                source=row.get('source', LeadSource.IMPORT),
-                tags=row.get('tags', '').split(',') if row.get('tags') else [],
-                notes=row.get('notes')
-            )
-            leads.append(lead_item)
-        
-        # Use the import endpoint
-        import_request = LeadImportRequest(leads=leads, skip_duplicates=True)
-        return await import_leads(import_request, current_user)
-        
+        with os.fdopen(fd, "wb") as spool:
+            while chunk := await file.read(1024 * 1024):
+                spool.write(chunk)
+        job = await lead_import_jobs.start(db, current_user['id'], path, file.filename or "upload.csv", skip_duplicates)
     except Exception as e:
         logger.error(f"Error importing CSV: {e}")
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
         raise HTTPException(status_code=400, detail=f"Failed to import CSV: {str(e)}")
+    
+    return {"job_id": job["job_id"], "status": job["status"], "filename": job["filename"]}
+
+@crm_router.get("/leads/import-jobs/{job_id}")
+async def get_lead_import_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a CSV import; errors lists failed rows (row number, phone, reason)"""
+    job = await lead_import_jobs.get(db, current_user['id'], job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 # ============ APPOINTMENT ENDPOINTS ============
 
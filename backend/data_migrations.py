@@ -0,0 +1,29 @@
+"""
+One-Time Data Migrations
+Startup backfills record completion in the `migrations` collection, so every
+later worker start skips their (unindexed) scan instead of repeating it.
+
+    if await data_migrations.is_done(db, "leads_phone_e164"):
+        return
+    ...
+    await data_migrations.mark_done(db, "leads_phone_e164", updated=n)
+"""
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+async def is_done(db, name: str) -> bool:
+    """Whether the migration has completed (on any worker)"""
+    return await db.migrations.find_one({"_id": name}, {"_id": 1}) is not None
+
+
+async def mark_done(db, name: str, **fields):
+    """Record the migration as completed, with its counters"""
+    await db.migrations.update_one(
+        {"_id": name},
+        {"$set": {**fields, "finished_at": datetime.utcnow()}},
+        upsert=True
+    )
+    logger.info(f"🗃️ Migration {name} completed {fields or ''}")
@@ -1,4 +1,5 @@
 import httpx
+from http_client_registry import http_client_registry
 import logging
 import os
 
@@ -47,7 +48,7 @@ class DiaTTSService:
             logger.info(f"🎤 Dia TTS: Sending request → voice='{voice}', speed={speed}, format={response_format}, text_length={len(text)}")
             logger.info(f"📤 Request body: {request_body}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_client_registry.session(timeout=30.0) as client:
                 response = await client.post(
                     self.tts_endpoint,
                     json=request_body,
@@ -79,7 +80,7 @@ class DiaTTSService:
     async def health_check(self) -> dict:
         """Check if Dia TTS API is healthy"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with http_client_registry.session(timeout=5.0) as client:
                 # Try to hit the base URL or a health endpoint if available
                 response = await client.get(f"{self.api_url}/health")
                 response.raise_for_status()
@@ -0,0 +1,130 @@
+"""
+Inbound DID Routing Index
+Maps a dialed number (normalized E.164) to the tenant and inbound agent that
+answer it, so call.initiated no longer scans phone_numbers in Python.
+
+- Built at startup from phone_numbers; also backfills the indexed
+  number_e164 field on documents that predate it
+- Kept current by the phone-number create/update/delete endpoints
+- Miss (or entry older than DID_ROUTE_TTL) → one indexed find_one on
+  number_e164, so numbers added on another worker are picked up and
+  reassignments made there age out within the TTL
+- Unknown numbers are remembered briefly so junk calls don't hit Mongo each time
+"""
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from lead_import import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+# Seconds a route is trusted before it is re-read from Mongo (other workers may have changed it)
+DID_ROUTE_TTL = float(os.environ.get("DID_ROUTE_TTL", "30"))
+# Seconds an unknown number is remembered as unknown
+DID_NEGATIVE_TTL = 5.0
+
+ROUTE_PROJECTION = {"_id": 0, "id": 1, "number": 1, "number_e164": 1, "user_id": 1,
+                    "inbound_agent_id": 1, "inbound_agent_name": 1}
+
+
+def normalize_did(number: Optional[str]) -> Optional[str]:
+    """E.164 key for a stored or dialed number (Telnyx sends E.164; users type anything)"""
+    return normalize_phone(number)
+
+
+def route_from_doc(doc: Dict) -> Dict:
+    return {
+        "phone_number_id": doc.get("id"),
+        "number": doc.get("number"),
+        "user_id": doc.get("user_id"),
+        "inbound_agent_id": doc.get("inbound_agent_id"),
+        "inbound_agent_name": doc.get("inbound_agent_name"),
+    }
+
+
+class DIDRouter:
+    """In-memory number → route index with an indexed Mongo fallback"""
+
+    def __init__(self, ttl: float = DID_ROUTE_TTL, negative_ttl: float = DID_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._routes: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        self.stats = {"hits": 0, "fallbacks": 0, "misses": 0}
+
+    def _put(self, e164: str, route: Optional[Dict]):
+        self._routes[e164] = (time.time(), route)
+
+    def upsert(self, doc: Dict):
+        """Index (or re-index) a phone_numbers document"""
+        e164 = doc.get("number_e164") or normalize_did(doc.get("number"))
+        if e164:
+            self._put(e164, route_from_doc(doc))
+
+    def remove(self, number: Optional[str]):
+        e164 = normalize_did(number)
+        if e164:
+            self._routes.pop(e164, None)
+
+    async def build(self, db) -> int:
+        """Load every number; backfill number_e164 where it's missing or stale"""
+        await db.phone_numbers.create_index("number_e164", name="number_e164")
+        started = time.time()
+        routes: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        backfill = []
+        duplicates = 0
+        async for doc in db.phone_numbers.find({}, ROUTE_PROJECTION):
+            e164 = normalize_did(doc.get("number"))
+            if not e164:
+                continue
+            if doc.get("number_e164") != e164:
+                backfill.append(UpdateOne({"id": doc.get("id")}, {"$set": {"number_e164": e164}}))
+            existing = routes.get(e164)
+            if existing:
+                duplicates += 1
+                if existing[1].get("inbound_agent_id") or not doc.get("inbound_agent_id"):
+                    continue  # first routable record wins, as the old scan did
+            routes[e164] = (started, route_from_doc(doc))
+        if backfill:
+            await db.phone_numbers.bulk_write(backfill, ordered=False)
+        self._routes = routes
+        if duplicates:
+            logger.warning(f"⚠️ {duplicates} phone_numbers share a normalized number with another record")
+        logger.info(f"📇 DID routing index: {len(routes)} numbers ({len(backfill)} backfilled) "
+                    f"in {int((time.time() - started) * 1000)}ms")
+        return len(routes)
+
+    async def lookup(self, db, number: Optional[str]) -> Optional[Dict]:
+        """Route for a dialed number, or None if no phone_numbers record has it"""
+        e164 = normalize_did(number)
+        if not e164:
+            return None
+        cached = self._routes.get(e164)
+        if cached:
+            age = time.time() - cached[0]
+            if age < (self.ttl if cached[1] else self.negative_ttl):
+                self.stats["hits"] += 1
+                return cached[1]
+
+        self.stats["fallbacks"] += 1
+        doc = await db.phone_numbers.find_one(
+            {"number_e164": e164, "inbound_agent_id": {"$nin": [None, ""]}}, ROUTE_PROJECTION
+        ) or await db.phone_numbers.find_one({"number_e164": e164}, ROUTE_PROJECTION)
+        if doc is None:
+            # Rows written before number_e164 existed and not yet backfilled
+            doc = await db.phone_numbers.find_one({"number": number}, ROUTE_PROJECTION)
+        route = route_from_doc(doc) if doc else None
+        if route is None:
+            self.stats["misses"] += 1
+        self._put(e164, route)
+        return route
+
+    def get_stats(self) -> dict:
+        return {"numbers": sum(1 for _, route in self._routes.values() if route), **self.stats}
+
+
+# Global DID router instance
+did_router = DIDRouter()
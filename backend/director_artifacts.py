@@ -0,0 +1,70 @@
+"""
+Director Artifact Store - content-addressed files on local disk
+Generated variant audio is written once, named by its SHA-256, and referenced
+from job results by URL instead of being inlined as base64.
+
+- Identical audio (same text + voice settings) is stored once
+- Writes are atomic (temp file + os.replace), so readers never see partial files
+- Layout: <root>/<digest[:2]>/<digest><ext>
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional
+
+DIRECTOR_ARTIFACT_DIR = os.environ.get("DIRECTOR_ARTIFACT_DIR", "/tmp/director_artifacts")
+ARTIFACT_URL_PREFIX = "/api/director/artifacts"
+
+CONTENT_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".json": "application/json",
+}
+
+_NAME_RE = re.compile(r"^([0-9a-f]{64})(\.[a-z0-9]{1,5})$")
+
+
+class ArtifactStore:
+    """Write-once blob store keyed by content hash"""
+
+    def __init__(self, root: str = DIRECTOR_ARTIFACT_DIR):
+        self.root = root
+
+    def _path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}{ext}")
+
+    def put(self, data: bytes, ext: str = ".mp3") -> str:
+        """Store data (no-op if already present); returns the artifact name"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        return f"{digest}{ext}"
+
+    def url(self, name: str) -> str:
+        return f"{ARTIFACT_URL_PREFIX}/{name}"
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Filesystem path for an artifact name, or None if unknown/invalid"""
+        match = _NAME_RE.match(name or "")
+        if not match:
+            return None
+        path = self._path(match.group(1), match.group(2))
+        return path if os.path.isfile(path) else None
+
+    def content_type(self, name: str) -> str:
+        return CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+
+
+# Global artifact store instance
+artifact_store = ArtifactStore()
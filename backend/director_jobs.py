@@ -0,0 +1,126 @@
+"""
+Director Evolution Jobs
+Runs DirectorService.evolve_node in the background so the HTTP request returns
+immediately with a job id.
+
+- Job state lives in MongoDB (director_jobs), so any worker can answer polls
+- Progress (generation, variants done/total) and the partial evolution log are
+  written after every evaluated variant
+- Cancel sets cancel_requested on the job; the owning worker also cancels its
+  task directly, others pick the flag up between variants
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from director_service import DirectorService, EvolutionCancelled
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class DirectorJobManager:
+    """Starts, tracks and cancels evolution jobs"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _public(job: Optional[Dict]) -> Optional[Dict]:
+        if job:
+            job.pop("_id", None)
+        return job
+
+    async def start(self, service: DirectorService, sandbox_id: str, node_id: str, generations: int = 3) -> Dict:
+        await service._init_db()
+        now = datetime.utcnow()
+        job = {
+            "job_id": f"evo_{uuid.uuid4().hex[:12]}",
+            "user_id": service.user_id,
+            "sandbox_id": sandbox_id,
+            "node_id": node_id,
+            "status": "queued",
+            "cancel_requested": False,
+            "progress": {"generation": 0, "generations": generations, "variants_done": 0, "variants_total": 0},
+            "generations": [],
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await service.db.director_jobs.insert_one(job)
+
+        task = asyncio.create_task(self._run(service, job["job_id"], sandbox_id, node_id, generations))
+        self._tasks[job["job_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["job_id"], None))
+        print(f"[Director] 🚀 Evolution job {job['job_id']} started for node {node_id}")
+        return self._public(job)
+
+    async def _run(self, service: DirectorService, job_id: str, sandbox_id: str, node_id: str, generations: int):
+        jobs = service.db.director_jobs
+        write_lock = asyncio.Lock()  # variants finish concurrently; keep progress writes ordered
+
+        async def update(fields: Dict):
+            fields["updated_at"] = datetime.utcnow()
+            await jobs.update_one({"job_id": job_id}, {"$set": fields})
+
+        async def on_progress(progress: Dict, evolution_log: List[Dict]):
+            generations_so_far = [
+                {"generation": g["generation"], "variants": [v for v in g["variants"] if v is not None]}
+                for g in evolution_log
+            ]
+            async with write_lock:
+                await update({"progress": progress, "generations": generations_so_far})
+
+        async def should_cancel() -> bool:
+            job = await jobs.find_one({"job_id": job_id}, {"cancel_requested": 1})
+            return bool(job and job.get("cancel_requested"))
+
+        try:
+            await update({"status": "running", "started_at": datetime.utcnow()})
+            result = await service.evolve_node(
+                sandbox_id=sandbox_id,
+                node_id=node_id,
+                generations=generations,
+                on_progress=on_progress,
+                should_cancel=should_cancel,
+            )
+            await update({
+                "status": "completed",
+                "result": result,
+                "generations": result.get("generations", []),
+                "finished_at": datetime.utcnow(),
+            })
+            print(f"[Director] ✅ Evolution job {job_id} completed")
+        except (EvolutionCancelled, asyncio.CancelledError):
+            await update({"status": "cancelled", "finished_at": datetime.utcnow()})
+            print(f"[Director] 🛑 Evolution job {job_id} cancelled")
+        except Exception as e:
+            await update({"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+            print(f"[Director] ❌ Evolution job {job_id} failed: {e}")
+
+    async def get(self, service: DirectorService, job_id: str) -> Optional[Dict]:
+        await service._init_db()
+        job = await service.db.director_jobs.find_one({"job_id": job_id, "user_id": service.user_id})
+        return self._public(job)
+
+    async def cancel(self, service: DirectorService, job_id: str) -> Optional[Dict]:
+        """Request cancellation; returns the job (None if not found)"""
+        await service._init_db()
+        job = await service.db.director_jobs.find_one_and_update(
+            {"job_id": job_id, "user_id": service.user_id, "status": {"$nin": list(TERMINAL_STATUSES)}},
+            {"$set": {"cancel_requested": True, "updated_at": datetime.utcnow()}},
+        )
+        if job is None:
+            return await self.get(service, job_id)
+
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            task.cancel()
+        job["cancel_requested"] = True
+        return self._public(job)
+
+
+# Global director job manager instance
+director_jobs = DirectorJobManager()
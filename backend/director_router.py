@@ -2,11 +2,14 @@
 Director Router - API Endpoints for the Director Studio Feature
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import json
 
 from director_service import DirectorService
+from director_jobs import director_jobs
+from director_artifacts import artifact_store
 from auth_middleware import get_current_user  # Same as used in server.py
 
 router = APIRouter(prefix="/api/director", tags=["Director Studio"])
@@ -101,8 +104,9 @@ async def get_sandbox_nodes(sandbox_id: str, current_user: dict = Depends(get_cu
 @router.post("/evolve")
 async def evolve_node(request: EvolveNodeRequest, current_user: dict = Depends(get_current_user)):
     """
-    Run the evolutionary optimization loop on a specific node.
-    Returns FULL data including all variants, audio, and scores.
+    Run the evolutionary optimization loop on a specific node and wait for it.
+    Returns all variants and scores; audio is referenced by audio_url.
+    Prefer POST /evolve/jobs, which returns immediately and can be polled.
     """
     try:
         service = DirectorService(user_id=current_user['id'])
@@ -113,7 +117,7 @@ async def evolve_node(request: EvolveNodeRequest, current_user: dict = Depends(g
             generations=request.generations
         )
         
-        # Result now contains full evolution log with audio
+        # Result contains the full evolution log; audio lives in the artifact store
         return {
             "success": True,
             "node_id": result.get("node_id"),
@@ -129,6 +133,69 @@ async def evolve_node(request: EvolveNodeRequest, current_user: dict = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/evolve/jobs")
+async def start_evolve_job(request: EvolveNodeRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Start evolution as a background job. Poll GET /evolve/jobs/{job_id}.
+    """
+    try:
+        service = DirectorService(user_id=current_user['id'])
+        config = await service.get_sandbox_config(request.sandbox_id)
+        if not config:
+            raise HTTPException(status_code=404, detail="Sandbox not found")
+        
+        job = await director_jobs.start(
+            service,
+            sandbox_id=request.sandbox_id,
+            node_id=request.node_id,
+            generations=request.generations
+        )
+        return {"success": True, "job_id": job["job_id"], "status": job["status"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/evolve/jobs/{job_id}")
+async def get_evolve_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Job status, progress and (partial) evolution log.
+    """
+    service = DirectorService(user_id=current_user['id'])
+    job = await director_jobs.get(service, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, **job}
+
+
+@router.post("/evolve/jobs/{job_id}/cancel")
+async def cancel_evolve_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Cancel a running evolution job. The sandbox is left unchanged.
+    """
+    service = DirectorService(user_id=current_user['id'])
+    job = await director_jobs.cancel(service, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job_id": job_id, "status": job["status"], "cancel_requested": job.get("cancel_requested", False)}
+
+
+@router.get("/artifacts/{name}")
+async def get_artifact(name: str, current_user: dict = Depends(get_current_user)):
+    """
+    Serve a stored artifact (variant audio). Names are content hashes.
+    """
+    path = artifact_store.resolve(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(
+        path,
+        media_type=artifact_store.content_type(name),
+        headers={"Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+
 @router.patch("/sandbox/node")
 async def update_sandbox_node(request: UpdateNodeRequest, current_user: dict = Depends(get_current_user)):
     """
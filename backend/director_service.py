@@ -8,11 +8,24 @@ import copy
 import uuid
 import asyncio
 import json
-import httpx
+from http_client_registry import http_client_registry
 import traceback
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
+from director_artifacts import artifact_store
+
+# Variants evaluated at once per generation (each is a TTS stream + a judge call)
+DIRECTOR_EVAL_CONCURRENCY = int(os.environ.get("DIRECTOR_EVAL_CONCURRENCY", "3"))
+
+# Placeholder _run_streaming_test returns without an ElevenLabs key
+SIMULATED_AUDIO = b'SIMULATED_AUDIO'
+
+ProgressCallback = Callable[[Dict, List[Dict]], Awaitable[None]]
+
+
+class EvolutionCancelled(Exception):
+    """Raised inside evolve_node when its job was cancelled"""
 
 
 class DirectorService:
@@ -132,10 +145,22 @@ class DirectorService:
         
         raise ValueError(f"Node {node_id} not found in sandbox")
 
-    async def evolve_node(self, sandbox_id: str, node_id: str, generations: int = 3):
+    async def evolve_node(
+        self,
+        sandbox_id: str,
+        node_id: str,
+        generations: int = 3,
+        on_progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], Awaitable[bool]]] = None,
+    ):
         """
         Starts the Evolutionary Optimization loop for a specific node.
-        Returns FULL data including all variants, audio, and scores.
+        Each generation's variants are evaluated concurrently (bounded by
+        DIRECTOR_EVAL_CONCURRENCY); audio goes to the artifact store and is
+        referenced by URL.
+
+        on_progress(progress, evolution_log) is awaited after every variant;
+        should_cancel() is polled between variants and raises EvolutionCancelled.
         """
         await self._init_db()
         
@@ -143,6 +168,10 @@ class DirectorService:
         
         evolution_log = []  # Full history for UI
         
+        async def check_cancel():
+            if should_cancel and await should_cancel():
+                raise EvolutionCancelled(f"Evolution of {node_id} cancelled")
+        
         try:
             config = await self.get_sandbox_config(sandbox_id)
             if not config:
@@ -171,6 +200,19 @@ class DirectorService:
             node_label = target_node.get('label') or node_data.get('label') or node_id
             print(f"[Director] Evolving node: {node_label}")
             
+            progress = {
+                "node_id": node_id,
+                "node_label": node_label,
+                "generation": 0,
+                "generations": generations,
+                "variants_done": 0,
+                "variants_total": 0,
+            }
+            
+            async def report():
+                if on_progress:
+                    await on_progress(dict(progress), evolution_log)
+            
             # 1. Generate Chaos Scenario using Grok
             scenario = await self._call_grok_for_scenario(node_data)
             print(f"[Director] Scenario: {scenario[:80]}...")
@@ -178,49 +220,34 @@ class DirectorService:
             best_score = 0
             best_variant = node_data
             best_variant_data = None
+            eval_slots = asyncio.Semaphore(DIRECTOR_EVAL_CONCURRENCY)
             
             for gen in range(generations):
+                await check_cancel()
                 print(f"--- Generation {gen + 1} ---")
-                generation_results = []
                 
                 # 2. Mutation Phase
                 variants = await self._generate_mutations(node_data)
                 
-                # 3. Battle Royale (Test each variant with REAL audio)
-                for i, variant in enumerate(variants):
-                    try:
-                        audio_bytes, text_output, latency = await self._run_streaming_test(variant, scenario, voice_id)
-                        score = await self._call_openai_judge(audio_bytes, text_output, latency, scenario)
-                        
-                        # Encode audio to base64 for frontend
-                        import base64
-                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8') if audio_bytes else None
-                        
-                        variant_result = {
-                            "variant_type": variant.get('_variant_type', 'Unknown'),
-                            "content": variant.get('content', ''),
-                            "voice_settings": variant.get('voice_settings', {}),
-                            "audio_base64": audio_base64,
-                            "latency_ms": int(latency * 1000),
-                            "score": score
-                        }
-                        generation_results.append(variant_result)
-                        print(f"[Director] Variant {i+1} ({variant.get('_variant_type')}): Score {score.get('total', 0)}")
-                        
-                    except Exception as var_err:
-                        print(f"[Director] Variant {i+1} error: {var_err}")
-                        generation_results.append({
-                            "variant_type": variant.get('_variant_type', 'Unknown'),
-                            "content": variant.get('content', ''),
-                            "voice_settings": variant.get('voice_settings', {}),
-                            "error": str(var_err),
-                            "score": {"total": 0}
-                        })
+                generation_entry = {"generation": gen + 1, "variants": [None] * len(variants)}
+                evolution_log.append(generation_entry)
+                progress["generation"] = gen + 1
+                progress["variants_total"] += len(variants)
+                await report()
                 
-                evolution_log.append({
-                    "generation": gen + 1,
-                    "variants": generation_results
-                })
+                # 3. Battle Royale (Test all variants concurrently with REAL audio)
+                async def evaluate(i: int, variant: Dict):
+                    async with eval_slots:
+                        await check_cancel()
+                        result = await self._evaluate_variant(i, variant, scenario, voice_id)
+                    generation_entry["variants"][i] = result
+                    progress["variants_done"] += 1
+                    await report()
+                    return result
+                
+                generation_results = list(await asyncio.gather(
+                    *[evaluate(i, variant) for i, variant in enumerate(variants)]
+                ))
                 
                 # 4. Selection
                 if generation_results:
@@ -237,6 +264,8 @@ class DirectorService:
                                 best_variant = v
                                 break
             
+            await check_cancel()
+            
             # Apply winner to sandbox
             for node in call_flow:
                 if str(node.get('id')) == node_id_str:
@@ -257,11 +286,45 @@ class DirectorService:
                 "best_score": best_score
             }
             
+        except EvolutionCancelled:
+            print(f"[Director] 🛑 Evolution cancelled for {node_id}")
+            raise
         except Exception as e:
             print(f"[Director] ❌ Evolution error: {e}")
             print(traceback.format_exc())
             raise
 
+    async def _evaluate_variant(self, index: int, variant: Dict, scenario: str, voice_id: str) -> Dict:
+        """TTS test + judge for one variant; audio is stored as an artifact"""
+        try:
+            audio_bytes, text_output, latency = await self._run_streaming_test(variant, scenario, voice_id)
+            score = await self._call_openai_judge(audio_bytes, text_output, latency, scenario)
+            
+            audio_url = None
+            if audio_bytes and audio_bytes != SIMULATED_AUDIO:
+                name = await asyncio.to_thread(artifact_store.put, audio_bytes, ".mp3")
+                audio_url = artifact_store.url(name)
+            
+            print(f"[Director] Variant {index+1} ({variant.get('_variant_type')}): Score {score.get('total', 0)}")
+            return {
+                "variant_type": variant.get('_variant_type', 'Unknown'),
+                "content": variant.get('content', ''),
+                "voice_settings": variant.get('voice_settings', {}),
+                "audio_url": audio_url,
+                "audio_bytes": len(audio_bytes or b''),
+                "latency_ms": int(latency * 1000),
+                "score": score
+            }
+        except Exception as var_err:
+            print(f"[Director] Variant {index+1} error: {var_err}")
+            return {
+                "variant_type": variant.get('_variant_type', 'Unknown'),
+                "content": variant.get('content', ''),
+                "voice_settings": variant.get('voice_settings', {}),
+                "error": str(var_err),
+                "score": {"total": 0}
+            }
+
     async def _call_grok_for_scenario(self, node_context: Dict) -> str:
         """Use Grok 4 to generate a chaos scenario."""
         if not self.grok_api_key:
@@ -277,7 +340,7 @@ Output ONLY the persona description in 1-2 sentences."""
         user_prompt = f"Generate a chaos scenario for testing this voice agent response: {content}"
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_client_registry.session(timeout=30.0) as client:
                 response = await client.post(
                     "https://api.x.ai/v1/chat/completions",
                     headers={
@@ -327,7 +390,7 @@ Measured Latency: {latency:.2f}s
 Judge this response."""
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with http_client_registry.session(timeout=60.0) as client:
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={
@@ -386,7 +449,6 @@ Judge this response."""
             print("[Director] ⚠️ No OpenAI key, using fallback mutations")
             return self._fallback_mutations(base_node_data)
         
-        variants = []
         variant_configs = [
             {
                 "type": "Diplomat",
@@ -408,7 +470,7 @@ Judge this response."""
             }
         ]
         
-        for config in variant_configs:
+        async def build_variant(config: Dict) -> Dict:
             try:
                 # Pass full node data for comprehensive optimization
                 rewritten_content = await self._rewrite_node_with_gpt(content, config, base_node_data)
@@ -417,7 +479,6 @@ Judge this response."""
                 variant['voice_settings'] = config['voice_settings']
                 variant['_variant_type'] = config['type']
                 variant['_speech_only'] = self._extract_speech_content(rewritten_content)
-                variants.append(variant)
                 print(f"[Director] ✅ Generated {config['type']} variant")
             except Exception as e:
                 print(f"[Director] ❌ Error generating {config['type']}: {e}")
@@ -425,7 +486,10 @@ Judge this response."""
                 variant = copy.deepcopy(base_node_data)
                 variant['_variant_type'] = config['type']
                 variant['_speech_only'] = self._extract_speech_content(content)
-                variants.append(variant)
+            return variant
+        
+        # Rewrites are independent; run them side by side (order preserved)
+        variants = list(await asyncio.gather(*[build_variant(config) for config in variant_configs]))
         
         return variants
     
@@ -485,7 +549,7 @@ CRITICAL RULES:
 {original_content[:4000]}{node_context}"""
 
         try:
-            async with httpx.AsyncClient(timeout=90.0) as client:
+            async with http_client_registry.session(timeout=90.0) as client:
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={
@@ -558,12 +622,12 @@ CRITICAL RULES:
         if not self.elevenlabs_api_key:
             print("[Director] ⚠️ No ElevenLabs key, using simulated audio")
             await asyncio.sleep(0.2)
-            return b'SIMULATED_AUDIO', text, 0.3
+            return SIMULATED_AUDIO, text, 0.3
         
         start_time = time.time()
         
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
+            async with http_client_registry.session(timeout=15.0) as client:
                 url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
                 
                 data = {
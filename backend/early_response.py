@@ -0,0 +1,125 @@
+"""
+Early (Speculative) Response Generation
+Starts CallSession.process_user_input as soon as the local VAD reports a probable
+end of turn, instead of waiting for Soniox's <end> token.
+
+- Sentences produced before the turn is confirmed are buffered, never spoken
+- commit(): the STT endpoint arrived with the same transcript - the barge-in
+  interceptor runs, buffered sentences are replayed into the real TTS callback,
+  the rest stream live and the turn's background work is scheduled
+- cancel(): the caller kept talking (or said something else) - the task is
+  cancelled and the session state it touched is restored
+
+The run is started with speculative=True, so process_user_input leaves the
+side effects it can't undo (stopping playback, the redis barge-in flag,
+background summary) to commit(). Only conversation state it mutates is
+snapshotted (history, node position, variables, end-call flag, the
+agent-speaking / silence clocks and the check-in / hold-on flags), so
+call-flow nodes that fire webhooks are excluded unless the agent opts in.
+"""
+import asyncio
+import copy
+import logging
+import re
+import time
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SentenceCallback = Callable[[str], Awaitable]
+
+
+def normalize_transcript(text: str) -> str:
+    """Compare transcripts ignoring case, punctuation and spacing"""
+    return " ".join(re.sub(r"[^\w\s']", " ", (text or "").lower()).split())
+
+
+class EarlyResponse:
+    """One speculative process_user_input run for a call"""
+
+    def __init__(self, session, text: str):
+        self.session = session
+        self.text = text
+        self.key = normalize_transcript(text)
+        self.started_at = time.time()
+        self.first_sentence_at: Optional[float] = None
+        self.committed = False
+        self.cancelled = False
+
+        self._buffer: List[str] = []
+        self._live_callback: Optional[SentenceCallback] = None
+        self._lock = asyncio.Lock()
+        self._snapshot = self._take_snapshot()
+        self.task = asyncio.create_task(
+            session.process_user_input(text, stream_callback=self._on_sentence, speculative=True)
+        )
+
+    def _take_snapshot(self) -> dict:
+        s = self.session
+        return {
+            "history_len": len(s.conversation_history),
+            "current_node_id": s.current_node_id,
+            "current_node_label": s.current_node_label,
+            "session_variables": copy.copy(s.session_variables),
+            "should_end_call": s.should_end_call,
+            "last_message_was_checkin": s.last_message_was_checkin,
+            "checkin_count": s.checkin_count,
+            "hold_on_detected": s.hold_on_detected,
+            "max_checkins_reached": s.max_checkins_reached,
+            "agent_speaking": s.agent_speaking,
+            "silence_start_time": s.silence_start_time,
+        }
+
+    def _restore_snapshot(self):
+        s, snap = self.session, self._snapshot
+        del s.conversation_history[snap["history_len"]:]
+        s.current_node_id = snap["current_node_id"]
+        s.current_node_label = snap["current_node_label"]
+        s.session_variables = snap["session_variables"]
+        s.should_end_call = snap["should_end_call"]
+        s.last_message_was_checkin = snap["last_message_was_checkin"]
+        s.checkin_count = snap["checkin_count"]
+        s.hold_on_detected = snap["hold_on_detected"]
+        s.max_checkins_reached = snap["max_checkins_reached"]
+        s.agent_speaking = snap["agent_speaking"]
+        s.silence_start_time = snap["silence_start_time"]
+        s.is_processing = False
+
+    async def _on_sentence(self, sentence: str):
+        if self.first_sentence_at is None:
+            self.first_sentence_at = time.time()
+        async with self._lock:
+            if self._live_callback is None:
+                self._buffer.append(sentence)
+                return
+        await self._live_callback(sentence)
+
+    def matches(self, text: str) -> bool:
+        return normalize_transcript(text) == self.key
+
+    async def commit(self, stream_callback: SentenceCallback):
+        """Use this response for the turn: replay buffered sentences, then stream live"""
+        self.committed = True
+        await self.session.intercept_barge_in(self.text)
+        async with self._lock:
+            for sentence in self._buffer:
+                await stream_callback(sentence)
+            self._buffer.clear()
+            self._live_callback = stream_callback
+        result = await self.task
+        if result is not None:
+            self.session.schedule_turn_background_work()
+        return result
+
+    async def cancel(self, reason: str = ""):
+        if self.committed or self.cancelled:
+            return
+        self.cancelled = True
+        if not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._restore_snapshot()
+        logger.info(f"↩️ Early response discarded ({reason}) after {int((time.time() - self.started_at) * 1000)}ms: '{self.text[:50]}'")
@@ -7,10 +7,13 @@ import websockets
 import json
 import base64
 import logging
+import os
 from typing import AsyncGenerator, Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+ELEVENLABS_WS_BASE_URL = os.environ.get("ELEVENLABS_WS_BASE_URL", "wss://api.elevenlabs.io")
+
 class ElevenLabsWebSocketService:
     """
     Manages WebSocket connection to ElevenLabs for streaming TTS
@@ -73,7 +76,7 @@ class ElevenLabsWebSocketService:
             }
             
             # Construct WebSocket URL with SSML parsing enabled
-            uri = f"wss://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream-input?model_id={model_id}&output_format={output_format}&enable_ssml_parsing=true"
+            uri = f"{ELEVENLABS_WS_BASE_URL}/v1/text-to-speech/{voice_id}/stream-input?model_id={model_id}&output_format={output_format}&enable_ssml_parsing=true"
             
             logger.info(f"🔌 Connecting to ElevenLabs WebSocket: voice={voice_id}, model={model_id}")
             logger.info(f"🎙️ Voice settings: stability={self.voice_settings.get('stability')}, similarity={self.voice_settings.get('similarity_boost')}, style={self.voice_settings.get('style')}")
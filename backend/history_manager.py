@@ -0,0 +1,244 @@
+"""
+Conversation History Manager
+Keeps the LLM prompt bounded on long calls instead of sending
+CallSession.conversation_history whole every turn.
+
+- Token counts are cached per message and only new messages are counted
+  (tiktoken, with a chars/4 estimate if the encoding can't be loaded)
+- The last HISTORY_KEEP_TURNS turns are kept verbatim, within
+  HISTORY_TOKEN_BUDGET tokens
+- Older messages fold into a rolling summary, written by a background task
+  after a turn completes - never while the caller is waiting
+- Until the summary catches up, unsummarized messages stay verbatim (bounded
+  by HISTORY_HARD_LIMIT_TOKENS), so nothing silently disappears
+- The summary is its own system message placed after the cached system prompt,
+  so the prompt prefix providers cache (Grok, OpenAI) stays byte-identical
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "3000"))
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "8"))
+HISTORY_HARD_LIMIT_TOKENS = int(os.environ.get("HISTORY_HARD_LIMIT_TOKENS", "12000"))
+
+# Summarize once at least this many messages have left the verbatim window
+SUMMARY_MIN_MESSAGES = 4
+SUMMARY_MAX_TOKENS = 250
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "SUMMARY OF THE EARLIER CONVERSATION (older turns, condensed):\n"
+
+Summarizer = Callable[[str, List[Dict]], Awaitable[Optional[str]]]
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """tiktoken encoding, loaded once; None if unavailable (offline, not installed)"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding_failed = True
+            logger.warning(f"⚠️ tiktoken encoding unavailable, estimating tokens from length: {e}")
+    return _encoding
+
+
+def prewarm_encoding():
+    """Load the encoding at startup rather than on a caller's first turn"""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def llm_message(msg: Dict) -> Dict:
+    """Drop bookkeeping keys (_node_id, ...) before a message goes to a provider"""
+    return {k: v for k, v in msg.items() if not k.startswith("_")}
+
+
+class ConversationHistory:
+    """Token-budgeted view over a session's conversation_history list"""
+
+    def __init__(
+        self,
+        budget_tokens: int = HISTORY_TOKEN_BUDGET,
+        keep_turns: int = HISTORY_KEEP_TURNS,
+        hard_limit_tokens: int = HISTORY_HARD_LIMIT_TOKENS,
+    ):
+        self.budget_tokens = budget_tokens
+        self.keep_messages = keep_turns * 2
+        self.hard_limit_tokens = max(hard_limit_tokens, budget_tokens)
+
+        # (id(msg), len(content), tokens) per message, in history order
+        self._counts: List[Tuple[int, int, int]] = []
+
+        self.summary = ""
+        self.summarized_upto = 0     # messages[:summarized_upto] are covered by the summary
+        self._summary_anchor = None  # id() of messages[summarized_upto - 1], to detect rewrites
+        self._summary_task: Optional[asyncio.Task] = None
+
+        self.stats = {"summaries": 0, "summary_failures": 0, "summary_ms": 0, "dropped_unsummarized": 0}
+
+    # ── Token accounting ────────────────────────────────────────────
+
+    def _sync(self, messages: List[Dict]) -> List[int]:
+        """Token count per message; recounts only messages that are new or changed"""
+        counts = self._counts
+        del counts[len(messages):]
+        for i, msg in enumerate(messages):
+            content = msg.get("content") or ""
+            if i < len(counts):
+                msg_id, length, _ = counts[i]
+                if msg_id == id(msg) and length == len(content):
+                    continue
+                del counts[i:]  # history was rewritten from here on
+            counts.append((id(msg), len(content), count_tokens(content) + MESSAGE_OVERHEAD_TOKENS))
+
+        # Summary no longer matches the history it was built from (rollback, reload)
+        if self.summarized_upto and (
+            self.summarized_upto > len(messages) or id(messages[self.summarized_upto - 1]) != self._summary_anchor
+        ):
+            self._reset_summary()
+        return [tokens for _, _, tokens in counts]
+
+    def total_tokens(self, messages: List[Dict]) -> int:
+        return sum(self._sync(messages))
+
+    def _tail_start(self, tokens: List[int], max_messages: int, budget: int) -> int:
+        """First index of the newest messages that fit max_messages and budget (at least one)"""
+        start, used = len(tokens), 0
+        while start > 0 and len(tokens) - start < max_messages:
+            if used + tokens[start - 1] > budget and start < len(tokens):
+                break
+            used += tokens[start - 1]
+            start -= 1
+        return start
+
+    # ── Windows for the LLM ─────────────────────────────────────────
+
+    def window(self, messages: List[Dict], max_messages: Optional[int] = None,
+               budget: Optional[int] = None) -> Tuple[Optional[str], List[Dict]]:
+        """(summary or None, verbatim messages) to send for this turn"""
+        tokens = self._sync(messages)
+        tail_start = self._tail_start(tokens, max_messages or self.keep_messages, budget or self.budget_tokens)
+        if tail_start == 0:
+            return None, list(messages)
+
+        # Messages that left the window but aren't in the summary yet stay verbatim...
+        start = min(tail_start, self.summarized_upto)
+        # ...up to the hard limit (summarizer down or behind)
+        total = sum(tokens[start:])
+        while start < tail_start and total > self.hard_limit_tokens:
+            total -= tokens[start]
+            start += 1
+            self.stats["dropped_unsummarized"] += 1
+        summary = self.summary if self.summarized_upto and self.summary else None
+        return summary, messages[start:]
+
+    def llm_messages(self, messages: List[Dict], **kwargs) -> Tuple[List[Dict], List[Dict]]:
+        """(summary system message list, history messages) ready for a chat request"""
+        summary, tail = self.window(messages, **kwargs)
+        summary_msgs = [{"role": "system", "content": SUMMARY_PREFIX + summary}] if summary else []
+        return summary_msgs, [llm_message(m) for m in tail]
+
+    def transcript(self, messages: List[Dict], max_messages: int = 10, budget: Optional[int] = None,
+                   user_label: str = None, assistant_label: str = None) -> str:
+        """Recent conversation as text for auxiliary prompts (transitions, extraction)"""
+        summary, tail = self.window(messages, max_messages=max_messages, budget=budget)
+        lines = [f"(Earlier: {summary})"] if summary else []
+        for msg in tail:
+            role = msg.get("role", "")
+            if role == "user" and user_label:
+                role = user_label
+            elif role == "assistant" and assistant_label:
+                role = assistant_label
+            lines.append(f"{role}: {msg.get('content', '')}")
+        return "\n".join(lines)
+
+    # ── Rolling summary ─────────────────────────────────────────────
+
+    def _reset_summary(self):
+        self.summary = ""
+        self.summarized_upto = 0
+        self._summary_anchor = None
+
+    def needs_summary(self, messages: List[Dict]) -> bool:
+        tokens = self._sync(messages)
+        tail_start = self._tail_start(tokens, self.keep_messages, self.budget_tokens)
+        return tail_start - self.summarized_upto >= SUMMARY_MIN_MESSAGES
+
+    def schedule_summary(self, messages: List[Dict], summarize: Summarizer) -> Optional[asyncio.Task]:
+        """Start a background summary if enough history left the window (one at a time)"""
+        if self._summary_task and not self._summary_task.done():
+            return None
+        if not self.needs_summary(messages):
+            return None
+        self._summary_task = asyncio.create_task(self._summarize(messages, summarize))
+        return self._summary_task
+
+    async def _summarize(self, messages: List[Dict], summarize: Summarizer):
+        tokens = self._sync(messages)
+        upto = self._tail_start(tokens, self.keep_messages, self.budget_tokens)
+        start = self.summarized_upto
+        chunk = messages[start:upto]
+        anchor = id(messages[upto - 1])
+        previous = self.summary
+        started = time.time()
+        try:
+            summary = await summarize(previous, [llm_message(m) for m in chunk])
+        except Exception as e:
+            summary = None
+            logger.warning(f"⚠️ History summary failed: {e}")
+        elapsed_ms = int((time.time() - started) * 1000)
+
+        if not summary:
+            self.stats["summary_failures"] += 1
+            return
+        # History rewritten while we were summarizing: drop the result
+        if self.summarized_upto != start or len(messages) < upto or id(messages[upto - 1]) != anchor:
+            return
+        self.summary = summary.strip()
+        self.summarized_upto = upto
+        self._summary_anchor = anchor
+        self.stats["summaries"] += 1
+        self.stats["summary_ms"] += elapsed_ms
+        logger.info(f"🗜️ History summary: {upto} messages folded ({len(chunk)} new) in {elapsed_ms}ms")
+
+    async def close(self):
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
+            try:
+                await self._summary_task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+def build_summary_prompt(previous_summary: str, messages: List[Dict]) -> List[Dict]:
+    """Chat messages asking the LLM to extend the rolling summary"""
+    transcript = "\n".join(f"{m.get('role')}: {m.get('content', '')}" for m in messages)
+    return [
+        {"role": "system", "content": (
+            "You maintain a running summary of a phone call between an AI agent (assistant) and a caller (user). "
+            "Merge the new turns into the existing summary. Keep every concrete fact the caller gave (names, numbers, "
+            "dates, preferences, objections, commitments) and what the agent already said or asked, so it is not repeated. "
+            "Write plain prose, at most 120 words, no preamble."
+        )},
+        {"role": "user", "content": f"EXISTING SUMMARY:\n{previous_summary or '(none)'}\n\nNEW TURNS:\n{transcript}\n\nUpdated summary:"},
+    ]
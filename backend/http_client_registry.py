@@ -0,0 +1,316 @@
+"""
+Shared HTTP Client Registry
+One pooled httpx.AsyncClient per upstream origin (scheme://host:port) instead of a
+fresh client - and a fresh DNS + TCP + TLS handshake - per request.
+
+- Tuned keep-alive limits and HTTP/2 (when `h2` is installed) per host profile
+- Per-host concurrency caps (semaphore) and default timeouts, for streamed
+  responses too
+- Created lazily, pre-warmed at startup, closed at shutdown
+- At most HTTP_MAX_ORIGINS clients: the least recently used idle origin
+  (customer webhooks, CRM hosts) is closed to make room. Profiled hosts and
+  clients handed out with get_client() (LLM SDKs hold on to them) are kept
+- No cookie persistence: tenant webhooks share a client per origin, so a
+  Set-Cookie from one tenant's endpoint must not be replayed to the next
+- Connection reuse stats via httpcore trace events
+
+Usage (drop-in for `async with httpx.AsyncClient(timeout=30.0) as client:`):
+
+    async with http_client_registry.session(timeout=30.0) as client:
+        response = await client.post(url, json=payload)
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Host profiles: tuned limits for the upstreams we call on the hot path.
+# Anything not listed (customer webhooks, CRM endpoints) gets DEFAULT_PROFILE.
+HOST_PROFILES: Dict[str, dict] = {
+    "api.x.ai": {"http2": True, "max_keepalive": 20, "max_connections": 50, "concurrency": 100, "connect_timeout": 5.0},
+    "api.openai.com": {"http2": True, "max_keepalive": 20, "max_connections": 50, "concurrency": 100, "connect_timeout": 5.0},
+    "generativelanguage.googleapis.com": {"http2": True, "max_keepalive": 10, "max_connections": 30, "concurrency": 60, "connect_timeout": 5.0},
+    "api.elevenlabs.io": {"http2": True, "max_keepalive": 10, "max_connections": 30, "concurrency": 60, "connect_timeout": 5.0},
+    "api.telnyx.com": {"http2": False, "max_keepalive": 20, "max_connections": 50, "concurrency": 100, "connect_timeout": 5.0},
+}
+
+DEFAULT_PROFILE = {
+    "http2": False,
+    "max_keepalive": int(os.environ.get("HTTP_DEFAULT_MAX_KEEPALIVE", "10")),
+    "max_connections": int(os.environ.get("HTTP_DEFAULT_MAX_CONNECTIONS", "20")),
+    "concurrency": int(os.environ.get("HTTP_DEFAULT_CONCURRENCY", "20")),
+    "connect_timeout": 10.0,
+}
+
+# Idle keep-alive connections are dropped after this many seconds
+KEEPALIVE_EXPIRY = 30.0
+
+# Most origins with an open client; beyond that the least recently used idle one is closed
+HTTP_MAX_ORIGINS = int(os.environ.get("HTTP_MAX_ORIGINS", "64"))
+
+# Hosts to open clients for at startup (comma separated origins)
+PREWARM_ORIGINS = [
+    o.strip() for o in os.environ.get("HTTP_PREWARM_ORIGINS", "https://api.x.ai,https://api.openai.com").split(",") if o.strip()
+]
+
+
+def _no_cookie_jar() -> CookieJar:
+    """Cookie jar that never stores a Set-Cookie (shared clients are multi-tenant)"""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def origin_of(url: str) -> str:
+    """Normalize a URL (or bare origin) to scheme://host[:port]"""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _HostStats:
+    """Per-host counters"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def as_dict(self) -> dict:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+class _HostSession:
+    """
+    Thin proxy with the httpx.AsyncClient request API.
+    Routes each request to the shared client for its origin, applies the
+    session's default timeout and holds the host's concurrency slot.
+    """
+
+    def __init__(self, registry: "HTTPClientRegistry", timeout=None, follow_redirects: Optional[bool] = None):
+        self._registry = registry
+        self._timeout = timeout
+        self._follow_redirects = follow_redirects
+
+    def _apply_defaults(self, kwargs: dict) -> dict:
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        if self._follow_redirects is not None:
+            kwargs.setdefault("follow_redirects", self._follow_redirects)
+        return kwargs
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self._registry.request(method, url, **self._apply_defaults(kwargs))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        return self._registry.stream(method, url, **self._apply_defaults(kwargs))
+
+
+class HTTPClientRegistry:
+    """
+    Registry of shared httpx.AsyncClient instances keyed by origin
+    """
+
+    def __init__(self, max_origins: int = HTTP_MAX_ORIGINS):
+        self.max_origins = max_origins
+        self.clients: "OrderedDict[str, httpx.AsyncClient]" = OrderedDict()   # least recently used first
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, _HostStats] = {}
+        self._pinned: Set[str] = set()          # origins whose client was handed out (never evicted)
+        self._active: Dict[str, int] = {}       # origin → requests/streams in flight
+        self._closing: Set[asyncio.Task] = set()
+        self.evicted = 0
+
+    @staticmethod
+    def _profile(origin: str) -> dict:
+        host = urlsplit(origin).hostname or ""
+        return HOST_PROFILES.get(host, DEFAULT_PROFILE)
+
+    def _stats_for(self, host: str) -> _HostStats:
+        stats = self.stats.get(host)
+        if stats is None:
+            stats = self.stats[host] = _HostStats()
+        return stats
+
+    async def _on_request(self, request: httpx.Request):
+        """Event hook: attach a trace callback so new TCP connections are counted"""
+        stats = self._stats_for(request.url.host)
+        stats.requests += 1
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+
+        request.extensions["trace"] = trace
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Get (or create) the shared client for the URL's origin, for callers that keep it (never evicted)"""
+        origin = origin_of(url)
+        self._pinned.add(origin)
+        return self._client(origin)
+
+    def _client(self, origin: str) -> httpx.AsyncClient:
+        client = self.clients.get(origin)
+        if client is None or client.is_closed:
+            profile = self._profile(origin)
+            use_http2 = profile["http2"] and HTTP2_AVAILABLE
+            client = httpx.AsyncClient(
+                http2=use_http2,
+                timeout=httpx.Timeout(60.0, connect=profile["connect_timeout"]),
+                cookies=_no_cookie_jar(),
+                limits=httpx.Limits(
+                    max_keepalive_connections=profile["max_keepalive"],
+                    max_connections=profile["max_connections"],
+                    keepalive_expiry=KEEPALIVE_EXPIRY
+                ),
+                event_hooks={"request": [self._on_request]}
+            )
+            self.clients[origin] = client
+            logger.info(f"🌐 Created shared HTTP client for {origin} (http2={use_http2}, max_connections={profile['max_connections']})")
+            self._evict_idle()
+        self.clients.move_to_end(origin)
+        return client
+
+    def _evict_idle(self):
+        """Close least recently used idle clients while over max_origins"""
+        if len(self.clients) <= self.max_origins:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop to close them on yet; trimmed on the next request
+        for origin in list(self.clients):
+            if len(self.clients) <= self.max_origins:
+                return
+            host = urlsplit(origin).hostname or ""
+            if origin in self._pinned or host in HOST_PROFILES or self._active.get(origin):
+                continue
+            client = self.clients.pop(origin)
+            self.semaphores.pop(origin, None)
+            self.stats.pop(host, None)
+            self.evicted += 1
+            task = loop.create_task(client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def _semaphore(self, origin: str) -> asyncio.Semaphore:
+        semaphore = self.semaphores.get(origin)
+        if semaphore is None:
+            semaphore = self.semaphores[origin] = asyncio.Semaphore(self._profile(origin)["concurrency"])
+        return semaphore
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[httpx.AsyncClient]:
+        """The origin's client, holding its concurrency slot and counting the call in its stats"""
+        origin = origin_of(url)
+        self._active[origin] = self._active.get(origin, 0) + 1    # not evicted while in use
+        try:
+            client = self._client(origin)
+            stats = self._stats_for(urlsplit(url).hostname or "")
+            async with self._semaphore(origin):
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+                start = time.time()
+                try:
+                    yield client
+                except httpx.HTTPError:
+                    stats.errors += 1
+                    raise
+                finally:
+                    stats.in_flight -= 1
+                    stats.total_ms += (time.time() - start) * 1000
+        finally:
+            self._active[origin] -= 1
+            if not self._active[origin]:
+                del self._active[origin]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared client, bounded by the host's concurrency cap"""
+        async with self._slot(url) as client:
+            return await client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Streamed request through the shared client; the slot is held until the body is consumed"""
+        async with self._slot(url) as client:
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+    @asynccontextmanager
+    async def session(self, timeout=None, follow_redirects: Optional[bool] = None):
+        """
+        Drop-in replacement for `async with httpx.AsyncClient(timeout=...) as client`.
+        Nothing is opened or closed here - connections stay pooled across sessions.
+        """
+        yield _HostSession(self, timeout=timeout, follow_redirects=follow_redirects)
+
+    async def startup(self):
+        """Create clients for hot upstreams so the first call doesn't pay client construction"""
+        for origin in PREWARM_ORIGINS:
+            self.get_client(origin)
+        logger.info(f"🌐 HTTP client registry ready (http2 available={HTTP2_AVAILABLE}, prewarmed={len(PREWARM_ORIGINS)})")
+
+    async def aclose_all(self):
+        """Close every shared client (server shutdown)"""
+        for origin, client in list(self.clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing HTTP client for {origin}: {e}")
+        self.clients.clear()
+        self.semaphores.clear()
+        self._pinned.clear()
+
+    def get_stats(self) -> dict:
+        """Connection reuse stats per upstream host"""
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "clients": len(self.clients),
+            "evicted": self.evicted,
+            "hosts": {host: stats.as_dict() for host, stats in self.stats.items()},
+        }
+
+
+# Global registry instance
+http_client_registry = HTTPClientRegistry()
@@ -9,7 +9,6 @@ with DISC adaptation and correct transition logic built-in.
 20% of responses: 2,200ms (full LLM)
 Average: 496ms ✅ WAY BELOW 1500ms!
 """
-import re
 
 # Human sales agent "muscle memory" - validated responses with transitions
 PATTERN_LIBRARY = {
@@ -85,23 +84,16 @@ def match_pattern(user_input: str, conversation_history: list = None) -> dict:
     Instant pattern matching like human muscle memory
     Returns matched pattern with confidence score
     """
-    user_input_lower = user_input.lower()
+    # Scores come from the shared utterance analyzer (patterns compiled once,
+    # one cached scan per utterance)
+    from utterance_analyzer import utterance_analyzer
+    scores = utterance_analyzer.analyze(user_input).instant_scores
     
     best_match = None
     best_score = 0
     
     for pattern_name, pattern_data in PATTERN_LIBRARY.items():
-        score = 0
-        
-        # Check main patterns
-        for regex_pattern in pattern_data["patterns"]:
-            if re.search(regex_pattern, user_input_lower):
-                score += 10
-        
-        # Check confidence boosters
-        for boost in pattern_data.get("confidence_boost", []):
-            if boost in user_input_lower:
-                score += 5
+        score = scores.get(pattern_name, 0)
         
         # Update best match
         if score > best_score:
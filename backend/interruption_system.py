@@ -13,7 +13,7 @@ Two frameworks:
 
 import logging
 import asyncio
-import httpx
+from http_client_registry import http_client_registry
 import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -183,7 +183,7 @@ Return JSON:
 }}"""
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with http_client_registry.session(timeout=10.0) as client:
                 response = await client.post(
                     "https://api.x.ai/v1/chat/completions",
                     headers={
@@ -309,7 +309,7 @@ Return JSON:
 Return ONLY the phrase, no quotes or explanation."""
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with http_client_registry.session(timeout=10.0) as client:
                 response = await client.post(
                     "https://api.x.ai/v1/chat/completions",
                     headers={
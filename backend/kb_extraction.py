@@ -0,0 +1,389 @@
+"""
+Knowledge Base Extraction Worker
+Takes text extraction for /agents/{id}/kb/upload and /agents/{id}/kb/url off
+the event loop. The handlers used to read the whole upload into memory and run
+PyPDF2 / python-docx (or the HTML scrape) inline, so a large PDF stalled audio
+for every live call on the worker.
+
+- Uploads are spooled to disk a chunk at a time (KB_MAX_UPLOAD_MB) and hashed
+  as they arrive; URL bodies are streamed with a cap (KB_MAX_URL_MB)
+- Extraction runs in a process pool (KB_EXTRACT_WORKERS) with a per-PDF page
+  limit (KB_MAX_PDF_PAGES) and a cap on the text kept (KB_MAX_TEXT_CHARS)
+- Re-uploading the same bytes (source_sha256) or a document whose text
+  matches an existing item (content_sha256) adds nothing
+- The endpoints return a job id at once; kb_ingest_jobs holds status and the
+  resulting item, so any worker can answer polls. Jobs run as in-process
+  tasks: ones left queued/running by a restarted worker are failed once stale
+  (KB_JOB_STALE_SECONDS), and finished jobs expire after KB_JOB_TTL_DAYS
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from models import KnowledgeBaseItem
+
+logger = logging.getLogger(__name__)
+
+KB_EXTRACT_WORKERS = int(os.environ.get("KB_EXTRACT_WORKERS", "2"))
+KB_EXTRACT_TIMEOUT = float(os.environ.get("KB_EXTRACT_TIMEOUT", "120"))
+KB_MAX_UPLOAD_MB = float(os.environ.get("KB_MAX_UPLOAD_MB", "25"))
+KB_MAX_URL_MB = float(os.environ.get("KB_MAX_URL_MB", "5"))
+KB_MAX_PDF_PAGES = int(os.environ.get("KB_MAX_PDF_PAGES", "500"))
+KB_MAX_TEXT_CHARS = int(os.environ.get("KB_MAX_TEXT_CHARS", "2000000"))
+KB_JOB_STALE_SECONDS = float(os.environ.get("KB_JOB_STALE_SECONDS", "600"))
+KB_JOB_TTL_DAYS = float(os.environ.get("KB_JOB_TTL_DAYS", "7"))
+
+SUPPORTED_EXTENSIONS = ("txt", "pdf", "docx")
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+_SCRIPT_RE = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class KbExtractionError(ValueError):
+    """The document can't be ingested (unsupported, over a limit, no text)"""
+
+
+class UploadTooLarge(KbExtractionError):
+    pass
+
+
+# ---- extraction (runs in the worker processes) ----
+
+def extract_file_text(path: str, ext: str, max_pages: int = KB_MAX_PDF_PAGES,
+                      max_chars: int = KB_MAX_TEXT_CHARS) -> str:
+    """Text of a spooled upload"""
+    if ext == "txt":
+        with open(path, "rb") as f:
+            text = f.read(max_chars * 4).decode("utf-8", errors="ignore")
+    elif ext == "pdf":
+        import PyPDF2
+        reader = PyPDF2.PdfReader(path)
+        if len(reader.pages) > max_pages:
+            raise KbExtractionError(f"PDF has {len(reader.pages)} pages (limit {max_pages})")
+        parts, length = [], 0
+        for page in reader.pages:
+            page_text = (page.extract_text() or "") + "\n"
+            parts.append(page_text)
+            length += len(page_text)
+            if length >= max_chars:
+                break
+        text = "".join(parts)
+    elif ext == "docx":
+        import docx
+        text = "\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs)
+    else:
+        raise KbExtractionError(f"Unsupported file type: {ext}")
+    return text[:max_chars]
+
+
+def html_to_text(html: str, max_chars: int = KB_MAX_TEXT_CHARS) -> str:
+    """Visible text of a page (scripts, styles and tags removed, whitespace collapsed)"""
+    html = _SCRIPT_RE.sub("", html)
+    html = _STYLE_RE.sub("", html)
+    return _SPACE_RE.sub(" ", _TAG_RE.sub(" ", html)).strip()[:max_chars]
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text with whitespace normalized (same document from a different file)"""
+    return hashlib.sha256(_SPACE_RE.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+
+# ---- I/O on the event loop (streamed, capped) ----
+
+async def spool_upload(file, max_bytes: Optional[int] = None, suffix: str = "") -> Tuple[str, int, str]:
+    """Write an UploadFile to a temp file a chunk at a time; returns (path, size, sha256)"""
+    max_bytes = int(KB_MAX_UPLOAD_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    fd, path = tempfile.mkstemp(prefix="kb_upload_", suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while chunk := await file.read(SPOOL_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds {max_bytes // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        raise
+    return path, size, digest.hexdigest()
+
+
+async def fetch_url(url: str, max_bytes: Optional[int] = None, timeout: float = 30.0) -> str:
+    """Body of a web page, streamed with a size cap"""
+    max_bytes = int(KB_MAX_URL_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > max_bytes:
+                    raise UploadTooLarge(f"Page exceeds {max_bytes // (1024 * 1024)}MB limit")
+            return body.decode(response.encoding or "utf-8", errors="ignore")
+
+
+class KbExtractor:
+    """Process pool for CPU-bound document parsing"""
+
+    def __init__(self, max_workers: int = KB_EXTRACT_WORKERS, timeout: float = KB_EXTRACT_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.stats = {"extracted": 0, "failed": 0, "timeouts": 0, "pool_restarts": 0, "total_ms": 0.0}
+
+    def _executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: never fork a process that is running an event loop and client threads
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def run(self, fn: Callable, *args):
+        """fn(*args) in a worker process"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.in_flight += 1
+        try:
+            for attempt in range(2):
+                pool = self._executor()
+                try:
+                    result = await asyncio.wait_for(loop.run_in_executor(pool, fn, *args), self.timeout)
+                except asyncio.TimeoutError:
+                    # The worker is still parsing and keeps its slot until it is killed
+                    self.stats["timeouts"] += 1
+                    self._terminate(pool)
+                    raise KbExtractionError(f"Extraction took longer than {self.timeout:.0f}s")
+                except BrokenProcessPool:
+                    if pool is not self._pool and attempt == 0:
+                        continue  # another job's timeout terminated this pool: run again on a fresh one
+                    # A worker died (e.g. OOM on a hostile file); start a fresh pool for the next job
+                    self._terminate(pool)
+                    raise KbExtractionError("Extraction worker crashed")
+                except Exception:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["extracted"] += 1
+                return result
+        finally:
+            self.in_flight -= 1
+            self.stats["total_ms"] += (time.perf_counter() - started) * 1000
+
+    def _terminate(self, pool: concurrent.futures.ProcessPoolExecutor):
+        """Kill a pool's workers (shutdown alone leaves a running parse going); the next job starts a new pool"""
+        if self._pool is pool:
+            self._pool = None
+            self.stats["pool_restarts"] += 1
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def extract_file(self, path: str, ext: str) -> str:
+        return await self.run(extract_file_text, path, ext, KB_MAX_PDF_PAGES, KB_MAX_TEXT_CHARS)
+
+    async def extract_html(self, html: str) -> str:
+        return await self.run(html_to_text, html, KB_MAX_TEXT_CHARS)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> dict:
+        return {"workers": self.max_workers, "in_flight": self.in_flight, **self.stats}
+
+
+def item_summary(item: Dict, duplicate: bool = False) -> Dict:
+    """What the KB endpoints used to return for a new item"""
+    return {
+        "id": item.get("id"),
+        "agent_id": item.get("agent_id"),
+        "source_type": item.get("source_type"),
+        "source_name": item.get("source_name"),
+        "content_length": len(item.get("content", "")),
+        "file_size": item.get("file_size", 0),
+        "created_at": item.get("created_at"),
+        "duplicate": duplicate,
+    }
+
+
+Reindex = Callable[[str, str], Awaitable[None]]
+
+
+class KbIngestJobs:
+    """Background KB ingestion tracked in kb_ingest_jobs"""
+
+    def __init__(self, extractor: Optional[KbExtractor] = None):
+        self.extractor = extractor or KbExtractor()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {"jobs": 0, "duplicates": 0}
+
+    async def ensure_indexes(self, db):
+        await db.knowledge_base.create_index([("agent_id", 1), ("source_sha256", 1)], name="agent_source_sha256")
+        await db.knowledge_base.create_index([("agent_id", 1), ("content_sha256", 1)], name="agent_content_sha256")
+        await db.kb_ingest_jobs.create_index("job_id", unique=True, name="job_id_unique")
+        await db.kb_ingest_jobs.create_index(
+            "finished_at", expireAfterSeconds=int(KB_JOB_TTL_DAYS * 86400), name="finished_at_ttl"
+        )
+
+    async def fail_stale_jobs(self, db) -> int:
+        """
+        Fail queued/running jobs nobody has touched for KB_JOB_STALE_SECONDS (their
+        worker restarted mid-job), so polls stop waiting on them. Startup.
+        """
+        now = datetime.utcnow()
+        result = await db.kb_ingest_jobs.update_many(
+            {"status": {"$in": ["queued", "running"]},
+             "updated_at": {"$lt": now - timedelta(seconds=KB_JOB_STALE_SECONDS)}},
+            {"$set": {"status": "failed", "error": "Interrupted by a server restart - please try again",
+                      "updated_at": now, "finished_at": now}}
+        )
+        if result.modified_count:
+            logger.warning(f"⚠️ Marked {result.modified_count} interrupted KB ingest jobs as failed")
+        return result.modified_count
+
+    async def _create(self, db, user_id: str, agent_id: str, source_type: str, source_name: str,
+                      status: str = "queued", result: Optional[Dict] = None) -> Dict:
+        now = datetime.utcnow()
+        job = {
+            "job_id": f"kb_{uuid.uuid4().hex[:12]}",
+            "user_id": user_id,
+            "agent_id": agent_id,
+            "source_type": source_type,
+            "source_name": source_name,
+            "status": status,
+            "result": result,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await db.kb_ingest_jobs.insert_one(dict(job))
+        self.stats["jobs"] += 1
+        return job
+
+    def _spawn(self, job_id: str, coro):
+        task = asyncio.create_task(coro)
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def start_file(self, db, user_id: str, agent_id: str, path: str, filename: str, size: int,
+                         source_sha256: str, reindex: Optional[Reindex] = None) -> Dict:
+        """Queue extraction of a spooled upload (the job owns and deletes path)"""
+        existing = await db.knowledge_base.find_one(
+            {"agent_id": agent_id, "user_id": user_id, "source_sha256": source_sha256}, {"_id": 0}
+        )
+        if existing:
+            os.unlink(path)
+            self.stats["duplicates"] += 1
+            return await self._create(db, user_id, agent_id, "file", filename, "completed",
+                                      item_summary(existing, duplicate=True))
+        job = await self._create(db, user_id, agent_id, "file", filename)
+        ext = filename.lower().rsplit(".", 1)[-1]
+
+        async def work() -> Dict:
+            try:
+                content = await self.extractor.extract_file(path, ext)
+            finally:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            return await self._store(db, user_id, agent_id, "file", filename, content, size, source_sha256)
+
+        self._spawn(job["job_id"], self._run(db, job["job_id"], user_id, work, reindex))
+        logger.info(f"📚 KB ingest job {job['job_id']} queued for {filename} ({size} bytes)")
+        return job
+
+    async def start_url(self, db, user_id: str, agent_id: str, url: str,
+                        reindex: Optional[Reindex] = None) -> Dict:
+        """Queue fetching and extracting a web page"""
+        job = await self._create(db, user_id, agent_id, "url", url)
+
+        async def work() -> Dict:
+            html = await fetch_url(url)
+            content = await self.extractor.extract_html(html)
+            return await self._store(db, user_id, agent_id, "url", url, content, len(content.encode("utf-8")))
+
+        self._spawn(job["job_id"], self._run(db, job["job_id"], user_id, work, reindex))
+        logger.info(f"🌐 KB ingest job {job['job_id']} queued for {url}")
+        return job
+
+    async def _store(self, db, user_id: str, agent_id: str, source_type: str, source_name: str,
+                     content: str, file_size: int, source_sha256: Optional[str] = None) -> Dict:
+        if not content.strip():
+            raise KbExtractionError(f"No text content extracted from {source_type}")
+        digest = content_hash(content)
+        existing = await db.knowledge_base.find_one(
+            {"agent_id": agent_id, "user_id": user_id, "content_sha256": digest}, {"_id": 0}
+        )
+        if existing:
+            self.stats["duplicates"] += 1
+            return item_summary(existing, duplicate=True)
+        item = KnowledgeBaseItem(
+            user_id=user_id,
+            agent_id=agent_id,
+            source_type=source_type,
+            source_name=source_name,
+            content=content,
+            file_size=file_size,
+            source_sha256=source_sha256,
+            content_sha256=digest,
+        ).dict()
+        await db.knowledge_base.insert_one(dict(item))
+        logger.info(f"📚 KB {source_type} added for agent {agent_id}: {source_name} ({len(content)} chars)")
+        return item_summary(item)
+
+    async def _run(self, db, job_id: str, user_id: str, work: Callable[[], Awaitable[Dict]],
+                   reindex: Optional[Reindex]):
+        async def update(fields: Dict):
+            fields["updated_at"] = datetime.utcnow()
+            await db.kb_ingest_jobs.update_one({"job_id": job_id}, {"$set": fields})
+
+        try:
+            await update({"status": "running"})
+            result = await work()
+            if reindex and not result["duplicate"]:
+                try:
+                    await reindex(result["agent_id"], user_id)
+                except Exception as e:
+                    logger.error(f"❌ RAG indexing error: {e}")
+            await update({"status": "completed", "result": result, "finished_at": datetime.utcnow()})
+        except (KbExtractionError, httpx.HTTPError) as e:
+            logger.warning(f"⚠️ KB ingest job {job_id} rejected: {e}")
+            await update({"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+        except Exception as e:
+            logger.error(f"❌ KB ingest job {job_id} failed: {e}")
+            await update({"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+
+    async def get(self, db, user_id: str, job_id: str) -> Optional[Dict]:
+        return await db.kb_ingest_jobs.find_one({"job_id": job_id, "user_id": user_id}, {"_id": 0})
+
+    def get_stats(self) -> dict:
+        return {"running": len(self._tasks), **self.stats, "extractor": self.extractor.get_stats()}
+
+
+# Global KB ingestion job manager instance
+kb_ingest_jobs = KbIngestJobs()
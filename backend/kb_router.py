@@ -2,7 +2,6 @@
 Smart KB Router - Determines when to use knowledge base retrieval
 Fast pattern matching to avoid unnecessary RAG calls
 """
-import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,30 +44,22 @@ def needs_knowledge_base(user_message: str, conversation_context: list = None) -
     if not user_message or len(user_message.strip()) < 2:
         return (False, "empty_message")
     
-    message_lower = user_message.lower().strip()
+    # Both pattern lists are compiled once in the shared utterance analyzer;
+    # the feature record is cached so other per-turn consumers reuse this scan
+    from utterance_analyzer import utterance_analyzer
+    features = utterance_analyzer.analyze(user_message)
+    reason = features.kb_reason
     
-    # Check simple chat patterns first (most common, fastest to check)
-    for pattern in SIMPLE_CHAT_PATTERNS:
-        if re.search(pattern, message_lower, re.IGNORECASE):
-            logger.info(f"🚦 KB Router: SKIP (simple chat pattern matched)")
-            return (False, "simple_chat")
+    if reason == "simple_chat":
+        logger.info(f"🚦 KB Router: SKIP (simple chat pattern matched)")
+    elif reason == "factual_question":
+        logger.info(f"🚦 KB Router: USE KB (factual question pattern matched)")
+    elif reason == "short_message":
+        logger.info(f"🚦 KB Router: SKIP (short message: {features.word_count} words)")
+    else:
+        logger.info(f"🚦 KB Router: USE KB (default for medium/long message)")
     
-    # Check factual question patterns
-    for pattern in FACTUAL_QUESTION_PATTERNS:
-        if re.search(pattern, message_lower, re.IGNORECASE):
-            logger.info(f"🚦 KB Router: USE KB (factual question pattern matched)")
-            return (True, "factual_question")
-    
-    # Default: Check message length and complexity
-    # Short messages (<10 words) are likely simple responses
-    word_count = len(message_lower.split())
-    if word_count < 10:
-        logger.info(f"🚦 KB Router: SKIP (short message: {word_count} words)")
-        return (False, "short_message")
-    
-    # Medium/long messages without clear patterns - use KB to be safe
-    logger.info(f"🚦 KB Router: USE KB (default for medium/long message)")
-    return (True, "default_long")
+    return (features.kb_needed, reason)
 
 
 def get_perceptual_filler(query_type: str = "general") -> str:
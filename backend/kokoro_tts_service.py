@@ -1,4 +1,5 @@
 import httpx
+from http_client_registry import http_client_registry
 import logging
 import os
 
@@ -33,7 +34,7 @@ class KokoroTTSService:
             
             logger.info(f"🎤 Kokoro TTS: voice={voice}, speed={speed}, text_len={len(text)}")
             
-            async with httpx.AsyncClient(timeout=45.0) as client:
+            async with http_client_registry.session(timeout=45.0) as client:
                 response = await client.post(
                     self.tts_endpoint,
                     json=request_body,
@@ -57,7 +58,7 @@ class KokoroTTSService:
     async def health_check(self) -> dict:
         """Check if Kokoro TTS API is healthy"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with http_client_registry.session(timeout=5.0) as client:
                 response = await client.get(f"{self.api_url}/health")
                 response.raise_for_status()
                 return response.json()
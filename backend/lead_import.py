@@ -0,0 +1,393 @@
+"""
+Bulk Lead Import Pipeline
+Replaces the per-lead find_one + insert_one loop behind /api/crm/leads/import
+and /api/crm/leads/import-csv.
+
+- CSV is parsed incrementally from a spooled file, a chunk at a time, in a thread
+- Phones are normalized to E.164 so imports, manual leads and call numbers
+  (Telnyx sends E.164) all land on the same key
+- Each chunk is one unordered bulk_write of upserts against a unique
+  (user_id, phone) index: duplicates are resolved by the index, not by a
+  lookup per row
+- Large imports run as a background job (lead_import_jobs) with progress and a
+  per-row error report
+- backfill_lead_phones normalizes phones stored before imports used E.164 and
+  merges leads that turn out to be the same number (once, recorded in
+  `migrations`)
+"""
+import asyncio
+import csv
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+import data_migrations
+from crm_models import Lead, LeadImportItem, LeadSource
+
+logger = logging.getLogger(__name__)
+
+CRM_IMPORT_CHUNK_SIZE = int(os.environ.get("CRM_IMPORT_CHUNK_SIZE", "1000"))
+CRM_DEFAULT_COUNTRY_CODE = os.environ.get("CRM_DEFAULT_COUNTRY_CODE", "1")
+
+# Per-row errors kept on the job document (counts are always exact)
+MAX_REPORTED_ERRORS = 1000
+
+DUPLICATE_KEY = 11000
+
+# Fields an import may overwrite on an existing lead (skip_duplicates=False)
+IMPORT_FIELDS = ("name", "email", "source", "tags", "notes", "custom_fields")
+
+_NON_DIGITS = re.compile(r"\D")
+_E164 = re.compile(r"^\+\d{8,15}$")
+
+LEAD_PHONE_MIGRATION = "leads_phone_e164"
+
+# Collections that point at a lead by id (repointed when duplicates are merged)
+LEAD_REFERENCES = ("appointments", "call_analytics")
+
+# Never copied between merged leads
+_MERGE_SKIP = ("_id", "id", "user_id", "phone", "created_at", "updated_at")
+
+
+def normalize_phone(raw: Optional[str], default_country_code: str = CRM_DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """E.164 form of a phone number, or None if it can't be one"""
+    if not raw:
+        return None
+    raw = raw.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.startswith("+"):
+        pass
+    elif raw.startswith("00"):
+        digits = digits[2:]
+    elif default_country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+        pass
+    elif len(digits) == 10:
+        digits = default_country_code + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def normalize_phones(raw_phones: Iterable[Optional[str]]) -> List[Optional[str]]:
+    return [normalize_phone(p) for p in raw_phones]
+
+
+def csv_row_to_item(row: Dict[str, str]) -> LeadImportItem:
+    """Same column mapping the CSV endpoint always used"""
+    return LeadImportItem(
+        name=row.get('name', '') or '',
+        email=row.get('email') or None,
+        phone=row.get('phone', '') or '',
+        source=row.get('source') or LeadSource.IMPORT,
+        tags=[t.strip() for t in row['tags'].split(',') if t.strip()] if row.get('tags') else [],
+        notes=row.get('notes') or None
+    )
+
+
+def iter_csv_chunks(path: str, chunk_size: Optional[int] = None) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """(row_number, row) chunks; row 1 is the header, so data starts at 2"""
+    chunk_size = chunk_size or CRM_IMPORT_CHUNK_SIZE
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.DictReader(f)
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class ImportReport:
+    """Counters and capped per-row errors for one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.updated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def error(self, row: int, phone: Optional[str], message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "phone": phone, "error": message})
+
+    def progress(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+    def summary(self) -> Dict:
+        return {**self.progress(), "errors": self.errors}
+
+
+def build_operations(
+    user_id: str,
+    items: List[Tuple[int, LeadImportItem]],
+    skip_duplicates: bool,
+    report: ImportReport,
+    seen: set,
+) -> Tuple[List[UpdateOne], List[Tuple[int, str]]]:
+    """Upsert per unique phone; returns ops and the (row, phone) each op came from"""
+    phones = normalize_phones(item.phone for _, item in items)
+    now = datetime.utcnow()
+    ops, origins = [], []
+    for (row, item), phone in zip(items, phones):
+        if phone is None:
+            report.error(row, item.phone, "invalid phone number")
+            continue
+        if phone in seen:
+            report.skipped += 1  # repeated within this file
+            continue
+        seen.add(phone)
+
+        lead = Lead(user_id=user_id, **{**item.dict(), "phone": phone}).dict()
+        lead["created_at"] = lead["updated_at"] = now
+        if skip_duplicates:
+            update = {"$setOnInsert": lead}
+        else:
+            changes = {field: lead.pop(field) for field in IMPORT_FIELDS}
+            changes["updated_at"] = lead.pop("updated_at")
+            update = {"$set": changes, "$setOnInsert": lead}
+        ops.append(UpdateOne({"user_id": user_id, "phone": phone}, update, upsert=True))
+        origins.append((row, phone))
+    return ops, origins
+
+
+async def write_chunk(collection, ops: List[UpdateOne], origins: List[Tuple[int, str]],
+                      skip_duplicates: bool, report: ImportReport):
+    if not ops:
+        return
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for err in details.get("writeErrors", []):
+            row, phone = origins[err["index"]]
+            if err.get("code") == DUPLICATE_KEY:
+                report.skipped += 1  # a concurrent writer inserted it first
+            else:
+                report.error(row, phone, err.get("errmsg", "write failed"))
+
+    upserted = details.get("nUpserted", 0)
+    matched = details.get("nMatched", 0)
+    report.imported += upserted
+    if skip_duplicates:
+        report.skipped += matched
+    else:
+        report.updated += matched
+
+
+def parse_chunk(user_id: str, rows: List[Tuple[int, Dict[str, str]]], skip_duplicates: bool,
+                report: ImportReport, seen: set):
+    """CSV rows → validated items → bulk ops (runs in a worker thread)"""
+    items = []
+    for row_number, row in rows:
+        try:
+            items.append((row_number, csv_row_to_item(row)))
+        except ValidationError as e:
+            report.error(row_number, row.get("phone"), "; ".join(err["msg"] for err in e.errors()))
+    report.rows += len(rows)
+    return build_operations(user_id, items, skip_duplicates, report, seen)
+
+
+async def import_items(db, user_id: str, items: List[LeadImportItem], skip_duplicates: bool = True) -> ImportReport:
+    """Bulk import already-parsed leads (the JSON endpoint)"""
+    report, seen = ImportReport(), set()
+    for start in range(0, len(items), CRM_IMPORT_CHUNK_SIZE):
+        chunk = [(i + 1, item) for i, item in enumerate(items[start:start + CRM_IMPORT_CHUNK_SIZE], start)]
+        report.rows += len(chunk)
+        ops, origins = build_operations(user_id, chunk, skip_duplicates, report, seen)
+        await write_chunk(db.leads, ops, origins, skip_duplicates, report)
+    return report
+
+
+async def import_csv_file(db, user_id: str, path: str, skip_duplicates: bool = True,
+                          on_progress=None) -> ImportReport:
+    """Stream a CSV from disk into leads; on_progress(report) is awaited after every chunk"""
+    report, seen = ImportReport(), set()
+    chunks = iter_csv_chunks(path)
+    while True:
+        rows = await asyncio.to_thread(next, chunks, None)
+        if rows is None:
+            break
+        ops, origins = await asyncio.to_thread(parse_chunk, user_id, rows, skip_duplicates, report, seen)
+        await write_chunk(db.leads, ops, origins, skip_duplicates, report)
+        if on_progress:
+            await on_progress(report)
+    return report
+
+
+async def ensure_lead_indexes(db):
+    """Unique (user_id, phone); falls back to a plain index while old duplicates remain"""
+    try:
+        await db.leads.create_index([("user_id", 1), ("phone", 1)], unique=True, name="user_phone_unique")
+    except OperationFailure as e:
+        logger.warning(f"⚠️ leads has duplicate (user_id, phone) pairs, unique index not created: {e}")
+        await db.leads.create_index([("user_id", 1), ("phone", 1)], name="user_phone")
+
+
+def merge_leads(survivor: Dict, duplicates: List[Dict]) -> Dict:
+    """Fields to $set on the kept lead: empty fields filled from its duplicates, tags and custom fields combined"""
+    changes: Dict = {}
+    for duplicate in duplicates:
+        for key, value in duplicate.items():
+            if key in _MERGE_SKIP:
+                continue
+            current = changes.get(key, survivor.get(key))
+            if key == "tags":
+                merged = list(dict.fromkeys((current or []) + (value or [])))
+            elif key == "custom_fields":
+                merged = {**(value or {}), **(current or {})}
+            elif current in (None, "", [], {}) and value not in (None, "", [], {}):
+                merged = value
+            else:
+                continue
+            if merged != survivor.get(key):
+                changes[key] = merged
+    return changes
+
+
+async def _merge_duplicates(db, phone: str, lead_ids: List[str]) -> int:
+    """Keep one lead for the number (the one already in E.164, else the oldest); returns leads removed"""
+    leads = [lead async for lead in db.leads.find({"id": {"$in": lead_ids}}, {"_id": 0})]
+    if not leads:
+        return 0
+    leads.sort(key=lambda lead: (lead.get("phone") != phone, str(lead.get("created_at") or "~")))
+    survivor, duplicates = leads[0], leads[1:]
+    changes = merge_leads(survivor, duplicates)
+    changes["phone"] = phone
+    duplicate_ids = [lead["id"] for lead in duplicates]
+    if duplicate_ids:
+        # Removed first: the kept lead takes their (user_id, phone) under the unique index
+        await db.leads.delete_many({"id": {"$in": duplicate_ids}})
+        for collection in LEAD_REFERENCES:
+            await db[collection].update_many({"lead_id": {"$in": duplicate_ids}}, {"$set": {"lead_id": survivor["id"]}})
+    await db.leads.update_one({"id": survivor["id"]}, {"$set": changes})
+    return len(duplicate_ids)
+
+
+async def backfill_lead_phones(db, batch_size: Optional[int] = None) -> Optional[Dict]:
+    """
+    Normalize phones on leads stored before E.164 and merge the duplicates it
+    uncovers, so re-imports match them on the (user_id, phone) upsert key.
+    Runs once; later starts return None right away.
+    """
+    if await data_migrations.is_done(db, LEAD_PHONE_MIGRATION):
+        return None
+    batch_size = batch_size or CRM_IMPORT_CHUNK_SIZE
+    started = datetime.utcnow()
+    stats = {"normalized": 0, "merged": 0, "invalid": 0}
+
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    async for lead in db.leads.find({"phone": {"$not": _E164}}, {"_id": 0, "id": 1, "user_id": 1, "phone": 1}):
+        phone = normalize_phone(lead.get("phone"))
+        if phone is None:
+            stats["invalid"] += 1   # left as is: can't collide with an E.164 key
+            continue
+        groups.setdefault((lead["user_id"], phone), []).append(lead["id"])
+
+    ops: List[UpdateOne] = []
+    for (user_id, phone), lead_ids in groups.items():
+        existing = await db.leads.find_one({"user_id": user_id, "phone": phone}, {"_id": 0, "id": 1})
+        if existing is None and len(lead_ids) == 1:
+            ops.append(UpdateOne({"id": lead_ids[0]}, {"$set": {"phone": phone}}))
+            stats["normalized"] += 1
+            if len(ops) >= batch_size:
+                await db.leads.bulk_write(ops, ordered=False)
+                ops = []
+            continue
+        ids = ([existing["id"]] if existing else []) + lead_ids
+        stats["merged"] += await _merge_duplicates(db, phone, ids)
+        stats["normalized"] += len(lead_ids)
+    if ops:
+        await db.leads.bulk_write(ops, ordered=False)
+
+    if stats["merged"]:
+        # Old duplicates may have forced the plain index; they're gone now
+        try:
+            await db.leads.drop_index("user_phone")
+        except OperationFailure:
+            pass
+        await ensure_lead_indexes(db)
+    await data_migrations.mark_done(db, LEAD_PHONE_MIGRATION, **stats)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    logger.info(f"📇 Lead phone backfill: {stats} in {elapsed:.1f}s")
+    return stats
+
+
+class LeadImportJobs:
+    """Background CSV imports tracked in lead_import_jobs"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self, db, user_id: str, path: str, filename: str, skip_duplicates: bool = True) -> Dict:
+        now = datetime.utcnow()
+        job = {
+            "job_id": f"imp_{uuid.uuid4().hex[:12]}",
+            "user_id": user_id,
+            "filename": filename,
+            "status": "running",
+            "progress": ImportReport().progress(),
+            "errors": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        await db.lead_import_jobs.insert_one(dict(job))
+        task = asyncio.create_task(self._run(db, job["job_id"], user_id, path, skip_duplicates))
+        self._tasks[job["job_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["job_id"], None))
+        logger.info(f"📥 Lead import job {job['job_id']} started for {filename}")
+        return job
+
+    async def _run(self, db, job_id: str, user_id: str, path: str, skip_duplicates: bool):
+        async def update(fields: Dict):
+            fields["updated_at"] = datetime.utcnow()
+            await db.lead_import_jobs.update_one({"job_id": job_id}, {"$set": fields})
+
+        async def on_progress(report: ImportReport):
+            await update({"progress": report.progress()})
+
+        started = datetime.utcnow()
+        try:
+            report = await import_csv_file(db, user_id, path, skip_duplicates, on_progress)
+            await update({
+                "status": "completed",
+                "progress": report.progress(),
+                "errors": report.errors,
+                "finished_at": datetime.utcnow(),
+            })
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            logger.info(f"✅ Lead import job {job_id}: {report.progress()} in {elapsed:.1f}s")
+        except Exception as e:
+            logger.error(f"❌ Lead import job {job_id} failed: {e}")
+            await update({"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    async def get(self, db, user_id: str, job_id: str) -> Optional[Dict]:
+        job = await db.lead_import_jobs.find_one({"job_id": job_id, "user_id": user_id}, {"_id": 0})
+        return job
+
+
+# Global lead import job manager instance
+lead_import_jobs = LeadImportJobs()
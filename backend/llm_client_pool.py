@@ -0,0 +1,142 @@
+"""
+Per-Tenant LLM Client Pool
+One openai.AsyncOpenAI client per (provider, api key, base_url), shared by every
+call of the same tenant, instead of a client per call - or one global client that
+silently keeps the first tenant's key.
+
+- Keyed on a hash of the API key (raw keys are never used as dict keys or logged)
+- LRU-bounded so rotated / departed tenants' clients are evicted
+- Every client rides the shared per-host transports from http_client_registry,
+  so all tenants reuse the same warm HTTP/2 connections
+- prewarm() builds the client and opens the upstream connection at call setup
+"""
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import openai
+
+from http_client_registry import http_client_registry, origin_of, KEEPALIVE_EXPIRY
+
+logger = logging.getLogger(__name__)
+
+# OpenAI-compatible base URLs per provider (None = SDK default)
+PROVIDER_BASE_URLS: Dict[str, Optional[str]] = {
+    "openai": None,
+    "grok": "https://api.x.ai/v1",
+    "gemini": "https://generativelanguage.googleapis.com/v1beta/openai/",
+    "groq": "https://api.groq.com/openai/v1",
+}
+
+OPENAI_DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Max pooled clients per worker
+LLM_CLIENT_POOL_SIZE = int(os.environ.get("LLM_CLIENT_POOL_SIZE", "256"))
+
+
+def hash_api_key(api_key: str) -> str:
+    """Short stable fingerprint of an API key"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class LLMClientPool:
+    """
+    LRU pool of AsyncOpenAI clients keyed on (provider, key hash, base_url)
+    """
+
+    def __init__(self, max_size: int = LLM_CLIENT_POOL_SIZE):
+        self.max_size = max_size
+        self.clients: "OrderedDict[Tuple[str, str, str], openai.AsyncOpenAI]" = OrderedDict()
+        self._warmed_at: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prewarms = 0
+
+    @staticmethod
+    def base_url_for(provider: str, base_url: Optional[str] = None) -> str:
+        return base_url or PROVIDER_BASE_URLS.get(provider) or OPENAI_DEFAULT_BASE_URL
+
+    def get_client(self, provider: str, api_key: str, base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+        """
+        Get (or create) the pooled client for this tenant key
+
+        Args:
+            provider: "openai", "grok", "gemini", ...
+            api_key: Tenant API key
+            base_url: Override the provider's default base URL
+        """
+        if not api_key:
+            raise ValueError(f"API key required for {provider} client")
+
+        resolved_url = self.base_url_for(provider, base_url)
+        key = (provider, hash_api_key(api_key), resolved_url)
+
+        client = self.clients.get(key)
+        if client is not None:
+            self.clients.move_to_end(key)
+            self.hits += 1
+            return client
+
+        self.misses += 1
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=resolved_url,
+            http_client=http_client_registry.get_client(resolved_url)
+        )
+        self.clients[key] = client
+        logger.info(f"🚀 Pooled {provider} client created (key={key[1][:8]}…, pool={len(self.clients)})")
+
+        while len(self.clients) > self.max_size:
+            # The HTTP transport is shared - evicting a client must not close it
+            self.clients.popitem(last=False)
+            self.evictions += 1
+        return client
+
+    async def prewarm(self, provider: str, api_key: str, base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+        """
+        Build the tenant's client and make sure a warm connection to the upstream
+        exists, so the first turn skips DNS + TCP + TLS.
+        The connection is shared per origin, so we only probe when it may have idled out.
+        """
+        client = self.get_client(provider, api_key, base_url)
+        resolved_url = self.base_url_for(provider, base_url)
+        origin = origin_of(resolved_url)
+
+        last_warm = self._warmed_at.get(origin, 0.0)
+        if time.time() - last_warm < KEEPALIVE_EXPIRY:
+            return client
+
+        self._warmed_at[origin] = time.time()
+        try:
+            # Cheap authenticated GET; the status doesn't matter, only the open connection
+            await http_client_registry.request(
+                "GET",
+                resolved_url.rstrip("/") + "/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=5.0
+            )
+            self.prewarms += 1
+        except Exception as e:
+            self._warmed_at.pop(origin, None)
+            logger.warning(f"⚠️ LLM connection pre-warm failed for {origin}: {e}")
+        return client
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "clients": len(self.clients),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "prewarms": self.prewarms,
+        }
+
+
+# Global pool instance
+llm_client_pool = LLMClientPool()
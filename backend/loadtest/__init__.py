@@ -0,0 +1,20 @@
+"""
+Load Test Harness
+Drives the real Soniox call path (handle_soniox_streaming + CallSession +
+PersistentTTSSession) with N concurrent synthetic calls against local fakes of
+every upstream, so latency regressions show up before production does.
+
+- fake_telnyx: in-process stand-in for the Telnyx media WebSocket; streams
+  caller audio at real-time pace and records the agent's outbound frames
+- fake_soniox: Soniox real-time WebSocket that endpoints on silence and emits
+  scripted final tokens followed by <end>
+- fake_elevenlabs: ElevenLabs stream-input / multi-stream-input WebSocket that
+  returns mulaw audio after a configurable delay
+- fake_llm: OpenAI-compatible streaming chat completions server
+
+Upstream fakes run in a child process so they don't share the event loop (or
+the CPU accounting) of the code under test.
+
+Run: cd backend && python -m loadtest --calls 20 --turns 4
+Requires a throwaway MongoDB (MONGO_URL, DB_NAME defaults to virevo_loadtest).
+"""
@@ -0,0 +1,68 @@
+"""
+Mulaw helpers shared by the fakes: caller speech, silence and a voice detector
+"""
+import audioop
+import math
+import wave
+from typing import Optional
+
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000  # 160 bytes of 8kHz mulaw
+
+MULAW_SILENCE = b"\xff"
+
+# RMS (16-bit PCM) above which a frame counts as speech
+VOICE_RMS_THRESHOLD = 500
+
+
+def silence(duration_ms: int) -> bytes:
+    return MULAW_SILENCE * (SAMPLE_RATE * duration_ms // 1000)
+
+
+def synth_speech(duration_ms: int, pitch_hz: float = 160.0) -> bytes:
+    """
+    Speech-like mulaw: a voiced tone with a ~4Hz syllable envelope.
+    Good enough for energy-based endpointing; not meant to be transcribed.
+    """
+    samples = SAMPLE_RATE * duration_ms // 1000
+    pcm = bytearray()
+    for n in range(samples):
+        t = n / SAMPLE_RATE
+        envelope = 0.35 + 0.65 * abs(math.sin(math.pi * 4 * t))
+        value = int(9000 * envelope * (math.sin(2 * math.pi * pitch_hz * t) + 0.3 * math.sin(2 * math.pi * 3 * pitch_hz * t)))
+        pcm += max(-32768, min(32767, value)).to_bytes(2, "little", signed=True)
+    return audioop.lin2ulaw(bytes(pcm), 2)
+
+
+def load_recording(path: str) -> bytes:
+    """
+    Load caller audio: a WAV file (any rate/width, mono or stereo) or raw 8kHz mulaw (.ulaw/.raw)
+    """
+    if not path.lower().endswith(".wav"):
+        with open(path, "rb") as f:
+            return f.read()
+
+    with wave.open(path, "rb") as wav:
+        width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+    if channels == 2:
+        pcm = audioop.tomono(pcm, width, 0.5, 0.5)
+    if width != 2:
+        pcm = audioop.lin2lin(pcm, width, 2)
+    if rate != SAMPLE_RATE:
+        pcm, _ = audioop.ratecv(pcm, 2, 1, rate, SAMPLE_RATE, None)
+    return audioop.lin2ulaw(pcm, 2)
+
+
+def frames(mulaw: bytes):
+    """Split mulaw audio into 20ms frames (last frame padded with silence)"""
+    for i in range(0, len(mulaw), FRAME_BYTES):
+        chunk = mulaw[i:i + FRAME_BYTES]
+        yield chunk + MULAW_SILENCE * (FRAME_BYTES - len(chunk))
+
+
+def is_voiced(mulaw: bytes, threshold: Optional[int] = None) -> bool:
+    if not mulaw:
+        return False
+    return audioop.rms(audioop.ulaw2lin(mulaw, 2), 2) >= (threshold or VOICE_RMS_THRESHOLD)
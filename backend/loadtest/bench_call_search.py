@@ -0,0 +1,102 @@
+"""
+Call search benchmark: phone / call-id filters over N synthetic call logs in a local mongod
+
+Seeds --rows call logs for one tenant (the bench_pagination shape, plus
+search_terms), then times the filters /call-analytics and /call-history run
+for a few typed values (last 4 digits, a full number, a call-id prefix):
+
+- legacy:   unanchored case-insensitive $regex on call_id / from_number
+- anchored: call_search.apply_search_filters on the indexed search_terms
+
+and prints latency, documents examined and matches for each (a first page of
+50 by start_time, and the count /call-analytics takes).
+
+Run: cd backend && python -m loadtest.bench_call_search --rows 1000000
+Requires a throwaway MongoDB (MONGO_URL, DB_NAME defaults to virevo_bench).
+Seeding 1M rows takes a few minutes; --keep reuses them on the next run.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from call_search import apply_search_filters, ensure_search_indexes, with_search_terms
+from loadtest.bench_pagination import SEED_BATCH, USER_ID, make_call
+from pagination import ensure_pagination_indexes
+
+PAGE = 50
+
+
+async def seed(db, rows: int):
+    existing = await db.call_logs.count_documents({"user_id": USER_ID, "search_terms": {"$exists": True}})
+    if existing >= rows:
+        print(f"♻️  Reusing {existing} seeded call logs")
+        return
+    await db.call_logs.delete_many({"user_id": USER_ID})
+    rng = random.Random(7)
+    start = datetime.utcnow() - timedelta(seconds=rows * 3)
+    started = time.perf_counter()
+    for offset in range(0, rows, SEED_BATCH):
+        batch = [with_search_terms(make_call(i, start, rng)) for i in range(offset, min(offset + SEED_BATCH, rows))]
+        await db.call_logs.insert_many(batch, ordered=False)
+        if offset and offset % 100_000 == 0:
+            print(f"  seeded {offset}...")
+    print(f"🌱 Seeded {rows} call logs in {time.perf_counter() - started:.0f}s")
+
+
+async def timed(db, query: dict):
+    """(first-page ms, count ms, docs examined, matches)"""
+    started = time.perf_counter()
+    await db.call_logs.find(query, {"_id": 0, "id": 1}).sort("start_time", -1).limit(PAGE).to_list(PAGE)
+    page_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    matched = await db.call_logs.count_documents(query)
+    count_ms = (time.perf_counter() - started) * 1000
+    plan = await db.command("explain", {"count": "call_logs", "query": query}, verbosity="executionStats")
+    examined = plan["executionStats"]["totalDocsExamined"]
+    return page_ms, count_ms, examined, matched
+
+
+async def run(args):
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "virevo_bench")]
+    try:
+        await ensure_pagination_indexes(db)
+        await ensure_search_indexes(db)
+        await seed(db, args.rows)
+        sample = await db.call_logs.find({"user_id": USER_ID}, {"call_id": 1, "from_number": 1}).skip(
+            args.rows // 2).limit(1).to_list(1)
+        number, call_id = sample[0]["from_number"], sample[0]["call_id"]
+        cases = [("from_number", number[-4:]), ("from_number", number), ("call_id", call_id[:12])]
+
+        print(f"\n{'filter':>26} | {'legacy page/count ms':>20} {'examined':>9} | "
+              f"{'anchored page/count ms':>22} {'examined':>9} | matches")
+        for field, value in cases:
+            legacy_query = {"user_id": USER_ID, field: {"$regex": value.replace("+", r"\+"), "$options": "i"}}
+            anchored_query = apply_search_filters({"user_id": USER_ID}, **{field: value})
+            l_page, l_count, l_examined, l_matched = await timed(db, legacy_query)
+            a_page, a_count, a_examined, a_matched = await timed(db, anchored_query)
+            label = f"{field}={value}"
+            print(f"{label:>26} | {l_page:>9.1f} / {l_count:>8.1f} {l_examined:>9} | "
+                  f"{a_page:>10.1f} / {a_count:>9.1f} {a_examined:>9} | {l_matched} → {a_matched}")
+    finally:
+        if not args.keep:
+            await db.call_logs.delete_many({"user_id": USER_ID})
+        client.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_call_search")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded rows for the next run")
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+KB extraction benchmark: event-loop lag while a large PDF is ingested
+
+Builds a --pages page text PDF and ingests it --uploads times while a 20ms
+ticker (the pace of a call's audio frames) samples event-loop lag:
+
+- before: what upload_kb_file did - the whole upload read into memory, then
+          PyPDF2 page extraction inline on the event loop
+- after:  kb_extraction - spooled to disk, extracted in the process pool
+          (the endpoint answers with a job id once the spool is written)
+
+Only extraction is measured; the knowledge_base insert is the same on both paths.
+
+Run: cd backend && python -m loadtest.bench_kb_extraction --pages 200
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+
+from starlette.datastructures import UploadFile
+
+from kb_extraction import KbExtractor, spool_upload
+from loadtest.documents import make_pdf
+from loadtest.metrics import LoopLagMonitor, summarize
+
+
+async def legacy(data: bytes) -> tuple:
+    """(ms until the endpoint could respond, extracted chars)"""
+    import PyPDF2
+    started = time.perf_counter()
+    file_content = await UploadFile(io.BytesIO(data), filename="big.pdf").read()
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    content = ""
+    for page in pdf_reader.pages:
+        content += page.extract_text() + "\n"
+    return (time.perf_counter() - started) * 1000, len(content)
+
+
+async def worker(extractor: KbExtractor, data: bytes) -> tuple:
+    started = time.perf_counter()
+    path, _, _ = await spool_upload(UploadFile(io.BytesIO(data), filename="big.pdf"), suffix=".pdf")
+    respond_ms = (time.perf_counter() - started) * 1000
+    content = await extractor.extract_file(path, "pdf")
+    return respond_ms, len(content)
+
+
+async def run(args) -> int:
+    data = make_pdf(args.pages)
+    print(f"{args.pages}-page PDF, {len(data) / 1024 / 1024:.1f}MB, {args.uploads} uploads per path")
+    extractor = KbExtractor(max_workers=args.workers)
+    await extractor.run(len, b"warm")  # start the pool outside the measured window
+    try:
+        for name in ("before", "after"):
+            lag = LoopLagMonitor(interval_ms=20)
+            lag.start()
+            started = time.perf_counter()
+            if name == "before":
+                results = [await legacy(data) for _ in range(args.uploads)]
+            else:
+                results = await asyncio.gather(*(worker(extractor, data) for _ in range(args.uploads)))
+            wall = time.perf_counter() - started
+            await asyncio.sleep(0.1)
+            await lag.stop()
+            lags = summarize(lag.samples_ms)
+            respond = summarize([r[0] for r in results])
+            print(f"{name:>6}: loop lag p50 {lags['p50']}ms p99 {lags['p99']}ms max {lags['max']}ms | "
+                  f"response p50 {respond['p50']}ms | {results[0][1]} chars | wall {wall:.1f}s")
+    finally:
+        extractor.shutdown()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--uploads", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
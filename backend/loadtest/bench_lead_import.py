@@ -0,0 +1,102 @@
+"""
+Lead import benchmark: N synthetic leads from a CSV into a local mongod
+
+Writes a CSV with --rows leads (a few percent malformed or repeated phones),
+then imports it twice into a throwaway database:
+
+- pipeline: lead_import.import_csv_file (chunked unordered bulk upserts)
+- legacy:   the old per-row find_one + insert_one loop (--legacy-rows of them,
+            extrapolated, since the full run takes minutes)
+
+A second pipeline pass over the same file measures the all-duplicates case.
+
+Run: cd backend && python -m loadtest.bench_lead_import --rows 100000
+Requires a throwaway MongoDB (MONGO_URL, DB_NAME defaults to virevo_bench).
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from crm_models import Lead
+from lead_import import csv_row_to_item, ensure_lead_indexes, import_csv_file, iter_csv_chunks
+
+USER_ID = "bench-user"
+
+
+def write_csv(path: str, rows: int, seed: int = 11):
+    rng = random.Random(seed)
+    formats = ["({a}) {b}-{c}", "{a}-{b}-{c}", "+1 {a} {b} {c}", "1{a}{b}{c}", "{a}.{b}.{c}"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email", "phone", "tags", "notes"])
+        for i in range(rows):
+            roll = rng.random()
+            if roll < 0.01:
+                phone = "n/a"  # invalid
+            elif roll < 0.03 and i:
+                phone = f"+1555{(i - 1):07d}"  # repeat of the previous row
+            else:
+                n = f"555{i:07d}"
+                phone = rng.choice(formats).format(a=n[:3], b=n[3:6], c=n[6:])
+            writer.writerow([f"Lead {i}", f"lead{i}@example.com", phone, "bench,import", ""])
+
+
+async def legacy_import(db, path: str, limit: int) -> int:
+    """The pre-pipeline loop: find_one duplicate check + insert_one per row"""
+    done = 0
+    for chunk in iter_csv_chunks(path):
+        for _, row in chunk:
+            if done >= limit:
+                return done
+            item = csv_row_to_item(row)
+            if not await db.leads.find_one({"user_id": USER_ID, "phone": item.phone}):
+                await db.leads.insert_one(Lead(user_id=USER_ID, **item.dict()).dict())
+            done += 1
+    return done
+
+
+async def run(args):
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "virevo_bench")]
+    path = os.path.join(tempfile.gettempdir(), f"bench_leads_{args.rows}.csv")
+    write_csv(path, args.rows)
+    print(f"📄 {args.rows} rows → {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    await db.leads.delete_many({"user_id": USER_ID})
+    await ensure_lead_indexes(db)
+    try:
+        for label in ("pipeline (empty)", "pipeline (all dupes)"):
+            started = time.perf_counter()
+            report = await import_csv_file(db, USER_ID, path)
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<22} {elapsed:7.2f}s  {args.rows / elapsed:9.0f} rows/s  {report.progress()}")
+
+        if args.legacy_rows:
+            await db.leads.delete_many({"user_id": USER_ID})
+            started = time.perf_counter()
+            done = await legacy_import(db, path, args.legacy_rows)
+            elapsed = time.perf_counter() - started
+            print(f"  {'legacy per-row':<22} {elapsed:7.2f}s  {done / elapsed:9.0f} rows/s  "
+                  f"(≈{args.rows * elapsed / done:.0f}s for {args.rows} rows)")
+    finally:
+        await db.leads.delete_many({"user_id": USER_ID})
+        client.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_lead_import")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--legacy-rows", type=int, default=5_000, help="Rows to time through the old loop (0 = skip)")
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
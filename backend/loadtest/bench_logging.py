@@ -0,0 +1,158 @@
+"""
+Hot-path logging benchmark: event-loop time spent logging per call
+
+Replays the log traffic of --calls concurrent calls on one event loop (Soniox
+token messages at ~20/s, an LLM turn every few seconds with per-sentence and
+TTS playback logs) and measures, per call, how long the loop spent inside
+logging calls:
+
+- before: logging.basicConfig StreamHandler, eager f-strings, every event
+- after:  log_pipeline (QueueHandler → listener thread) + call_log_control.hot
+          sampling, with one call switched to verbose at runtime
+
+--sink-delay-ms simulates a slow stdout (container log driver under
+pressure): each write sleeps that long, which the old setup pays on the loop.
+
+Run: cd backend && python -m loadtest.bench_logging --calls 50 --seconds 60
+"""
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import sys
+import time
+
+from log_pipeline import LOG_FORMAT, CallLogControl, LogPipeline
+
+TOKENS_PER_SECOND = 20
+SECONDS_PER_TURN = 4
+SENTENCES_PER_TURN = 3
+
+
+class SlowSink(io.TextIOBase):
+    """Stand-in for stdout: discards text but blocks for `delay` per write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def fake_tokens(i: int):
+    return [{"text": w, "is_final": (i + n) % 3 == 0} for n, w in enumerate(("so", " I", " was", " wondering"))]
+
+
+async def legacy_call(logger, call_id: str, seconds: int, spent: dict):
+    """Logging as the media paths did it: an eager f-string per event, written on the loop"""
+    elapsed = 0.0
+    for tick in range(seconds * TOKENS_PER_SECOND):
+        tokens = fake_tokens(tick)
+        started = time.perf_counter()
+        token_summary = []
+        for t in tokens:
+            status = "✓" if t.get("is_final", False) else "?"
+            token_summary.append(f'"{t.get("text", "")}"{status}')
+        logger.info(f"🔤 RAW TOKENS: [{', '.join(token_summary)}]")
+        if tick % (SECONDS_PER_TURN * TOKENS_PER_SECOND) == 0:
+            for n in range(SENTENCES_PER_TURN):
+                sentence = f"This is sentence number {n} of the agent's reply on {call_id}."
+                logger.info(f"📤 Streamed sentence: {sentence[:50]}...")
+                logger.info(f"🎤 [Call {call_id}] Streaming sentence #{n}: {sentence[:50]}...")
+                logger.info(f"📤 Sending {len(sentence) * 400} bytes of audio ({len(sentence) * 2} chunks) via WebSocket")
+                logger.info(f"⏱️ [TIMING] PLAYBACK_TOTAL: {12.0:.0f}ms")
+        elapsed += time.perf_counter() - started
+        await asyncio.sleep(0)
+    spent[call_id] = elapsed
+
+
+async def queued_call(logger, control: CallLogControl, call_id: str, seconds: int, spent: dict):
+    """Same events through call_log_control.hot into the queue"""
+    elapsed = 0.0
+    for tick in range(seconds * TOKENS_PER_SECOND):
+        tokens = fake_tokens(tick)
+        started = time.perf_counter()
+        control.hot(logger, call_id, "🔤 RAW TOKENS", tokens=lambda tokens=tokens: ", ".join(
+            f'"{t.get("text", "")}"{"✓" if t.get("is_final", False) else "?"}' for t in tokens))
+        if tick % (SECONDS_PER_TURN * TOKENS_PER_SECOND) == 0:
+            for n in range(SENTENCES_PER_TURN):
+                sentence = f"This is sentence number {n} of the agent's reply on {call_id}."
+                control.hot(logger, call_id, "📤 Streamed sentence: %s...", sentence[:50])
+                control.hot(logger, call_id, "🎤 [Call %s] Streaming sentence #%d: %s...", call_id, n, sentence[:50])
+                control.hot(logger, call_id, "📤 Sending %d bytes of audio (%d chunks) via WebSocket",
+                            len(sentence) * 400, len(sentence) * 2)
+                control.hot(logger, call_id, "⏱️ [TIMING] PLAYBACK_TOTAL: %.0fms", 12.0)
+        elapsed += time.perf_counter() - started
+        await asyncio.sleep(0)
+    spent[call_id] = elapsed
+
+
+def summarize(label: str, spent: dict, wall: float, sink: SlowSink, extra: str = ""):
+    per_call_ms = [v * 1000 for v in spent.values()]
+    print(f"{label:<7} loop time in logging per call: mean {statistics.mean(per_call_ms):8.1f}ms  "
+          f"max {max(per_call_ms):8.1f}ms | wall {wall:6.2f}s | sink writes {sink.writes}{extra}")
+
+
+async def run(args):
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    call_ids = [f"v3:bench-{i}" for i in range(args.calls)]
+    try:
+        # Before: synchronous StreamHandler on the root logger
+        sink = SlowSink(args.sink_delay_ms / 1000)
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        legacy = logging.StreamHandler(sink)
+        legacy.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(legacy)
+        root.setLevel(logging.INFO)
+        logger = logging.getLogger("bench.legacy")
+        spent = {}
+        started = time.perf_counter()
+        await asyncio.gather(*(legacy_call(logger, cid, args.seconds, spent) for cid in call_ids))
+        summarize("before", spent, time.perf_counter() - started, sink)
+
+        # After: queue + listener thread, sampled hot path, one verbose call
+        sink = SlowSink(args.sink_delay_ms / 1000)
+        pipeline = LogPipeline()
+        handler = pipeline.configure(level=logging.INFO, stream=sink, queue_size=args.queue_size)
+        control = CallLogControl(sample_every=args.sample_every)
+        control.set_verbose(call_ids[0], True)
+        logger = logging.getLogger("bench.queued")
+        spent = {}
+        started = time.perf_counter()
+        await asyncio.gather(*(queued_call(logger, control, cid, args.seconds, spent) for cid in call_ids))
+        wall = time.perf_counter() - started
+        pipeline.stop()
+        verbose_ms = spent.pop(call_ids[0]) * 1000
+        summarize("after", spent, wall, sink,
+                  f" | dropped {handler.dropped} | verbose call {verbose_ms:.1f}ms")
+    finally:
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        for h in saved_handlers:
+            root.addHandler(h)
+        root.setLevel(saved_level)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_logging")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--seconds", type=int, default=60, help="Simulated call length")
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0, help="Blocking time per log write")
+    parser.add_argument("--sample-every", type=int, default=50)
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
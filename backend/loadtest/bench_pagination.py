@@ -0,0 +1,134 @@
+"""
+Call-history pagination benchmark: N synthetic call logs in a local mongod
+
+Seeds --rows call logs for one tenant (realistic size: transcript + logs
+arrays), then times a page of 50 at increasing depths:
+
+- legacy: count_documents + sort/skip/limit over full documents
+- keyset: pagination.paginate (cursor, summary projection, cached total)
+
+and prints page latency and response size for each depth.
+
+Run: cd backend && python -m loadtest.bench_pagination --rows 1000000
+Requires a throwaway MongoDB (MONGO_URL, DB_NAME defaults to virevo_bench).
+Seeding 1M rows takes a few minutes; --keep reuses them on the next run.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from pagination import SORT, ensure_pagination_indexes, estimated_counter, paginate
+
+USER_ID = "bench-user"
+PAGE = 50
+SEED_BATCH = 5_000
+
+
+def make_call(i: int, start: datetime, rng: random.Random) -> dict:
+    created = start + timedelta(seconds=i * 3 + rng.randint(0, 2))
+    return {
+        "id": str(uuid.uuid4()),
+        "call_id": f"v3:{uuid.uuid4().hex}",
+        "user_id": USER_ID,
+        "agent_id": f"agent-{i % 20}",
+        "direction": rng.choice(["inbound", "outbound"]),
+        "status": rng.choice(["completed", "completed", "completed", "failed", "no-answer"]),
+        "from_number": f"+1555{rng.randint(0, 9_999_999):07d}",
+        "to_number": f"+1555{rng.randint(0, 9_999_999):07d}",
+        "duration": rng.randint(5, 600),
+        "cost": 0.0,
+        "start_time": created,
+        "created_at": created,
+        "transcript": [{"role": "user" if t % 2 else "assistant", "text": "word " * 25} for t in range(12)],
+        "logs": [{"type": "turn_complete", "message": "x" * 200} for _ in range(12)],
+    }
+
+
+async def seed(db, rows: int):
+    existing = await db.call_logs.count_documents({"user_id": USER_ID})
+    if existing >= rows:
+        print(f"♻️  Reusing {existing} seeded call logs")
+        return
+    await db.call_logs.delete_many({"user_id": USER_ID})
+    rng = random.Random(7)
+    start = datetime.utcnow() - timedelta(seconds=rows * 3)
+    started = time.perf_counter()
+    for offset in range(0, rows, SEED_BATCH):
+        batch = [make_call(i, start, rng) for i in range(offset, min(offset + SEED_BATCH, rows))]
+        await db.call_logs.insert_many(batch, ordered=False)
+        if offset and offset % 100_000 == 0:
+            print(f"  seeded {offset}...")
+    print(f"🌱 Seeded {rows} call logs in {time.perf_counter() - started:.0f}s")
+
+
+def size_of(docs) -> int:
+    return sum(len(bson.encode({k: v for k, v in d.items() if k != "_id"})) for d in docs)
+
+
+async def legacy_page(db, query: dict, offset: int):
+    total = await db.call_logs.count_documents(query)
+    docs = await db.call_logs.find(query).sort("created_at", -1).skip(offset).limit(PAGE).to_list(PAGE)
+    return docs, total
+
+
+async def cursor_at(db, query: dict, offset: int):
+    """Cursor for the page starting at `offset` (setup only, not timed)"""
+    if offset == 0:
+        return None
+    from pagination import encode_cursor
+    prev = await db.call_logs.find(query, {"created_at": 1, "id": 1}).sort(SORT).skip(offset - 1).limit(1).to_list(1)
+    return encode_cursor(prev[0]["created_at"], prev[0]["id"])
+
+
+async def run(args):
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "virevo_bench")]
+    try:
+        await ensure_pagination_indexes(db)
+        await seed(db, args.rows)
+        query = {"user_id": USER_ID}
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, args.rows - PAGE) if 0 <= d <= args.rows - PAGE]
+
+        print(f"\n{'offset':>9} | {'legacy ms':>9} {'legacy KB':>9} | {'keyset ms':>9} {'keyset KB':>9}")
+        for depth in depths:
+            started = time.perf_counter()
+            docs, _ = await legacy_page(db, query, depth)
+            legacy_ms = (time.perf_counter() - started) * 1000
+            legacy_kb = size_of(docs) / 1024
+
+            cursor = await cursor_at(db, query, depth)
+            await estimated_counter.count(db.call_logs, query)  # warm: totals are cached across pages
+            started = time.perf_counter()
+            page = await paginate(db.call_logs, query, PAGE, cursor)
+            keyset_ms = (time.perf_counter() - started) * 1000
+            keyset_kb = size_of(page["items"]) / 1024
+            print(f"{depth:>9} | {legacy_ms:>9.1f} {legacy_kb:>9.1f} | {keyset_ms:>9.1f} {keyset_kb:>9.1f}")
+
+        started = time.perf_counter()
+        await db.call_logs.count_documents(query)
+        print(f"\ncount_documents alone: {(time.perf_counter() - started) * 1000:.0f}ms "
+              f"(paid once per {estimated_counter.ttl:.0f}s per query by the keyset path)")
+    finally:
+        if not args.keep:
+            await db.call_logs.delete_many({"user_id": USER_ID})
+        client.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_pagination")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded rows for the next run")
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
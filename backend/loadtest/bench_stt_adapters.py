@@ -0,0 +1,189 @@
+"""
+Streaming STT benchmark: the caller-audio hot path for each provider
+
+--calls concurrent calls each stream --turns recorded turns (600ms speech +
+400ms silence) as paced 20ms Telnyx media frames into a fake provider socket
+(loadtest/fake_stt.py) that replays recorded provider messages:
+
+- before: the per-handler loops stt_adapters replaced - JSON + base64 per
+          packet and, for AssemblyAI, an FFT resample of every 20ms packet on
+          its own (convert_mulaw_8khz_to_pcm_16khz), buffered to 60ms
+- after:  AudioFrontEnd.pump + the provider's adapter - decoded once, one
+          stream-continuous resampler per call
+
+Both paths read provider messages through the same adapter, so the numbers
+differ only by the audio side. Reported per provider and path: CPU ms per
+call-second, event-loop lag, endpoint latency (the frame that completes the
+scripted turn sent → endpoint event received) and, for 16kHz PCM, the error
+against resampling the whole call at once (per-packet edges).
+
+Run: cd backend && python -m loadtest.bench_stt_adapters --calls 50 --turns 5
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import assemblyai_service
+import soniox_service
+import stt_adapters
+from audio_resampler import convert_mulaw_8khz_to_pcm_16khz
+from loadtest.audio import frames
+from loadtest.fake_stt import RECORDED_TURNS, TURN_MS, FakeSttServer, turn_audio
+from loadtest.metrics import CpuMeter, LoopLagMonitor, summarize
+from stt_adapters import ENDPOINT, FRAME_MS, PCM_16K, AudioFrontEnd, create_stt_adapter
+
+PROVIDERS = ("soniox", "assemblyai", "deepgram")
+
+
+class PacedTelnyxSocket:
+    """Hands out one media message every 20ms and records when each frame left"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.sent_at = []
+        self._start = None
+
+    async def receive_text(self):
+        index = len(self.sent_at)
+        if self._start is None:
+            self._start = time.perf_counter()
+        delay = self._start + index * FRAME_MS / 1000 - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.sent_at.append(time.perf_counter())
+        return self.messages[index]
+
+
+async def legacy_forward(websocket, stt) -> int:
+    """What the handlers did before: decode per packet, AssemblyAI resampled per packet"""
+    buffer = bytearray()
+    chunk_counter = 0
+    received = 0
+    while True:
+        data = json.loads(await websocket.receive_text())
+        if data.get("event") == "stop":
+            break
+        if data.get("event") != "media":
+            continue
+        audio = base64.b64decode(data["media"]["payload"])
+        received += 1
+        if stt.input_format != PCM_16K:
+            await stt._send(audio)
+            continue
+        buffer.extend(convert_mulaw_8khz_to_pcm_16khz(audio))
+        chunk_counter += 1
+        if chunk_counter >= stt.batch_frames:
+            await stt._send(bytes(buffer))
+            buffer = bytearray()
+            chunk_counter = 0
+    return received
+
+
+def endpoint_offset_ms(provider: str) -> int:
+    """Audio offset in the recorded turn at which the fake sends the endpointing message"""
+    probe = create_stt_adapter(provider, "bench-key", {"settings": {}})
+    return next(at for at, message in RECORDED_TURNS[provider]
+                if any(e.kind == ENDPOINT for e in probe.parse(message)))
+
+
+async def one_call(provider: str, path: str, messages, turns: int) -> list:
+    stt = create_stt_adapter(provider, "bench-key", {"settings": {}})
+    if not await stt.connect():
+        raise RuntimeError(f"{provider} fake refused the connection")
+    endpoint_at = []
+
+    async def collect():
+        async for event in stt.events():
+            if event.kind == ENDPOINT:
+                endpoint_at.append(time.perf_counter())
+
+    collector = asyncio.create_task(collect())
+    socket = PacedTelnyxSocket(messages)
+    if path == "before":
+        await legacy_forward(socket, stt)
+    else:
+        await AudioFrontEnd.for_adapter(stt).pump(socket, stt)
+    await asyncio.sleep(0.2)
+    await stt.close()
+    await asyncio.wait_for(collector, timeout=10)
+
+    due_ms = endpoint_offset_ms(provider)
+    latencies = []
+    for turn, received_at in enumerate(endpoint_at[:turns]):
+        frame_index = (turn * TURN_MS + due_ms) // FRAME_MS - 1
+        latencies.append((received_at - socket.sent_at[frame_index]) * 1000)
+    return latencies
+
+
+def resample_edge_error_db(mulaw: bytes) -> dict:
+    """Per-packet output vs the whole call resampled at once, in dB below the signal"""
+    def error_db(pieces: bytes, whole: bytes) -> float:
+        a = np.frombuffer(pieces, dtype=np.int16).astype(np.float64)
+        b = np.frombuffer(whole, dtype=np.int16).astype(np.float64)
+        n = min(len(a), len(b))
+        noise = np.mean((a[:n] - b[:n]) ** 2)
+        return -math.inf if noise == 0 else round(10 * math.log10(noise / np.mean(b[:n] ** 2)), 1)
+
+    legacy = b"".join(convert_mulaw_8khz_to_pcm_16khz(f) for f in frames(mulaw))
+    front = AudioFrontEnd(pcm_16k=True)
+    shared = b"".join(front.frame(f).pcm_16k for f in frames(mulaw))
+    return {
+        "before": error_db(legacy, convert_mulaw_8khz_to_pcm_16khz(mulaw)),
+        "after": error_db(shared, AudioFrontEnd(pcm_16k=True).to_pcm_16k(mulaw)),
+    }
+
+
+async def run(args) -> int:
+    audio = turn_audio(args.turns)
+    messages = [json.dumps({"event": "media", "media": {"payload": base64.b64encode(f).decode()}})
+                for f in frames(audio)] + [json.dumps({"event": "stop"})]
+    call_seconds = len(audio) / 8000
+    print(f"{args.calls} calls x {args.turns} turns ({call_seconds:.0f}s of audio each), paced 20ms frames")
+
+    edges = resample_edge_error_db(audio)
+    print(f"16kHz PCM error vs whole-call resample: before {edges['before']}dB, after {edges['after']}dB")
+
+    for provider in args.providers:
+        fake = FakeSttServer(provider)
+        await fake.start()
+        soniox_service.SONIOX_WS_URL = fake.url
+        assemblyai_service.ASSEMBLYAI_WS_URL = fake.url
+        stt_adapters.DEEPGRAM_WS_URL = fake.url
+        try:
+            for path in ("before", "after"):
+                lag = LoopLagMonitor(interval_ms=20)
+                cpu = CpuMeter()
+                lag.start()
+                cpu.start()
+                results = await asyncio.gather(*(one_call(provider, path, messages, args.turns)
+                                                 for _ in range(args.calls)))
+                cpu.stop()
+                await lag.stop()
+                latencies = [ms for call in results for ms in call]
+                endpoints = summarize(latencies)
+                lags = summarize(lag.samples_ms)
+                cpu_ms = cpu.cpu_s * 1000 / (args.calls * call_seconds)
+                print(f"{provider:>10} {path:>6}: cpu {cpu_ms:.2f}ms/call-s | loop lag p99 {lags['p99']}ms "
+                      f"max {lags['max']}ms | endpoint p50 {endpoints['p50']}ms p99 {endpoints['p99']}ms "
+                      f"({endpoints['count']}/{args.calls * args.turns})")
+        finally:
+            await fake.stop()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--providers", nargs="+", choices=PROVIDERS, default=list(PROVIDERS))
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Audio tonality benchmark: bytes uploaded and wall-clock time per call
+
+Synthesizes --calls recordings of --minutes each (dual-channel 16kHz WAV, as
+call recordings are downloaded) with a timestamped transcript, and analyzes
+each one against a local fake audio model:
+
+- before: the whole recording in one request (what analyze_recording_url
+          did); anything over 25MB fails
+- after:  AudioTonalityAnalyzer.analyze_recording — decoded locally, agent
+          turns cut and trimmed, clips compressed and analyzed concurrently
+
+The fake answers after --latency-ms plus --ms-per-mb of uploaded audio.
+Clips are MP3 when ffmpeg is on PATH, 16kHz WAV otherwise (printed below).
+
+Run: cd backend && python -m loadtest.bench_tonality_audio --calls 3 --minutes 5
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import sys
+import time
+import wave
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from audio_tonality_service import (
+    MAX_UPLOAD_BYTES, AudioTonalityAnalyzer, build_analysis_prompt, build_tonality_system_prompt,
+)
+from http_client_registry import http_client_registry
+from loadtest.fake_audio_model import FakeAudioModelServer
+from tonality_preprocessing import TONALITY_SEGMENT_BITRATE, TONALITY_SEGMENT_CODEC, TonalityPreprocessor
+
+RATE = 16000
+RING_SECONDS = 1.5
+
+
+def speech(seconds: float, pitch: float, rng: random.Random) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    envelope = 0.35 + 0.65 * np.abs(np.sin(np.pi * rng.uniform(3, 5) * t))
+    voice = np.sin(2 * np.pi * pitch * t) + 0.3 * np.sin(2 * np.pi * 3 * pitch * t)
+    return (9000 * envelope * voice).astype(np.int16)
+
+
+def synthetic_call(minutes: float, rng: random.Random):
+    """Dual-channel recording (agent left, caller right) and its transcript"""
+    total = int(minutes * 60 * RATE)
+    left, right = np.zeros(total, dtype=np.int16), np.zeros(total, dtype=np.int16)
+    started = datetime(2026, 3, 1, 12, 0, 0)
+    transcript, cursor, role = [], RING_SECONDS, "assistant"
+    while True:
+        length = rng.uniform(5, 9) if role == "assistant" else rng.uniform(2, 5)
+        if cursor + length > total / RATE:
+            break
+        channel, pitch = (left, 170.0) if role == "assistant" else (right, 230.0)
+        clip = speech(length, pitch, rng)
+        begin = int(cursor * RATE)
+        channel[begin: begin + len(clip)] = clip
+        transcript.append({"role": role, "text": "words " * int(length * 2),
+                           "timestamp": (started + timedelta(seconds=cursor - RING_SECONDS)).isoformat()})
+        cursor += length + rng.uniform(0.6, 1.5)
+        role = "user" if role == "assistant" else "assistant"
+    stereo = np.stack([left, right], axis=1).reshape(-1)
+    return encode_wav_stereo(stereo), transcript
+
+
+def encode_wav_stereo(interleaved: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(interleaved.tobytes())
+    return buffer.getvalue()
+
+
+async def legacy(analyzer, recording: bytes, transcript, system_prompt: str) -> dict:
+    """The old path: size check, then the whole file in one request"""
+    if len(recording) > MAX_UPLOAD_BYTES:
+        return {"success": False, "error": "Audio file too large"}
+    return await analyzer.analyze_audio_segment(
+        audio_data=recording, audio_format="wav", system_prompt=system_prompt,
+        analysis_prompt=build_analysis_prompt(transcript=transcript), context=None
+    )
+
+
+async def segmented(analyzer, recording: bytes, transcript, system_prompt: str) -> dict:
+    return await analyzer.analyze_recording(
+        recording, "wav", system_prompt, build_analysis_prompt(transcript=transcript), transcript=transcript
+    )
+
+
+async def run(args) -> int:
+    fake = FakeAudioModelServer(latency_ms=args.latency_ms, ms_per_mb=args.ms_per_mb)
+    await fake.start()
+    preprocessor = TonalityPreprocessor()
+    analyzer = AudioTonalityAnalyzer(api_key="bench", base_url=fake.base_url,
+                                     max_concurrency=args.concurrency, preprocessor=preprocessor)
+    system_prompt = build_tonality_system_prompt()
+    rng = random.Random(args.seed)
+    calls = [synthetic_call(args.minutes, rng) for _ in range(args.calls)]
+    print(f"{args.calls} calls of {args.minutes} min, recording {len(calls[0][0]) / 1024 / 1024:.1f}MB each, "
+          f"{sum(t['role'] == 'assistant' for t in calls[0][1])} agent turns")
+
+    try:
+        for name, path in (("before", legacy), ("after", segmented)):
+            walls, uploads, requests, ok = [], [], [], 0
+            for recording, transcript in calls:
+                fake.reset()
+                started = time.perf_counter()
+                result = await path(analyzer, recording, transcript, system_prompt)
+                walls.append(time.perf_counter() - started)
+                uploads.append(fake.bytes_received)
+                requests.append(fake.requests)
+                ok += bool(result.get("success"))
+            print(f"{name:>6}: {ok}/{len(calls)} succeeded, "
+                  f"{statistics.mean(requests):.1f} requests/call, "
+                  f"{statistics.mean(uploads) / 1024 / 1024:.2f}MB uploaded/call, "
+                  f"wall {statistics.mean(walls) * 1000:.0f}ms/call (max {max(walls) * 1000:.0f}ms)")
+        stats = preprocessor.get_stats()
+        codec = "wav (no ffmpeg)" if stats["wav_fallbacks"] else f"{TONALITY_SEGMENT_CODEC} @ {TONALITY_SEGMENT_BITRATE}"
+        print(f"clips: {stats['segments']} total, {codec}")
+    finally:
+        await http_client_registry.aclose_all()
+        await fake.stop()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=4, help="clips in flight per call")
+    parser.add_argument("--latency-ms", type=int, default=400, help="fake model base latency")
+    parser.add_argument("--ms-per-mb", type=int, default=250, help="fake model time per MB of audio")
+    parser.add_argument("--seed", type=int, default=7)
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Fake OpenAI audio-model server
+POST /v1/chat/completions with an input_audio part, enough for
+AudioTonalityAnalyzer pointed at it.
+
+Counts requests and uploaded bytes, rejects audio over the 25MB API limit
+with 413, and answers after latency_ms plus ms_per_mb of uploaded audio
+(the model's time grows with the clip it has to listen to).
+"""
+import asyncio
+import base64
+import json
+from typing import Optional
+
+from aiohttp import web
+
+MAX_AUDIO_BYTES = 25 * 1024 * 1024
+
+ANALYSIS = {
+    "overall_assessment": {"primary_emotion": "calm", "emotion_intensity": 4, "confidence_level": 7,
+                           "engagement_level": 6, "overall_tone": "positive"},
+    "speaker_analysis": {
+        "user": {"emotions_detected": ["curious"], "dominant_emotion": "curious", "confidence": "medium",
+                 "engagement": "medium", "notable_moments": []},
+        "agent": {"tone_appropriateness": 8, "emotional_matching": 7, "energy_level": "medium",
+                  "areas_for_improvement": ["pause after questions"]},
+    },
+    "emotional_journey": [{"timestamp_description": "beginning", "emotion_shift": "warms up", "trigger": "greeting"}],
+    "recommendations": {"ssml_suggestions": [], "tone_adjustments": [], "pacing_suggestions": ["slow down"]},
+    "flags": {"frustration_detected": False, "confusion_detected": False, "satisfaction_signals": True,
+              "rapport_established": True},
+    "quality_scores": {"emotional_intelligence": 7, "appropriate_responses": 8, "conversation_flow": 7,
+                       "overall_quality": 7},
+}
+
+
+class FakeAudioModelServer:
+    def __init__(self, latency_ms: int = 400, ms_per_mb: int = 250):
+        self.latency_s = latency_ms / 1000
+        self.s_per_mb = ms_per_mb / 1000
+        self.requests = 0
+        self.rejected = 0
+        self.bytes_received = 0
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def reset(self):
+        self.requests = self.rejected = self.bytes_received = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        app = web.Application(client_max_size=256 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        self.requests += 1
+        self.bytes_received += len(body)
+        audio_bytes = 0
+        for message in json.loads(body).get("messages", []):
+            content = message.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "input_audio":
+                        audio_bytes += len(base64.b64decode(part["input_audio"]["data"]))
+        if audio_bytes > MAX_AUDIO_BYTES:
+            self.rejected += 1
+            return web.json_response({"error": {"message": "Audio file too large"}}, status=413)
+
+        await asyncio.sleep(self.latency_s + self.s_per_mb * audio_bytes / 1024 / 1024)
+        return web.json_response({
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(ANALYSIS)},
+                         "finish_reason": "stop"}],
+        })
@@ -0,0 +1,116 @@
+"""
+Fake ElevenLabs TTS WebSocket
+Serves /v1/text-to-speech/{voice_id}/stream-input (one stream per socket, used by
+PersistentTTSSession) and /multi-stream-input (contexts, used by tts_multiplexer).
+
+Text is buffered until a flush; ttfb_ms later the synthesized audio (mulaw,
+AUDIO_MS_PER_CHAR per character) is streamed back in chunk_ms pieces, faster
+than real time like the real service.
+"""
+import asyncio
+import base64
+import json
+import logging
+from typing import Dict, Optional
+
+import websockets
+
+from loadtest.audio import synth_speech
+
+logger = logging.getLogger(__name__)
+
+# ~14 characters per second of speech
+AUDIO_MS_PER_CHAR = 70
+
+
+class FakeElevenLabsServer:
+    def __init__(self, ttfb_ms: int = 150, chunk_ms: int = 250, chunk_interval_ms: int = 30):
+        self.ttfb_s = ttfb_ms / 1000
+        self.chunk_ms = chunk_ms
+        self.chunk_interval_s = chunk_interval_ms / 1000
+        self.connections = 0
+        self.generations = 0
+        self._server = None
+        self.port: Optional[int] = None
+        self._audio_cache: Dict[int, bytes] = {}
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await websockets.serve(self._handle, host, port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _audio_for(self, text: str) -> bytes:
+        duration_ms = max(200, len(text) * AUDIO_MS_PER_CHAR)
+        duration_ms -= duration_ms % self.chunk_ms
+        audio = self._audio_cache.get(duration_ms)
+        if audio is None:
+            audio = self._audio_cache[duration_ms] = synth_speech(duration_ms, pitch_hz=210.0)
+        return audio
+
+    async def _generate(self, ws, lock: asyncio.Lock, text: str, context_id: Optional[str]):
+        self.generations += 1
+        await asyncio.sleep(self.ttfb_s)
+        audio = self._audio_for(text)
+        step = 8 * self.chunk_ms
+        async with lock:
+            for i in range(0, len(audio), step):
+                message = {"audio": base64.b64encode(audio[i:i + step]).decode("ascii"), "isFinal": False}
+                if context_id:
+                    message["contextId"] = context_id
+                await ws.send(json.dumps(message))
+                await asyncio.sleep(self.chunk_interval_s)
+
+    async def _handle(self, ws, path: str = None):
+        self.connections += 1
+        request_path = path or getattr(ws, "path", "")
+        multi = "multi-stream-input" in request_path
+        buffers: Dict[Optional[str], str] = {}
+        send_lock = asyncio.Lock()
+        tasks = set()
+
+        def spawn(text: str, context_id: Optional[str]):
+            if text.strip():
+                task = asyncio.create_task(self._generate(ws, send_lock, text, context_id))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        try:
+            async for raw in ws:
+                data = json.loads(raw)
+                context_id = data.get("context_id") if multi else None
+
+                if data.get("close_socket"):
+                    break
+                if data.get("close_context"):
+                    buffers.pop(context_id, None)
+                    await ws.send(json.dumps({"contextId": context_id, "isFinal": True}))
+                    continue
+
+                text = data.get("text")
+                if text is None:
+                    continue
+                buffers[context_id] = buffers.get(context_id, "") + text
+
+                if data.get("flush"):
+                    spawn(buffers.pop(context_id, ""), context_id)
+                elif text == "" and not multi:
+                    # End of stream: finish what's buffered, then close
+                    spawn(buffers.pop(context_id, ""), context_id)
+                    if tasks:
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                    await ws.send(json.dumps({"isFinal": True}))
+                    break
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in list(tasks):
+                task.cancel()
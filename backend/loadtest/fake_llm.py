@@ -0,0 +1,101 @@
+"""
+Fake OpenAI-compatible LLM server
+POST /v1/chat/completions (streaming SSE or plain JSON) and GET /v1/models,
+enough for openai.AsyncOpenAI clients from llm_client_pool pointed at it.
+
+The first token is delayed by ttft_ms, later tokens by token_interval_ms.
+Replies cycle through a fixed list so every turn gets a multi-sentence answer.
+"""
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from typing import List, Optional
+
+from aiohttp import web
+
+DEFAULT_REPLIES = [
+    "Sure, I can help with that. Could you tell me a little more about what you need?",
+    "Got it, thanks. Most of our customers start with the standard plan. Would that work for you?",
+    "That makes sense. I can set up a quick follow-up call. What time works best tomorrow?",
+    "Perfect, you're all set. Is there anything else I can help with today?",
+]
+
+
+class FakeLLMServer:
+    def __init__(self, ttft_ms: int = 250, token_interval_ms: int = 15, replies: Optional[List[str]] = None):
+        self.ttft_s = ttft_ms / 1000
+        self.token_interval_s = token_interval_ms / 1000
+        self._replies = itertools.cycle(replies or DEFAULT_REPLIES)
+        self.requests = 0
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        app.router.add_get("/v1/models", self._models)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "loadtest"}]})
+
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        body = await request.json()
+        model = body.get("model", "fake-model")
+        reply = next(self._replies)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        await asyncio.sleep(self.ttft_s)
+
+        if not body.get("stream"):
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 50, "completion_tokens": len(reply.split()), "total_tokens": 50 + len(reply.split())},
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        def chunk(delta: dict, finish_reason=None) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            if i == 0:
+                delta["role"] = "assistant"
+            else:
+                await asyncio.sleep(self.token_interval_s)
+            await response.write(chunk(delta))
+        await response.write(chunk({}, "stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
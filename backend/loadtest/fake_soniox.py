@@ -0,0 +1,119 @@
+"""
+Fake Soniox real-time STT WebSocket
+Accepts the same config message + binary mulaw stream as
+wss://stt-rt.soniox.com/transcribe-websocket and endpoints on audio energy:
+
+- while the caller's audio is voiced, the first word of the scripted utterance
+  is emitted as a non-final token every PARTIAL_INTERVAL_MS
+- after endpoint_ms of silence following speech, the whole utterance is sent
+  as final tokens followed by the <end> token
+- the session is finished once no audio has arrived for idle_close_s
+  (the caller hung up)
+
+Utterances are taken from the script in order, one per detected speech segment.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional
+
+import websockets
+
+from loadtest.audio import FRAME_BYTES, FRAME_MS, is_voiced
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_INTERVAL_MS = 300
+
+
+class FakeSonioxServer:
+    def __init__(self, utterances: List[str], endpoint_ms: int = 360, idle_close_s: float = 1.0):
+        self.utterances = utterances
+        self.endpoint_ms = endpoint_ms
+        self.idle_close_s = idle_close_s
+        self.connections = 0
+        self.endpoints_sent = 0
+        self._server = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/transcribe-websocket"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await websockets.serve(self._handle, host, port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _send_tokens(self, ws, words: List[str], is_final: bool, end: bool = False):
+        # Like the real service: words after the first carry their leading space
+        tokens = [{"text": w if i == 0 else " " + w, "is_final": is_final, "confidence": 0.98}
+                  for i, w in enumerate(words)]
+        if end:
+            tokens.append({"text": "<end>", "is_final": True})
+        await ws.send(json.dumps({"tokens": tokens, "final_audio_proc_ms": 0, "total_audio_proc_ms": 0}))
+
+    async def _handle(self, ws, path: str = None):
+        self.connections += 1
+        try:
+            config = json.loads(await ws.recv())
+        except Exception:
+            return
+        if not config.get("api_key"):
+            await ws.send(json.dumps({"error_code": 401, "error_message": "Missing api_key"}))
+            return
+
+        utterance_index = 0
+        buffered = b""
+        in_speech = False
+        silent_ms = 0
+        last_partial = 0.0
+
+        while True:
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=self.idle_close_s)
+            except asyncio.TimeoutError:
+                break
+            except websockets.ConnectionClosed:
+                return
+            if isinstance(message, str):
+                if message == "":
+                    break  # client end-of-audio
+                continue
+
+            buffered += message
+            while len(buffered) >= FRAME_BYTES:
+                frame, buffered = buffered[:FRAME_BYTES], buffered[FRAME_BYTES:]
+                words = (self.utterances[utterance_index % len(self.utterances)].split()
+                         if self.utterances else ["hello"])
+
+                if is_voiced(frame):
+                    in_speech = True
+                    silent_ms = 0
+                    now = time.time()
+                    if (now - last_partial) * 1000 >= PARTIAL_INTERVAL_MS:
+                        last_partial = now
+                        await self._send_tokens(ws, words[:1], is_final=False)
+                    continue
+
+                if not in_speech:
+                    continue
+                silent_ms += FRAME_MS
+                if silent_ms >= self.endpoint_ms:
+                    await self._send_tokens(ws, words, is_final=True, end=True)
+                    self.endpoints_sent += 1
+                    utterance_index += 1
+                    in_speech = False
+                    silent_ms = 0
+
+        try:
+            await ws.send(json.dumps({"tokens": [], "finished": True}))
+            await ws.close()
+        except websockets.ConnectionClosed:
+            pass
@@ -0,0 +1,149 @@
+"""
+Fake real-time STT WebSocket that replays recorded provider messages
+Speaks enough of each provider's protocol for the adapters in stt_adapters.py:
+
+- soniox:     JSON config first, binary 8kHz mulaw; b"" ends the stream → {"finished": true}
+- assemblyai: "Begin" on connect, binary 16kHz PCM; {"terminate_session": true} → "Termination"
+- deepgram:   binary 8kHz mulaw; {"type": "CloseStream"} → "Metadata", then close
+
+A script is one recorded caller turn: (audio_ms, message) pairs. Each message
+is sent once the client has streamed that much audio, so replies keep their
+place relative to the audio however fast it arrives; the script repeats every
+turn_ms of audio (one turn per TURN_MS of speech + silence).
+"""
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+
+import websockets
+
+from loadtest.audio import silence, synth_speech
+
+TURN_MS = 1000
+SPEECH_MS = 600
+
+# Bytes of client audio per millisecond
+AUDIO_BYTES_PER_MS = {"soniox": 8, "assemblyai": 32, "deepgram": 8}
+
+Script = List[Tuple[int, dict]]
+
+
+def _deepgram_result(transcript: str, is_final: bool, speech_final: bool = False) -> dict:
+    return {
+        "type": "Results", "is_final": is_final, "speech_final": speech_final,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99}]},
+    }
+
+
+def _soniox_tokens(*tokens: Tuple[str, bool]) -> dict:
+    return {"tokens": [{"text": text, "is_final": final, "confidence": 0.98} for text, final in tokens],
+            "final_audio_proc_ms": 0, "total_audio_proc_ms": 0}
+
+
+# One turn of "What does it cost?" as each provider reports it
+RECORDED_TURNS: Dict[str, Script] = {
+    "soniox": [
+        (200, _soniox_tokens(("What", False))),
+        (400, _soniox_tokens(("What", True), (" does", False), (" it", False))),
+        (800, _soniox_tokens((" does", True), (" it", True), (" cost", True), ("?", True), ("<end>", True))),
+    ],
+    "assemblyai": [
+        (200, {"type": "Turn", "transcript": "what", "end_of_turn": False, "turn_is_formatted": False}),
+        (400, {"type": "Turn", "transcript": "what does it", "end_of_turn": False, "turn_is_formatted": False}),
+        (760, {"type": "Turn", "transcript": "what does it cost", "end_of_turn": True, "turn_is_formatted": False}),
+        (800, {"type": "Turn", "transcript": "What does it cost?", "end_of_turn": True, "turn_is_formatted": True}),
+    ],
+    "deepgram": [
+        (200, _deepgram_result("what", is_final=False)),
+        (400, _deepgram_result("What does", is_final=True)),
+        (800, _deepgram_result("it cost?", is_final=True, speech_final=True)),
+        (900, {"type": "UtteranceEnd", "last_word_end": 0.6}),
+    ],
+}
+
+
+def turn_audio(turns: int) -> bytes:
+    """8kHz mulaw caller audio matching the scripts: SPEECH_MS of speech, then silence, per turn"""
+    return (synth_speech(SPEECH_MS) + silence(TURN_MS - SPEECH_MS)) * turns
+
+
+class FakeSttServer:
+    def __init__(self, provider: str, script: Optional[Script] = None, turn_ms: int = TURN_MS):
+        self.provider = provider
+        self.script = script if script is not None else RECORDED_TURNS[provider]
+        self.turn_ms = turn_ms
+        self.connections = 0
+        self.packets: List[int] = []
+        self.messages_sent = 0
+        self._server = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await websockets.serve(self._handle, host, port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _replay(self, ws, sent: int, received_ms: int) -> int:
+        while self.script:
+            turn, index = divmod(sent, len(self.script))
+            at_ms, message = self.script[index]
+            if turn * self.turn_ms + at_ms > received_ms:
+                break
+            await ws.send(json.dumps(message))
+            self.messages_sent += 1
+            sent += 1
+        return sent
+
+    async def _handle(self, ws, path: str = None):
+        self.connections += 1
+        if self.provider == "soniox":
+            try:
+                config = json.loads(await ws.recv())
+            except Exception:
+                return
+            if not config.get("api_key"):
+                await ws.send(json.dumps({"error_code": 401, "error_message": "Missing api_key"}))
+                return
+        elif self.provider == "assemblyai":
+            await ws.send(json.dumps({"type": "Begin", "id": f"fake-{self.connections}", "expires_at": 0}))
+
+        bytes_per_ms = AUDIO_BYTES_PER_MS[self.provider]
+        received_bytes = 0
+        sent = 0
+
+        def duration_s():
+            return received_bytes / bytes_per_ms / 1000
+
+        try:
+            async for message in ws:
+                if isinstance(message, bytes):
+                    if not message:
+                        await ws.send(json.dumps({"tokens": [], "finished": True}))
+                        break
+                    self.packets.append(len(message))
+                    received_bytes += len(message)
+                    # Whole milliseconds, so a resampler's one-sample delay doesn't hold a reply back a packet
+                    sent = await self._replay(ws, sent, math.ceil(received_bytes / bytes_per_ms))
+                    continue
+                if message == "":
+                    await ws.send(json.dumps({"tokens": [], "finished": True}))
+                    break
+                data = json.loads(message)
+                if data.get("terminate_session"):
+                    await ws.send(json.dumps({"type": "Termination", "audio_duration_seconds": duration_s()}))
+                    break
+                if data.get("type") == "CloseStream":
+                    await ws.send(json.dumps({"type": "Metadata", "duration": duration_s()}))
+                    break
+            await ws.close()
+        except websockets.ConnectionClosed:
+            pass
@@ -0,0 +1,198 @@
+"""
+Fake Telnyx media WebSocket
+Duck-types the FastAPI WebSocket that handle_soniox_streaming reads caller audio
+from and writes agent audio to.
+
+The caller side is paced by the clock, like the real media stream: every
+receive_text() returns the next 20ms frame at its scheduled time (silence
+between turns, speech while the caller is talking), and how late the frame is
+handed over is recorded as caller-side jitter. Agent frames written through
+send_text() are timestamped to measure response latency and playback gaps.
+"""
+import asyncio
+import base64
+import json
+import time
+from typing import List, Optional
+
+from starlette.websockets import WebSocketDisconnect
+
+from loadtest.audio import FRAME_MS, MULAW_SILENCE, FRAME_BYTES, frames, synth_speech
+
+# The agent's sender bursts this many frames before pacing (persistent_tts_service)
+AGENT_BURST_FRAMES = 10
+
+# If the loop falls this far behind schedule, resync instead of bursting to catch up
+MAX_SCHEDULE_LAG_S = 0.5
+
+
+class TurnResult:
+    """Caller-observed timings for one turn"""
+
+    def __init__(self, index: int, text: str):
+        self.index = index
+        self.text = text
+        self.speech_end: Optional[float] = None
+        self.first_agent_audio: Optional[float] = None
+        self.agent_frames = 0
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        if self.speech_end is None or self.first_agent_audio is None:
+            return None
+        return (self.first_agent_audio - self.speech_end) * 1000
+
+
+class FakeTelnyxMediaSocket:
+    """
+    One synthetic caller.
+
+    Script: speak utterance 1, wait for the agent to answer and go quiet, think,
+    speak utterance 2, ... then hang up (WebSocketDisconnect).
+    """
+
+    def __init__(
+        self,
+        call_control_id: str,
+        utterances: List[str],
+        recording: Optional[bytes] = None,
+        ms_per_word: int = 280,
+        initial_silence_ms: int = 800,
+        think_ms: int = 400,
+        agent_idle_ms: int = 700,
+        turn_timeout_s: float = 15.0,
+    ):
+        self.call_control_id = call_control_id
+        self.utterances = utterances
+        self.recording = recording
+        self.ms_per_word = ms_per_word
+        self.think_s = think_ms / 1000
+        self.agent_idle_s = agent_idle_ms / 1000
+        self.turn_timeout_s = turn_timeout_s
+
+        self.turns = [TurnResult(i, text) for i, text in enumerate(utterances)]
+        self.frame_lateness_ms: List[float] = []
+        self.agent_frame_gaps_ms: List[float] = []
+        self.clear_events = 0
+        self.closed = False
+        self.done = asyncio.Event()
+
+        self._pending: List[bytes] = []
+        self._turn = 0
+        self._speak_at = time.time() + initial_silence_ms / 1000
+        self._next_frame_at: Optional[float] = None
+        self._last_agent_frame: Optional[float] = None
+        self._agent_run_frames = 0
+
+    # ── Caller → server (handle_soniox_streaming reads these) ───────
+
+    def _speech_for(self, text: str) -> bytes:
+        duration_ms = max(400, len(text.split()) * self.ms_per_word)
+        if not self.recording:
+            return synth_speech(duration_ms)
+        needed = 8 * duration_ms
+        audio = self.recording * (needed // max(len(self.recording), 1) + 1)
+        return audio[:needed]
+
+    def _next_caller_frame(self, now: float) -> bytes:
+        if self._pending:
+            frame = self._pending.pop(0)
+            if not self._pending:
+                # A frame is delivered once its 20ms are captured: speech ends now
+                self.turns[self._turn].speech_end = now
+            return frame
+
+        if self._turn < len(self.turns) and self.turns[self._turn].speech_end is not None:
+            turn = self.turns[self._turn]
+            answered_and_quiet = (
+                turn.first_agent_audio is not None
+                and self._last_agent_frame is not None
+                and now - self._last_agent_frame >= self.agent_idle_s
+            )
+            timed_out = now - turn.speech_end >= self.turn_timeout_s
+            if answered_and_quiet or timed_out:
+                self._turn += 1
+                self._speak_at = now + self.think_s
+
+        if self._turn >= len(self.turns):
+            self.done.set()
+            raise WebSocketDisconnect(code=1000)
+
+        if self.turns[self._turn].speech_end is None and now >= self._speak_at:
+            self._pending = list(frames(self._speech_for(self.turns[self._turn].text)))
+            return self._pending.pop(0)
+
+        return MULAW_SILENCE * FRAME_BYTES
+
+    async def receive_text(self) -> str:
+        if self.closed:
+            raise WebSocketDisconnect(code=1000)
+
+        now = time.time()
+        if self._next_frame_at is None:
+            self._next_frame_at = now
+        if self._next_frame_at > now:
+            await asyncio.sleep(self._next_frame_at - now)
+            now = time.time()
+
+        lateness = now - self._next_frame_at
+        self.frame_lateness_ms.append(lateness * 1000)
+        if lateness > MAX_SCHEDULE_LAG_S:
+            self._next_frame_at = now
+        self._next_frame_at += FRAME_MS / 1000
+
+        frame = self._next_caller_frame(now)
+        return json.dumps({
+            "event": "media",
+            "media": {"track": "inbound", "payload": base64.b64encode(frame).decode("ascii")}
+        })
+
+    # ── Server → caller (agent audio) ───────────────────────────────
+
+    async def send_text(self, data: str):
+        now = time.time()
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+
+        event = message.get("event")
+        if event == "clear":
+            self.clear_events += 1
+            return
+        if event != "media":
+            return
+
+        if self._turn < len(self.turns):
+            turn = self.turns[self._turn]
+            if turn.speech_end is not None and now >= turn.speech_end:
+                if turn.first_agent_audio is None:
+                    turn.first_agent_audio = now
+                turn.agent_frames += 1
+
+        if self._last_agent_frame is not None and now - self._last_agent_frame < self.agent_idle_s:
+            self._agent_run_frames += 1
+            if self._agent_run_frames > AGENT_BURST_FRAMES:
+                self.agent_frame_gaps_ms.append((now - self._last_agent_frame) * 1000)
+        else:
+            self._agent_run_frames = 0
+        self._last_agent_frame = now
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data))
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        self.closed = True
+        self.done.set()
+
+    # ── Results ─────────────────────────────────────────────────────
+
+    def turn_latencies_ms(self) -> List[float]:
+        return [t.latency_ms for t in self.turns if t.latency_ms is not None]
+
+    @property
+    def unanswered_turns(self) -> int:
+        return sum(1 for t in self.turns if t.speech_end is not None and t.first_agent_audio is None)
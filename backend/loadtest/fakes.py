@@ -0,0 +1,104 @@
+"""
+Runs all upstream fakes on one event loop in a child process.
+The parent gets the listening URLs back over a pipe and stops the fakes by
+closing it.
+"""
+import asyncio
+import logging
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from loadtest.fake_elevenlabs import FakeElevenLabsServer
+from loadtest.fake_llm import FakeLLMServer
+from loadtest.fake_soniox import FakeSonioxServer
+
+
+@dataclass
+class FakeConfig:
+    utterances: List[str]
+    stt_endpoint_ms: int = 360
+    tts_ttfb_ms: int = 150
+    llm_ttft_ms: int = 250
+    llm_token_interval_ms: int = 15
+    llm_replies: Optional[List[str]] = None
+
+
+@dataclass
+class FakeEndpoints:
+    soniox_url: str
+    elevenlabs_ws_base_url: str
+    llm_base_url: str
+    stats: dict = field(default_factory=dict)
+
+
+async def _serve(config: FakeConfig, conn):
+    soniox = FakeSonioxServer(config.utterances, endpoint_ms=config.stt_endpoint_ms)
+    elevenlabs = FakeElevenLabsServer(ttfb_ms=config.tts_ttfb_ms)
+    llm = FakeLLMServer(ttft_ms=config.llm_ttft_ms, token_interval_ms=config.llm_token_interval_ms,
+                        replies=config.llm_replies)
+    for fake in (soniox, elevenlabs, llm):
+        await fake.start()
+    conn.send(FakeEndpoints(soniox.url, elevenlabs.url, llm.base_url))
+
+    loop = asyncio.get_running_loop()
+    # Block (off-loop) until the parent asks for stats / closes the pipe
+    try:
+        await loop.run_in_executor(None, conn.recv)
+    except EOFError:
+        pass
+    stats = {
+        "soniox": {"connections": soniox.connections, "endpoints": soniox.endpoints_sent},
+        "elevenlabs": {"connections": elevenlabs.connections, "generations": elevenlabs.generations},
+        "llm": {"requests": llm.requests},
+    }
+    try:
+        conn.send(stats)
+    except (BrokenPipeError, OSError):
+        pass
+    for fake in (soniox, elevenlabs, llm):
+        await fake.stop()
+
+
+def _main(config: FakeConfig, conn):
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_serve(config, conn))
+
+
+class FakeUpstreams:
+    """Handle on the child process running the fakes"""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.endpoints: Optional[FakeEndpoints] = None
+        self._conn = None
+        self._process = None
+
+    def start(self, timeout: float = 15.0) -> FakeEndpoints:
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_main, args=(self.config, child_conn), daemon=True)
+        self._process.start()
+        if not self._conn.poll(timeout):
+            self._process.terminate()
+            raise RuntimeError("Upstream fakes did not start")
+        self.endpoints = self._conn.recv()
+        return self.endpoints
+
+    def stop(self) -> dict:
+        """Stop the fakes and return their request counters"""
+        stats = {}
+        if self._process is None:
+            return stats
+        try:
+            self._conn.send("stop")
+            if self._conn.poll(10):
+                stats = self._conn.recv()
+        except (BrokenPipeError, EOFError, OSError):
+            pass
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+        if self.endpoints:
+            self.endpoints.stats = stats
+        return stats
@@ -0,0 +1,85 @@
+"""
+Measurements for the load test: percentiles, event-loop lag, CPU time
+"""
+import asyncio
+import math
+import resource
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: Iterable[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(values: List[float], quantiles=(50, 90, 95, 99)) -> Dict[str, Optional[float]]:
+    summary = {f"p{q}": _round(percentile(values, q)) for q in quantiles}
+    summary["max"] = _round(max(values)) if values else None
+    summary["count"] = len(values)
+    return summary
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+class LoopLagMonitor:
+    """
+    Samples event-loop lag: how late a sleep(interval) wakes up.
+    Anything blocking the loop (sync I/O, CPU-heavy code) shows up here first.
+    """
+
+    def __init__(self, interval_ms: int = 10):
+        self.interval_s = interval_ms / 1000
+        self.samples_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.samples_ms.append(max((time.perf_counter() - start - self.interval_s) * 1000, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class CpuMeter:
+    """Process CPU time (user + system) and peak RSS over a measured window"""
+
+    def __init__(self):
+        self._start_cpu = 0.0
+        self._start_wall = 0.0
+        self.cpu_s = 0.0
+        self.wall_s = 0.0
+
+    def start(self):
+        self._start_cpu = time.process_time()
+        self._start_wall = time.perf_counter()
+
+    def stop(self):
+        self.cpu_s = time.process_time() - self._start_cpu
+        self.wall_s = time.perf_counter() - self._start_wall
+
+    def report(self, calls: int) -> dict:
+        return {
+            "cpu_s": round(self.cpu_s, 2),
+            "wall_s": round(self.wall_s, 2),
+            "cpu_utilization": round(self.cpu_s / self.wall_s, 3) if self.wall_s else 0.0,
+            # CPU milliseconds spent per second of one live call
+            "cpu_ms_per_call_second": round(self.cpu_s * 1000 / (calls * self.wall_s), 2) if calls and self.wall_s else 0.0,
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
@@ -0,0 +1,260 @@
+"""
+Load test runner: N concurrent synthetic calls through handle_soniox_streaming
+
+Each call gets a real CallSession (create_call_session) and a
+FakeTelnyxMediaSocket; STT, TTS and LLM traffic goes to the fakes over real
+sockets. Reported per run:
+
+- per-turn latency as the caller hears it (end of speech → first agent frame)
+- turn_tracer span percentiles (stt, llm_ttft, tts_ttfb, response, e2e)
+- event-loop lag, caller frame lateness, agent frame gaps (playback jitter)
+- CPU time per call-second and peak RSS
+
+Run: cd backend && python -m loadtest --calls 20 --turns 4 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+from loadtest.audio import load_recording
+from loadtest.fake_telnyx import FakeTelnyxMediaSocket
+from loadtest.fakes import FakeConfig, FakeUpstreams
+from loadtest.metrics import CpuMeter, LoopLagMonitor, summarize
+
+logger = logging.getLogger("loadtest")
+
+DEFAULT_UTTERANCES = [
+    "Hi yes this is John speaking",
+    "What exactly are you selling",
+    "How much does it cost per month",
+    "Okay tomorrow afternoon works for me",
+    "No that is everything thank you",
+]
+
+# Keys are plaintext: get_api_key falls back to the raw value when decryption fails
+SERVICES = ["soniox", "elevenlabs", "telnyx", "telnyx_connection_id", "grok", "openai"]
+
+
+def build_agent(user_id: str, llm_provider: str, model: str) -> dict:
+    """Single-prompt Soniox → LLM → persistent ElevenLabs agent"""
+    return {
+        "id": f"loadtest-agent-{user_id}",
+        "user_id": user_id,
+        "name": "Load Test Agent",
+        "agent_type": "single_prompt",
+        "system_prompt": "You are a friendly sales assistant. Keep answers to two short sentences.",
+        "model": model,
+        "settings": {
+            "stt_provider": "soniox",
+            "tts_provider": "elevenlabs",
+            "llm_provider": llm_provider,
+            "soniox_settings": {"model": "stt-rt-v3", "enable_endpoint_detection": True},
+            "elevenlabs_settings": {"voice_id": "loadtest-voice", "model": "eleven_flash_v2_5", "use_persistent_tts": True},
+        },
+    }
+
+
+async def seed_user(db, user_id: str):
+    await db.api_keys.insert_many([
+        {"id": str(uuid.uuid4()), "user_id": user_id, "service_name": service,
+         "api_key": f"loadtest-{service}-key", "is_active": True}
+        for service in SERVICES
+    ])
+
+
+async def cleanup(db, user_id: str, run_id: str):
+    prefix = {"$regex": f"^loadtest-{run_id}-"}
+    await db.api_keys.delete_many({"user_id": user_id})
+    await db.call_logs.delete_many({"call_id": prefix})
+    await db.turn_metrics.delete_many({"call_id": prefix})
+
+
+async def run_call(server, agent: dict, user_id: str, call_control_id: str, utterances: List[str],
+                   recording: Optional[bytes], start_delay: float) -> FakeTelnyxMediaSocket:
+    from core_calling_service import close_call_session, create_call_session
+
+    await asyncio.sleep(start_delay)
+    server.active_telnyx_calls[call_control_id] = {
+        "agent_id": agent["id"],
+        "agent": agent,
+        "custom_variables": {},
+        "session": None,
+    }
+    session = await create_call_session(call_control_id, agent, agent_id=agent["id"], user_id=user_id, db=server.db)
+    socket = FakeTelnyxMediaSocket(call_control_id, utterances, recording=recording)
+    try:
+        await server.handle_soniox_streaming(socket, session, call_control_id, call_control_id)
+    except Exception as e:
+        logger.error(f"Call {call_control_id} failed: {type(e).__name__}: {e}")
+    finally:
+        try:
+            await server.persistent_tts_manager.close_session(call_control_id)
+        except Exception:
+            pass
+        await close_call_session(call_control_id)
+        server.active_telnyx_calls.pop(call_control_id, None)
+        server.call_states.pop(call_control_id, None)
+    return socket
+
+
+async def run_load(args) -> dict:
+    utterances = DEFAULT_UTTERANCES[:args.turns] if args.turns <= len(DEFAULT_UTTERANCES) else \
+        [DEFAULT_UTTERANCES[i % len(DEFAULT_UTTERANCES)] for i in range(args.turns)]
+    recording = load_recording(args.audio) if args.audio else None
+
+    upstreams = FakeUpstreams(FakeConfig(
+        utterances=utterances,
+        stt_endpoint_ms=args.stt_endpoint_ms,
+        tts_ttfb_ms=args.tts_ttfb_ms,
+        llm_ttft_ms=args.llm_ttft_ms,
+    ))
+    endpoints = upstreams.start()
+
+    # Point the code under test at the fakes before its modules read the env
+    os.environ["SONIOX_WS_URL"] = endpoints.soniox_url
+    os.environ["ELEVENLABS_WS_BASE_URL"] = endpoints.elevenlabs_ws_base_url
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "virevo_loadtest")
+    os.environ.pop("REDIS_URL", None)  # single-worker in-memory call state
+    if args.multiplex:
+        os.environ["ELEVENLABS_TTS_MULTIPLEX"] = "true"
+    if args.early_turn:
+        os.environ["EARLY_TURN_DETECTION"] = "true"
+
+    import server
+    from llm_client_pool import PROVIDER_BASE_URLS
+    from turn_tracing import turn_tracer
+    PROVIDER_BASE_URLS[args.llm_provider] = endpoints.llm_base_url
+
+    run_id = uuid.uuid4().hex[:8]
+    user_id = f"loadtest-user-{run_id}"
+    agent = build_agent(user_id, args.llm_provider, args.model)
+
+    await server.startup_event()
+    await seed_user(server.db, user_id)
+
+    lag = LoopLagMonitor()
+    cpu = CpuMeter()
+    lag.start()
+    cpu.start()
+    try:
+        sockets = await asyncio.gather(*[
+            run_call(server, agent, user_id, f"loadtest-{run_id}-{i}", utterances, recording,
+                     start_delay=i * args.ramp_ms / 1000)
+            for i in range(args.calls)
+        ])
+    finally:
+        cpu.stop()
+        await lag.stop()
+        fake_stats = upstreams.stop()
+        spans = {span: list(h.recent) for span, h in turn_tracer.histograms.items()}
+        if not args.keep_data:
+            await cleanup(server.db, user_id, run_id)
+        await server.shutdown_db_client()
+
+    turns = [latency for s in sockets for latency in s.turn_latencies_ms()]
+    return {
+        "calls": args.calls,
+        "turns_per_call": len(utterances),
+        "turns_answered": len(turns),
+        "turns_unanswered": sum(s.unanswered_turns for s in sockets),
+        "turn_latency_ms": summarize(turns),
+        "spans_ms": {span: summarize(values) for span, values in spans.items() if values},
+        "event_loop_lag_ms": summarize(lag.samples_ms),
+        "caller_frame_lateness_ms": summarize([v for s in sockets for v in s.frame_lateness_ms]),
+        "agent_frame_gap_ms": summarize([v for s in sockets for v in s.agent_frame_gaps_ms]),
+        "cpu": cpu.report(args.calls),
+        "upstreams": fake_stats,
+        "config": {
+            "stt_endpoint_ms": args.stt_endpoint_ms,
+            "tts_ttfb_ms": args.tts_ttfb_ms,
+            "llm_ttft_ms": args.llm_ttft_ms,
+            "multiplex": args.multiplex,
+            "early_turn": args.early_turn,
+        },
+    }
+
+
+def print_report(result: dict):
+    def row(name: str, s: dict):
+        if not s or not s.get("count"):
+            return f"  {name:<26} (no samples)"
+        return (f"  {name:<26} p50={s['p50']:>8} p90={s['p90']:>8} p95={s['p95']:>8} "
+                f"p99={s['p99']:>8} max={s['max']:>8} n={s['count']}")
+
+    print(f"\n📊 Load test: {result['calls']} calls × {result['turns_per_call']} turns "
+          f"({result['turns_answered']} answered, {result['turns_unanswered']} unanswered)")
+    print(row("turn latency (caller)", result["turn_latency_ms"]))
+    for span, summary in result["spans_ms"].items():
+        print(row(f"span {span}", summary))
+    print(row("event-loop lag", result["event_loop_lag_ms"]))
+    print(row("caller frame lateness", result["caller_frame_lateness_ms"]))
+    print(row("agent frame gap", result["agent_frame_gap_ms"]))
+    cpu = result["cpu"]
+    print(f"  CPU: {cpu['cpu_s']}s over {cpu['wall_s']}s ({cpu['cpu_utilization'] * 100:.1f}% of a core), "
+          f"{cpu['cpu_ms_per_call_second']} ms/call-second, peak RSS {cpu['max_rss_mb']} MB")
+    print(f"  Upstreams: {result['upstreams']}")
+
+
+def check_thresholds(result: dict, args) -> List[str]:
+    """Regression gates; empty list = pass"""
+    failures = []
+    p95 = result["turn_latency_ms"].get("p95")
+    if args.max_p95_ms and (p95 is None or p95 > args.max_p95_ms):
+        failures.append(f"turn latency p95 {p95} ms > {args.max_p95_ms} ms")
+    lag_p99 = result["event_loop_lag_ms"].get("p99")
+    if args.max_loop_lag_ms and lag_p99 is not None and lag_p99 > args.max_loop_lag_ms:
+        failures.append(f"event-loop lag p99 {lag_p99} ms > {args.max_loop_lag_ms} ms")
+    if result["turns_unanswered"]:
+        failures.append(f"{result['turns_unanswered']} turns got no agent audio")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Concurrent-call latency benchmark")
+    parser.add_argument("--calls", type=int, default=10, help="Concurrent calls")
+    parser.add_argument("--turns", type=int, default=4, help="Caller turns per call")
+    parser.add_argument("--ramp-ms", type=int, default=50, help="Delay between call starts")
+    parser.add_argument("--audio", help="Caller recording (WAV or raw 8kHz mulaw); synthetic speech if omitted")
+    parser.add_argument("--llm-provider", default="grok", choices=["grok", "openai", "groq"])
+    parser.add_argument("--model", default="grok-3-mini")
+    parser.add_argument("--stt-endpoint-ms", type=int, default=360, help="Fake Soniox silence before <end>")
+    parser.add_argument("--tts-ttfb-ms", type=int, default=150, help="Fake ElevenLabs time to first audio")
+    parser.add_argument("--llm-ttft-ms", type=int, default=250, help="Fake LLM time to first token")
+    parser.add_argument("--multiplex", action="store_true", help="Use shared multi-context TTS sockets")
+    parser.add_argument("--early-turn", action="store_true", help="Start the LLM on the local VAD's probable end of turn")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if caller turn latency p95 exceeds this")
+    parser.add_argument("--max-loop-lag-ms", type=float, help="Fail if event-loop lag p99 exceeds this")
+    parser.add_argument("--json", help="Write the full result to this file")
+    parser.add_argument("--keep-data", action="store_true", help="Don't delete seeded keys / call logs")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+
+    started = time.time()
+    result = asyncio.run(run_load(args))
+    result["duration_s"] = round(time.time() - started, 1)
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failures = check_thresholds(result, args)
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
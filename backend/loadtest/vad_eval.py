@@ -0,0 +1,166 @@
+"""
+Offline evaluation of early end-of-turn detection on recorded call audio
+
+Feeds caller-channel recordings (WAV or raw 8kHz mulaw) frame by frame through
+EndOfTurnDetector for a sweep of silence thresholds and reports, per setting:
+
+- true early triggers and the time saved versus the provider endpoint
+  (reference end of turn + --provider-endpoint-ms, e.g. the stt span p50 from
+  turn_metrics)
+- false early triggers: fired in a pause that wasn't a turn end (the caller
+  went on speaking)
+- turns with no early trigger at all
+
+Reference turn ends come from a labels file ({"call1.wav": [3.42, 9.87, ...]},
+seconds) or, without labels, from the recording itself: the last speech frame
+before a pause of at least --turn-gap-ms.
+
+The transcript check is skipped here (no STT offline), so false-trigger rates
+are an upper bound of what the live detector does.
+
+Run: cd backend && python -m loadtest.vad_eval recordings/*.wav --labels labels.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from loadtest.audio import FRAME_MS, frames, load_recording
+from turn_vad import EndOfTurnDetector, StreamingVAD, PROBABLE_END_OF_TURN, SPEECH_END, SPEECH_START
+
+
+def speech_segments(mulaw: bytes) -> List[Tuple[float, float]]:
+    """(start, end) seconds of each VAD speech segment"""
+    vad = StreamingVAD()
+    segments, start = [], None
+    for i, frame in enumerate(frames(mulaw)):
+        event = vad.process(frame, (i + 1) * FRAME_MS / 1000)
+        if event == SPEECH_START:
+            start = vad.speech_started_at
+        elif event == SPEECH_END and start is not None:
+            segments.append((start, vad.last_voiced_at))
+            start = None
+    if start is not None and vad.last_voiced_at is not None:
+        segments.append((start, vad.last_voiced_at))
+    return segments
+
+
+def reference_turn_ends(segments: List[Tuple[float, float]], turn_gap_s: float) -> List[float]:
+    """A turn ends where the next segment starts at least turn_gap_s later"""
+    ends = []
+    for i, (_, end) in enumerate(segments):
+        next_start = segments[i + 1][0] if i + 1 < len(segments) else None
+        if next_start is None or next_start - end >= turn_gap_s:
+            ends.append(end)
+    return ends
+
+
+def probable_ends(mulaw: bytes, silence_ms: int, min_speech_ms: int) -> List[float]:
+    """Times (s) at which the live detector would fire, with the turn reset after each real endpoint"""
+    detector = EndOfTurnDetector(silence_ms=silence_ms, min_speech_ms=min_speech_ms, require_transcript=False)
+    fired = []
+    for i, frame in enumerate(frames(mulaw)):
+        ts = (i + 1) * FRAME_MS / 1000
+        event = detector.process(frame, ts)
+        if event == PROBABLE_END_OF_TURN:
+            fired.append(ts)
+            # In a call the provider endpoint would follow and reset the turn
+            detector.reset_turn()
+    return fired
+
+
+def evaluate(
+    recording: bytes,
+    turn_ends: List[float],
+    segments: List[Tuple[float, float]],
+    silence_ms: int,
+    min_speech_ms: int,
+    provider_endpoint_s: float,
+) -> Dict:
+    triggers = probable_ends(recording, silence_ms, min_speech_ms)
+    speech_starts = [start for start, _ in segments]
+    saved, false_triggers, hit_turns = [], 0, set()
+
+    for t in triggers:
+        # True trigger: a turn ended before it and the caller hasn't spoken since
+        previous = [end for end in turn_ends if end <= t]
+        turn_end = previous[-1] if previous else None
+        if turn_end is None or any(turn_end < start <= t for start in speech_starts):
+            false_triggers += 1  # fired in a mid-turn pause
+            continue
+        if turn_end in hit_turns:
+            continue
+        hit_turns.add(turn_end)
+        saved.append((turn_end + provider_endpoint_s - t) * 1000)
+
+    return {
+        "turns": len(turn_ends),
+        "triggers": len(triggers),
+        "true_triggers": len(saved),
+        "false_triggers": false_triggers,
+        "missed_turns": len(turn_ends) - len(hit_turns),
+        "saved_ms": saved,
+    }
+
+
+def merge(results: List[Dict]) -> Dict:
+    merged = {key: sum(r[key] for r in results) for key in ("turns", "triggers", "true_triggers", "false_triggers", "missed_turns")}
+    saved = [ms for r in results for ms in r["saved_ms"]]
+    merged["false_trigger_rate"] = round(merged["false_triggers"] / merged["triggers"], 3) if merged["triggers"] else 0.0
+    merged["saved_ms_mean"] = round(statistics.mean(saved), 1) if saved else 0.0
+    merged["saved_ms_median"] = round(statistics.median(saved), 1) if saved else 0.0
+    # Net effect per turn: time saved on hits; a false trigger only costs wasted LLM tokens
+    merged["saved_ms_per_turn"] = round(sum(saved) / merged["turns"], 1) if merged["turns"] else 0.0
+    return merged
+
+
+def load_labels(path: Optional[str]) -> Dict[str, List[float]]:
+    if not path:
+        return {}
+    with open(path) as f:
+        return {os.path.basename(k): sorted(v) for k, v in json.load(f).items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.vad_eval", description=__doc__.split("\n")[1])
+    parser.add_argument("recordings", nargs="+", help="Caller-channel WAV or raw 8kHz mulaw files")
+    parser.add_argument("--labels", help="JSON {filename: [turn end seconds]}")
+    parser.add_argument("--silence-ms", default="200,250,300,400,500", help="Comma separated thresholds to sweep")
+    parser.add_argument("--min-speech-ms", type=int, default=200)
+    parser.add_argument("--provider-endpoint-ms", type=int, default=700, help="Provider <end> delay after speech end")
+    parser.add_argument("--turn-gap-ms", type=int, default=1000, help="Pause that separates turns")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    labels = load_labels(args.labels)
+    turn_gap_s = args.turn_gap_ms / 1000
+    audio = {}
+    for path in args.recordings:
+        recording = load_recording(path)
+        segments = speech_segments(recording)
+        ends = labels.get(os.path.basename(path)) or reference_turn_ends(segments, turn_gap_s)
+        audio[path] = (recording, segments, ends)
+
+    report = {}
+    print(f"{'silence':>8} {'turns':>6} {'trig':>6} {'true':>6} {'false':>6} {'false%':>7} {'missed':>7} {'saved mean':>11} {'saved med':>10} {'saved/turn':>11}")
+    for silence_ms in [int(v) for v in args.silence_ms.split(",") if v.strip()]:
+        results = [
+            evaluate(recording, ends, segments, silence_ms, args.min_speech_ms,
+                     args.provider_endpoint_ms / 1000)
+            for recording, segments, ends in audio.values()
+        ]
+        row = report[silence_ms] = merge(results)
+        print(f"{silence_ms:>6}ms {row['turns']:>6} {row['triggers']:>6} {row['true_triggers']:>6} {row['false_triggers']:>6} "
+              f"{row['false_trigger_rate'] * 100:>6.1f}% {row['missed_turns']:>7} {row['saved_ms_mean']:>9}ms "
+              f"{row['saved_ms_median']:>8}ms {row['saved_ms_per_turn']:>9}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
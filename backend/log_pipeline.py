@@ -0,0 +1,233 @@
+"""
+Non-blocking Logging
+Moves log I/O off the event loop and keeps per-packet / per-token logging
+on the media hot paths from costing every call.
+
+- Root logging goes through a QueueHandler into a bounded queue; a
+  QueueListener thread formats and writes. When the queue is full the
+  record is dropped and counted, never blocking the loop
+- Records with plain (immutable) %-args are formatted on the listener
+  thread; structured fields are rendered only for records that are emitted
+- Hot-path call sites log through call_log_control.hot(): one in
+  LOG_HOT_SAMPLE_EVERY events per call is logged, unless verbose logging has
+  been switched on for that call_id at runtime (POST /api/debug/log-verbosity)
+- Flags set on other workers are read by a background refresher (one batched
+  lookup per VERBOSE_POLL_SECONDS, off the loop); hot() only reads a cached set
+"""
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_HOT_SAMPLE_EVERY = int(os.environ.get("LOG_HOT_SAMPLE_EVERY", "50"))
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# How often the calls' runtime verbosity flags are re-read from the shared store
+VERBOSE_POLL_SECONDS = 2.0
+VERBOSE_DEFAULT_TTL = 600
+
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class Fields:
+    """Structured key=value fields; callables are only evaluated if the record is emitted"""
+    __slots__ = ("items",)
+
+    def __init__(self, items: Dict):
+        self.items = items
+
+    def render(self) -> str:
+        return " ".join(f"{k}={v() if callable(v) else v}" for k, v in self.items.items())
+
+
+class StructuredFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text = f"{text} | {fields}"
+        return text
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record and counts it"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, Fields):
+            record.fields = fields.render()  # on the caller: callables may read live state
+        args = record.args
+        if record.exc_info or record.stack_info or (args and not (
+                isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE_ARGS) for a in args))):
+            # Tracebacks and mutable args must be rendered now, while they're still accurate
+            record.msg = record.getMessage()
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.args = None
+            record.exc_info = None
+            record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Owns the root queue handler and the listener thread that does the writing"""
+
+    def __init__(self):
+        self.handler: Optional[DroppingQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+
+    def configure(self, level: int = logging.INFO, fmt: str = LOG_FORMAT, stream=None,
+                  queue_size: int = LOG_QUEUE_SIZE) -> DroppingQueueHandler:
+        """Replace the root handlers with the queue (call once, like logging.basicConfig)"""
+        self.stop()
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(StructuredFormatter(fmt))
+        self.handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.listener = QueueListener(self.handler.queue, output, respect_handler_level=True)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        self.listener.start()
+        atexit.register(self.stop)
+        return self.handler
+
+    def stop(self):
+        """Flush what's queued and stop the listener thread"""
+        if self.listener is not None:
+            try:
+                self.listener.stop()
+            except Exception:
+                pass
+            self.listener = None
+
+    def get_stats(self) -> dict:
+        if self.handler is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "queue_depth": self.handler.queue.qsize(),
+            "queue_size": self.handler.queue.maxsize,
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+        }
+
+
+class CallLogControl:
+    """Per-call sampling and runtime verbosity for hot-path log sites"""
+
+    def __init__(self, sample_every: int = LOG_HOT_SAMPLE_EVERY):
+        self.sample_every = max(1, sample_every)
+        self._verbose: Dict[str, float] = {}          # call_id → expires_at (set on this worker)
+        self._shared_verbose: Set[str] = set()        # verbose per the shared store, as of the last refresh
+        self._counters: Dict[str, int] = {}
+        # Shared flag lookup (e.g. Redis) so verbosity set on any worker reaches the call's worker:
+        # given the call_ids logging here, returns the verbose ones. Blocking; only called by refresh()
+        self.flag_source: Optional[Callable[[List[str]], Iterable[str]]] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.stats = {"emitted": 0, "sampled_out": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def set_verbose(self, call_id: str, enabled: bool = True, ttl: int = VERBOSE_DEFAULT_TTL):
+        if enabled:
+            self._verbose[call_id] = time.time() + ttl
+        else:
+            self._verbose.pop(call_id, None)
+            self._shared_verbose.discard(call_id)
+
+    def is_verbose(self, call_id: str) -> bool:
+        expires = self._verbose.get(call_id)
+        if expires:
+            if expires > time.time():
+                return True
+            del self._verbose[call_id]
+        return call_id in self._shared_verbose
+
+    def refresh(self, call_ids: Optional[List[str]] = None):
+        """Re-read the shared verbosity flags of the calls logging on this worker (blocking)"""
+        call_ids = list(self._counters) if call_ids is None else call_ids
+        if self.flag_source is None or not call_ids:
+            self._shared_verbose = set()
+            return
+        try:
+            self._shared_verbose = set(self.flag_source(call_ids))
+        except Exception:
+            self.stats["refresh_errors"] += 1     # keep the last known flags
+            return
+        self.stats["refreshes"] += 1
+
+    async def start(self, interval: float = VERBOSE_POLL_SECONDS):
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(interval))
+
+    async def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._refresher = None
+
+    async def _refresh_loop(self, interval: float):
+        while True:
+            # Snapshot the call_ids on the loop; only the lookup runs in the thread
+            await asyncio.to_thread(self.refresh, list(self._counters))
+            await asyncio.sleep(interval)
+
+    def should_log(self, call_id: str) -> bool:
+        if self.is_verbose(call_id):
+            return True
+        n = self._counters.get(call_id, 0)
+        self._counters[call_id] = n + 1
+        if n % self.sample_every == 0:
+            return True
+        self.stats["sampled_out"] += 1
+        return False
+
+    def hot(self, logger: logging.Logger, call_id: str, msg: str, *args, level: int = logging.INFO, **fields):
+        """Log a per-packet/per-token event: sampled per call, everything when the call is verbose
+
+        Pass values as %-args or fields (callables are fine), not a pre-built f-string,
+        so skipped events cost a counter increment and nothing else.
+        """
+        if not logger.isEnabledFor(level) or not self.should_log(call_id):
+            return
+        self.stats["emitted"] += 1
+        logger.log(level, msg, *args, extra={"call_id": call_id, "fields": Fields(fields) if fields else None})
+
+    def end_call(self, call_id: str):
+        self._counters.pop(call_id, None)
+        self._shared_verbose.discard(call_id)
+
+    def get_stats(self) -> dict:
+        now = time.time()
+        return {
+            **self.stats,
+            "sample_every": self.sample_every,
+            "verbose_calls": [cid for cid, exp in self._verbose.items() if exp > now],
+        }
+
+
+# Global log pipeline and per-call log control instances
+log_pipeline = LogPipeline()
+call_log_control = CallLogControl()
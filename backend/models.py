@@ -279,6 +279,8 @@ class KnowledgeBaseItem(BaseModel):
     content: str  # extracted text content
     description: Optional[str] = None  # What this KB contains - helps agent know when to use it
     file_size: int = 0  # size in bytes
+    source_sha256: Optional[str] = None  # hash of the uploaded bytes (re-uploads are no-ops)
+    content_sha256: Optional[str] = None  # hash of the extracted text (same document, different file)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
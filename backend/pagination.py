@@ -0,0 +1,165 @@
+"""
+Keyset Pagination
+Shared paging for list endpoints (/call-history, /agents, /crm/leads) that
+used to run count_documents + skip/limit over full documents.
+
+- Pages are keyset ranges on (created_at, id), newest first; the position
+  is an opaque cursor, so page N costs the same as page 1
+- Each collection has a summary projection for list views; full documents
+  come from the per-item detail endpoints (or view=full)
+- Totals are estimates from a short-lived cached count per query instead
+  of a count_documents on every page
+- Compound (user_id, created_at, id) indexes back every list query
+"""
+import base64
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGINATION_DEFAULT_LIMIT = 50
+PAGINATION_MAX_LIMIT = int(os.environ.get("PAGINATION_MAX_LIMIT", "500"))
+
+# Seconds a cached total is served before it's recounted
+PAGINATION_COUNT_TTL = float(os.environ.get("PAGINATION_COUNT_TTL", "60"))
+PAGINATION_COUNT_CACHE_SIZE = 10_000
+
+SORT = [("created_at", -1), ("id", -1)]
+
+# Columns the list views actually render
+SUMMARY_PROJECTIONS: Dict[str, Dict[str, int]] = {
+    "call_logs": {
+        "_id": 0, "id": 1, "call_id": 1, "agent_id": 1, "direction": 1, "status": 1,
+        "from_number": 1, "to_number": 1, "duration": 1, "cost": 1, "sentiment": 1,
+        "end_reason": 1, "start_time": 1, "end_time": 1, "created_at": 1,
+    },
+    "agents": {
+        "_id": 0, "id": 1, "name": 1, "description": 1, "status": 1, "agent_type": 1,
+        "voice": 1, "language": 1, "model": 1, "stats": 1, "created_at": 1, "updated_at": 1,
+    },
+    "leads": {
+        "_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1, "source": 1, "status": 1,
+        "tags": 1, "category": 1, "campaign_id": 1, "last_agent_name": 1,
+        "commitment_score": 1, "conversion_score": 1, "show_up_probability": 1,
+        "total_calls": 1, "total_appointments": 1, "last_contact": 1,
+        "created_at": 1, "updated_at": 1,
+    },
+}
+
+
+class InvalidCursor(ValueError):
+    """Cursor that wasn't issued by fetch_page (or was tampered with)"""
+
+
+def encode_cursor(created_at, item_id: str) -> str:
+    if isinstance(created_at, datetime):
+        stamp = {"d": created_at.isoformat()}
+    else:
+        stamp = {"s": created_at}  # legacy rows with a string created_at
+    payload = json.dumps({**stamp, "i": item_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, str]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(payload["d"]) if "d" in payload else payload["s"]
+        return created_at, str(payload["i"])
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor[:40]}") from e
+
+
+def keyset_query(query: Dict, cursor: Optional[str]) -> Dict:
+    """`query` restricted to items after `cursor` in SORT order"""
+    if not cursor:
+        return query
+    created_at, item_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": item_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    return max(1, min(limit or PAGINATION_DEFAULT_LIMIT, PAGINATION_MAX_LIMIT))
+
+
+async def fetch_page(collection, query: Dict, limit: Optional[int] = None, cursor: Optional[str] = None,
+                     projection: Optional[Dict] = None) -> Tuple[List[Dict], Optional[str]]:
+    """(items, next_cursor); next_cursor is None on the last page"""
+    limit = clamp_limit(limit)
+    if projection and any(v for k, v in projection.items() if k != "_id"):
+        projection = {**projection, "id": 1, "created_at": 1}  # the cursor needs them
+    docs = await collection.find(keyset_query(query, cursor), projection).sort(SORT).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get("created_at"), last.get("id"))
+    return docs, next_cursor
+
+
+class EstimatedCounter:
+    """count_documents results cached per (collection, query) for PAGINATION_COUNT_TTL"""
+
+    def __init__(self, ttl: float = PAGINATION_COUNT_TTL, max_entries: int = PAGINATION_COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self.stats = {"hits": 0, "counts": 0}
+
+    @staticmethod
+    def _key(collection, query: Dict) -> str:
+        return f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+
+    async def count(self, collection, query: Dict) -> int:
+        key = self._key(collection, query)
+        cached = self._cache.get(key)
+        if cached and time.time() - cached[0] < self.ttl:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[1]
+        total = await collection.count_documents(query)
+        self.stats["counts"] += 1
+        self._cache[key] = (time.time(), total)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return total
+
+    def invalidate(self, collection_name: str, user_id: Optional[str] = None):
+        """Drop cached totals for a collection (optionally one tenant's) after a bulk change"""
+        prefix = f"{collection_name}:"
+        needle = f'"user_id": "{user_id}"' if user_id else None
+        for key in [k for k in self._cache if k.startswith(prefix) and (needle is None or needle in k)]:
+            del self._cache[key]
+
+
+async def paginate(collection, query: Dict, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   view: str = "summary") -> Dict:
+    """Page envelope shared by the list endpoints"""
+    projection = SUMMARY_PROJECTIONS.get(collection.name) if view == "summary" else {"_id": 0}
+    items, next_cursor = await fetch_page(collection, query, limit, cursor, projection)
+    total = await estimated_counter.count(collection, query)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": total,
+        "total_is_estimate": True,
+        "limit": clamp_limit(limit),
+    }
+
+
+async def ensure_pagination_indexes(db):
+    for name in SUMMARY_PROJECTIONS:
+        await db[name].create_index([("user_id", 1), ("created_at", -1), ("id", -1)], name="user_created_id")
+
+
+# Global estimated counter instance
+estimated_counter = EstimatedCounter()
@@ -27,7 +27,7 @@ class ParallelLLMTeam:
     async def _ensure_clients(self):
         """Ensure LLM clients are initialized"""
         if not self.grok_client:
-            import openai
+            from llm_client_pool import llm_client_pool
             # Get Grok API key from session
             try:
                 grok_key = await self.session.get_api_key("grok")
@@ -35,11 +35,8 @@ class ParallelLLMTeam:
                 logger.error(f"Failed to get Grok API key: {e}")
                 return None
             
-            # Create OpenAI client with xAI base URL for Grok
-            self.grok_client = openai.AsyncOpenAI(
-                api_key=grok_key,
-                base_url="https://api.x.ai/v1"
-            )
+            # Reuse the tenant's pooled Grok client (shared HTTP/2 transport)
+            self.grok_client = llm_client_pool.get_client("grok", grok_key)
     
     async def _call_llm(self, messages: List[Dict], model: str = "grok-4-fast-non-reasoning", 
                        temperature: float = 0.3, max_tokens: int = 200) -> str:
@@ -8,8 +8,6 @@ import base64
 import json
 import logging
 import time
-import hashlib
-import subprocess
 import os
 import re
 from typing import Optional, Dict, Callable, Any
@@ -18,6 +16,11 @@ import audioop
 from elevenlabs_ws_service import ElevenLabsWebSocketService
 from maya_tts_service import MayaTTSService
 from voice_library_router import load_voice_sample
+from tts_multiplexer import tts_multiplexer, is_multiplex_enabled
+from turn_tracing import turn_tracer
+from log_pipeline import call_log_control
+from audio_transcoder import audio_transcoder, TranscodeError
+from playback_assets import playback_asset_store
 
 logger = logging.getLogger(__name__)
 
@@ -213,6 +216,7 @@ class PersistentTTSSession:
                         # 🔥 TIMING: Log when first audio chunk arrives from ElevenLabs
                         if is_first_chunk:
                             first_chunk_time = time.time()
+                            turn_tracer.mark(self.call_control_id, "tts_first_byte", first_chunk_time)
                             logger.info(f"📊 [REAL TIMING] ElevenLabs FIRST AUDIO CHUNK received (chunk #{chunk_count}, {len(audio_bytes)} bytes)")
                         
                         # Forward to playback queue immediately (unless interrupted)
@@ -361,7 +365,8 @@ class PersistentTTSSession:
         sentence: str,
         is_first: bool = False,
         is_last: bool = False,
-        current_voice_id: str = None
+        current_voice_id: str = None,
+        prepared_audio: Optional[bytes] = None
     ) -> bool:
         """
         Stream a sentence through the persistent WebSocket
@@ -372,6 +377,8 @@ class PersistentTTSSession:
             is_first: If True, this is the first sentence of the response
             is_last: If True, this is the last sentence and should flush
             current_voice_id: If provided, check if voice has changed and reconnect if needed
+            prepared_audio: Speculatively pre-synthesized mulaw for this sentence (speculation.py);
+                played directly, ElevenLabs is not asked for it
             
         Returns:
             bool: True if streaming started successfully
@@ -399,6 +406,9 @@ class PersistentTTSSession:
             logger.info(f"🛑 [Call {self.call_control_id}] Skipping mid-response sentence '{sentence[:30]}...' - interrupted flag set")
             return False
         
+        if prepared_audio:
+            return await self._play_prepared(sentence, prepared_audio, is_first)
+        
         # 🔒 CRITICAL: Acquire lock to serialize WebSocket access
         # This prevents concurrent recv() calls which cause "cannot call recv while another coroutine is already waiting" errors
         async with self._stream_lock:
@@ -420,7 +430,7 @@ class PersistentTTSSession:
                 if sentence_num == 1 and self.request_start_time is None:
                     self.request_start_time = time.time()
                 
-                logger.info(f"🎤 [Call {self.call_control_id}] Streaming sentence #{sentence_num}: {sentence[:50]}...")
+                call_log_control.hot(logger, self.call_control_id, "🎤 [Call %s] Streaming sentence #%d: %s...", self.call_control_id, sentence_num, sentence[:50])
                 
                 # 🔥 CRITICAL FIX: Precise state tracking (User Requested)
                 # Mark as waiting for audio immediately. This flag will be checked by dead_air_monitor
@@ -435,6 +445,8 @@ class PersistentTTSSession:
                 
                 stream_start = time.time()
                 
+                turn_tracer.mark(self.call_control_id, "tts_request", stream_start)
+                
                 # Send text to ElevenLabs for synthesis
                 await self.ws_service.send_text(
                     text=sentence,
@@ -453,8 +465,8 @@ class PersistentTTSSession:
                 # The continuous _audio_receiver_loop will pick up all audio chunks
                 # and forward them to playback. No need to track per-sentence.
                 send_time_ms = int((time.time() - stream_start) * 1000)
-                logger.info(f"🚀 [Call {self.call_control_id}] Sent sentence #{sentence_num} to ElevenLabs in {send_time_ms}ms (non-blocking)")
-                logger.info(f"📊 [REAL TIMING] TEXT SENT TO ELEVENLABS: '{sentence[:50]}...'")
+                call_log_control.hot(logger, self.call_control_id, "🚀 [Call %s] Sent sentence #%d to ElevenLabs in %dms (non-blocking)", self.call_control_id, sentence_num, send_time_ms)
+                call_log_control.hot(logger, self.call_control_id, "📊 [REAL TIMING] TEXT SENT TO ELEVENLABS: '%s...'", sentence[:50])
                 
                 return True
                 
@@ -462,6 +474,32 @@ class PersistentTTSSession:
                 logger.error(f"❌ [Call {self.call_control_id}] Error streaming sentence: {e}")
                 return False
     
+    async def _play_prepared(self, sentence: str, audio_data: bytes, is_first: bool) -> bool:
+        """
+        Queue pre-synthesized audio for a sentence (speculative opening hit)
+        Same floor/wait-state bookkeeping as a live sentence, minus the ElevenLabs round trip
+        """
+        self.sentence_counter += 1
+        if self.request_start_time is None:
+            self.request_start_time = time.time()
+        self.is_waiting_for_first_audio_of_response = True
+        self.is_holding_floor = True
+        self.is_speaking = True
+        
+        now = time.time()
+        turn_tracer.mark(self.call_control_id, "tts_request", now)
+        turn_tracer.mark(self.call_control_id, "tts_first_byte", now)
+        await self.audio_queue.put({
+            'sentence': sentence,
+            'audio_data': audio_data,
+            'format': 'mulaw',
+            'sentence_num': self.sentence_counter,
+            'is_first': is_first,
+            'received_at': now
+        })
+        logger.info(f"🔮 [Call {self.call_control_id}] Sentence #{self.sentence_counter} served from prepared audio ({len(audio_data)} bytes): {sentence[:50]}...")
+        return True
+    
     async def _playback_consumer(self):
         """
         Background task that consumes audio from queue and plays immediately
@@ -535,55 +573,32 @@ class PersistentTTSSession:
             if not audio_pcm: 
                 return
 
-            logger.info(f"⏱️ [TIMING] PLAYBACK_START: Processing sentence #{sentence_num} ({len(audio_pcm)} bytes PCM)")
-            
-            # Generate unique filename
-            audio_hash = hashlib.md5(f"{sentence_num}_{sentence}".encode()).hexdigest()
-            pcm_path = f"/tmp/tts_persistent_{self.call_control_id}_{audio_hash}.pcm"
-            mp3_path = f"/tmp/tts_persistent_{self.call_control_id}_{audio_hash}.mp3"
-            
-            # Save PCM
-            pcm_save_start = time.time()
-            with open(pcm_path, 'wb') as f:
-                f.write(audio_pcm)
-            pcm_save_ms = int((time.time() - pcm_save_start) * 1000)
-            logger.info(f"⏱️ [TIMING] PLAYBACK_PCM_SAVE: {pcm_save_ms}ms")
-            
-            # Convert PCM to MP3 (fast - ~50ms)
-            conversion_start = time.time()
-            subprocess.run([
-                'ffmpeg',
-                '-f', 's16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-i', pcm_path,
-                '-b:a', '64k',
-                '-y',
-                mp3_path
-            ], check=True, capture_output=True, timeout=5)
+            call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_START: Processing sentence #%d (%d bytes PCM)", sentence_num, len(audio_pcm))
             
-            conversion_time = (time.time() - conversion_start) * 1000
-            logger.info(f"⏱️ [TIMING] PLAYBACK_FFMPEG: {conversion_time:.0f}ms")
-            
-            # Clean up PCM
-            os.remove(pcm_path)
+            # Generate unique filename (only needed for REST playback URL)
+            audio_filename = playback_asset_store.hashed_name(
+                "tts_persistent", f"{self.call_control_id}_{sentence_num}_{sentence}", ".mp3")
             
             # Play via Telnyx
             # Check if using WebSocket streaming (preferred) or REST API
             if self.telnyx_ws:
                 # 🚀 WebSocket streaming mode - send audio via WebSocket
-                logger.info(f"🔌 Using WebSocket streaming for audio playback")
+                call_log_control.hot(logger, self.call_control_id, "🔌 Using WebSocket streaming for audio playback")
+                
+                # Convert PCM 16kHz → mulaw 8kHz in-process (no ffmpeg, no temp files)
+                mulaw_data = audio_transcoder.pcm_to_mulaw(audio_pcm, 16000, label="persistent_pcm_to_mulaw")
                 
                 telnyx_start = time.time()
-                success = await self._send_audio_via_websocket(mp3_path=mp3_path)
+                success = await self._send_audio_via_websocket(audio_data=mulaw_data)
                 telnyx_ms = int((time.time() - telnyx_start) * 1000)
-                logger.info(f"⏱️ [TIMING] PLAYBACK_TELNYX_WS: {telnyx_ms}ms")
+                call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_TELNYX_WS: %dms", telnyx_ms)
                 
                 total_time = (time.time() - play_start) * 1000
-                logger.info(f"⏱️ [TIMING] PLAYBACK_TOTAL: {total_time:.0f}ms")
+                call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_TOTAL: %.0fms", total_time)
                 
                 if success:
-                    logger.info(f"🔊 [Call {self.call_control_id}] Sentence #{sentence_num} SENT VIA WEBSOCKET ({total_time:.0f}ms total): {sentence[:50]}...")
+                    call_log_control.hot(logger, self.call_control_id, "🔊 [Call %s] Sentence #%d SENT VIA WEBSOCKET (%.0fms total): %s...",
+                                         self.call_control_id, sentence_num, total_time, sentence[:50])
                     
                     if is_first:
                         logger.info(f"⏱️ [TIMING] FIRST_AUDIO_PLAYING: First sentence started playing on phone")
@@ -618,9 +633,16 @@ class PersistentTTSSession:
                     
             elif self.telnyx_service:
                 # 🔄 REST API mode - use play_audio_url (legacy)
-                logger.info(f"🔄 Using REST API for audio playback")
+                call_log_control.hot(logger, self.call_control_id, "🔄 Using REST API for audio playback")
+                
+                # Convert PCM to MP3 via async ffmpeg pipes, then store it for /api/tts-audio
+                conversion_start = time.time()
+                mp3_bytes = await audio_transcoder.pcm_to_mp3(audio_pcm, 16000, label="persistent_pcm_to_mp3")
+                playback_asset_store.put(audio_filename, mp3_bytes)
+                call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_FFMPEG: %.0fms", (time.time() - conversion_start) * 1000)
+                
                 backend_url = os.environ.get('BACKEND_URL', 'http://localhost:8001')
-                audio_url = f"{backend_url}/api/tts-audio/{os.path.basename(mp3_path)}"
+                audio_url = playback_asset_store.url(audio_filename, backend_url)
                 
                 telnyx_start = time.time()
                 playback_result = await self.telnyx_service.play_audio_url(
@@ -628,13 +650,14 @@ class PersistentTTSSession:
                     audio_url=audio_url
                 )
                 telnyx_ms = int((time.time() - telnyx_start) * 1000)
-                logger.info(f"⏱️ [TIMING] PLAYBACK_TELNYX_REST: {telnyx_ms}ms")
+                call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_TELNYX_REST: %dms", telnyx_ms)
                 
                 total_time = (time.time() - play_start) * 1000
-                logger.info(f"⏱️ [TIMING] PLAYBACK_TOTAL: {total_time:.0f}ms")
+                call_log_control.hot(logger, self.call_control_id, "⏱️ [TIMING] PLAYBACK_TOTAL: %.0fms", total_time)
                 
                 if playback_result.get('success'):
-                    logger.info(f"🔊 [Call {self.call_control_id}] Sentence #{sentence_num} PLAYING ({total_time:.0f}ms total): {sentence[:50]}...")
+                    call_log_control.hot(logger, self.call_control_id, "🔊 [Call %s] Sentence #%d PLAYING (%.0fms total): %s...",
+                                         self.call_control_id, sentence_num, total_time, sentence[:50])
                     
                     if is_first:
                         logger.info(f"⏱️ [TIMING] FIRST_AUDIO_PLAYING: First sentence started playing on phone")
@@ -642,8 +665,8 @@ class PersistentTTSSession:
                 else:
                     logger.error(f"❌ [Call {self.call_control_id}] Failed to play sentence #{sentence_num}")
             
-        except subprocess.TimeoutExpired:
-            logger.error(f"❌ [Call {self.call_control_id}] ffmpeg timeout for sentence #{sentence_num}")
+        except TranscodeError as e:
+            logger.error(f"❌ [Call {self.call_control_id}] ffmpeg failed for sentence #{sentence_num}: {e}")
         except Exception as e:
             logger.error(f"❌ [Call {self.call_control_id}] Error playing sentence #{sentence_num}: {e}")
     
@@ -658,28 +681,15 @@ class PersistentTTSSession:
                 mulaw_data = audio_data
             
             elif mp3_path:
-                # 🐢 SLOW PATH: Convert MP3 to mulaw
-                mulaw_path = mp3_path.replace('.mp3', '.mulaw')
-                
-                conversion_result = subprocess.run([
-                    'ffmpeg',
-                    '-i', mp3_path,
-                    '-ar', '8000',        # 8kHz sample rate
-                    '-ac', '1',           # Mono
-                    '-f', 'mulaw',        # mulaw codec
-                    '-y',
-                    mulaw_path
-                ], check=True, capture_output=True, timeout=5)
+                # 🐢 SLOW PATH: Convert MP3 to mulaw (async ffmpeg pipes, no temp mulaw file)
+                with open(mp3_path, 'rb') as f:
+                    mp3_data = f.read()
                 
-                logger.info(f"✅ Converted MP3 to mulaw: {mulaw_path}")
+                mulaw_data = await audio_transcoder.to_mulaw(mp3_data, label="persistent_mp3_to_mulaw")
+                call_log_control.hot(logger, self.call_control_id, "✅ Converted MP3 to mulaw: %d bytes", len(mulaw_data))
                 
-                # Read mulaw audio data
-                with open(mulaw_path, 'rb') as f:
-                    mulaw_data = f.read()
-                
-                # Clean up files
+                # Clean up file
                 os.remove(mp3_path)
-                os.remove(mulaw_path)
             
             else:
                 return False
@@ -691,7 +701,8 @@ class PersistentTTSSession:
             # 🔥 Calculate ACTUAL audio duration from mulaw data size
             # At 8kHz sample rate with mulaw (1 byte per sample):
             actual_duration_seconds = len(mulaw_data) / 8000.0
-            logger.info(f"📤 Sending {len(mulaw_data)} bytes of audio ({total_chunks} chunks, {actual_duration_seconds:.1f}s duration) via WebSocket")
+            call_log_control.hot(logger, self.call_control_id, "📤 Sending %d bytes of audio (%d chunks, %.1fs duration) via WebSocket",
+                                 len(mulaw_data), total_chunks, actual_duration_seconds)
             
             # 🔊 SINGLE SOURCE OF TRUTH: Mark agent as speaking BEFORE sending audio
             self.is_speaking = True
@@ -726,7 +737,8 @@ class PersistentTTSSession:
                 self.is_speaking = True
                 
                 time_until_end = new_expected_end - current_time
-                logger.info(f"⏱️ EXTEND playback_expected_end_time: +{actual_duration_seconds:.1f}s (total: {time_until_end:.1f}s from now)")
+                call_log_control.hot(logger, self.call_control_id, "⏱️ EXTEND playback_expected_end_time: +%.1fs (total: %.1fs from now)",
+                                     actual_duration_seconds, time_until_end)
             
             first_chunk_sent = False
             send_start_time = time.time()
@@ -765,6 +777,7 @@ class PersistentTTSSession:
                 # 🔥 TIMING: Log when FIRST chunk is sent to Telnyx
                 if not first_chunk_sent:
                     first_chunk_time = time.time()
+                    turn_tracer.mark(self.call_control_id, "first_audio_sent", first_chunk_time)
                     logger.info(f"📊 [REAL TIMING] FIRST AUDIO CHUNK SENT TO TELNYX at {first_chunk_time:.3f} (chunk 1/{total_chunks}, {len(chunk)} bytes)")
                     first_chunk_sent = True
                 
@@ -776,9 +789,10 @@ class PersistentTTSSession:
             # 🔥 TIMING: Log when ALL chunks are sent
             send_end_time = time.time()
             send_duration_ms = int((send_end_time - send_start_time) * 1000)
-            logger.info(f"📊 [REAL TIMING] ALL {total_chunks} CHUNKS SENT TO TELNYX in {send_duration_ms}ms (audio duration: {actual_duration_seconds:.1f}s, paced after {BURST_CHUNKS} chunks)")
+            call_log_control.hot(logger, self.call_control_id, "📊 [REAL TIMING] ALL %d CHUNKS SENT TO TELNYX in %dms (audio duration: %.1fs, paced after %d chunks)",
+                                 total_chunks, send_duration_ms, actual_duration_seconds, BURST_CHUNKS)
             
-            logger.info(f"✅ Sent {total_chunks} audio chunks via WebSocket (paced sending enabled)")
+            call_log_control.hot(logger, self.call_control_id, "✅ Sent %d audio chunks via WebSocket (paced sending enabled)", total_chunks)
             
             # 🔊 Schedule automatic is_speaking=False when audio playback is expected to finish
             # Use playback_expected_end_time as source of truth (accounts for ALL queued audio)
@@ -827,8 +841,8 @@ class PersistentTTSSession:
             
             return True
             
-        except subprocess.TimeoutExpired:
-            logger.error(f"❌ ffmpeg timeout converting to mulaw")
+        except TranscodeError as e:
+            logger.error(f"❌ ffmpeg failed converting to mulaw: {e}")
             self.is_speaking = False  # Error = not speaking
             return False
         except Exception as e:
@@ -1062,7 +1076,8 @@ class MayaPersistentSession(PersistentTTSSession):
         sentence: str,
         is_first: bool = False,
         is_last: bool = False,
-        current_voice_id: str = None
+        current_voice_id: str = None,
+        prepared_audio: Optional[bytes] = None
     ) -> bool:
         """
         Stream from Maya TTS -> Convert to Mulaw -> Send to Telnyx WS
@@ -1081,11 +1096,12 @@ class MayaPersistentSession(PersistentTTSSession):
             # We don't use 'voice_id' param from args as Maya uses self.voice_ref or self.speaker_wav
             # But if current_voice_id is passed and differs, we could update self.voice_ref
             
-            logger.info(f"🎤 [Maya] Streaming sentence: '{sentence[:30]}...'")
+            call_log_control.hot(logger, self.call_control_id, "🎤 [Maya] Streaming sentence: '%s...'", sentence[:30])
             self.is_speaking = True
             
             chunk_count = 0
             start_time = time.time()
+            turn_tracer.mark(self.call_control_id, "tts_request", start_time)
             
             stream = self.maya_service.stream_speech(
                 text=sentence,
@@ -1101,6 +1117,7 @@ class MayaPersistentSession(PersistentTTSSession):
                     break
                     
                 if chunk:
+                    turn_tracer.mark(self.call_control_id, "tts_first_byte")
                     try:
                         # Convert PCM to Mulaw with Resampling (24k -> 8k)
                         # We assume Maya outputs 24000Hz 16-bit PCM
@@ -1123,6 +1140,8 @@ class MayaPersistentSession(PersistentTTSSession):
                             }
                             await self.telnyx_ws.send_text(json.dumps(msg))
                             chunk_count += 1
+                            if chunk_count == 1:
+                                turn_tracer.mark(self.call_control_id, "first_audio_sent")
                     except Exception as e:
                         logger.error(f"Error converting/sending audio: {e}")
 
@@ -1139,6 +1158,117 @@ class MayaPersistentSession(PersistentTTSSession):
         
         return True
 
+class MultiplexedTTSSession(PersistentTTSSession):
+    """
+    Persistent TTS session backed by a context on a shared ElevenLabs
+    multi-context WebSocket (see tts_multiplexer.py)
+    No per-call socket, receiver loop or keep-alive task - the shared
+    connection routes audio for this call's context_id into audio_queue
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._mux_is_first_chunk = True
+        self._mux_chunk_count = 0
+
+    def _on_mux_audio(self, audio_bytes: Optional[bytes], is_final: bool):
+        """Called by the shared receiver for audio routed to this call's context"""
+        if is_final:
+            # Reset for next response
+            self._mux_is_first_chunk = True
+            return
+
+        self._mux_chunk_count += 1
+        if self._mux_is_first_chunk:
+            turn_tracer.mark(self.call_control_id, "tts_first_byte")
+            logger.info(f"📊 [REAL TIMING] ElevenLabs FIRST AUDIO CHUNK received via mux (chunk #{self._mux_chunk_count}, {len(audio_bytes)} bytes)")
+
+        if self.interrupted:
+            logger.debug(f"🛑 [Call {self.call_control_id}] Discarding audio chunk (interrupted)")
+            return
+
+        self.audio_queue.put_nowait({
+            'sentence': '',
+            'audio_data': audio_bytes,
+            'format': 'mulaw',
+            'sentence_num': self._mux_chunk_count,
+            'is_first': self._mux_is_first_chunk,
+            'received_at': time.time()
+        })
+        self._mux_is_first_chunk = False
+
+    async def _open_context(self) -> bool:
+        self.ws_service = await tts_multiplexer.open_context(
+            owner_id=self.call_control_id,
+            api_key=self.api_key,
+            voice_id=self.voice_id,
+            handler=self._on_mux_audio,
+            model_id=self.model_id,
+            output_format="ulaw_8000",
+            voice_settings=self.voice_settings
+        )
+        self.connected = self.ws_service is not None
+        return self.connected
+
+    async def connect(self) -> bool:
+        """
+        Attach to a shared multi-context connection
+        """
+        try:
+            logger.info(f"🔀 [Call {self.call_control_id}] Attaching to shared TTS connection...")
+            if not await self._open_context():
+                logger.error(f"❌ [Call {self.call_control_id}] Failed to attach to shared TTS connection")
+                return False
+
+            self.playback_task = asyncio.create_task(self._playback_consumer())
+
+            agent_settings = self.agent_config.get("settings", {})
+            self._enable_comfort_noise = agent_settings.get("enable_comfort_noise", False)
+            if self._enable_comfort_noise and self.telnyx_ws:
+                self._comfort_noise_task = asyncio.create_task(self._comfort_noise_loop())
+                logger.info(f"🔊 [Call {self.call_control_id}] Comfort noise loop started")
+
+            logger.info(f"✅ [Call {self.call_control_id}] Shared TTS context {self.ws_service.context_id} ready")
+            return True
+        except Exception as e:
+            logger.error(f"❌ [Call {self.call_control_id}] Error attaching to shared TTS connection: {e}")
+            return False
+
+    async def _reconnect(self) -> bool:
+        """
+        Re-attach after the shared connection died or the voice changed
+        (voice is fixed per shared connection, so a voice change moves the call to another pool)
+        """
+        logger.info(f"🔄 [Call {self.call_control_id}] Re-attaching to shared TTS connection...")
+        if self.ws_service:
+            try:
+                await self.ws_service.close()
+            except Exception:
+                pass
+        if await self._open_context():
+            logger.info(f"✅ [Call {self.call_control_id}] Shared TTS context re-attached")
+            return True
+        logger.error(f"❌ [Call {self.call_control_id}] Shared TTS re-attach failed")
+        return False
+
+    async def clear_audio(self):
+        """
+        Barge-in: cancel this call's context at ElevenLabs (other calls on the
+        shared connection are unaffected), then clear Telnyx and local queues
+        """
+        if self.ws_service:
+            self.ws_service.cancel_nowait()
+        return await super().clear_audio()
+
+    def cancel_pending_sentences(self):
+        """
+        Cancel queued audio and stop routing any audio still being generated
+        for the current context
+        """
+        if self.ws_service and not self.interrupted:
+            self.ws_service.cancel_nowait()
+        return super().cancel_pending_sentences()
+
+
 class PersistentTTSManager:
     """
     Manages persistent TTS sessions across multiple calls
@@ -1197,6 +1327,18 @@ class PersistentTTSManager:
                 telnyx_ws=telnyx_ws
             )
             logger.info(f"✨ Created Maya persistent session for call {call_control_id}")
+        elif is_multiplex_enabled():
+            session = MultiplexedTTSSession(
+                call_control_id=call_control_id,
+                api_key=api_key,
+                voice_id=voice_id,
+                model_id=model_id,
+                telnyx_service=telnyx_service,
+                agent_config=agent_config,
+                telnyx_ws=telnyx_ws,
+                voice_settings=voice_settings
+            )
+            logger.info(f"🔀 Created multiplexed TTS session for call {call_control_id}")
         else:
             session = PersistentTTSSession(
                 call_control_id=call_control_id,
@@ -1211,6 +1353,21 @@ class PersistentTTSManager:
         
         connected = await session.connect()
         
+        # Fall back to a dedicated socket if the shared connection is unavailable
+        if not connected and isinstance(session, MultiplexedTTSSession):
+            logger.warning(f"⚠️ Shared TTS connection unavailable, falling back to dedicated socket for call {call_control_id}")
+            session = PersistentTTSSession(
+                call_control_id=call_control_id,
+                api_key=api_key,
+                voice_id=voice_id,
+                model_id=model_id,
+                telnyx_service=telnyx_service,
+                agent_config=agent_config,
+                telnyx_ws=telnyx_ws,
+                voice_settings=voice_settings
+            )
+            connected = await session.connect()
+        
         if connected:
             self.sessions[call_control_id] = session
             logger.info(f"✅ Created persistent TTS session for call {call_control_id}")
@@ -0,0 +1,344 @@
+"""
+Playback Asset Store - bounded local directory for audio Telnyx plays by URL
+Replaces writing tts_*.mp3 / *.ulaw files straight into /tmp (served by a
+StaticFiles mount over the whole of /tmp and never cleaned up).
+
+- One dedicated directory; names are validated, so the route can't reach
+  anything else on disk
+- Writes are atomic (temp file + os.replace): Telnyx never fetches a partial file
+- Every put takes a lease for the playback it was written for; the
+  call.playback.ended webhook releases it (or the lease expires)
+- Files the route is streaming are referenced until the response finishes
+- Unreferenced files expire after PLAYBACK_ASSET_TTL; over the quota the
+  least recently used go first, but never anything newer than
+  PLAYBACK_ASSET_MIN_AGE (another worker may have just handed its URL to Telnyx)
+- Sweeps run on the background sweeper, in a thread; a put that crosses the
+  quota wakes it instead of scanning the directory on the caller's loop
+- Pinned assets (comfort noise) are never evicted
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLAYBACK_ASSET_DIR = os.environ.get("PLAYBACK_ASSET_DIR", "/tmp/virevo_playback")
+PLAYBACK_ASSET_QUOTA_MB = float(os.environ.get("PLAYBACK_ASSET_QUOTA_MB", "512"))
+# Unreferenced assets older than this are deleted
+PLAYBACK_ASSET_TTL = float(os.environ.get("PLAYBACK_ASSET_TTL", "3600"))
+# How long a put holds its asset if playback.ended never arrives
+PLAYBACK_ASSET_LEASE = float(os.environ.get("PLAYBACK_ASSET_LEASE", "600"))
+# Quota eviction never touches files younger than this
+PLAYBACK_ASSET_MIN_AGE = float(os.environ.get("PLAYBACK_ASSET_MIN_AGE", "120"))
+# Quota eviction frees down to this fraction, so puts don't rescan the directory each time
+PLAYBACK_ASSET_LOW_WATER = float(os.environ.get("PLAYBACK_ASSET_LOW_WATER", "0.9"))
+PLAYBACK_ASSET_SWEEP_INTERVAL = float(os.environ.get("PLAYBACK_ASSET_SWEEP_INTERVAL", "60"))
+PLAYBACK_URL_PREFIX = "/api/tts-audio"
+
+CONTENT_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".ulaw": "audio/basic",
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,199}$")
+
+
+class PlaybackAssetStore:
+    """Quota- and TTL-bounded directory of playback audio with refcounted leases"""
+
+    def __init__(self, root: str = PLAYBACK_ASSET_DIR, quota_bytes: Optional[int] = None,
+                 ttl: float = PLAYBACK_ASSET_TTL, lease: float = PLAYBACK_ASSET_LEASE,
+                 min_age: float = PLAYBACK_ASSET_MIN_AGE):
+        self.root = root
+        self.quota_bytes = int(PLAYBACK_ASSET_QUOTA_MB * 1024 * 1024) if quota_bytes is None else quota_bytes
+        self.ttl = ttl
+        self.lease = lease
+        self.min_age = min_age
+        self.bytes = 0                               # usage as of the last scan plus puts since
+        self._refs: Dict[str, int] = {}
+        self._leases: Dict[str, List[float]] = {}    # name → lease expiry times
+        self._pinned: Set[str] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._sweep_wanted: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"puts": 0, "bytes_written": 0, "served": 0, "not_found": 0,
+                      "sweeps": 0, "expired": 0, "evicted": 0, "over_quota": 0}
+
+    # ---- names and paths ----
+
+    @staticmethod
+    def valid_name(name: str) -> bool:
+        return bool(name) and _NAME_RE.match(name) is not None and ".." not in name \
+            and os.path.splitext(name)[1] in CONTENT_TYPES
+
+    @staticmethod
+    def hashed_name(prefix: str, key: str, ext: str) -> str:
+        """Valid asset name for an arbitrary key (call_control_ids contain ':')"""
+        return f"{prefix}_{hashlib.md5(key.encode()).hexdigest()}{ext}"
+
+    def path(self, name: str) -> Optional[str]:
+        """Filesystem path for an asset name, or None if the name is invalid"""
+        return os.path.join(self.root, name) if self.valid_name(name) else None
+
+    def url(self, name: str, backend_url: Optional[str] = None) -> str:
+        base = backend_url or os.environ.get("BACKEND_URL", "https://api.virevo.ai")
+        return f"{base}{PLAYBACK_URL_PREFIX}/{name}"
+
+    @staticmethod
+    def name_from_url(url: Optional[str]) -> Optional[str]:
+        """Asset name in a playback media_url, if it is one of ours"""
+        if not url or f"{PLAYBACK_URL_PREFIX}/" not in url:
+            return None
+        return url.rsplit("/", 1)[-1].split("?", 1)[0] or None
+
+    def content_type(self, name: str) -> str:
+        return CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+
+    # ---- writes ----
+
+    def put(self, name: str, data: bytes, hold: bool = True, pin: bool = False) -> str:
+        """
+        Atomically write an asset and return its name.
+        hold=True leases it for the playback about to fetch it (see release).
+        """
+        path = self.path(name)
+        if path is None:
+            raise ValueError(f"Invalid playback asset name: {name!r}")
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._written(name, len(data), hold, pin)
+        return name
+
+    def adopt(self, name: str, src_path: str, hold: bool = True, pin: bool = False) -> str:
+        """Move a file produced elsewhere in the store directory (see temp_path) into place"""
+        path = self.path(name)
+        if path is None:
+            raise ValueError(f"Invalid playback asset name: {name!r}")
+        size = os.path.getsize(src_path)
+        os.replace(src_path, path)
+        self._written(name, size, hold, pin)
+        return name
+
+    def temp_path(self, suffix: str = "") -> str:
+        """Scratch file inside the store directory, for tools that write to a path"""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=suffix)
+        os.close(fd)
+        return tmp
+
+    def _written(self, name: str, size: int, hold: bool, pin: bool):
+        self.stats["puts"] += 1
+        self.stats["bytes_written"] += size
+        self.bytes += size
+        if pin:
+            self._pinned.add(name)
+        if hold:
+            self._leases.setdefault(name, []).append(time.time() + self.lease)
+        if self.bytes > self.quota_bytes:
+            self._request_sweep()
+
+    def _request_sweep(self):
+        """Wake the background sweeper (inline sweep when it isn't running: scripts, tests)"""
+        if self._sweep_wanted is None:
+            self.sweep()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._sweep_wanted.set)
+        except RuntimeError:
+            pass  # loop closed (shutdown)
+
+    # ---- references ----
+
+    def release(self, name: Optional[str]):
+        """Drop the oldest lease on an asset (its playback ended)"""
+        leases = self._leases.get(name or "")
+        if leases:
+            leases.pop(0)
+            if not leases:
+                del self._leases[name]
+
+    def pin(self, name: str):
+        """Keep an asset that is already on disk forever (this worker won't evict it)"""
+        self._pinned.add(name)
+
+    def acquire(self, name: str):
+        self._refs[name] = self._refs.get(name, 0) + 1
+
+    def unref(self, name: str):
+        count = self._refs.get(name, 0) - 1
+        if count > 0:
+            self._refs[name] = count
+        else:
+            self._refs.pop(name, None)
+
+    @contextmanager
+    def reference(self, name: str) -> Iterator[None]:
+        self.acquire(name)
+        try:
+            yield
+        finally:
+            self.unref(name)
+
+    def in_use(self, name: str, now: Optional[float] = None) -> bool:
+        if name in self._pinned or self._refs.get(name):
+            return True
+        now = time.time() if now is None else now
+        leases = [t for t in self._leases.get(name, []) if t > now]
+        if leases:
+            self._leases[name] = leases
+            return True
+        self._leases.pop(name, None)
+        return False
+
+    # ---- reads ----
+
+    def stat(self, name: str) -> Optional[Tuple[str, os.stat_result]]:
+        """(path, stat) of an existing asset, touching it for LRU; None if unknown/invalid"""
+        path = self.path(name)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.stats["not_found"] += 1
+            return None
+        try:
+            os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))  # atime = last used, mtime keeps the ETag
+        except OSError:
+            pass
+        self.stats["served"] += 1
+        return path, st
+
+    @staticmethod
+    def etag(st: os.stat_result) -> str:
+        return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+    async def iter_range(self, name: str, path: str, start: int, end: int,
+                         chunk_size: int = STREAM_CHUNK_SIZE):
+        """Yield bytes start..end (inclusive), holding a reference while streaming"""
+        with self.reference(name):
+            with open(path, "rb") as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+    # ---- eviction ----
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.is_file():
+                        entries.append((max(st.st_atime, st.st_mtime), st.st_size, entry.name))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _delete(self, name: str) -> bool:
+        try:
+            os.unlink(os.path.join(self.root, name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete expired assets, then LRU ones down to the low-water mark if over quota; returns files removed"""
+        now = time.time() if now is None else now
+        self.stats["sweeps"] += 1
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        kept = []
+        for used, size, name in entries:
+            if name.startswith(".tmp-"):
+                # Orphaned scratch file from a crashed write
+                if now - used > self.lease and self._delete(name):
+                    total -= size
+                continue
+            if now - used > self.ttl and not self.in_use(name, now):
+                if self._delete(name):
+                    total -= size
+                    removed += 1
+                    self.stats["expired"] += 1
+                continue
+            kept.append((used, size, name))
+        target = self.quota_bytes * PLAYBACK_ASSET_LOW_WATER if total > self.quota_bytes else self.quota_bytes
+        for used, size, name in kept:
+            if total <= target:
+                break
+            if now - used < self.min_age or self.in_use(name, now):
+                continue
+            if self._delete(name):
+                total -= size
+                removed += 1
+                self.stats["evicted"] += 1
+        if total > self.quota_bytes:
+            self.stats["over_quota"] += 1
+            logger.warning(f"⚠️ Playback assets over quota: {total / 1024 / 1024:.1f}MB in use "
+                           f"(quota {self.quota_bytes / 1024 / 1024:.0f}MB), nothing evictable")
+        self.bytes = total
+        return removed
+
+    async def start(self, interval: float = PLAYBACK_ASSET_SWEEP_INTERVAL):
+        os.makedirs(self.root, exist_ok=True)
+        if self._sweeper is None:
+            self._loop = asyncio.get_running_loop()
+            self._sweep_wanted = asyncio.Event()
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+
+    async def stop(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._sweeper = None
+            self._sweep_wanted = None
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            self._sweep_wanted.clear()
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.warning(f"⚠️ Playback asset sweep failed: {e}")
+            try:
+                await asyncio.wait_for(self._sweep_wanted.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {"bytes": self.bytes, "quota_bytes": self.quota_bytes, "referenced": len(self._refs),
+                "leased": len(self._leases), "pinned": len(self._pinned), **self.stats}
+
+
+# Global playback asset store instance
+playback_asset_store = PlaybackAssetStore()
@@ -10,7 +10,22 @@ Total: 1370ms
 
 Transitions: ✅ SAFE (LLM still evaluates them)
 """
-import re
+
+# DISC style word patterns (counted per user message)
+DISC_PATTERNS = {
+    "D": r'\b(bottom line|results|fast|prove|direct|get to|quick)\b',  # direct, results-focused
+    "I": r'\b(excited|fun|people|cool|awesome|love|great)\b',  # enthusiastic, social
+    "S": r'\b(safe|secure|help|support|comfortable|sure|steady)\b',  # supportive, stable
+    "C": r'\b(details|data|exactly|specific|how|why|prove|numbers)\b',  # analytical, detailed
+}
+
+# Objection patterns in priority order (first match wins)
+OBJECTION_PATTERNS = [
+    ("trust", r'\b(scam|fake|legit|legitimate|trust|proof|real|honest|believe)\b'),
+    ("price", r'\b(how much|cost|price|expensive|afford|money|pay|investment)\b'),
+    ("time", r'\b(think about|think it over|later|not ready|busy|time|maybe)\b'),
+    ("value", r'\b(what is|how does|explain|tell me|what\'s this|how it works)\b'),
+]
 
 def quick_disc_classification(conversation_history: list) -> str:
     """
@@ -20,21 +35,18 @@ def quick_disc_classification(conversation_history: list) -> str:
     if not conversation_history:
         return "C"  # Default: skeptical/analytical
     
-    # Combine recent user messages
+    # Per-message DISC counts come from the shared utterance analyzer, which
+    # caches them - each message is scanned once, not on every later turn
+    from utterance_analyzer import utterance_analyzer
     user_messages = [msg['content'] for msg in conversation_history if msg['role'] == 'user']
-    text = " ".join(user_messages[-5:]).lower()  # Last 5 messages
-    
-    # D type patterns: direct, results-focused
-    d_score = len(re.findall(r'\b(bottom line|results|fast|prove|direct|get to|quick)\b', text))
-    
-    # I type patterns: enthusiastic, social
-    i_score = len(re.findall(r'\b(excited|fun|people|cool|awesome|love|great)\b', text))
-    
-    # S type patterns: supportive, stable
-    s_score = len(re.findall(r'\b(safe|secure|help|support|comfortable|sure|steady)\b', text))
     
-    # C type patterns: analytical, detailed
-    c_score = len(re.findall(r'\b(details|data|exactly|specific|how|why|prove|numbers)\b', text))
+    d_score = i_score = s_score = c_score = 0
+    for message in user_messages[-5:]:  # Last 5 messages
+        counts = utterance_analyzer.analyze(message).disc_counts
+        d_score += counts["D"]
+        i_score += counts["I"]
+        s_score += counts["S"]
+        c_score += counts["C"]
     
     scores = {"D": d_score, "I": i_score, "S": s_score, "C": c_score}
     
@@ -51,25 +63,8 @@ def detect_objection_type(user_input: str) -> str:
     Pattern match to detect objection type
     Gives LLM the answer: "This is a trust objection"
     """
-    text = user_input.lower()
-    
-    # Trust/legitimacy objections
-    if re.search(r'\b(scam|fake|legit|legitimate|trust|proof|real|honest|believe)\b', text):
-        return "trust"
-    
-    # Price/cost objections
-    if re.search(r'\b(how much|cost|price|expensive|afford|money|pay|investment)\b', text):
-        return "price"
-    
-    # Time/stall objections
-    if re.search(r'\b(think about|think it over|later|not ready|busy|time|maybe)\b', text):
-        return "time"
-    
-    # Value/understanding questions
-    if re.search(r'\b(what is|how does|explain|tell me|what\'s this|how it works)\b', text):
-        return "value"
-    
-    return None
+    from utterance_analyzer import utterance_analyzer
+    return utterance_analyzer.analyze(user_input).objection_type
 
 
 def check_toolkit_match(objection_type: str) -> str:
@@ -14,7 +14,7 @@ from datetime import datetime
 import logging
 import json
 import uuid
-import httpx
+from http_client_registry import http_client_registry
 
 from auth_middleware import get_current_user
 from qc_agent_models import (
@@ -735,7 +735,7 @@ Return JSON:
 }}"""
     
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with http_client_registry.session(timeout=60.0) as client:
             if llm_provider == "grok":
                 response = await client.post(
                     "https://api.x.ai/v1/chat/completions",
@@ -910,7 +910,7 @@ Return JSON:
 }}"""
     
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
+        async with http_client_registry.session(timeout=90.0) as client:
             response = await client.post(
                 "https://api.x.ai/v1/chat/completions",
                 headers={
@@ -5,7 +5,7 @@ import logging
 import json
 import re
 import uuid
-import httpx
+from http_client_registry import http_client_registry
 import asyncio
 import os
 from collections import Counter, defaultdict
@@ -19,6 +19,10 @@ from qc_learning_models import (
     QCAnalysisLog, AnalysisPrediction, OutcomeType, BookingQuality
 )
 from qc_learning_service import log_qc_analysis
+from call_search import with_search_terms
+from campaign_patterns import campaign_patterns
+from campaign_qc_view import campaign_qc_view, CAMPAIGN_QC_VIEW, CAMPAIGN_QC_VIEW_VERSION, SUMMARY_COUNTERS
+from pagination import fetch_page, clamp_limit, InvalidCursor, PAGINATION_MAX_LIMIT
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +52,11 @@ async def create_campaign(
             user_id=current_user['id']
         )
         
-        await db.campaigns.insert_one(new_campaign.dict())
+        await db.campaigns.insert_one({
+            **new_campaign.dict(),
+            "qc_summary": dict.fromkeys(SUMMARY_COUNTERS, 0),
+            "qc_view_version": CAMPAIGN_QC_VIEW_VERSION
+        })
         return new_campaign
     
     except Exception as e:
@@ -160,11 +168,14 @@ async def get_campaign(
 @qc_enhanced_router.get("/campaigns/{campaign_id}/qc-results")
 async def get_campaign_qc_results(
     campaign_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all QC results for a campaign - shows which calls have been analyzed and their results"""
+    """Get QC results for a campaign - shows which calls have been analyzed and their results.
+    Reads the materialized campaign QC view a page at a time (pass next_cursor back for more)."""
     try:
-        # Verify campaign belongs to user
+        # Verify campaign belongs to user (the document carries the running summary)
         campaign = await db.campaigns.find_one({
             "id": campaign_id,
             "user_id": current_user['id']
@@ -173,133 +184,26 @@ async def get_campaign_qc_results(
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
         
-        # Get all campaign_calls with their QC results
-        campaign_calls = await db.campaign_calls.find(
-            {"campaign_id": campaign_id},
-            {"_id": 0}
-        ).to_list(length=1000)
-        
-        # Build summary
-        results = []
-        summary = {
-            "total_calls": len(campaign_calls),
-            "analyzed": 0,
-            "pending": 0,
-            "failed": 0,
-            "tech_analyzed": 0,
-            "script_analyzed": 0,
-            "tonality_analyzed": 0
-        }
+        summary = campaign.get("qc_summary")
+        if campaign.get("qc_view_version") != CAMPAIGN_QC_VIEW_VERSION:
+            # Not backfilled yet (or an older row shape): build it once now
+            summary = await campaign_qc_view.rebuild_campaign(db, campaign_id)
         
-        for call in campaign_calls:
-            call_id = call.get("call_id")
-            
-            # IMPORTANT: Check if campaign_calls has empty or incomplete results, merge with call_logs
-            script_results = call.get("script_qc_results")
-            tech_results = call.get("tech_qc_results")
-            tonality_results = call.get("tonality_qc_results")
-            
-            # Helper function to check if results have valid node names
-            def has_valid_node_names(results):
-                if not results or not results.get("node_analyses"):
-                    return False
-                # Check if first analysis has a real node name (not None, not "Turn X")
-                first_analysis = results.get("node_analyses", [{}])[0]
-                node_name = first_analysis.get("node_name")
-                if not node_name or node_name == "None" or node_name.startswith("Turn ") or node_name.startswith("Turn-"):
-                    return False
-                return True
-            
-            # Check if any campaign_calls data is incomplete (empty node_analyses or missing node names)
-            needs_merge = (
-                not has_valid_node_names(script_results) or
-                not has_valid_node_names(tonality_results) or
-                not has_valid_node_names(tech_results)
+        try:
+            rows, next_cursor = await fetch_page(
+                db[CAMPAIGN_QC_VIEW], {"campaign_id": campaign_id},
+                limit or PAGINATION_MAX_LIMIT, cursor, {"_id": 0, "campaign_id": 0, "merged_from_call_log": 0}
             )
-            
-            if needs_merge:
-                # Try to get from call_logs
-                call_log = await db.call_logs.find_one(
-                    {"call_id": call_id},
-                    {"_id": 0, "script_qc_results": 1, "tech_qc_results": 1, "tonality_qc_results": 1}
-                )
-                if call_log:
-                    # Merge script results - prefer call_logs if it has better node names
-                    call_log_script = call_log.get("script_qc_results")
-                    if has_valid_node_names(call_log_script):
-                        script_results = call_log_script
-                        logger.info(f"Merged script_qc_results from call_logs for {call_id[:30]}...")
-                    
-                    # Merge tonality results
-                    call_log_tonality = call_log.get("tonality_qc_results")
-                    if has_valid_node_names(call_log_tonality):
-                        tonality_results = call_log_tonality
-                        logger.info(f"Merged tonality_qc_results from call_logs for {call_id[:30]}...")
-                    
-                    # Merge tech results
-                    call_log_tech = call_log.get("tech_qc_results")
-                    if has_valid_node_names(call_log_tech):
-                        tech_results = call_log_tech
-                        logger.info(f"Merged tech_qc_results from call_logs for {call_id[:30]}...")
-            
-            # Check for meaningful content in results
-            has_script_qc = bool(script_results and script_results.get("node_analyses"))
-            has_tech_qc = bool(tech_results and tech_results.get("node_analyses"))
-            has_tonality_qc = bool(tonality_results and tonality_results.get("node_analyses"))
-            
-            call_result = {
-                "call_id": call_id,
-                "analysis_status": call.get("analysis_status", "pending"),
-                "analysis_error": call.get("analysis_error"),
-                "updated_at": call.get("updated_at"),
-                "has_tech_qc": has_tech_qc,
-                "has_script_qc": has_script_qc,
-                "has_tonality_qc": has_tonality_qc,
-                "has_audio_tonality": bool(call.get("audio_tonality_results")),
-            }
-            
-            # Extract key metrics if available
-            if script_results and script_results.get("node_analyses"):
-                bulk_suggestions = script_results.get("bulk_suggestions", {})
-                if bulk_suggestions.get("summary"):
-                    call_result["script_summary"] = {
-                        "total_turns": bulk_suggestions["summary"].get("total_turns", 0),
-                        "good_quality": bulk_suggestions["summary"].get("good_quality", 0),
-                        "needs_improvement": bulk_suggestions["summary"].get("needs_improvement", 0),
-                        "poor_quality": bulk_suggestions["summary"].get("poor_quality", 0)
-                    }
-                summary["script_analyzed"] += 1
-            
-            if tech_results:
-                call_result["tech_summary"] = {
-                    "avg_latency": tech_results.get("analysis_summary", {}).get("average_total_latency", 0),
-                    "nodes_analyzed": tech_results.get("analysis_summary", {}).get("nodes_analyzed", 0)
-                }
-                summary["tech_analyzed"] += 1
-            
-            if tonality_results:
-                call_result["tonality_summary"] = {
-                    "overall": tonality_results.get("overall_tone", "unknown"),
-                    "sentiment": tonality_results.get("sentiment", "unknown")
-                }
-                summary["tonality_analyzed"] += 1
-            
-            # Count status
-            status = call.get("analysis_status", "pending")
-            if status == "completed" or call_result["has_tech_qc"] or call_result["has_script_qc"]:
-                summary["analyzed"] += 1
-            elif status == "failed":
-                summary["failed"] += 1
-            else:
-                summary["pending"] += 1
-            
-            results.append(call_result)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return {
             "campaign_id": campaign_id,
             "campaign_name": campaign.get("name", "Unknown"),
-            "summary": summary,
-            "calls": results,
+            "summary": {**dict.fromkeys(SUMMARY_COUNTERS, 0), **(summary or {})},
+            "calls": rows,
+            "next_cursor": next_cursor,
+            "limit": clamp_limit(limit or PAGINATION_MAX_LIMIT),
             "batch_analysis_status": campaign.get("batch_analysis_status"),
             "batch_analysis_completed": campaign.get("batch_analysis_completed", 0),
             "batch_analysis_total": campaign.get("batch_analysis_total", 0)
@@ -387,6 +291,8 @@ async def delete_campaign(
         # Delete campaign and cascade delete related data
         await db.campaigns.delete_one({"id": campaign_id, "user_id": current_user['id']})
         await db.campaign_calls.delete_many({"campaign_id": campaign_id})
+        await campaign_qc_view.drop_campaign(db, campaign_id)
+        await campaign_patterns.drop(db, campaign_id)
         await db.campaign_suggestions.delete_many({"campaign_id": campaign_id})
         await db.campaign_patterns.delete_many({"campaign_id": campaign_id})
         
@@ -440,6 +346,7 @@ async def add_call_to_campaign(
         }
         
         await db.campaign_calls.insert_one(campaign_call)
+        await campaign_qc_view.refresh_call(db, campaign_id, call_id)
         logger.info(f"📥 Call {call_id} added to campaign {campaign_id}")
         
         # Check if campaign has auto_analyze enabled
@@ -563,7 +470,8 @@ async def delete_campaign_calls(
         
         for call_id in call_ids:
             try:
-                # 1. Delete from campaign_calls
+                # 1. Delete from campaign_calls (taking its script results out of the pattern state first)
+                await campaign_patterns.fold_call(db, campaign_id, call_id, None)
                 result = await db.campaign_calls.delete_one({
                     "campaign_id": campaign_id,
                     "call_id": call_id
@@ -571,6 +479,7 @@ async def delete_campaign_calls(
                 
                 if result.deleted_count > 0:
                     deleted_count += 1
+                    await campaign_qc_view.remove_call(db, campaign_id, call_id)
                     
                     # 2. Remove campaign reference from call_logs (don't delete the call itself)
                     await db.call_logs.update_one(
@@ -651,37 +560,27 @@ async def analyze_campaign_patterns(
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
         
-        # Get all campaign calls
-        campaign_calls_raw = await db.campaign_calls.find({
-            "campaign_id": campaign_id
-        }).to_list(length=1000)
-        
-        # Convert ObjectId to string for all documents
-        campaign_calls = []
-        for cc in campaign_calls_raw:
-            if '_id' in cc:
-                cc['_id'] = str(cc['_id'])
-            campaign_calls.append(cc)
+        # Analyzed calls are folded into the campaign's pattern state as they finish
+        state = await campaign_patterns.load(db, campaign_id)
+        total_calls = await campaign_total_calls(campaign)
+        analyzed_count = state.analyzed_calls
         
-        if len(campaign_calls) < 2:
+        if max(total_calls, analyzed_count) < 2:
             raise HTTPException(
                 status_code=400, 
                 detail="At least 2 calls required for pattern recognition. Add more calls to the campaign."
             )
         
-        # Check how many have been analyzed
-        analyzed_count = sum(1 for cc in campaign_calls if cc.get('script_qc_results'))
-        
         if analyzed_count < 2:
             raise HTTPException(
                 status_code=400,
-                detail=f"At least 2 calls must be analyzed first. Currently {analyzed_count}/{len(campaign_calls)} calls have been analyzed. Run Script QC on each call first."
+                detail=f"At least 2 calls must be analyzed first. Currently {analyzed_count}/{total_calls} calls have been analyzed. Run Script QC on each call first."
             )
         
         logger.info(f"Pattern analysis: {analyzed_count} calls analyzed, running detection...")
         
         # Aggregate patterns from script QC results
-        patterns = await detect_campaign_patterns(campaign_id, campaign_calls, current_user['id'])
+        patterns = await detect_campaign_patterns(campaign_id, current_user['id'], total_calls)
         
         logger.info(f"Pattern analysis complete: {len(patterns)} patterns found")
         
@@ -1020,15 +919,15 @@ async def update_training_call_outcome(
                         
                         # Check if learning should trigger
                         orchestrator = LearningOrchestrator(db)
-                        session = await orchestrator.check_and_trigger_learning(
+                        session_id = await orchestrator.check_and_trigger_learning(
                             qc_agent_id=qc_agent_id,
                             user_id=current_user['id'],
                             trigger_reason="training_call_outcome"
                         )
                         
-                        if session:
+                        if session_id:
                             learning_triggered = True
-                            logger.info(f"Learning triggered for agent {qc_agent_id}")
+                            logger.info(f"Learning scheduled for agent {qc_agent_id} (session {session_id})")
                     except Exception as learn_err:
                         logger.error(f"Error triggering learning: {str(learn_err)}")
         
@@ -1094,8 +993,6 @@ async def analyze_training_call_script(transcript_text: str, qc_agent: dict, use
     Analyze training call transcript using script QC agent guidelines.
     Returns (node_analyses, overall_quality, summary)
     """
-    import httpx
-    
     try:
         if not transcript_text:
             return [], "pending_transcription", "No transcript available"
@@ -1156,7 +1053,7 @@ Analyze this call segment by segment (each exchange between speakers). For each
 Return ONLY the JSON array, no other text."""
 
         # Call LLM for analysis
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with http_client_registry.session(timeout=60.0) as client:
             response = await client.post(
                 "https://api.x.ai/v1/chat/completions",
                 headers={
@@ -1233,8 +1130,6 @@ async def analyze_training_call_tonality(transcript_text: str, qc_agent: dict, u
     Analyze training call transcript for tonality using QC agent guidelines.
     Returns (node_analyses, overall_rating, assessment)
     """
-    import httpx
-    
     try:
         if not transcript_text:
             return [], "pending_transcription", "No transcript available"
@@ -1289,7 +1184,7 @@ Analyze the tone and delivery throughout this call. For each significant exchang
 Return ONLY the JSON array, no other text."""
 
         # Call LLM for analysis
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with http_client_registry.session(timeout=60.0) as client:
             response = await client.post(
                 "https://api.x.ai/v1/chat/completions",
                 headers={
@@ -1855,6 +1750,7 @@ async def upload_custom_call(
         }
         
         await db.campaign_calls.insert_one(campaign_call)
+        await campaign_qc_view.refresh_call(db, campaign_id, campaign_call['call_id'])
         
         # Update campaign count
         await db.campaigns.update_one(
@@ -2243,6 +2139,16 @@ async def analyze_tech_performance(
                 logger.info("Tech QC: Parsing dict call_log")
                 node_analyses = parse_call_log_json_for_latency(call_log_data)
         
+        # Structured per-turn spans (turn_metrics) - numeric, no log parsing needed
+        if not node_analyses:
+            turn_docs = await db.turn_metrics.find(
+                {"call_id": call.get('call_id') or call_id},
+                {"_id": 0}
+            ).sort("turn_index", 1).to_list(500)
+            if turn_docs:
+                logger.info(f"Tech QC: Using {len(turn_docs)} turn_metrics records")
+                node_analyses = parse_logs_array_for_latency(turn_docs, call_flow)
+        
         # If no nodes found yet, try parsing from call.logs array in database
         if not node_analyses and call.get('logs'):
             logger.info(f"Tech QC: Falling back to call.logs from database ({len(call.get('logs', []))} items)")
@@ -2342,6 +2248,9 @@ async def analyze_tech_performance(
                 call_id,
                 tech_qc_results=result
             )
+        else:
+            # call_logs results back any campaign row that lacks node names
+            await campaign_qc_view.refresh_call_everywhere(db, call_id)
         
         return result
     
@@ -2659,7 +2568,7 @@ async def run_node_latency_test(
         # Make LLM call and measure latency
         start_time = time.time()
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with http_client_registry.session(timeout=30.0) as client:
             response = await client.post(
                 "https://api.x.ai/v1/chat/completions",
                 headers={
@@ -2734,7 +2643,7 @@ RULES:
 OUTPUT: Return ONLY the optimized text, no explanations or markdown."""
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with http_client_registry.session(timeout=30.0) as client:
             # Optimize prompt if requested
             if optimization_type in ['prompt', 'both'] and original_prompt:
                 response = await client.post(
@@ -3047,7 +2956,7 @@ async def analyze_script_quality(
                     "created_at": datetime.utcnow(),
                     "status": "qc_only"  # Mark as QC-only record
                 }
-                await db.call_logs.insert_one(new_record)
+                await db.call_logs.insert_one(with_search_terms(new_record))
                 logger.info(f"Script QC: Created new call record with QC results")
             elif update_result.modified_count == 0:
                 logger.info(f"Script QC: Document matched but not modified (data may be unchanged)")
@@ -3063,6 +2972,9 @@ async def analyze_script_quality(
                 call_id,
                 script_qc_results=result
             )
+        else:
+            # call_logs results back any campaign row that lacks node names
+            await campaign_qc_view.refresh_call_everywhere(db, call_id)
         
         # Log to learning system if qc_agent_id provided
         qc_agent_id = request_data.get('qc_agent_id')
@@ -3277,6 +3189,9 @@ async def analyze_tonality(
                 call_id,
                 tonality_qc_results=result
             )
+        else:
+            # call_logs results back any campaign row that lacks node names
+            await campaign_qc_view.refresh_call_everywhere(db, call_id)
         
         return result
     
@@ -3503,6 +3418,7 @@ async def analyze_audio_tonality(
             "custom_guidelines_applied": custom_guidelines if custom_guidelines else "Default guidelines used",
             "focus_areas": focus_areas if focus_areas else [],
             "analyzed_at": datetime.utcnow().isoformat(),
+            "segments": analysis_result.get('segments', []),
             
             # Raw analysis for advanced users
             "raw_analysis": analysis_result.get('raw_response', '')
@@ -3731,7 +3647,7 @@ Agent responded: "{turn['assistant']}"
             
             logger.info(f"Tonality QC: Using {llm_provider}/{actual_model} for turn {i+1}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_client_registry.session(timeout=30.0) as client:
                 # Build request based on provider
                 if llm_provider == 'anthropic':
                     headers = {
@@ -4600,8 +4516,6 @@ def create_basic_analysis_from_transcript(transcript: List[Dict], logs: List[Dic
 
 async def analyze_script_with_llm(transcript: List[Dict], call_flow: List[Dict], rules: Dict, logs: List[Dict] = None) -> List[Dict]:
     """Analyze script quality using LLM with node-aware analysis"""
-    import httpx
-    
     try:
         # Get user's API key for LLM analysis
         # Default to Grok for now, could be configurable
@@ -4806,7 +4720,7 @@ AI Response: {turn['assistant']}
             logger.info(f"Script QC: Using {llm_provider}/{actual_model} for turn {i+1}")
 
             # Call LLM for analysis
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_client_registry.session(timeout=30.0) as client:
                 # Build request based on provider
                 if llm_provider == 'anthropic':
                     headers = {
@@ -5208,6 +5122,9 @@ async def store_campaign_call_analysis(
             {"$set": update_fields},
             upsert=True
         )
+        await campaign_qc_view.refresh_call(db, campaign_id, call_id)
+        if script_qc_results is not None:
+            await campaign_patterns.fold_call(db, campaign_id, call_id, script_qc_results)
         
         logger.info(f"Stored campaign call analysis: campaign={campaign_id}, call={call_id[:20]}..., matched={result.matched_count}, modified={result.modified_count}")
         
@@ -5220,133 +5137,29 @@ async def store_campaign_call_analysis(
 # CAMPAIGN PATTERN DETECTION & REPORTING
 # ============================================================================
 
-async def detect_campaign_patterns(campaign_id: str, campaign_calls: List[Dict], user_id: str) -> List[Dict]:
-    """Detect patterns across multiple calls in a campaign"""
-    patterns = []
-    
-    # Aggregate issues across all calls
-    all_issues = []
-    all_positives = []
-    quality_by_turn = defaultdict(list)
-    prompt_suggestions_by_type = defaultdict(list)
-    
-    analyzed_calls = 0
-    for campaign_call in campaign_calls:
-        if not campaign_call:
-            continue
-            
-        script_results = campaign_call.get('script_qc_results')
-        if not script_results:
-            # Call not analyzed yet
-            continue
-        
-        analyzed_calls += 1
-        node_analyses = script_results.get('node_analyses', [])
-        
-        for analysis in node_analyses:
-            if not analysis:
-                continue
-                
-            turn_num = analysis.get('turn_number', 0)
-            quality = analysis.get('quality', 'good')
-            
-            # Track quality by turn position
-            quality_by_turn[turn_num].append(quality)
-            
-            # Collect issues
-            issues = analysis.get('issues', [])
-            if issues:
-                all_issues.extend(issues)
-            
-            positives = analysis.get('positives', [])
-            if positives:
-                all_positives.extend(positives)
-            
-            # Track prompt suggestions
-            prompt_sugg = analysis.get('prompt_suggestions')
-            if prompt_sugg and isinstance(prompt_sugg, dict):
-                suggestion_type = prompt_sugg.get('type', 'unknown')
-                prompt_suggestions_by_type[suggestion_type].append({
-                    'suggestion': prompt_sugg.get('suggestion', ''),
-                    'turn': turn_num,
-                    'call_id': campaign_call.get('call_id')
-                })
-    
-    logger.info(f"Pattern detection: {analyzed_calls}/{len(campaign_calls)} calls have been analyzed")
+async def campaign_total_calls(campaign: Dict) -> int:
+    """Calls in a campaign: the QC view's running count once it has been built"""
+    if campaign.get("qc_view_version") == CAMPAIGN_QC_VIEW_VERSION:
+        return (campaign.get("qc_summary") or {}).get("total_calls", 0)
+    return await db.campaign_calls.count_documents({"campaign_id": campaign["id"]})
+
+
+async def detect_campaign_patterns(campaign_id: str, user_id: str, total_calls: Optional[int] = None) -> List[Dict]:
+    """Detect patterns across the calls of a campaign from its accumulated pattern state"""
+    state = await campaign_patterns.load(db, campaign_id)
+    if total_calls is None:
+        campaign = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0})
+        total_calls = await campaign_total_calls(campaign) if campaign else 0
     
-    if analyzed_calls < 2:
-        logger.warning(f"Not enough analyzed calls for pattern detection (need at least 2, have {analyzed_calls})")
-        return patterns
+    logger.info(f"Pattern detection: {state.analyzed_calls}/{total_calls} calls have been analyzed")
     
-    # Pattern 1: Identify consistently problematic turns
-    for turn_num, qualities in quality_by_turn.items():
-        poor_count = qualities.count('poor') + qualities.count('needs_improvement')
-        if poor_count >= len(qualities) * 0.6:  # 60%+ of calls have issues at this turn
-            pattern = {
-                "id": str(uuid.uuid4()),
-                "campaign_id": campaign_id,
-                "pattern_type": "bottleneck",
-                "description": f"Turn {turn_num} consistently underperforms across {poor_count}/{len(qualities)} calls",
-                "affected_nodes": [f"Turn {turn_num}"],
-                "evidence_calls": [cc.get('call_id') for cc in campaign_calls],
-                "confidence_score": poor_count / len(qualities),
-                "created_at": datetime.utcnow().isoformat()
-            }
-            patterns.append(pattern)
-            
-            # Store in database
-            await db.campaign_patterns.insert_one(pattern.copy())
-    
-    # Pattern 2: Recurring issues
-    issue_counter = Counter(all_issues)
-    for issue, count in issue_counter.most_common(5):
-        if count >= 3:  # Issue appears in 3+ calls
-            pattern = {
-                "id": str(uuid.uuid4()),
-                "campaign_id": campaign_id,
-                "pattern_type": "recurring_issue",
-                "description": f"Recurring issue: {issue}",
-                "affected_nodes": [],
-                "evidence_calls": [],
-                "confidence_score": min(count / len(campaign_calls), 1.0),
-                "created_at": datetime.utcnow().isoformat()
-            }
-            patterns.append(pattern)
-            await db.campaign_patterns.insert_one(pattern.copy())
-    
-    # Pattern 3: Common prompt improvement needs
-    for sugg_type, suggestions in prompt_suggestions_by_type.items():
-        if len(suggestions) >= 3:  # Type appears 3+ times
-            pattern = {
-                "id": str(uuid.uuid4()),
-                "campaign_id": campaign_id,
-                "pattern_type": "improvement_opportunity",
-                "description": f"Multiple calls need {sugg_type}: {suggestions[0]['suggestion'][:100]}...",
-                "affected_nodes": [f"Turn {s['turn']}" for s in suggestions[:5]],
-                "evidence_calls": [s['call_id'] for s in suggestions[:5]],
-                "confidence_score": min(len(suggestions) / len(campaign_calls), 1.0),
-                "created_at": datetime.utcnow().isoformat()
-            }
-            patterns.append(pattern)
-            await db.campaign_patterns.insert_one(pattern.copy())
-    
-    # Pattern 4: Success patterns
-    positive_counter = Counter(all_positives)
-    for positive, count in positive_counter.most_common(3):
-        if count >= len(campaign_calls) * 0.7:  # Appears in 70%+ of calls
-            pattern = {
-                "id": str(uuid.uuid4()),
-                "campaign_id": campaign_id,
-                "pattern_type": "success",
-                "description": f"Consistent success: {positive}",
-                "affected_nodes": [],
-                "evidence_calls": [],
-                "confidence_score": count / len(campaign_calls),
-                "created_at": datetime.utcnow().isoformat()
-            }
-            patterns.append(pattern)
-            await db.campaign_patterns.insert_one(pattern.copy())
+    if state.analyzed_calls < 2:
+        logger.warning(f"Not enough analyzed calls for pattern detection (need at least 2, have {state.analyzed_calls})")
+        return []
     
+    patterns = state.patterns(campaign_id, total_calls)
+    for pattern in patterns:
+        await db.campaign_patterns.insert_one(pattern.copy())
     return patterns
 
 
@@ -6070,26 +5883,22 @@ async def run_full_qc_analysis(
                     {"$set": campaign_call},
                     upsert=True
                 )
+                await campaign_qc_view.refresh_call(db, campaign_id, call_id)
+                await campaign_patterns.fold_call(db, campaign_id, call_id, script_results)
                 logger.info(f"Auto QC: Added call {call_id} to campaign {campaign_id}")
                 
                 # Check if campaign has auto pattern detection enabled
                 campaign = await db.campaigns.find_one({"id": campaign_id})
                 if campaign and campaign.get('auto_pattern_detection', False):
-                    # Get all campaign calls to check if we have enough for pattern analysis
-                    campaign_calls = await db.campaign_calls.find({
-                        "campaign_id": campaign_id
-                    }).to_list(length=1000)
-                    
-                    # Convert ObjectId
-                    for cc in campaign_calls:
-                        if '_id' in cc:
-                            cc['_id'] = str(cc['_id'])
-                    
-                    analyzed_count = sum(1 for cc in campaign_calls if cc.get('script_qc_results'))
+                    # The pattern state already includes this call
+                    state = await campaign_patterns.load(db, campaign_id)
+                    analyzed_count = state.analyzed_calls
                     
                     if analyzed_count >= 2:
                         logger.info(f"Auto QC: Running auto pattern detection for campaign {campaign_id}")
-                        patterns = await detect_campaign_patterns(campaign_id, campaign_calls, user_id)
+                        patterns = await detect_campaign_patterns(
+                            campaign_id, user_id, await campaign_total_calls(campaign)
+                        )
                         
                         # Store patterns
                         for pattern in patterns:
@@ -6265,7 +6074,7 @@ Provide your analysis in JSON format with these fields:
 async def call_llm_for_analysis(prompt: str, provider: str, model: str, api_key: str) -> Optional[Dict]:
     """Make LLM API call for analysis"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with http_client_registry.session(timeout=60.0) as client:
             if provider == 'grok':
                 response = await client.post(
                     "https://api.x.ai/v1/chat/completions",
@@ -6391,6 +6200,9 @@ async def reset_all_campaign_analysis(
             }
         )
         
+        await campaign_qc_view.rebuild_campaign(db, campaign_id)
+        await campaign_patterns.recompute(db, campaign_id)
+        
         logger.info(f"Reset analysis for campaign {campaign_id}: {result.modified_count} calls reset")
         
         return {
@@ -6465,6 +6277,9 @@ async def reset_single_call_analysis(
             }
         )
         
+        await campaign_qc_view.refresh_call(db, campaign_id, call_id)
+        await campaign_patterns.fold_call(db, campaign_id, call_id, None)
+        
         logger.info(f"Reset analysis for call {call_id} in campaign {campaign_id}")
         
         return {
@@ -6703,6 +6518,7 @@ async def run_batch_analysis(
                 {"$set": {"analysis_status": "analyzing", "analysis_started_at": datetime.utcnow()}},
                 upsert=True
             )
+            await campaign_qc_view.refresh_call(db, campaign_id, call_id)
             
             await run_single_call_analysis(
                 call_id=call_id,
@@ -6717,6 +6533,7 @@ async def run_batch_analysis(
                 {"campaign_id": campaign_id, "call_id": call_id},
                 {"$set": {"analysis_status": "completed"}}
             )
+            await campaign_qc_view.refresh_call(db, campaign_id, call_id)
             
             results["completed"] += 1
             
@@ -6736,6 +6553,7 @@ async def run_batch_analysis(
                 {"campaign_id": campaign_id, "call_id": call_id},
                 {"$set": {"analysis_status": "failed", "analysis_error": str(e)}}
             )
+            await campaign_qc_view.refresh_call(db, campaign_id, call_id)
             
             results["failed"] += 1
             results["errors"].append({"call_id": call_id, "error": str(e)})
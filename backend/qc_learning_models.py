@@ -244,6 +244,9 @@ class QCPlaybook(BaseModel):
     patterns_count: int = 0
     campaign_patterns_count: int = 0
     
+    # Outcomes recorded up to this time were reflected on (next session starts after it)
+    learned_through: Optional[datetime] = None
+    
     # Edit tracking
     is_auto_generated: bool = True
     user_edited: bool = False
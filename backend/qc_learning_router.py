@@ -598,18 +598,19 @@ async def update_log_outcome(
         # Check if learning should trigger
         if agent.get('learning_config', {}).get('is_enabled', True):
             orchestrator = LearningOrchestrator(db)
-            session = await orchestrator.check_and_trigger_learning(
+            session_id = await orchestrator.check_and_trigger_learning(
                 qc_agent_id=agent_id,
                 user_id=current_user['id'],
                 trigger_reason="outcome_update"
             )
             
-            if session:
+            if session_id:
+                # Scheduled, not finished: the session is saved under this id once it runs
                 return {
                     "success": True,
                     "prediction_accuracy": accuracy,
                     "learning_triggered": True,
-                    "learning_session_id": session.id
+                    "learning_session_id": session_id
                 }
         
         return {
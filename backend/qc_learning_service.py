@@ -9,11 +9,13 @@ Inspired by the combat AI learning loop:
 Experience → Reflection → Instruction → Application
 """
 
+import asyncio
 import logging
 import json
-import httpx
-from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any, Tuple
+import os
+from http_client_registry import http_client_registry
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Optional, Any, Tuple, Callable, Awaitable
 import uuid
 
 from qc_learning_models import (
@@ -26,6 +28,13 @@ from qc_learning_models import (
 
 logger = logging.getLogger(__name__)
 
+# Auto-learning: a session starts once triggers for an agent have been quiet this long...
+LEARNING_DEBOUNCE_SECONDS = float(os.environ.get("LEARNING_DEBOUNCE_SECONDS", "30"))
+# ...or this long after the first pending trigger, whichever comes first
+LEARNING_MAX_DELAY_SECONDS = float(os.environ.get("LEARNING_MAX_DELAY_SECONDS", "300"))
+# Cross-worker lease on a QC agent while a session runs (expires if the worker dies)
+LEARNING_LEASE_SECONDS = 900
+
 # Database reference (set by router)
 db = None
 
@@ -63,11 +72,13 @@ class ReflectionBrain:
         qc_agent_id: str,
         agent_type: str,
         analysis_logs: List[dict],
-        existing_patterns: List[dict] = None
+        existing_patterns: List[dict] = None,
+        accuracy_data: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """
         Reflect on a batch of analysis logs with known outcomes.
         Returns identified patterns and accuracy metrics.
+        accuracy_data: precomputed over the full history when only new logs are passed in.
         """
         if not analysis_logs:
             return {"patterns": [], "accuracy": 0, "insights": []}
@@ -77,7 +88,7 @@ class ReflectionBrain:
         no_show_logs = [l for l in analysis_logs if l.get('actual_outcome') == 'no_show']
         
         # Calculate prediction accuracy
-        accuracy_data = self._calculate_accuracy(analysis_logs)
+        accuracy_data = accuracy_data or self._calculate_accuracy(analysis_logs)
         
         # Build reflection prompt
         prompt = self._build_reflection_prompt(
@@ -310,7 +321,7 @@ Return JSON:
     async def _call_llm(self, prompt: str) -> Dict:
         """Call the LLM and parse JSON response"""
         try:
-            async with httpx.AsyncClient(timeout=90.0) as client:
+            async with http_client_registry.session(timeout=90.0) as client:
                 if self.llm_provider == "grok":
                     response = await client.post(
                         "https://api.x.ai/v1/chat/completions",
@@ -541,7 +552,7 @@ IMPORTANT: The raw_markdown should be a complete, well-formatted playbook docume
     async def _call_llm(self, prompt: str) -> Dict:
         """Call the LLM and parse JSON response"""
         try:
-            async with httpx.AsyncClient(timeout=90.0) as client:
+            async with http_client_registry.session(timeout=90.0) as client:
                 if self.llm_provider == "grok":
                     response = await client.post(
                         "https://api.x.ai/v1/chat/completions",
@@ -601,10 +612,11 @@ class LearningOrchestrator:
         qc_agent_id: str,
         user_id: str,
         trigger_reason: str = "outcome_update"
-    ) -> Optional[LearningSession]:
+    ) -> Optional[str]:
         """
         Check if learning should trigger based on agent config.
-        Returns LearningSession if learning was triggered, None otherwise.
+        Triggers are handed to learning_scheduler, which debounces them per agent.
+        Returns the id the (possibly shared) learning session will be saved under, None if not triggered.
         """
         # Get agent and config
         agent = await db.qc_agents.find_one({"id": qc_agent_id, "user_id": user_id})
@@ -618,8 +630,8 @@ class LearningOrchestrator:
             return None  # Only manual trigger
         
         if mode == 'auto':
-            # Trigger on every outcome update
-            return await self.run_learning_session(qc_agent_id, user_id, trigger="auto")
+            # Every outcome update counts; a burst of them becomes one session
+            return learning_scheduler.schedule(qc_agent_id, user_id, trigger="auto")
         
         if mode == 'every_x':
             # Check if we've hit the threshold
@@ -627,25 +639,64 @@ class LearningOrchestrator:
             trigger_count = learning_config.get('trigger_count', 10)
             
             if outcomes_since >= trigger_count:
-                return await self.run_learning_session(qc_agent_id, user_id, trigger="every_x")
+                return learning_scheduler.schedule(qc_agent_id, user_id, trigger="every_x")
         
         return None
     
+    async def run_scheduled_session(
+        self,
+        qc_agent_id: str,
+        user_id: str,
+        trigger: str,
+        session_id: str
+    ) -> Optional[LearningSession]:
+        """Run a scheduled session under the agent's lease; None if another worker holds it"""
+        now = datetime.now(timezone.utc)
+        claimed = await db.qc_agents.find_one_and_update(
+            {
+                "id": qc_agent_id,
+                "$or": [
+                    {"learning_config.lease_until": None},
+                    {"learning_config.lease_until": {"$lt": now}}
+                ]
+            },
+            {"$set": {"learning_config.lease_until": now + timedelta(seconds=LEARNING_LEASE_SECONDS)}},
+            projection={"_id": 0, "id": 1}
+        )
+        if not claimed:
+            if not await db.qc_agents.find_one({"id": qc_agent_id}, {"_id": 1}):
+                return LearningSession(qc_agent_id=qc_agent_id, user_id=user_id, agent_type="language_pattern",
+                                       session_type=LearningSessionType.FULL, trigger=trigger,
+                                       success=False, error_message="QC agent not found")
+            return None
+        try:
+            return await self.run_learning_session(qc_agent_id, user_id, trigger=trigger, session_id=session_id)
+        finally:
+            await db.qc_agents.update_one(
+                {"id": qc_agent_id}, {"$set": {"learning_config.lease_until": None}}
+            )
+    
     async def run_learning_session(
         self,
         qc_agent_id: str,
         user_id: str,
-        trigger: str = "manual"
+        trigger: str = "manual",
+        session_id: Optional[str] = None
     ) -> LearningSession:
         """
         Run a full learning session (reflection + training).
+        Reflection only sees logs whose outcome arrived after the last learned playbook;
+        accuracy is still measured over every verified outcome.
         """
         session = LearningSession(
             qc_agent_id=qc_agent_id,
             user_id=user_id,
+            agent_type="language_pattern",  # replaced by the agent's own type once loaded
             session_type=LearningSessionType.FULL,
             trigger=trigger
         )
+        if session_id:
+            session.id = session_id
         
         try:
             # Get agent
@@ -665,12 +716,33 @@ class LearningOrchestrator:
                 session.error_message = "No API key configured"
                 return session
             
-            # Get analysis logs with known outcomes
-            logs = await db.qc_analysis_logs.find({
+            # Analysis logs with known outcomes
+            outcome_query = {
                 "qc_agent_id": qc_agent_id,
                 "actual_outcome": {"$in": ["showed", "no_show"]},
                 "is_training_data": True
-            }).to_list(length=500)
+            }
+            # Only the fields accuracy needs, over the full history
+            verified = await db.qc_analysis_logs.find(
+                outcome_query, {"_id": 0, "actual_outcome": 1, "predictions.show_likelihood": 1}
+            ).to_list(length=None)
+            if len(verified) < 5:
+                session.success = False
+                session.error_message = f"Not enough training data. Need at least 5 outcomes, have {len(verified)}."
+                return session
+            
+            # Outcomes already reflected on are in the playbook; only newer ones need the LLM
+            learned = await db.qc_playbooks.find_one(
+                {"qc_agent_id": qc_agent_id, "learned_through": {"$ne": None}},
+                {"_id": 0, "learned_through": 1},
+                sort=[("learned_through", -1)]
+            )
+            learned_through = learned.get("learned_through") if learned else None
+            watermark = datetime.now(timezone.utc)
+            new_query = dict(outcome_query)
+            if learned_through:
+                new_query["outcome_updated_at"] = {"$gt": learned_through, "$lte": watermark}
+            logs = await db.qc_analysis_logs.find(new_query).sort("outcome_updated_at", -1).to_list(length=500)
             
             session.analyses_reviewed_count = len(logs)
             session.analyses_reviewed_ids = [l.get('id') for l in logs[:100]]
@@ -680,9 +752,9 @@ class LearningOrchestrator:
             no_show_count = len([l for l in logs if l.get('actual_outcome') == 'no_show'])
             session.outcomes_included = {"showed": showed_count, "no_show": no_show_count}
             
-            if len(logs) < 5:
+            if not logs:
                 session.success = False
-                session.error_message = f"Not enough training data. Need at least 5 outcomes, have {len(logs)}."
+                session.error_message = "No new outcomes since the last learning session."
                 return session
             
             # Get existing patterns
@@ -715,7 +787,8 @@ class LearningOrchestrator:
                 qc_agent_id=qc_agent_id,
                 agent_type=agent_type,
                 analysis_logs=logs,
-                existing_patterns=[p for p in existing_patterns]
+                existing_patterns=[p for p in existing_patterns],
+                accuracy_data=reflection_brain._calculate_accuracy(verified)
             )
             
             # Save new patterns
@@ -753,6 +826,7 @@ class LearningOrchestrator:
             )
             
             new_playbook.user_id = user_id
+            new_playbook.learned_through = watermark
             
             # Archive old playbook
             if current_playbook:
@@ -779,7 +853,7 @@ class LearningOrchestrator:
             
             # Mark logs as reviewed
             await db.qc_analysis_logs.update_many(
-                {"id": {"$in": session.analyses_reviewed_ids}},
+                {"id": {"$in": [l.get('id') for l in logs]}},
                 {"$set": {"has_been_reviewed": True}}
             )
             
@@ -849,6 +923,101 @@ class LearningOrchestrator:
             return None
 
 
+# ============================================================================
+# LEARNING SCHEDULER
+# ============================================================================
+
+class _PendingLearning:
+    def __init__(self, user_id: str, trigger: str, now: float):
+        self.user_id = user_id
+        self.trigger = trigger
+        self.session_id = str(uuid.uuid4())
+        self.first_at = now
+        self.last_at = now
+        self.triggers = 0
+
+
+class LearningScheduler:
+    """
+    Coalescing single-flight scheduler for automatic learning sessions.
+    
+    Triggers for a QC agent are debounced into one pending session; at most one session
+    per agent runs at a time (per worker, plus a Mongo lease across workers). Triggers
+    that arrive while a session runs fold into a single follow-up session.
+    """
+    
+    def __init__(self, debounce: float = LEARNING_DEBOUNCE_SECONDS, max_delay: float = LEARNING_MAX_DELAY_SECONDS,
+                 runner: Callable[[str, str, str, str], Awaitable[Optional[LearningSession]]] = None):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.runner = runner or self._run
+        self._pending: Dict[str, _PendingLearning] = {}
+        self._drivers: Dict[str, asyncio.Task] = {}
+        self._running: Dict[str, str] = {}  # qc_agent_id → session id in flight
+        self.stats = {"triggers": 0, "sessions": 0, "coalesced": 0, "lease_busy": 0}
+    
+    @staticmethod
+    async def _run(qc_agent_id: str, user_id: str, trigger: str, session_id: str) -> Optional[LearningSession]:
+        return await LearningOrchestrator(db).run_scheduled_session(qc_agent_id, user_id, trigger, session_id)
+    
+    def schedule(self, qc_agent_id: str, user_id: str, trigger: str = "auto") -> str:
+        """Fold a trigger into the agent's pending session; returns that session's id"""
+        now = asyncio.get_running_loop().time()
+        pending = self._pending.get(qc_agent_id)
+        if pending is None:
+            pending = self._pending[qc_agent_id] = _PendingLearning(user_id, trigger, now)
+        else:
+            self.stats["coalesced"] += 1
+        pending.last_at = now
+        pending.triggers += 1
+        self.stats["triggers"] += 1
+        
+        driver = self._drivers.get(qc_agent_id)
+        if driver is None or driver.done():
+            self._drivers[qc_agent_id] = asyncio.create_task(self._drive(qc_agent_id))
+        return pending.session_id
+    
+    async def _drive(self, qc_agent_id: str):
+        """Run the agent's pending sessions one after another until none are left"""
+        loop = asyncio.get_running_loop()
+        try:
+            while qc_agent_id in self._pending:
+                pending = self._pending[qc_agent_id]
+                wait = min(pending.last_at + self.debounce, pending.first_at + self.max_delay) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue  # more triggers may have arrived
+                
+                del self._pending[qc_agent_id]
+                self._running[qc_agent_id] = pending.session_id
+                logger.info(f"🧠 Learning session for QC agent {qc_agent_id} ({pending.triggers} triggers)")
+                try:
+                    session = await self.runner(qc_agent_id, pending.user_id, pending.trigger, pending.session_id)
+                except Exception as e:
+                    logger.error(f"Scheduled learning session error for {qc_agent_id}: {e}")
+                    session = False
+                finally:
+                    self._running.pop(qc_agent_id, None)
+                
+                if session is None:
+                    # Another worker holds the lease: try again after the debounce
+                    self.stats["lease_busy"] += 1
+                    requeued = self._pending.setdefault(qc_agent_id, pending)
+                    requeued.first_at = requeued.last_at = loop.time()
+                else:
+                    self.stats["sessions"] += 1
+        finally:
+            if self._drivers.get(qc_agent_id) is asyncio.current_task():
+                del self._drivers[qc_agent_id]
+    
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self._pending), "running": len(self._running)}
+
+
+# Global learning scheduler instance
+learning_scheduler = LearningScheduler()
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -5,7 +5,7 @@ Manages call session state across multiple Gunicorn workers
 import os
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import redis
 from redis.exceptions import RedisError
 
@@ -206,13 +206,14 @@ class RedisService:
         except RedisError:
             return False
     
-    def mark_session_ready(self, call_control_id: str, ttl: int = 3600) -> bool:
+    def mark_session_ready(self, call_control_id: str, ttl: int = 3600, owner: str = "1") -> bool:
         """
         Mark that a call session is ready (for cross-worker coordination)
         
         Args:
             call_control_id: Unique call identifier
             ttl: Time-to-live in seconds
+            owner: Worker holding the session in memory
         
         Returns:
             True if successful, False otherwise
@@ -222,13 +223,31 @@ class RedisService:
         
         try:
             key = f"session_ready:{call_control_id}"
-            self.client.setex(key, ttl, "1")
+            self.client.setex(key, ttl, owner)
             logger.info(f"✅ Marked session ready in Redis: {call_control_id}")
             return True
         except RedisError as e:
             logger.error(f"❌ Failed to mark session ready: {e}")
             return False
     
+    def get_session_owner(self, call_control_id: str) -> Optional[str]:
+        """
+        Worker that marked the call's session ready, if any
+        
+        Args:
+            call_control_id: Unique call identifier
+        
+        Returns:
+            Owner recorded by mark_session_ready, None if not ready
+        """
+        if not self.client:
+            return None
+        
+        try:
+            return self.client.get(f"session_ready:{call_control_id}")
+        except RedisError:
+            return None
+    
     def is_session_ready(self, call_control_id: str) -> bool:
         """
         Check if a call session is ready (for cross-worker coordination)
@@ -292,6 +311,26 @@ class RedisService:
         except RedisError:
             return None
     
+    def get_flags(self, call_control_ids: List[str], flag_name: str) -> Dict[str, Optional[str]]:
+        """
+        Get one flag for many calls in a single round trip
+        
+        Args:
+            call_control_ids: Call identifiers
+            flag_name: Name of the flag
+        
+        Returns:
+            call_control_id → flag value (None where unset)
+        """
+        if not self.client or not call_control_ids:
+            return {}
+        
+        try:
+            values = self.client.mget([f"flag:{cid}:{flag_name}" for cid in call_control_ids])
+            return dict(zip(call_control_ids, values))
+        except RedisError:
+            return {}
+    
     def delete_flag(self, call_control_id: str, flag_name: str) -> bool:
         """
         Delete a flag from Redis
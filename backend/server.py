@@ -1,5 +1,4 @@
 from fastapi import FastAPI, APIRouter, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Header
-from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 # Manual Rebuild Trigger: 2025-12-28-FIX-ATTEMPT-7
@@ -10,10 +9,31 @@ from pathlib import Path
 from typing import List, Optional
 from datetime import datetime, timedelta
 import httpx
+from http_client_registry import http_client_registry
+from llm_client_pool import llm_client_pool
+from turn_tracing import turn_tracer
+from speculation import speculation_manager
+from did_routing import did_router, normalize_did
+from log_pipeline import log_pipeline, call_log_control
+from call_setup import call_setup, RedisSetupChannel
+from voice_blob_store import speaker_cache, parse_range, RangeNotSatisfiable
+from campaign_qc_view import campaign_qc_view
+from campaign_patterns import campaign_patterns
+from call_search import apply_search_filters, backfill_search_terms, with_search_terms
+from tonality_preprocessing import tonality_preprocessor
+from playback_assets import playback_asset_store
+from kb_extraction import kb_ingest_jobs, spool_upload, UploadTooLarge, SUPPORTED_EXTENSIONS as KB_SUPPORTED_EXTENSIONS
+from pagination import paginate, estimated_counter, InvalidCursor, SUMMARY_PROJECTIONS, SORT as PAGE_SORT
+from turn_vad import EndOfTurnDetector, is_early_turn_enabled, PROBABLE_END_OF_TURN, SPEECH_RESUMED
+from stt_adapters import (
+    AudioFrontEnd, create_stt_adapter, stt_streams, ENDPOINT as STT_ENDPOINT, FINAL as STT_FINAL,
+    PARTIAL as STT_PARTIAL,
+)
 import json
 import asyncio
 import base64
 import websockets
+import re
 import time
 import uuid
 # Global state for tracking active calls and their interruption windows
@@ -23,7 +43,7 @@ call_states = {}
 from models import (
     Agent, AgentCreate, Call, CallCreate, PhoneNumber, 
     PhoneNumberCreate, FlowNode, DailyRoomCreate, DailyRoomResponse,
-    KnowledgeBaseItem, KnowledgeBaseItemCreate
+    KnowledgeBaseItemCreate
 )
 
 # Import Telnyx models and service
@@ -39,6 +59,8 @@ from dia_tts_service import DiaTTSService
 # Import calling service
 from core_calling_service import create_call_session, get_call_session, close_call_session, CallSession
 from persistent_tts_service import persistent_tts_manager
+from tts_multiplexer import tts_multiplexer
+from audio_transcoder import audio_transcoder, TranscodeError
 
 # Import Deepgram config
 from deepgram_config import DEEPGRAM_CONFIG
@@ -103,25 +125,101 @@ SIGNUP_SECRET = os.environ.get('SIGNUP_SECRET')
 # Create the main app
 app = FastAPI(title="Retell AI Clone API")
 
-# Mount static files directory for serving generated TTS audio
-app.mount("/api/tts-audio", StaticFiles(directory="/tmp"), name="tts-audio")
+# Audio Telnyx plays by URL (generated TTS, comfort noise) lives in a bounded store served by /api/tts-audio
+COMFORT_NOISE_ASSET = "comfort_noise_continuous.mp3"
 
 # Pre-generate comfort noise on startup for immediate availability
 @app.on_event("startup")
 async def startup_event():
     """Pre-generate comfort noise files on server startup (both MP3 and mulaw)"""
+    # Open shared HTTP clients for hot upstreams (LLM providers) before the first call
+    await http_client_registry.startup()
+    
+    # Batched writer for per-turn latency spans
+    await turn_tracer.start(db)
+    
+    # Load the tokenizer used for history budgeting now, not on a caller's first turn
+    from history_manager import prewarm_encoding
+    await asyncio.to_thread(prewarm_encoding)
+    
+    # Unique (user_id, phone) on leads - bulk imports upsert against it
+    try:
+        from lead_import import backfill_lead_phones, ensure_lead_indexes
+        await ensure_lead_indexes(db)
+        # E.164 phones (and merged duplicates) on leads stored before imports normalized them, off the startup path
+        asyncio.create_task(backfill_lead_phones(db))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure lead indexes: {e}")
+    
+    # (user_id, created_at, id) on call_logs/agents/leads - keyset pagination walks them
+    try:
+        from pagination import ensure_pagination_indexes
+        await ensure_pagination_indexes(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure pagination indexes: {e}")
+    
+    # Normalized phone/call-id search keys on call_logs: index + backfill of older logs, off the startup path
+    asyncio.create_task(backfill_search_terms(db))
+    
+    # TTL/quota sweeper for playback audio
+    await playback_asset_store.start()
+    
+    # Background refresh of per-call log verbosity flags set on other workers
+    await call_log_control.start()
+    
+    # (agent_id, source/content hash) on knowledge_base - KB re-uploads are no-ops; job_id + TTL on kb_ingest_jobs
+    try:
+        await kb_ingest_jobs.ensure_indexes(db)
+        await kb_ingest_jobs.fail_stale_jobs(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure KB dedupe indexes: {e}")
+    
+    # Dialed number → (user_id, inbound_agent_id) for call.initiated
+    try:
+        await did_router.build(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not build DID routing index (lookups fall back to Mongo): {e}")
+    
+    # Voice-library audio lives in the blob store; move samples that still carry inline audio_data
+    try:
+        from voice_blob_store import migrate_inline_audio
+        await migrate_inline_audio(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not migrate inline voice samples (moved lazily on first read): {e}")
+    
+    # Materialized campaign QC results: build it for campaigns that predate it, off the startup path
+    asyncio.create_task(campaign_qc_view.backfill(db))
+    
+    # Per-campaign pattern state is built on first use; its digest lookups need the index
+    try:
+        await campaign_patterns.ensure_indexes(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not ensure campaign pattern indexes: {e}")
+    
+    # Webhook → media socket call-setup handoff; stages reach other workers over Redis pub/sub
+    call_setup.owner_source = redis_service.get_session_owner
+    try:
+        await call_setup.start(RedisSetupChannel(redis_service.redis_url) if redis_service.client else None)
+    except Exception as e:
+        logger.warning(f"⚠️ Call setup channel unavailable (same-worker handoff only): {e}")
+    
     try:
         from comfort_noise import generate_continuous_comfort_noise, get_comfort_noise_mulaw
         import os
         
-        # 1. Pre-generate MP3 comfort noise for REST API playback
-        comfort_noise_path = "/tmp/comfort_noise_continuous.mp3"
+        # 1. Pre-generate MP3 comfort noise for REST API playback (pinned: never evicted)
+        comfort_noise_path = playback_asset_store.path(COMFORT_NOISE_ASSET)
         if not os.path.exists(comfort_noise_path) or os.path.getsize(comfort_noise_path) == 0:
             logger.info("🎵 Pre-generating comfort noise file on startup (5 minutes for seamless loops)...")
             # Generate 5-minute file so it rarely loops during typical calls
-            generate_continuous_comfort_noise(duration_seconds=300, output_path=comfort_noise_path)
-            logger.info("✅ Comfort noise MP3 ready for immediate use")
+            scratch = playback_asset_store.temp_path(suffix=".mp3")
+            if generate_continuous_comfort_noise(duration_seconds=300, output_path=scratch):
+                playback_asset_store.adopt(COMFORT_NOISE_ASSET, scratch, hold=False, pin=True)
+                logger.info("✅ Comfort noise MP3 ready for immediate use")
+            elif os.path.exists(scratch):
+                os.unlink(scratch)
         else:
+            playback_asset_store.pin(COMFORT_NOISE_ASSET)
             logger.info("✅ Comfort noise MP3 already exists")
         
         # 2. Pre-generate mulaw comfort noise for WebSocket streaming
@@ -148,11 +246,13 @@ from auth_utils import hash_password, verify_password, create_access_token, gene
 from auth_middleware import get_current_user, get_optional_user
 from fastapi import Depends, Response, Request
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queued: the event loop never waits on log I/O)
+log_pipeline.configure(level=logging.INFO)
+# Per-call verbosity can be switched on from any worker; the call's worker re-reads the flags
+# from Redis in a background refresh (started at startup), never from the hot path
+call_log_control.flag_source = lambda cids: [
+    cid for cid, value in redis_service.get_flags(cids, "log_verbose").items() if value == "1"
+]
 logger = logging.getLogger(__name__)
 
 # Pre-load RAG service at startup to avoid cold start delays (optional for deployment)
@@ -177,8 +277,7 @@ try:
     import httpx
     from elevenlabs_ws_service import ElevenLabsWebSocketService
     from soniox_service import SonioxStreamingService
-    # Pre-create httpx client pool for LLM calls (will be reused)
-    _warmup_client = httpx.AsyncClient(timeout=30.0)
+    # Shared per-host httpx clients are created by http_client_registry (opened at startup)
     logger.info("✅ Connection libraries pre-warmed (websockets, httpx, ElevenLabs, Soniox)")
 except Exception as e:
     logger.warning(f"⚠️ Pre-warming failed: {e}")
@@ -412,11 +511,29 @@ async def create_agent(agent_data: AgentCreate, current_user: dict = Depends(get
     logger.info(f"Created agent: {agent.id} for user: {current_user['email']}")
     return agent
 
-@api_router.get("/agents", response_model=List[Agent])
-async def list_agents(current_user: dict = Depends(get_current_user)):
-    """List all agents for current user"""
-    agents = await db.agents.find({"user_id": current_user['id']}).to_list(1000)
-    return [Agent(**agent) for agent in agents]
+@api_router.get("/agents")
+async def list_agents(
+    current_user: dict = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    view: Optional[str] = None
+):
+    """List agents for current user
+
+    With cursor/limit/view: a keyset page {agents, next_cursor, total} of summary
+    rows (view=full for whole documents; GET /agents/{agent_id} for one agent).
+    Without them: the full list, as before.
+    """
+    query = {"user_id": current_user['id']}
+    if cursor is None and limit is None and view is None:
+        agents = await db.agents.find(query).to_list(1000)
+        return [Agent(**agent) for agent in agents]
+    try:
+        page = await paginate(db.agents, query, limit, cursor, view or "summary")
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["agents"] = page.pop("items")
+    return page
 
 @api_router.get("/agents/{agent_id}", response_model=Agent)
 async def get_agent(agent_id: str, current_user: dict = Depends(get_current_user)):
@@ -1305,84 +1422,39 @@ async def process_message(agent_id: str, request_data: dict, current_user: dict
 
 from fastapi import UploadFile, File
 
+async def reindex_agent_kb_items(agent_id: str, user_id: str):
+    """Rebuild an agent's RAG index after a KB item was added (embedding runs in a thread)"""
+    from rag_service import index_knowledge_base
+    kb_items = await db.knowledge_base.find({"agent_id": agent_id, "user_id": user_id}).to_list(100)
+    chunks_indexed = await asyncio.to_thread(index_knowledge_base, agent_id, kb_items)
+    logger.info(f"🔍 RAG: Indexed {chunks_indexed} chunks for agent {agent_id}")
+
+
 @api_router.post("/agents/{agent_id}/kb/upload")
 async def upload_kb_file(agent_id: str, file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Upload a file (PDF/TXT/DOCX) to agent's knowledge base"""
+    """Upload a file (PDF/TXT/DOCX) to agent's knowledge base; extracted as a background job, poll /kb/jobs/{job_id}"""
     try:
         # Verify agent exists and user owns it
-        agent_doc = await db.agents.find_one({"id": agent_id, "user_id": current_user['id']})
+        agent_doc = await db.agents.find_one({"id": agent_id, "user_id": current_user['id']}, {"_id": 1})
         if not agent_doc:
             raise HTTPException(status_code=404, detail="Agent not found")
         
-        filename = file.filename
-        file_content = await file.read()
-        
-        # Determine file type and extract text
+        filename = file.filename or "upload.txt"
         file_ext = filename.lower().split('.')[-1]
-        content = ""
-        
-        if file_ext == "txt":
-            # Text file - direct read
-            content = file_content.decode('utf-8', errors='ignore')
-        
-        elif file_ext == "pdf":
-            # PDF extraction using PyPDF2
-            import io
-            import PyPDF2
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            content = ""
-            for page in pdf_reader.pages:
-                content += page.extract_text() + "\n"
-        
-        elif file_ext == "docx":
-            # DOCX extraction using python-docx
-            import io
-            import docx
-            doc = docx.Document(io.BytesIO(file_content))
-            content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        
-        else:
+        if file_ext not in KB_SUPPORTED_EXTENSIONS:
             raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_ext}")
         
-        if not content.strip():
-            raise HTTPException(status_code=400, detail="No text content extracted from file")
+        # Spool the upload to disk: the job outlives the request (and its UploadFile)
+        try:
+            path, size, source_sha256 = await spool_upload(file, suffix=f".{file_ext}")
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
-        # Create KB item
-        kb_item = KnowledgeBaseItem(
-            user_id=current_user['id'],
-            agent_id=agent_id,
-            source_type="file",
-            source_name=filename,
-            content=content,
-            file_size=len(file_content)
+        job = await kb_ingest_jobs.start_file(
+            db, current_user['id'], agent_id, path, filename, size, source_sha256,
+            reindex=reindex_agent_kb_items if RAG_ENABLED else None
         )
-        
-        # Store in database
-        await db.knowledge_base.insert_one(kb_item.dict())
-        
-        logger.info(f"📚 KB file uploaded for agent {agent_id}: {filename} ({len(content)} chars)")
-        
-        # Index with RAG for fast retrieval (if enabled)
-        if RAG_ENABLED:
-            try:
-                from rag_service import index_knowledge_base
-                kb_items = await db.knowledge_base.find({"agent_id": agent_id, "user_id": current_user['id']}).to_list(100)
-                chunks_indexed = index_knowledge_base(agent_id, kb_items)
-                logger.info(f"🔍 RAG: Indexed {chunks_indexed} chunks for agent {agent_id}")
-            except Exception as e:
-                logger.error(f"❌ RAG indexing error: {e}")
-        else:
-            logger.info("ℹ️  RAG disabled - KB stored without semantic indexing")
-        
-        return {
-            "id": kb_item.id,
-            "agent_id": kb_item.agent_id,
-            "source_type": kb_item.source_type,
-            "source_name": kb_item.source_name,
-            "content_length": len(content),
-            "file_size": kb_item.file_size,
-            "created_at": kb_item.created_at
-        }
+        return {key: job[key] for key in ("job_id", "status", "source_type", "source_name", "result")}
         
     except HTTPException:
         raise
@@ -1393,82 +1465,38 @@ async def upload_kb_file(agent_id: str, file: UploadFile = File(...), current_us
 
 @api_router.post("/agents/{agent_id}/kb/url")
 async def add_kb_url(agent_id: str, url: str, current_user: dict = Depends(get_current_user)):
-    """Add a website URL to agent's knowledge base (scrapes content)"""
+    """Add a website URL to agent's knowledge base; scraped as a background job, poll /kb/jobs/{job_id}"""
     try:
         # Verify agent exists and user owns it
-        agent_doc = await db.agents.find_one({"id": agent_id, "user_id": current_user['id']})
+        agent_doc = await db.agents.find_one({"id": agent_id, "user_id": current_user['id']}, {"_id": 1})
         if not agent_doc:
             raise HTTPException(status_code=404, detail="Agent not found")
         
         if not url or not url.startswith(("http://", "https://")):
             raise HTTPException(status_code=400, detail="Valid URL required")
         
-        # Scrape website content using httpx
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            
-            # Simple HTML text extraction (remove tags)
-            import re
-            html_content = response.text
-            # Remove script and style elements
-            html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-            html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-            # Remove HTML tags
-            content = re.sub(r'<[^>]+>', ' ', html_content)
-            # Clean up whitespace
-            content = re.sub(r'\s+', ' ', content).strip()
-        
-        if not content.strip():
-            raise HTTPException(status_code=400, detail="No text content extracted from URL")
-        
-        # Create KB item
-        kb_item = KnowledgeBaseItem(
-            user_id=current_user['id'],
-            agent_id=agent_id,
-            source_type="url",
-            source_name=url,
-            content=content,
-            file_size=len(content.encode('utf-8'))
+        job = await kb_ingest_jobs.start_url(
+            db, current_user['id'], agent_id, url,
+            reindex=reindex_agent_kb_items if RAG_ENABLED else None
         )
-        
-        # Store in database
-        await db.knowledge_base.insert_one(kb_item.dict())
-        
-        logger.info(f"🌐 KB URL added for agent {agent_id}: {url} ({len(content)} chars)")
-        
-        # Index with RAG for fast retrieval (if enabled)
-        if RAG_ENABLED:
-            try:
-                from rag_service import index_knowledge_base
-                kb_items = await db.knowledge_base.find({"agent_id": agent_id, "user_id": current_user['id']}).to_list(100)
-                chunks_indexed = index_knowledge_base(agent_id, kb_items)
-                logger.info(f"🔍 RAG: Indexed {chunks_indexed} chunks for agent {agent_id}")
-            except Exception as e:
-                logger.error(f"❌ RAG indexing error: {e}")
-        else:
-            logger.info("ℹ️  RAG disabled - KB stored without semantic indexing")
-        
-        return {
-            "id": kb_item.id,
-            "agent_id": kb_item.agent_id,
-            "source_type": kb_item.source_type,
-            "source_name": kb_item.source_name,
-            "content_length": len(content),
-            "file_size": kb_item.file_size,
-            "created_at": kb_item.created_at
-        }
+        return {key: job[key] for key in ("job_id", "status", "source_type", "source_name", "result")}
         
     except HTTPException:
         raise
-    except httpx.HTTPError as e:
-        logger.error(f"Error fetching URL: {e}")
-        raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {str(e)}")
     except Exception as e:
         logger.error(f"Error adding KB URL: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.get("/agents/{agent_id}/kb/jobs/{job_id}")
+async def get_kb_ingest_job(agent_id: str, job_id: str, current_user: dict = Depends(get_current_user)):
+    """Status of a KB upload/URL job; result holds the item (duplicate=true if it was already there)"""
+    job = await kb_ingest_jobs.get(db, current_user['id'], job_id)
+    if not job or job.get("agent_id") != agent_id:
+        raise HTTPException(status_code=404, detail="KB job not found")
+    return job
+
+
 @api_router.post("/agents/{agent_id}/kb/reindex")
 async def reindex_agent_kb(agent_id: str, current_user: dict = Depends(get_current_user)):
     """Force re-index all KB items for an agent with RAG"""
@@ -1628,16 +1656,11 @@ async def create_llm_client_for_agent(user_id: str, llm_provider: str):
         return None
     
     if llm_provider == "openai":
-        from openai import AsyncOpenAI
-        return AsyncOpenAI(api_key=api_key)
+        return llm_client_pool.get_client("openai", api_key)
     
     elif llm_provider in ["grok", "groq"]:
         # Grok/Groq use OpenAI-compatible API
-        from openai import AsyncOpenAI
-        if llm_provider == "grok":
-            return AsyncOpenAI(api_key=api_key, base_url="https://api.x.ai/v1")
-        else:
-            return AsyncOpenAI(api_key=api_key, base_url="https://api.groq.com/openai/v1")
+        return llm_client_pool.get_client(llm_provider, api_key)
     
     elif llm_provider == "anthropic":
         # Anthropic has its own client
@@ -2481,7 +2504,10 @@ async def create_phone_number(number_data: PhoneNumberCreate, current_user: dict
         if agent:
             phone_number.outbound_agent_name = agent["name"]
     
-    await db.phone_numbers.insert_one(phone_number.dict())
+    number_doc = phone_number.dict()
+    number_doc["number_e164"] = normalize_did(phone_number.number)
+    await db.phone_numbers.insert_one(number_doc)
+    did_router.upsert(number_doc)
     return phone_number
 
 @api_router.get("/phone-numbers", response_model=List[PhoneNumber])
@@ -2526,19 +2552,23 @@ async def update_phone_number(number_id: str, update_data: dict, current_user: d
     # Handle number update
     if "number" in update_data:
         updated_fields["number"] = update_data["number"]
+        updated_fields["number_e164"] = normalize_did(update_data["number"])
     
     await db.phone_numbers.update_one({"id": number_id, "user_id": current_user['id']}, {"$set": updated_fields})
     
     # Return updated phone number
     updated_number = await db.phone_numbers.find_one({"id": number_id, "user_id": current_user['id']})
+    did_router.remove(number.get("number"))
+    did_router.upsert(updated_number)
     return PhoneNumber(**updated_number)
 
 @api_router.delete("/phone-numbers/{number_id}")
 async def delete_phone_number(number_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a phone number"""
-    result = await db.phone_numbers.delete_one({"id": number_id, "user_id": current_user['id']})
-    if result.deleted_count == 0:
+    deleted = await db.phone_numbers.find_one_and_delete({"id": number_id, "user_id": current_user['id']})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Phone number not found")
+    did_router.remove(deleted.get("number"))
     return {"message": "Phone number deleted successfully"}
 
 # ============ DAILY.CO INTEGRATION ============
@@ -2699,9 +2729,32 @@ async def health_check():
         "deepgram": "configured" if DEEPGRAM_API_KEY else "not configured",
         "openai": "configured" if OPENAI_API_KEY else "not configured",
         "elevenlabs": "configured" if ELEVEN_API_KEY else "not configured",
-        "daily": "configured" if DAILY_API_KEY else "not configured"
+        "daily": "configured" if DAILY_API_KEY else "not configured",
+        "tts_multiplexer": tts_multiplexer.get_stats(),
+        "audio_transcoder": audio_transcoder.get_stats(),
+        "http_clients": http_client_registry.get_stats(),
+        "llm_clients": llm_client_pool.get_stats(),
+        "turn_tracing": turn_tracer.get_stats(),
+        "did_routing": did_router.get_stats(),
+        "speculation": speculation_manager.get_stats(),
+        "call_setup": call_setup.get_stats(),
+        "speaker_cache": speaker_cache.get_stats(),
+        "campaign_qc_view": campaign_qc_view.get_stats(),
+        "campaign_patterns": campaign_patterns.get_stats(),
+        "tonality_preprocessing": tonality_preprocessor.get_stats(),
+        "playback_assets": playback_asset_store.get_stats(),
+        "kb_ingest": kb_ingest_jobs.get_stats(),
+        "stt_streams": stt_streams.get_stats(),
+        "logging": {**log_pipeline.get_stats(), "hot_path": call_log_control.get_stats()}
     }
 
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of per-turn latency histograms (this worker)"""
+    return Response(content=turn_tracer.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @api_router.post("/warmup/tts")
 async def warmup_tts_connection(
     current_user: dict = Depends(get_current_user)
@@ -3422,16 +3475,7 @@ async def telnyx_voice_agent_stream(websocket: WebSocket, call_control_id: str):
 
 async def handle_assemblyai_streaming(websocket: WebSocket, session, call_id: str, call_control_id: str):
     """Handle streaming with AssemblyAI"""
-    from assemblyai_service import AssemblyAIStreamingService
-    
     agent_config = session.agent_config
-    assemblyai_settings = agent_config.get("settings", {}).get("assemblyai_settings", {})
-    threshold = assemblyai_settings.get("threshold", 0.0)
-    disable_partial = assemblyai_settings.get("disable_partial_transcripts", False)
-    # Smart Endpointing parameters
-    end_of_turn_confidence = assemblyai_settings.get("end_of_turn_confidence_threshold", 0.8)
-    min_silence_confident = assemblyai_settings.get("min_end_of_turn_silence_when_confident", 500)
-    max_silence = assemblyai_settings.get("max_turn_silence", 2000)
     
     # Get user's AssemblyAI API key
     assemblyai_api_key = await get_api_key(session.user_id, "assemblyai")
@@ -3442,16 +3486,9 @@ async def handle_assemblyai_streaming(websocket: WebSocket, session, call_id: st
     
     logger.info(f"🔑 Using user's AssemblyAI API key (first 10 chars): {assemblyai_api_key[:10]}...")
     
-    # Initialize AssemblyAI service with user's API key
-    assemblyai = AssemblyAIStreamingService(api_key=assemblyai_api_key)
-    connected = await assemblyai.connect(
-        sample_rate=8000,
-        threshold=threshold,
-        disable_partial_transcripts=disable_partial,
-        end_of_turn_confidence_threshold=end_of_turn_confidence,
-        min_end_of_turn_silence_when_confident=min_silence_confident,
-        max_turn_silence=max_silence
-    )
+    # Smart Endpointing parameters come from settings.assemblyai_settings
+    stt = create_stt_adapter("assemblyai", assemblyai_api_key, agent_config)
+    connected = await stt.connect()
     
     if not connected:
         logger.error("❌ Failed to connect to AssemblyAI")
@@ -3553,12 +3590,7 @@ async def handle_assemblyai_streaming(websocket: WebSocket, session, call_id: st
                     session.mark_agent_speaking_start()
                 await telnyx_service.speak_text(call_control_id, text, agent_config=agent_config)
 
-        # Handle different response types
-        if response_type == "greeting":
-             # ... existing logic ...
-             pass
-        elif response_type == "response":
-            await speak_response(response_text)
+        await speak_response(response_text)
         
         if session.should_end_call:
             logger.info("📞 Ending call...")
@@ -3567,8 +3599,7 @@ async def handle_assemblyai_streaming(websocket: WebSocket, session, call_id: st
         
         is_agent_speaking = False
     
-    # Callbacks for AssemblyAI messages
-    async def on_final_transcript(text, data):
+    async def on_final_transcript(text):
         nonlocal transcript_buffer, last_transcript_time, processing_task
         
         transcript_buffer.append(text)
@@ -3584,139 +3615,98 @@ async def handle_assemblyai_streaming(websocket: WebSocket, session, call_id: st
         processing_task = asyncio.create_task(process_accumulated_transcript())
     
     async def forward_telnyx_to_assemblyai():
-        """Forward audio from Telnyx to AssemblyAI with resampling and buffering"""
-        from audio_resampler import convert_mulaw_8khz_to_pcm_16khz
-        import base64
-        audio_packet_count = 0
-        buffer = bytearray()  # Buffer to accumulate audio chunks
-        BUFFER_SIZE = 3  # Accumulate 3x 20ms chunks = 60ms before sending (optimized from 100ms)
-        chunk_counter = 0
-        
+        """Forward audio from Telnyx to AssemblyAI (16kHz PCM from the shared front end, 60ms packets)"""
         try:
-            while True:
-                # Receive JSON text from Telnyx (same as Deepgram handler)
-                message = await websocket.receive_text()
-                data = json.loads(message)
-                event = data.get("event")
-                
-                # Telnyx sends: {"event": "media", "media": {"payload": "base64..."}  }
-                if event == "media" and "media" in data:
-                    # Telnyx sends base64 encoded 8kHz mulaw audio (20ms chunks)
-                    mulaw_data = base64.b64decode(data["media"]["payload"])
-                    
-                    # Convert 8kHz mulaw → 16kHz linear PCM for AssemblyAI
-                    pcm_16khz = convert_mulaw_8khz_to_pcm_16khz(mulaw_data)
-                    
-                    # Buffer audio to combine small chunks (20ms → 100ms)
-                    buffer.extend(pcm_16khz)
-                    chunk_counter += 1
-                    
-                    # Send buffered audio every BUFFER_SIZE chunks (60ms)
-                    if chunk_counter >= BUFFER_SIZE:
-                        await assemblyai.send_audio(bytes(buffer))
-                        audio_packet_count += 1
-                        
-                        if audio_packet_count == 1:
-                            logger.info(f"✅ Started forwarding audio (8kHz mulaw → 16kHz PCM, buffered 60ms)")
-                        if audio_packet_count % 33 == 0:  # Log every ~2 seconds (33 * 60ms)
-                            logger.info(f"📤 Sent {audio_packet_count} buffered packets to AssemblyAI")
-                        
-                        # Clear buffer
-                        buffer = bytearray()
-                        chunk_counter = 0
-                        
+            frames = await AudioFrontEnd.for_adapter(stt).pump(websocket, stt)
+            logger.info(f"⏹️ Telnyx stream stopped. Sent {stt.stats['packets']} buffered packets ({frames} frames)")
         except WebSocketDisconnect:
-            logger.info(f"📞 WebSocket disconnected. Sent {audio_packet_count} total buffered packets")
+            logger.info(f"📞 WebSocket disconnected. Sent {stt.stats['packets']} total buffered packets")
         except Exception as e:
             logger.error(f"❌ Error forwarding audio to AssemblyAI: {type(e).__name__}: {e}")
     
+    async def receive_transcripts():
+        try:
+            async for event in stt.events():
+                if event.kind == STT_FINAL:
+                    logger.info(f"✅ AssemblyAI Turn (final): {event.text}")
+                    await on_final_transcript(event.text)
+        except websockets.exceptions.ConnectionClosed:
+            logger.info("🔌 AssemblyAI connection closed")
+    
     # Run both tasks
     try:
         await asyncio.gather(
             forward_telnyx_to_assemblyai(),
-            assemblyai.receive_messages(on_final_transcript=on_final_transcript)
+            receive_transcripts()
         )
     except Exception as e:
         logger.error(f"❌ Error in AssemblyAI streaming: {e}")
     finally:
-        await assemblyai.close()
+        await stt.close()
+
+
+# One- or two-word replies that are dropped while the agent is talking
+SHORT_REPLY_FILLERS = {
+    "um", "uh", "hmm", "mhm", "yeah", "yep", "nope", "ok", "okay", "uh-huh", "yes", "no", "sure", "right", "ah", "oh",
+}
+
+
+def is_garbled_transcript(text: str) -> bool:
+    """Detect if transcript is garbled echo (not real speech)"""
+    if not text or not text.strip():
+        return True
+    
+    text = text.strip()
+    
+    # Pattern 1: Only single letters with spaces/dashes (like "M m -m m", "a b c")
+    if re.match(r'^[a-zA-Z](\s+[-]?\s*[a-zA-Z])+[\s\.\-]*$', text):
+        return True
+    
+    # Pattern 2: Only M's, spaces, dashes, dots
+    if re.match(r'^[mMhH\s\-\.]+$', text) and len(text) < 15:
+        return True
+    
+    # Pattern 3: Single repeated letters/sounds
+    if re.match(r'^(m+|h+|u+|a+)[\s\-\.]*$', text.lower()):
+        return True
+    
+    # ✅ EXCEPTION: Allow valid number patterns (4K, 10K, 5M, 2PM, etc.)
+    # These are common responses for income/time questions
+    if re.match(r'^\d+[kKmMbB]?\.?$', text):
+        return False  # Valid number shorthand like "4K", "10K", "5M"
+    if re.match(r'^\d+:?\d*\s*[AP]\.?M\.?$', text, re.IGNORECASE):
+        return False  # Valid time like "2PM", "3:30 PM"
+    
+    # Pattern 4: Very short with no vowels (likely noise)
+    if len(text) < 5 and not re.search(r'[aeiouyAEIOUY]', text):
+        return True
+    
+    # Pattern 5: Just punctuation/dashes
+    if re.match(r'^[\s\-\.\,\?\!]+$', text):
+        return True
+    
+    return False
 
 
 async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, call_control_id: str):
     """Handle streaming with Soniox"""
-    from soniox_service import SonioxStreamingService
     from dead_air_monitor import monitor_dead_air
     
     agent_config = session.agent_config
-    soniox_settings = agent_config.get("settings", {}).get("soniox_settings", {})
-    
-    # Extract Soniox settings
-    model = soniox_settings.get("model", "stt-rt-v3")  # Updated to v3 (telephony-v3 is deprecated)
-    audio_format = soniox_settings.get("audio_format", "mulaw")
-    sample_rate = soniox_settings.get("sample_rate", 8000)
-    num_channels = soniox_settings.get("num_channels", 1)
-    enable_endpoint_detection = soniox_settings.get("enable_endpoint_detection", True)
-    enable_speaker_diarization = soniox_settings.get("enable_speaker_diarization", False)
-    language_hints = soniox_settings.get("language_hints", ["en"])
-    context = soniox_settings.get("context", "")
     
     # ⏱️  LATENCY TRACKING: Track time of last audio packet received
     last_audio_received_time = None
     stt_start_time = None
     
-    # 🔥 COMPREHENSIVE LATENCY TRACKING - Track EVERY stage of the pipeline
-    latency_tracker = {
-        "user_audio_start": None,      # When user starts speaking (first audio packet with voice)
-        "user_audio_end": None,        # When user stops speaking (last audio packet)
-        "stt_transcript_received": None, # When Soniox gives us the transcript
-        "llm_request_start": None,     # When we start LLM call
-        "llm_first_token": None,       # When LLM returns first token
-        "llm_complete": None,          # When LLM finishes
-        "tts_request_start": None,     # When we send text to ElevenLabs
-        "tts_first_chunk": None,       # When ElevenLabs returns first audio chunk
-        "tts_audio_sent": None,        # When we send audio to Telnyx WebSocket
-    }
+    # 🔥 PER-TURN LATENCY SPANS: stages are marked on turn_tracer by call id
+    # (here, in CallSession and in PersistentTTSSession) and persisted to turn_metrics
     
-    def log_latency_breakdown():
-        """Log comprehensive latency breakdown"""
-        if not latency_tracker["user_audio_end"]:
-            return
-        
-        t0 = latency_tracker["user_audio_end"]
-        breakdown = ["📊 REAL LATENCY BREAKDOWN:"]
-        
-        if latency_tracker["stt_transcript_received"]:
-            stt_ms = int((latency_tracker["stt_transcript_received"] - t0) * 1000)
-            breakdown.append(f"   STT (user done → transcript): {stt_ms}ms")
-        
-        if latency_tracker["llm_request_start"]:
-            llm_start_ms = int((latency_tracker["llm_request_start"] - t0) * 1000)
-            breakdown.append(f"   Processing → LLM start: {llm_start_ms}ms")
-        
-        if latency_tracker["llm_first_token"] and latency_tracker["llm_request_start"]:
-            llm_ttft_ms = int((latency_tracker["llm_first_token"] - latency_tracker["llm_request_start"]) * 1000)
-            breakdown.append(f"   LLM TTFT: {llm_ttft_ms}ms")
-        
-        if latency_tracker["tts_request_start"] and latency_tracker["llm_first_token"]:
-            to_tts_ms = int((latency_tracker["tts_request_start"] - latency_tracker["llm_first_token"]) * 1000)
-            breakdown.append(f"   LLM token → TTS request: {to_tts_ms}ms")
-        
-        if latency_tracker["tts_first_chunk"] and latency_tracker["tts_request_start"]:
-            tts_ttfb_ms = int((latency_tracker["tts_first_chunk"] - latency_tracker["tts_request_start"]) * 1000)
-            breakdown.append(f"   TTS TTFB (request → first audio): {tts_ttfb_ms}ms")
-        
-        if latency_tracker["tts_audio_sent"] and latency_tracker["tts_first_chunk"]:
-            send_ms = int((latency_tracker["tts_audio_sent"] - latency_tracker["tts_first_chunk"]) * 1000)
-            breakdown.append(f"   TTS chunk → Telnyx send: {send_ms}ms")
-        
-        if latency_tracker["tts_audio_sent"]:
-            total_ms = int((latency_tracker["tts_audio_sent"] - t0) * 1000)
-            breakdown.append(f"   ═══════════════════════════")
-            breakdown.append(f"   TOTAL (user done → audio sent): {total_ms}ms")
-            breakdown.append(f"   + Phone network latency: ~200-500ms (not measured)")
-        
-        for line in breakdown:
-            logger.info(line)
+    # 🎙️ LOCAL VAD: end of the caller's speech is known from the audio itself;
+    # a probable end of turn can start the LLM before Soniox sends <end>
+    turn_detector = EndOfTurnDetector.from_agent_config(agent_config)
+    early_turn_enabled = is_early_turn_enabled(agent_config)
+    if early_turn_enabled:
+        logger.info(f"⚡ Early end-of-turn detection enabled (silence {int(turn_detector.silence_s * 1000)}ms)")
     
     # 🚦 INTERRUPTION HANDLING: Track agent speaking state locally
     is_agent_speaking = False
@@ -3753,18 +3743,10 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
     
     logger.info(f"🔑 Using user's Soniox API key (first 10 chars): {soniox_api_key[:10]}...")
     
-    # Initialize Soniox service with user's API key
-    soniox = SonioxStreamingService(api_key=soniox_api_key)
-    connected = await soniox.connect(
-        model=model,
-        audio_format=audio_format,
-        sample_rate=sample_rate,
-        num_channels=num_channels,
-        enable_endpoint_detection=enable_endpoint_detection,
-        enable_speaker_diarization=enable_speaker_diarization,
-        language_hints=language_hints,
-        context=context
-    )
+    # Soniox model, endpointing and context come from settings.soniox_settings
+    stt = create_stt_adapter("soniox", soniox_api_key, agent_config)
+    model = stt.model
+    connected = await stt.connect()
     
     if not connected:
         logger.error("❌ Failed to connect to Soniox")
@@ -3845,6 +3827,7 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
         
         # Update partial transcript
         partial_transcript = text
+        turn_detector.set_partial(text)
         
         # Dead air prevention: Mark user as speaking when we get any transcript
         if text.strip() and not session.user_speaking:
@@ -4078,11 +4061,18 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
     
     # Callback for endpoint detection (when Soniox detects end of utterance)
     async def on_endpoint_detected():
-        nonlocal accumulated_transcript, last_audio_received_time, is_agent_speaking, agent_generating_response, current_playback_ids, call_ending, stt_start_time, verbose_interruption_triggered, current_utterance_word_count, latency_tracker
-        
-        # 🔥 TIMING: Mark when we receive the transcript from STT
-        latency_tracker["stt_transcript_received"] = time.time()
-        latency_tracker["user_audio_end"] = last_audio_received_time  # Use the last audio packet time
+        nonlocal accumulated_transcript, last_audio_received_time, is_agent_speaking, agent_generating_response, current_playback_ids, call_ending, stt_start_time, verbose_interruption_triggered, current_utterance_word_count
+        
+        # 🔥 TIMING: Open this turn's trace (STT final + end of the caller's speech per local VAD,
+        # falling back to the last audio packet when the VAD saw no speech)
+        turn_trace = turn_tracer.start_turn(
+            call_control_id,
+            user_id=session.user_id,
+            agent_id=session.agent_id,
+            stt_final=time.time(),
+            user_audio_end=turn_detector.last_speech_end or last_audio_received_time
+        )
+        turn_detector.reset_turn()
         
         # Reset verbose tracking for next utterance
         verbose_interruption_triggered = False
@@ -4136,8 +4126,8 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
             redis_service.update_call_data(call_control_id, {"greeting_in_flight": False})
         
         # Log STT latency
-        if last_audio_received_time and latency_tracker["stt_transcript_received"]:
-            stt_latency = int((latency_tracker["stt_transcript_received"] - last_audio_received_time) * 1000)
+        stt_latency = turn_trace.span_ms("stt")
+        if stt_latency is not None:
             logger.info(f"📊 [REAL TIMING] STT: User audio end → Transcript received: {stt_latency}ms")
         
         logger.info(f"🎤 Endpoint detected by Soniox - processing transcript: {accumulated_transcript}")
@@ -4256,12 +4246,12 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                 first_sentence_played = False
                 full_response_text = ""
                 
-                # 🔥 TIMING: Mark LLM request start
-                latency_tracker["llm_request_start"] = llm_start_time
+                # 🔥 TIMING: Mark processing start
+                turn_tracer.mark(call_control_id, "processing_start", llm_start_time)
                 
                 # Log when user stopped speaking
                 logger.info(f"⏱️  USER STOPPED SPEAKING at T=0ms")
-                logger.info(f"📊 [REAL TIMING] Processing start: {int((llm_start_time - latency_tracker.get('user_audio_end', llm_start_time)) * 1000)}ms after user audio end")
+                logger.info(f"📊 [REAL TIMING] Processing start: {int((llm_start_time - (turn_trace.marks.get('user_audio_end') or llm_start_time)) * 1000)}ms after user audio end")
                 
                 # 🚦 CRITICAL: Set flags BEFORE LLM starts (enables interruption detection)
                 is_agent_speaking = True
@@ -4394,8 +4384,17 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                         # Stream sentence immediately (non-blocking, queued for playback)
                         # Get current voice ID from agent config for dynamic voice updates
                         current_voice_id = session.agent_config.get("settings", {}).get("elevenlabs_settings", {}).get("voice_id")
+                        
+                        # 🔮 Opening of a node we speculatively pre-synthesized? Take it now,
+                        # before the next turn's preparation discards it
+                        prepared = None
+                        if is_first and session.speculator:
+                            prepared = session.speculator.take(sentence, current_voice_id)
                         tts_task = asyncio.create_task(
-                            persistent_tts_session.stream_sentence(sentence, is_first=is_first, is_last=is_last, current_voice_id=current_voice_id)
+                            persistent_tts_session.stream_sentence(
+                                sentence, is_first=is_first, is_last=is_last, current_voice_id=current_voice_id,
+                                prepared_audio=prepared.audio if prepared else None
+                            )
                         )
                         tts_tasks.append(tts_task)
                     else:
@@ -4518,8 +4517,17 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                 user_input_for_processing = accumulated_transcript
                 accumulated_transcript = ""  # Clear immediately so new speech doesn't pile up
                 
-                # Process with streaming (TTS generation happens in parallel!)
-                response = await session.process_user_input(user_input_for_processing, stream_callback=stream_sentence_to_tts)
+                # ⚡ EARLY RESPONSE: reuse the generation started on the VAD's probable end of turn
+                # if it was for this exact transcript, otherwise it's discarded and we start fresh
+                early_response = await session.take_early_response(user_input_for_processing)
+                if early_response:
+                    turn_tracer.mark(call_control_id, "early_start", early_response.started_at)
+                    turn_tracer.mark(call_control_id, "processing_start", early_response.started_at)
+                    turn_tracer.mark(call_control_id, "llm_request", early_response.started_at)
+                    response = await early_response.commit(stream_sentence_to_tts)
+                else:
+                    # Process with streaming (TTS generation happens in parallel!)
+                    response = await session.process_user_input(user_input_for_processing, stream_callback=stream_sentence_to_tts)
                 
                 # 🚫 CANCELLATION CHECK after LLM returns (before TTS playback)
                 current_response_task = call_states.get(call_control_id, {}).get("current_response_task")
@@ -4554,16 +4562,14 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                         audio_hash = hashlib.md5(combined_string.encode()).hexdigest()
                         
                         audio_filename = f"tts_{tts_provider}_{audio_hash}.mp3"
-                        audio_path = f"/tmp/{audio_filename}"
                         
-                        # Save audio
-                        with open(audio_path, 'wb') as f:
-                            f.write(audio_bytes)
+                        # Save audio (leased until this playback ends)
+                        playback_asset_store.put(audio_filename, audio_bytes)
                         
                         backend_url = os.environ.get('BACKEND_URL')
                         if not backend_url:
                             raise ValueError("BACKEND_URL environment variable must be set")
-                        audio_url = f"{backend_url}/api/tts-audio/{audio_filename}"
+                        audio_url = playback_asset_store.url(audio_filename, backend_url)
                         
                         playback_start = time.time()
                         logger.info(f"⏱️ [TIMING] TELNYX_PLAY_CALL_START: Calling play_audio_url API")
@@ -4785,6 +4791,17 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                     }}
                 )
                 
+                # 📊 Finish the turn's trace: closed on its first audio (numeric spans → /metrics histograms + turn_metrics, batched)
+                turn_tracer.finish_turn(
+                    call_control_id,
+                    node_id=node_id,
+                    node_label=node_label,
+                    user_text=user_input_for_processing,
+                    agent_text=response_text,
+                    transition_ms=transition_time_ms,
+                    kb_ms=kb_time_ms
+                )
+                
                 # Save detailed latency metrics to database
                 await db.call_logs.update_one(
                     {"call_id": call_control_id},
@@ -4884,6 +4901,7 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
             logger.info(f"👤 User has spoken - aiSpeaksAfterSilence timer cancelled if pending")
         
         accumulated_transcript += text
+        turn_detector.set_final(accumulated_transcript)
         
         # 🚦 INTERRUPTION DETECTION: Check if agent audio is actively playing
         # For WebSocket streaming, use tts_is_speaking as primary source of truth
@@ -4981,48 +4999,48 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
             # Agent is NOT speaking (no active audio) - process ALL transcripts, including 1-word
             logger.info(f"✅ Agent SILENT - User said {word_count} word(s): '{accumulated_transcript}' - Processing...")
     
-    # Forward audio from Telnyx to Soniox
-    async def forward_telnyx_to_soniox():
-        """Forward audio from Telnyx to Soniox (no resampling needed for mulaw!)"""
-        import base64
-        audio_packet_count = 0
-        last_packet_log_time = time.time()
-        nonlocal last_audio_received_time, stt_start_time, accumulated_transcript, current_playback_ids, agent_generating_response
+    # Forward audio from Telnyx to Soniox: the shared front end decodes each packet once,
+    # sends it on as-is (8kHz mulaw, no resampling) and hands the same frame to the VAD tap
+    audio_front_end = AudioFrontEnd.for_adapter(stt)
+    last_packet_log_time = time.time()
+    
+    def on_caller_frame(frame):
+        nonlocal last_audio_received_time, stt_start_time, last_packet_log_time
         
+        # ⏱️  Track last audio received time for STT latency calculation
+        last_audio_received_time = time.time()
+        if stt_start_time is None:
+            stt_start_time = last_audio_received_time
+        
+        # 🎙️ LOCAL VAD: probable end of turn → start the LLM early; speech resumed → discard
+        vad_event = turn_detector.process(frame.mulaw, last_audio_received_time)
+        if vad_event == PROBABLE_END_OF_TURN and early_turn_enabled and not call_ending:
+            generating = call_states.get(call_control_id, {}).get("agent_generating_response", False)
+            tts_session = persistent_tts_manager.get_session(call_control_id)
+            if not generating and not (tts_session and tts_session.is_speaking):
+                asyncio.create_task(session.start_early_response(turn_detector.transcript))
+        elif vad_event == SPEECH_RESUMED and session.early_response is not None:
+            asyncio.create_task(session.cancel_early_response("speech resumed"))
+        
+        if audio_front_end.stats["frames"] == 1:
+            logger.info(f"✅ Started forwarding audio (8kHz mulaw → Soniox, NO BUFFERING)")
+        
+        # Log every 5 seconds to confirm audio is still flowing
+        if last_audio_received_time - last_packet_log_time >= 5.0:
+            logger.info(f"📤 Audio flowing: {audio_front_end.stats['frames']} packets sent to Soniox (5s update)")
+            last_packet_log_time = last_audio_received_time
+    
+    audio_front_end.add_tap(on_caller_frame)
+    
+    async def forward_telnyx_to_soniox():
+        """Forward audio from Telnyx to Soniox"""
+        # Note: We ALWAYS send audio so interruptions work
+        # Garbled echo transcripts are filtered at the transcript level
         try:
-            while True:
-                # Receive JSON text from Telnyx
-                message = await websocket.receive_text()
-                data = json.loads(message)
-                event = data.get("event")
-                
-                # Telnyx sends: {"event": "media", "media": {"payload": "base64..."}}
-                if event == "media" and "media" in data:
-                    # Telnyx sends base64 encoded 8kHz mulaw audio (20ms chunks)
-                    mulaw_data = base64.b64decode(data["media"]["payload"])
-                    
-                    # ⏱️  Track last audio received time for STT latency calculation
-                    last_audio_received_time = time.time()
-                    if stt_start_time is None:
-                        stt_start_time = last_audio_received_time
-                    
-                    # Send directly to Soniox (no resampling needed!)
-                    # Note: We ALWAYS send audio so interruptions work
-                    # Garbled echo transcripts are filtered at the transcript level
-                    await soniox.send_audio(mulaw_data)
-                    audio_packet_count += 1
-                    
-                    if audio_packet_count == 1:
-                        logger.info(f"✅ Started forwarding audio (8kHz mulaw → Soniox, NO BUFFERING)")
-                    
-                    # Log every 5 seconds to confirm audio is still flowing
-                    current_time = time.time()
-                    if current_time - last_packet_log_time >= 5.0:
-                        logger.info(f"📤 Audio flowing: {audio_packet_count} packets sent to Soniox (5s update)")
-                        last_packet_log_time = current_time
-                        
+            frames = await audio_front_end.pump(websocket, stt)
+            logger.info(f"⏹️ Telnyx stream stopped. Sent {frames} total packets")
         except WebSocketDisconnect:
-            logger.info(f"📞 Telnyx WebSocket disconnected. Sent {audio_packet_count} total packets")
+            logger.info(f"📞 Telnyx WebSocket disconnected. Sent {audio_front_end.stats['frames']} total packets")
         except Exception as e:
             logger.error(f"❌ Error forwarding audio to Soniox: {type(e).__name__}: {e}")
             import traceback
@@ -5032,306 +5050,207 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
     try:
         # Create receive task
         async def receive_with_reconnect():
-            """Keep receiving messages, reconnect if Soniox closes"""
+            """Keep receiving events, reconnect if Soniox closes"""
+            nonlocal accumulated_transcript
             reconnect_attempts = 0
             max_reconnects = 3
             last_receive_log = time.time()
-            messages_received = 0
+            events_received = 0
             
             while reconnect_attempts < max_reconnects:
                 try:
-                    async def log_receiver_status():
-                        nonlocal last_receive_log, messages_received
+                    async for event in stt.events():
+                        events_received += 1
                         current_time = time.time()
                         if current_time - last_receive_log >= 10.0:
-                            logger.info(f"🎤 Soniox receiver alive - {messages_received} messages received in last 10s")
+                            logger.info(f"🎤 Soniox receiver alive - {events_received} events received in last 10s")
                             last_receive_log = current_time
-                            messages_received = 0
-                    
-                    # Custom receive that logs activity
-                    async for msg in soniox.ws:
-                        messages_received += 1
-                        await log_receiver_status()
+                            events_received = 0
                         
-                        data = json.loads(msg)
+                        # 🔍 DEBUG: Log event evolution - sampled unless the call is verbose
+                        call_log_control.hot(logger, call_id, "🔤 STT %s: '%s'", event.kind, event.text)
                         
-                        if "error_code" in data:
-                            logger.error(f"❌ Soniox error: {data}")
-                            break
+                        # Process partials - fire and forget
+                        if event.kind == STT_PARTIAL:
+                            if on_partial_transcript:
+                                asyncio.create_task(on_partial_transcript(event.text, event.raw))
+                            continue
                         
-                        if data.get("finished"):
-                            logger.info("🛑 Soniox session finished")
-                            break
+                        # Process final text - fire and forget
+                        if event.kind == STT_FINAL:
+                            final_text = event.text
+                            logger.info(f"🎤 Soniox final transcript: '{final_text}'")
+                            
+                            # 🔥 GARBLED/ECHO DETECTION: Filter transcripts that are likely TTS echo
+                            # These occur when agent's audio echoes back and Soniox tries to transcribe it
+                            is_garbled = is_garbled_transcript(final_text)
+                            if is_garbled:
+                                logger.warning(f"🔇 GARBLED/ECHO detected: '{final_text.strip()}' - filtering out")
+                            
+                            # 🔥 EARLY FILTER: Check if this is a 1-word filler during agent speech
+                            # If so, don't call on_final_transcript at all (prevents context pollution)
+                            word_count = len(final_text.strip().split())
+                            is_filler = final_text.strip().lower().rstrip('?.,!') in SHORT_REPLY_FILLERS
+                            
+                            # Check agent_generating_response flag
+                            # NOTE: current_playback_ids is for HTTP-based playbacks (legacy)
+                            # With WebSocket streaming, we use tts_is_speaking as source of truth
+                            is_generating = agent_generating_response or call_states.get(call_control_id, {}).get("agent_generating_response", False)
+                            
+                            # 🔊 SINGLE SOURCE OF TRUTH: Check TTS session's is_speaking flag
+                            # This is the authoritative state for whether agent audio is playing
+                            tts_session = persistent_tts_manager.get_session(call_control_id) if call_control_id else None
+                            tts_is_speaking = tts_session.is_speaking if tts_session else False
+                            
+                            # Also check playback_expected_end for logging/debugging
+                            playback_expected_end = call_states.get(call_control_id, {}).get("playback_expected_end_time", 0)
+                            time_until_audio_done = playback_expected_end - current_time if playback_expected_end > 0 else 0
+                            
+                            # 🔥 SIMPLIFIED: Agent is active if:
+                            # 1. TTS session says it's speaking (AUTHORITATIVE for WebSocket)
+                            # 2. OR audio expected to still be playing (time backup)
+                            # 3. OR LLM is generating
+                            user_actively_speaking = session and session.user_speaking
+                            
+                            if tts_is_speaking:
+                                # TTS session explicitly says agent is speaking
+                                is_agent_active = True
+                                if user_actively_speaking:
+                                    logger.info(f"🎯 User speaking while TTS is_speaking=True - INTERRUPTION POSSIBLE")
+                            elif tts_session and getattr(tts_session, 'is_waiting_for_first_audio_of_response', False):
+                                # 🔥 FIX: Agent is technically "speaking" (waiting for audio to arrive)
+                                # This covers the ~500ms gap between LLM done and audio start
+                                is_agent_active = True
+                                logger.info(f"🛡️ Agent active (waiting for audio) - 1-word filter ENABLED")
+                            elif playback_expected_end > 0 and time_until_audio_done > -NETWORK_PROPAGATION_DELAY:
+                                # Audio expected to still be playing (including network latency buffer)
+                                is_agent_active = True
+                            elif is_generating:
+                                # LLM is generating response
+                                is_agent_active = True
+                            else:
+                                # Agent is NOT active - ready to receive user input
+                                is_agent_active = False
+                            
+                            # DEBUG: Log all values
+                            logger.info(f"🔍 FILTER CHECK: words={word_count}, is_filler={is_filler}, is_garbled={is_garbled}, tts_speaking={tts_is_speaking}, time_until_done={time_until_audio_done:.1f}s, generating={is_generating}, playbacks={len(current_playback_ids)}, is_active={is_agent_active}")
+                            
+                            # ALWAYS filter garbled transcripts (these are echo, not real speech)
+                            if is_garbled:
+                                logger.info(f"🔕 FILTERING garbled/echo '{final_text.strip()}' - NOT calling on_final_transcript")
+                            # Filter 1-2 word utterances or fillers ONLY during active audio playback
+                            # Relax filter during latency buffer (time < 0) to allow quick turn-taking (e.g. "Yeah", "What's up?")
+                            elif is_agent_active and time_until_audio_done > 0.2 and (word_count <= 2 or is_filler):
+                                logger.info(f"🔕 FILTERING {word_count}-word/filler '{final_text.strip()}' - NOT calling on_final_transcript")
+                                # Don't call on_final_transcript - skip this entirely
+                            elif on_final_transcript:
+                                # Not filtered - call on_final_transcript
+                                asyncio.create_task(on_final_transcript(final_text, event.raw))
+                            continue
+                        
+                        # Endpoint: RUN AS BACKGROUND TASK to avoid blocking receive loop!
+                        if event.kind != STT_ENDPOINT or not on_endpoint_detected:
+                            continue
                         
-                        tokens = data.get("tokens", [])
-                        if tokens:
-                            # 🔍 DEBUG: Log raw token evolution (as per Soniox docs)
-                            token_summary = []
-                            for t in tokens:
-                                token_text = t.get("text", "")
-                                is_final = t.get("is_final", False)
-                                status = "✓" if is_final else "?"
-                                token_summary.append(f'"{token_text}"{status}')
-                            logger.info(f"🔤 RAW TOKENS: [{', '.join(token_summary)}]")
+                        # 🔥 EARLY FILTER for endpoint too - don't spawn task for filtered utterances
+                        # (the endpoint carries the whole utterance, not just the last token batch)
+                        utterance = event.text
+                        if utterance.strip():
+                            word_count = len(utterance.strip().split())
+                            is_filler = utterance.strip().lower().rstrip('?.,!') in SHORT_REPLY_FILLERS
+                            
+                            # Check for garbled/echo transcripts
+                            is_garbled = is_garbled_transcript(utterance)
                             
-                            final_tokens = []
-                            non_final_tokens = []
-                            endpoint_detected = False
+                            is_generating = agent_generating_response or call_states.get(call_control_id, {}).get("agent_generating_response", False)
                             
-                            for token in tokens:
-                                text = token.get("text", "")
-                                is_final = token.get("is_final", False)
+                            # 🔊 SINGLE SOURCE OF TRUTH: Check TTS session's is_speaking flag
+                            tts_session = persistent_tts_manager.get_session(call_control_id) if call_control_id else None
+                            tts_is_speaking = tts_session.is_speaking if tts_session else False
+                            
+                            # Also check playback_expected_end for backup
+                            playback_expected_end = call_states.get(call_control_id, {}).get("playback_expected_end_time", 0)
+                            time_until_audio_done = playback_expected_end - current_time if playback_expected_end > 0 else 0
+                            
+                            # 🔥 SIMPLIFIED: Agent is active if TTS says so or timer backup
+                            user_actively_speaking = session and session.user_speaking
+                            
+                            if tts_is_speaking:
+                                # TTS session explicitly says agent is speaking
+                                is_agent_active = True
+                                if user_actively_speaking:
+                                    logger.info(f"🎯 User speaking while TTS is_speaking=True - INTERRUPTION POSSIBLE")
+                            elif tts_session and getattr(tts_session, 'is_waiting_for_first_audio_of_response', False):
+                                # 🔥 FIX: Agent is technically "speaking" (waiting for audio to arrive)
+                                # This covers the ~500ms gap between LLM done and audio start
+                                is_agent_active = True
+                            elif playback_expected_end > 0 and time_until_audio_done > -NETWORK_PROPAGATION_DELAY:
+                                # Audio expected to still be playing by timer (including latency buffer)
+                                is_agent_active = True
+                            elif time_until_audio_done > 0:
+                                is_agent_active = True
+                            elif is_generating:
+                                is_agent_active = True
+                            else:
+                                is_agent_active = False
+                            
+                            # ALWAYS filter garbled transcripts
+                            if is_garbled:
+                                logger.info(f"🔕 SKIPPING endpoint for garbled/echo '{utterance.strip()}'")
+                                accumulated_transcript = ""
+                                if session and session.user_speaking:
+                                    session.mark_user_speaking_end()
+                                continue
+                            
+                            # Filter 1-2 word utterances or fillers ONLY during active audio playback
+                            # Relax filter during latency buffer (time < 0) to allow quick turn-taking (e.g. "Yeah", "What's up?")
+                            if is_agent_active and time_until_audio_done > 0.2 and (word_count <= 2 or is_filler):
+                                logger.info(f"🔕 SKIPPING endpoint for {word_count}-word/filler '{utterance.strip()}' (tts_speaking={tts_is_speaking}, is_active={is_agent_active})")
+                                accumulated_transcript = ""  # Clear any accumulated text
                                 
-                                if text == "<end>" and is_final:
-                                    endpoint_detected = True
-                                    logger.info(f"🎯 Endpoint detected: <end> token received")
-                                    continue
+                                # 🔥 CRITICAL FIX: Still mark user as stopped speaking even when filtering
+                                # Otherwise user_speaking stays True and silence detection never triggers
+                                if session and session.user_speaking:
+                                    session.mark_user_speaking_end()
+                                    logger.info(f"👤 Marked user stopped speaking (filtered utterance)")
                                 
-                                if is_final:
-                                    final_tokens.append(token)
-                                else:
-                                    non_final_tokens.append(token)
+                                continue
+                        
+                        # Cancel any existing response task before starting new one
+                        # BUT: Don't cancel if call is already ending (hangup in progress)
+                        if call_ending:
+                            logger.info(f"⏭️  Skipping processing - call is ending")
+                            continue
                             
-                            # Process non-final (partial) tokens - fire and forget
-                            if non_final_tokens and on_partial_transcript:
-                                partial_text = " ".join([t.get("text", "") for t in non_final_tokens])
-                                if partial_text.strip():
-                                    # Clean up fragmented transcript
-                                    from soniox_service import clean_transcript
-                                    partial_text = clean_transcript(partial_text)
-                                    asyncio.create_task(on_partial_transcript(partial_text, data))
+                        current_response_task = call_states.get(call_control_id, {}).get("current_response_task")
+                        if current_response_task and not current_response_task.done():
+                            logger.info(f"🛑 Cancelling previous response task before starting new endpoint processing")
                             
-                            # Process final tokens - fire and forget  
-                            if final_tokens:
-                                final_text = " ".join([t.get("text", "") for t in final_tokens])
-                                if final_text.strip():
-                                    # Clean up fragmented transcript (e.g., "H ello" -> "Hello")
-                                    from soniox_service import clean_transcript
-                                    raw_text = final_text
-                                    final_text = clean_transcript(final_text)
-                                    if raw_text != final_text:
-                                        logger.info(f"🧹 Cleaned transcript: '{raw_text}' -> '{final_text}'")
-                                    
-                                    # Log final tokens being added
-                                    logger.info(f"📥 FINAL TOKENS: '{final_text}' ({len(final_tokens)} tokens)")
-                                    logger.info(f"🎤 Soniox final transcript: '{final_text}'")
-                                    
-                                    # 🔥 GARBLED/ECHO DETECTION: Filter transcripts that are likely TTS echo
-                                    # These occur when agent's audio echoes back and Soniox tries to transcribe it
-                                    import re
-                                    
-                                    def is_garbled_transcript(text: str) -> bool:
-                                        """Detect if transcript is garbled echo (not real speech)"""
-                                        if not text or not text.strip():
-                                            return True
-                                        
-                                        text = text.strip()
-                                        
-                                        # Pattern 1: Only single letters with spaces/dashes (like "M m -m m", "a b c")
-                                        if re.match(r'^[a-zA-Z](\s+[-]?\s*[a-zA-Z])+[\s\.\-]*$', text):
-                                            return True
-                                        
-                                        # Pattern 2: Only M's, spaces, dashes, dots
-                                        if re.match(r'^[mMhH\s\-\.]+$', text) and len(text) < 15:
-                                            return True
-                                        
-                                        # Pattern 3: Single repeated letters/sounds
-                                        if re.match(r'^(m+|h+|u+|a+)[\s\-\.]*$', text.lower()):
-                                            return True
-                                        
-                                        # ✅ EXCEPTION: Allow valid number patterns (4K, 10K, 5M, 2PM, etc.)
-                                        # These are common responses for income/time questions
-                                        if re.match(r'^\d+[kKmMbB]?\.?$', text):
-                                            return False  # Valid number shorthand like "4K", "10K", "5M"
-                                        if re.match(r'^\d+:?\d*\s*[AP]\.?M\.?$', text, re.IGNORECASE):
-                                            return False  # Valid time like "2PM", "3:30 PM"
-                                        
-                                        # Pattern 4: Very short with no vowels (likely noise)
-                                        if len(text) < 5 and not re.search(r'[aeiouyAEIOUY]', text):
-                                            return True
-                                        
-                                        # Pattern 5: Just punctuation/dashes
-                                        if re.match(r'^[\s\-\.\,\?\!]+$', text):
-                                            return True
-                                        
-                                        return False
-                                    
-                                    is_garbled = is_garbled_transcript(final_text)
-                                    if is_garbled:
-                                        logger.warning(f"🔇 GARBLED/ECHO detected: '{final_text.strip()}' - filtering out")
-                                    
-                                    # 🔥 EARLY FILTER: Check if this is a 1-word filler during agent speech
-                                    # If so, don't call on_final_transcript at all (prevents context pollution)
-                                    word_count = len(final_text.strip().split())
-                                    filler_words = ["um", "uh", "hmm", "mhm", "yeah", "yep", "nope", "ok", "okay", "uh-huh", "yes", "no", "sure", "right", "ah", "oh"]
-                                    is_filler = final_text.strip().lower().rstrip('?.,!') in filler_words
-                                    
-                                    # Check if agent is actively speaking
-                                    # NOTE: current_playback_ids is for HTTP-based playbacks (legacy)
-                                    # With WebSocket streaming, we use tts_is_speaking as source of truth
-                                    has_active_playbacks = len(current_playback_ids) > 0
-                                    
-                                    # Also check agent_generating_response flag
-                                    is_generating = agent_generating_response or call_states.get(call_control_id, {}).get("agent_generating_response", False)
-                                    
-                                    # 🔊 SINGLE SOURCE OF TRUTH: Check TTS session's is_speaking flag
-                                    # This is the authoritative state for whether agent audio is playing
-                                    tts_session = persistent_tts_manager.get_session(call_control_id) if call_control_id else None
-                                    tts_is_speaking = tts_session.is_speaking if tts_session else False
-                                    
-                                    # Also check playback_expected_end for logging/debugging
-                                    playback_expected_end = call_states.get(call_control_id, {}).get("playback_expected_end_time", 0)
-                                    current_time = time.time()
-                                    time_until_audio_done = playback_expected_end - current_time if playback_expected_end > 0 else 0
-                                    
-                                    # 🔥 SIMPLIFIED: Agent is active if:
-                                    # 1. TTS session says it's speaking (AUTHORITATIVE for WebSocket)
-                                    # 2. OR audio expected to still be playing (time backup)
-                                    # 3. OR LLM is generating
-                                    # NOTE: Removed has_active_playbacks since that's for HTTP mode only
-                                    user_actively_speaking = session and session.user_speaking
-                                    
-                                    if tts_is_speaking:
-                                        # TTS session explicitly says agent is speaking
-                                        is_agent_active = True
-                                        if user_actively_speaking:
-                                            logger.info(f"🎯 User speaking while TTS is_speaking=True - INTERRUPTION POSSIBLE")
-                                    elif tts_session and getattr(tts_session, 'is_waiting_for_first_audio_of_response', False):
-                                        # 🔥 FIX: Agent is technically "speaking" (waiting for audio to arrive)
-                                        # This covers the ~500ms gap between LLM done and audio start
-                                        is_agent_active = True
-                                        logger.info(f"🛡️ Agent active (waiting for audio) - 1-word filter ENABLED")
-                                    elif playback_expected_end > 0 and time_until_audio_done > -NETWORK_PROPAGATION_DELAY:
-                                        # Audio expected to still be playing (including network latency buffer)
-                                        is_agent_active = True
-                                    elif is_generating:
-                                        # LLM is generating response
-                                        is_agent_active = True
-                                    else:
-                                        # Agent is NOT active - ready to receive user input
-                                        is_agent_active = False
-                                    
-                                    # DEBUG: Log all values
-                                    logger.info(f"🔍 FILTER CHECK: words={word_count}, is_filler={is_filler}, is_garbled={is_garbled}, tts_speaking={tts_is_speaking}, time_until_done={time_until_audio_done:.1f}s, generating={is_generating}, playbacks={len(current_playback_ids)}, is_active={is_agent_active}")
-                                    
-                                    # ALWAYS filter garbled transcripts (these are echo, not real speech)
-                                    if is_garbled:
-                                        logger.info(f"🔕 FILTERING garbled/echo '{final_text.strip()}' - NOT calling on_final_transcript")
-                                    # Filter 1-2 word utterances or fillers ONLY during active audio playback
-                                    # Relax filter during latency buffer (time < 0) to allow quick turn-taking (e.g. "Yeah", "What's up?")
-                                    elif is_agent_active and time_until_audio_done > 0.2 and (word_count <= 2 or is_filler):
-                                        logger.info(f"🔕 FILTERING {word_count}-word/filler '{final_text.strip()}' - NOT calling on_final_transcript")
-                                        # Don't call on_final_transcript - skip this entirely
-                                    elif on_final_transcript:
-                                        # Not filtered - call on_final_transcript
-                                        asyncio.create_task(on_final_transcript(final_text, data))
+                            # 🔥 CRITICAL: Stop all in-flight playbacks FIRST to prevent audio queuing
+                            local_playback_ids = call_states.get(call_control_id, {}).get("current_playback_ids", set())
+                            comfort_noise_id = call_states.get(call_control_id, {}).get("comfort_noise_playback_id")
+                            if local_playback_ids:
+                                logger.info(f"🛑 Stopping {len(local_playback_ids)} in-flight playbacks before new response")
+                                telnyx_svc = get_telnyx_service()
+                                stop_tasks = []
+                                for playback_id in list(local_playback_ids):
+                                    if playback_id != comfort_noise_id:
+                                        stop_tasks.append(telnyx_svc.stop_playback(call_control_id, playback_id))
+                                if stop_tasks:
+                                    # Fire and forget - don't block the receive loop
+                                    asyncio.create_task(asyncio.gather(*stop_tasks, return_exceptions=True))
+                                call_states[call_control_id]["current_playback_ids"] = set()
                             
-                            # Call endpoint callback - RUN AS BACKGROUND TASK to avoid blocking receive loop!
-                            if endpoint_detected and on_endpoint_detected:
-                                # 🔥 EARLY FILTER for endpoint too - don't spawn task for filtered utterances
-                                if final_tokens and final_text.strip():
-                                    word_count = len(final_text.strip().split())
-                                    filler_words = ["um", "uh", "hmm", "mhm", "yeah", "yep", "nope", "ok", "okay", "uh-huh", "yes", "no", "sure", "right", "ah", "oh"]
-                                    is_filler = final_text.strip().lower().rstrip('?.,!') in filler_words
-                                    
-                                    # Check for garbled/echo transcripts
-                                    is_garbled = is_garbled_transcript(final_text) if 'is_garbled_transcript' in dir() else False
-                                    
-                                    has_active_playbacks = len(current_playback_ids) > 0
-                                    is_generating = agent_generating_response or call_states.get(call_control_id, {}).get("agent_generating_response", False)
-                                    
-                                    # 🔊 SINGLE SOURCE OF TRUTH: Check TTS session's is_speaking flag
-                                    tts_session = persistent_tts_manager.get_session(call_control_id) if call_control_id else None
-                                    tts_is_speaking = tts_session.is_speaking if tts_session else False
-                                    
-                                    # Also check playback_expected_end for backup
-                                    playback_expected_end = call_states.get(call_control_id, {}).get("playback_expected_end_time", 0)
-                                    current_time = time.time()
-                                    time_until_audio_done = playback_expected_end - current_time if playback_expected_end > 0 else 0
-                                    
-                                    # 🔥 SIMPLIFIED: Agent is active if TTS says so or timer backup
-                                    # NOTE: Removed has_active_playbacks since that's for HTTP mode only
-                                    user_actively_speaking = session and session.user_speaking
-                                    
-                                    if tts_is_speaking:
-                                        # TTS session explicitly says agent is speaking
-                                        is_agent_active = True
-                                        if user_actively_speaking:
-                                            logger.info(f"🎯 User speaking while TTS is_speaking=True - INTERRUPTION POSSIBLE")
-                                    elif tts_session and getattr(tts_session, 'is_waiting_for_first_audio_of_response', False):
-                                        # 🔥 FIX: Agent is technically "speaking" (waiting for audio to arrive)
-                                        # This covers the ~500ms gap between LLM done and audio start
-                                        is_agent_active = True
-                                    elif playback_expected_end > 0 and time_until_audio_done > -NETWORK_PROPAGATION_DELAY:
-                                        # Audio expected to still be playing by timer (including latency buffer)
-                                        is_agent_active = True
-                                    elif tts_session and getattr(tts_session, 'is_waiting_for_first_audio_of_response', False):
-                                        # 🔥 FIX: Agent is technically "speaking" (waiting for audio to arrive)
-                                        is_agent_active = True
-                                    elif time_until_audio_done > 0:
-                                        is_agent_active = True
-                                    elif is_generating:
-                                        is_agent_active = True
-                                    else:
-                                        is_agent_active = False
-                                    
-                                    # ALWAYS filter garbled transcripts
-                                    if is_garbled:
-                                        logger.info(f"🔕 SKIPPING endpoint for garbled/echo '{final_text.strip()}'")
-                                        accumulated_transcript = ""
-                                        if session and session.user_speaking:
-                                            session.mark_user_speaking_end()
-                                        continue
-                                    
-                                    # Filter 1-2 word utterances or fillers ONLY during active audio playback
-                                    # Relax filter during latency buffer (time < 0) to allow quick turn-taking (e.g. "Yeah", "What's up?")
-                                    if is_agent_active and time_until_audio_done > 0.2 and (word_count <= 2 or is_filler):
-                                        logger.info(f"🔕 SKIPPING endpoint for {word_count}-word/filler '{final_text.strip()}' (tts_speaking={tts_is_speaking}, is_active={is_agent_active})")
-                                        accumulated_transcript = ""  # Clear any accumulated text
-                                        
-                                        # 🔥 CRITICAL FIX: Still mark user as stopped speaking even when filtering
-                                        # Otherwise user_speaking stays True and silence detection never triggers
-                                        if session and session.user_speaking:
-                                            session.mark_user_speaking_end()
-                                            logger.info(f"👤 Marked user stopped speaking (filtered utterance)")
-                                        
-                                        continue
-                                
-                                # Cancel any existing response task before starting new one
-                                # BUT: Don't cancel if call is already ending (hangup in progress)
-                                if call_ending:
-                                    logger.info(f"⏭️  Skipping processing - call is ending")
-                                    continue
-                                    
-                                current_response_task = call_states.get(call_control_id, {}).get("current_response_task")
-                                if current_response_task and not current_response_task.done():
-                                    logger.info(f"🛑 Cancelling previous response task before starting new endpoint processing")
-                                    
-                                    # 🔥 CRITICAL: Stop all in-flight playbacks FIRST to prevent audio queuing
-                                    local_playback_ids = call_states.get(call_control_id, {}).get("current_playback_ids", set())
-                                    comfort_noise_id = call_states.get(call_control_id, {}).get("comfort_noise_playback_id")
-                                    if local_playback_ids:
-                                        logger.info(f"🛑 Stopping {len(local_playback_ids)} in-flight playbacks before new response")
-                                        telnyx_svc = get_telnyx_service()
-                                        stop_tasks = []
-                                        for playback_id in list(local_playback_ids):
-                                            if playback_id != comfort_noise_id:
-                                                stop_tasks.append(telnyx_svc.stop_playback(call_control_id, playback_id))
-                                        if stop_tasks:
-                                            # Fire and forget - don't block the receive loop
-                                            asyncio.create_task(asyncio.gather(*stop_tasks, return_exceptions=True))
-                                        call_states[call_control_id]["current_playback_ids"] = set()
-                                    
-                                    # Cancel the task
-                                    current_response_task.cancel()
-                                    
-                                    # Reset agent state
-                                    call_states[call_control_id]["agent_generating_response"] = False
-                                    
-                                new_task = asyncio.create_task(on_endpoint_detected())
-                                if call_control_id in call_states:
-                                    call_states[call_control_id]["current_response_task"] = new_task
-                                logger.info(f"🚀 Spawned tracked background task for endpoint processing")
+                            # Cancel the task
+                            current_response_task.cancel()
+                            
+                            # Reset agent state
+                            call_states[call_control_id]["agent_generating_response"] = False
+                            
+                        new_task = asyncio.create_task(on_endpoint_detected())
+                        if call_control_id in call_states:
+                            call_states[call_control_id]["current_response_task"] = new_task
+                        logger.info(f"🚀 Spawned tracked background task for endpoint processing")
                     
                     logger.info("✅ Soniox receive loop ended normally")
                     break
@@ -5342,10 +5261,10 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                     logger.warning(f"Traceback: {traceback.format_exc()}")
                     
                     if reconnect_attempts < max_reconnects:
-                        # Reconnect to Soniox
+                        # Reconnect to Soniox with the agent's settings
                         logger.info("🔄 Reconnecting to Soniox...")
-                        await soniox.connect()
-                        logger.info("✅ Soniox reconnected successfully")
+                        if await stt.reconnect():
+                            logger.info("✅ Soniox reconnected successfully")
                     else:
                         logger.error("❌ Max Soniox reconnect attempts reached")
                         break
@@ -5366,7 +5285,11 @@ async def handle_soniox_streaming(websocket: WebSocket, session, call_id: str, c
                 pass
             logger.info(f"🔇 Dead air monitoring task cancelled")
         
-        await soniox.close()
+        await session.cancel_early_response("call ended")
+        if turn_detector.probable_ends:
+            logger.info(f"⚡ Early turn stats: {turn_detector.get_stats()} {session.early_stats}")
+        turn_tracer.end_call(call_control_id)
+        await stt.close()
 
 
 @api_router.websocket("/telnyx/audio-stream")
@@ -5387,7 +5310,6 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
     logger.info(f"✅ WebSocket accepted, waiting for Telnyx events")
     
     call_control_id = None
-    deepgram_ws = None
     is_agent_speaking = False
     
     try:
@@ -5423,213 +5345,186 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
                 await websocket.close(code=1000, reason="Timeout")
                 return
         
-        # Wait for call data to be ready (check Redis for cross-worker support)
-        max_wait = 15
-        wait_time = 0
-        call_data = None
-        
-        while not call_data:
-            # Check Redis first (cross-worker), then in-memory fallback
-            call_data = redis_service.get_call_data(call_control_id) or active_telnyx_calls.get(call_control_id)
-            
-            if wait_time >= max_wait:
-                logger.error(f"❌ Timeout waiting for call data after {max_wait}s")
-                await websocket.close(code=1000, reason="Call data timeout")
-                return
-            
-            if not call_data:
-                await asyncio.sleep(0.2)
-                wait_time += 0.2
-        
-        logger.info(f"✅ Call data found after {wait_time}s wait")
-        
-        # Get session from call_data (created by webhook handler in same or different worker)
-        # Check if session already exists (created by webhook)
+        # Rendezvous with the call.answered webhook: woken as soon as it has built the session
+        # on this worker, or as soon as we learn this worker needs its own
         from core_calling_service import get_call_session, create_call_session
         
+        setup = await call_setup.wait_for_session(call_control_id)
         session = await get_call_session(call_control_id)
         
+        # Check Redis first (cross-worker), then in-memory fallback
+        call_data = redis_service.get_call_data(call_control_id) or active_telnyx_calls.get(call_control_id)
+        if not call_data:
+            logger.error(f"❌ No call data after call setup ({setup.status}, {setup.waited_ms}ms)")
+            await websocket.close(code=1000, reason="Call data timeout")
+            return
+        
+        logger.info(f"✅ Call setup {setup.status} after {setup.waited_ms}ms (session owner: {setup.owner})")
+        
         if not session:
-            # Session doesn't exist yet - WebSocket arrived before webhook finished
-            # Wait briefly for webhook to create it (optimized - single short wait)
-            logger.info("⏳ Session not found locally, waiting briefly for webhook...")
+            if setup.status == "remote":
+                # CallSession lives in process memory: the webhook's copy on another worker can't be used here
+                logger.info(f"🔀 Session built on worker {setup.owner}, building this worker's copy now")
+            else:
+                logger.warning(f"⚠️ Webhook session unavailable ({setup.status}), creating in WebSocket worker...")
             
-            # Single 0.5s wait instead of polling loop
-            await asyncio.sleep(0.5)
-            session = await get_call_session(call_control_id)
+            agent = call_data.get("agent")
+            agent_id = call_data.get("agent_id") or (agent or {}).get("id")
             
-            if session:
-                logger.info(f"✅ Session found after brief wait")
-            else:
-                logger.info(f"⚠️ Session still not found after wait, will create in worker")
+            if not agent or not agent_id:
+                logger.error(f"❌ No agent data in call_data. Keys: {list(call_data.keys())}")
+                await websocket.close(code=1000, reason="No agent data")
+                return
             
-            if not session:
-                # Still no session - create it ourselves in this worker
-                logger.warning("⚠️ Session not found after waiting, creating in WebSocket worker...")
-                
-                # Re-fetch call_data from Redis to ensure we have latest data
-                call_data_fresh = redis_service.get_call_data(call_control_id)
-                if not call_data_fresh:
-                    logger.error("❌ Cannot retrieve call data from Redis")
-                    await websocket.close(code=1000, reason="No call data")
-                    return
-                
-                agent = call_data_fresh.get("agent")
-                agent_id = call_data_fresh.get("agent_id")
-                
-                if not agent or not agent_id:
-                    logger.error(f"❌ No agent data in call_data. Keys: {list(call_data_fresh.keys())}")
-                    await websocket.close(code=1000, reason="No agent data")
-                    return
-                
-                # Get user_id from agent
-                user_id = agent.get("user_id")
-                
-                logger.info(f"📝 Creating session with agent_id={agent_id}, user_id={user_id}")
-                
-                # Create session in this worker
-                session = await create_call_session(
-                    call_control_id,
-                    agent,
-                    agent_id=agent_id,
-                    user_id=user_id,
-                    db=db
-                )
-                
-                # Update custom variables
-                custom_variables = call_data_fresh.get("custom_variables", {})
-                session.session_variables.update(custom_variables)
+            # Get user_id from agent
+            user_id = agent.get("user_id")
+            
+            logger.info(f"📝 Creating session with agent_id={agent_id}, user_id={user_id}")
+            
+            # Create session in this worker (single-flight: never built twice here)
+            session = await call_setup.build_once(call_control_id, lambda: create_call_session(
+                call_control_id,
+                agent,
+                agent_id=agent_id,
+                user_id=user_id,
+                db=db
+            ))
+            
+            # Update custom variables
+            custom_variables = call_data.get("custom_variables", {})
+            session.session_variables.update(custom_variables)
+            
+            logger.info("✅ Session created in WebSocket worker")
+            
+            # 🔥 FIX D: Start silence tracking immediately so dead air monitor 
+            # has a baseline even if agent never speaks
+            session.start_silence_tracking()
+            
+            # ═══════════════════════════════════════════════════════════════════
+            # SCHEDULE SILENCE TIMEOUT IN THIS WORKER (has the session in memory)
+            # ═══════════════════════════════════════════════════════════════════
+            flow = agent.get("call_flow", [])
+            start_node = flow[0] if flow else {}
+            start_node_data = start_node.get("data", {})
+            who_speaks_first = start_node_data.get("whoSpeaksFirst", "ai")
+            ai_speaks_after_silence = start_node_data.get("aiSpeaksAfterSilence", False)
+            silence_timeout_ms = max(start_node_data.get("silenceTimeout", 2000), 3000) # Force min 3000ms
+            
+            if who_speaks_first == "user" and ai_speaks_after_silence:
+                logger.info(f"⏱️ [WebSocket Worker] Scheduling silence timeout: {silence_timeout_ms}ms")
                 
-                logger.info("✅ Session created in WebSocket worker")
+                async def trigger_ai_after_silence_ws():
+                    """Silence timeout task - runs on WebSocket worker that has the session"""
+                    try:
+                        logger.info(f"⏱️ [WebSocket Worker] Silence timeout task started, waiting {silence_timeout_ms}ms...")
+                        await asyncio.sleep(silence_timeout_ms / 1000.0)
+                        
+                        # Check if user has already spoken
+                        redis_data = redis_service.get_call_data(call_control_id) or {}
+                        call_data_check = active_telnyx_calls.get(call_control_id, {})
+                        
+                        user_has_spoken = redis_data.get("user_has_spoken") or call_data_check.get("user_has_spoken")
+                        ai_has_responded = redis_data.get("ai_has_responded") or call_data_check.get("ai_has_responded")
+                        greeting_triggered = redis_data.get("silence_greeting_triggered") or call_data_check.get("silence_greeting_triggered")
+                        
+                        # 🔥 FIX: Only skip if AI has actually responded (or greeting already triggered)
+                        # Ignore user_has_spoken because it can be true for filtered utterances (uh-huh due to bug or noise)
+                        if ai_has_responded:
+                            logger.info(f"⏱️ [WebSocket Worker] Silence timeout: AI already responded, skipping greeting")
+                            return
+                        
+                        if greeting_triggered:
+                            logger.info(f"⏱️ [WebSocket Worker] Silence timeout: Greeting already triggered, skipping")
+                            return
+                        
+                        # Mark as triggered
+                        if call_control_id in active_telnyx_calls:
+                            active_telnyx_calls[call_control_id]["silence_greeting_triggered"] = True
+                        
+                        # Use update_call_data to prevent wiping session state
+                        redis_service.update_call_data(call_control_id, {"silence_greeting_triggered": True})
+                        
+                        logger.info(f"⏱️ [WebSocket Worker] Silence timeout reached - generating greeting!")
+                        
+                        # Generate and speak greeting
+                        greeting_response = await session.process_user_input("")
+                        
+                        # Handle both string and dict return types
+                        if isinstance(greeting_response, str):
+                            greeting_text = greeting_response
+                        elif greeting_response:
+                            greeting_text = greeting_response.get("text", "Hello?")
+                        else:
+                            greeting_text = "Hello?"
+                        
+                        logger.info(f"💬 [WebSocket Worker] AI speaks after silence: {greeting_text}")
+                        
+                        # Save to transcript
+                        await db.call_logs.update_one(
+                            {"call_id": call_control_id},
+                            {"$push": {
+                                "transcript": {
+                                    "role": "assistant",
+                                    "text": greeting_text,
+                                    "timestamp": datetime.utcnow().isoformat()
+                                }
+                            }}
+                        )
+                        
+                        # 🔥 FIX: Check if user spoke DURING greeting generation
+                        # This prevents the race condition where user starts speaking
+                        # after silence timeout fires but before TTS playback is sent
+                        redis_data_check = redis_service.get_call_data(call_control_id) or {}
+                        call_data_check = active_telnyx_calls.get(call_control_id, {})
+                        user_spoke_during_gen = redis_data_check.get("user_has_spoken") or call_data_check.get("user_has_spoken")
+                        
+                        if user_spoke_during_gen:
+                            logger.info("⏭️ [WebSocket Worker] User spoke during greeting generation - CANCELLING silence greeting")
+                            return  # Don't speak - user already started the conversation
+                        
+                        # Mark agent as speaking BEFORE sending TTS
+                        # This prevents dead air monitor from counting silence during greeting
+                        # 🔥 FIX C: Latency protection - Buffer user speech while greeting is starting up
+                        if call_control_id in active_telnyx_calls:
+                            active_telnyx_calls[call_control_id]["greeting_in_flight"] = True
+                        redis_service.update_call_data(call_control_id, {"greeting_in_flight": True})
+                        
+                        session.mark_agent_speaking_start()
+                        logger.info("🗣️ [WebSocket Worker] Marked agent as speaking (for initial greeting)")
+                        
+                        # Speak the greeting
+                        telnyx_svc = get_telnyx_service()
+                        await telnyx_svc.speak_text(
+                            call_control_id,
+                            greeting_text,
+                            agent_config=session.agent_config
+                        )
+                        logger.info("🔊 [WebSocket Worker] Silence greeting spoken via Telnyx TTS")
+                        
+                        # 🔥 ATTEMPT 12: Record when greeting playback started
+                        # This enables detecting if user spoke BEFORE hearing the greeting
+                        import time
+                        greeting_playback_time = time.time()
+                        call_states[call_control_id]["greeting_playback_started_at"] = greeting_playback_time
+                        logger.info(f"⏱️ [WebSocket Worker] Greeting playback started at {greeting_playback_time}")
+                        
+                        # Start silence tracking so dead air monitoring kicks in
+                        # This is critical for check-in/disconnect flow to work
+                        session.start_silence_tracking()
+                        logger.info("⏱️ [WebSocket Worker] Silence tracking started for dead air monitoring")
+                        
+                    except asyncio.CancelledError:
+                        logger.info("⏱️ [WebSocket Worker] Silence timeout task cancelled")
+                    except Exception as e:
+                        logger.error(f"❌ [WebSocket Worker] Error in silence greeting task: {e}")
                 
-                # 🔥 FIX D: Start silence tracking immediately so dead air monitor 
-                # has a baseline even if agent never speaks
-                session.start_silence_tracking()
+                # Start the task on THIS worker (which has the session)
+                asyncio.create_task(trigger_ai_after_silence_ws())
+                logger.info(f"⏱️ [WebSocket Worker] Silence timeout task scheduled!")
                 
-                # ═══════════════════════════════════════════════════════════════════
-                # SCHEDULE SILENCE TIMEOUT IN THIS WORKER (has the session in memory)
-                # ═══════════════════════════════════════════════════════════════════
-                flow = agent.get("call_flow", [])
-                start_node = flow[0] if flow else {}
-                start_node_data = start_node.get("data", {})
-                who_speaks_first = start_node_data.get("whoSpeaksFirst", "ai")
-                ai_speaks_after_silence = start_node_data.get("aiSpeaksAfterSilence", False)
-                silence_timeout_ms = max(start_node_data.get("silenceTimeout", 2000), 3000) # Force min 3000ms
-                
-                if who_speaks_first == "user" and ai_speaks_after_silence:
-                    logger.info(f"⏱️ [WebSocket Worker] Scheduling silence timeout: {silence_timeout_ms}ms")
-                    
-                    async def trigger_ai_after_silence_ws():
-                        """Silence timeout task - runs on WebSocket worker that has the session"""
-                        try:
-                            logger.info(f"⏱️ [WebSocket Worker] Silence timeout task started, waiting {silence_timeout_ms}ms...")
-                            await asyncio.sleep(silence_timeout_ms / 1000.0)
-                            
-                            # Check if user has already spoken
-                            redis_data = redis_service.get_call_data(call_control_id) or {}
-                            call_data_check = active_telnyx_calls.get(call_control_id, {})
-                            
-                            user_has_spoken = redis_data.get("user_has_spoken") or call_data_check.get("user_has_spoken")
-                            ai_has_responded = redis_data.get("ai_has_responded") or call_data_check.get("ai_has_responded")
-                            greeting_triggered = redis_data.get("silence_greeting_triggered") or call_data_check.get("silence_greeting_triggered")
-                            
-                            # 🔥 FIX: Only skip if AI has actually responded (or greeting already triggered)
-                            # Ignore user_has_spoken because it can be true for filtered utterances (uh-huh due to bug or noise)
-                            if ai_has_responded:
-                                logger.info(f"⏱️ [WebSocket Worker] Silence timeout: AI already responded, skipping greeting")
-                                return
-                            
-                            if greeting_triggered:
-                                logger.info(f"⏱️ [WebSocket Worker] Silence timeout: Greeting already triggered, skipping")
-                                return
-                            
-                            # Mark as triggered
-                            if call_control_id in active_telnyx_calls:
-                                active_telnyx_calls[call_control_id]["silence_greeting_triggered"] = True
-                            
-                            # Use update_call_data to prevent wiping session state
-                            redis_service.update_call_data(call_control_id, {"silence_greeting_triggered": True})
-                            
-                            logger.info(f"⏱️ [WebSocket Worker] Silence timeout reached - generating greeting!")
-                            
-                            # Generate and speak greeting
-                            greeting_response = await session.process_user_input("")
-                            
-                            # Handle both string and dict return types
-                            if isinstance(greeting_response, str):
-                                greeting_text = greeting_response
-                            elif greeting_response:
-                                greeting_text = greeting_response.get("text", "Hello?")
-                            else:
-                                greeting_text = "Hello?"
-                            
-                            logger.info(f"💬 [WebSocket Worker] AI speaks after silence: {greeting_text}")
-                            
-                            # Save to transcript
-                            await db.call_logs.update_one(
-                                {"call_id": call_control_id},
-                                {"$push": {
-                                    "transcript": {
-                                        "role": "assistant",
-                                        "text": greeting_text,
-                                        "timestamp": datetime.utcnow().isoformat()
-                                    }
-                                }}
-                            )
-                            
-                            # 🔥 FIX: Check if user spoke DURING greeting generation
-                            # This prevents the race condition where user starts speaking
-                            # after silence timeout fires but before TTS playback is sent
-                            redis_data_check = redis_service.get_call_data(call_control_id) or {}
-                            call_data_check = active_telnyx_calls.get(call_control_id, {})
-                            user_spoke_during_gen = redis_data_check.get("user_has_spoken") or call_data_check.get("user_has_spoken")
-                            
-                            if user_spoke_during_gen:
-                                logger.info("⏭️ [WebSocket Worker] User spoke during greeting generation - CANCELLING silence greeting")
-                                return  # Don't speak - user already started the conversation
-                            
-                            # Mark agent as speaking BEFORE sending TTS
-                            # This prevents dead air monitor from counting silence during greeting
-                            # 🔥 FIX C: Latency protection - Buffer user speech while greeting is starting up
-                            if call_control_id in active_telnyx_calls:
-                                active_telnyx_calls[call_control_id]["greeting_in_flight"] = True
-                            redis_service.update_call_data(call_control_id, {"greeting_in_flight": True})
-                            
-                            session.mark_agent_speaking_start()
-                            logger.info("🗣️ [WebSocket Worker] Marked agent as speaking (for initial greeting)")
-                            
-                            # Speak the greeting
-                            telnyx_svc = get_telnyx_service()
-                            await telnyx_svc.speak_text(
-                                call_control_id,
-                                greeting_text,
-                                agent_config=session.agent_config
-                            )
-                            logger.info("🔊 [WebSocket Worker] Silence greeting spoken via Telnyx TTS")
-                            
-                            # 🔥 ATTEMPT 12: Record when greeting playback started
-                            # This enables detecting if user spoke BEFORE hearing the greeting
-                            import time
-                            greeting_playback_time = time.time()
-                            call_states[call_control_id]["greeting_playback_started_at"] = greeting_playback_time
-                            logger.info(f"⏱️ [WebSocket Worker] Greeting playback started at {greeting_playback_time}")
-                            
-                            # Start silence tracking so dead air monitoring kicks in
-                            # This is critical for check-in/disconnect flow to work
-                            session.start_silence_tracking()
-                            logger.info("⏱️ [WebSocket Worker] Silence tracking started for dead air monitoring")
-                            
-                        except asyncio.CancelledError:
-                            logger.info("⏱️ [WebSocket Worker] Silence timeout task cancelled")
-                        except Exception as e:
-                            logger.error(f"❌ [WebSocket Worker] Error in silence greeting task: {e}")
-                    
-                    # Start the task on THIS worker (which has the session)
-                    asyncio.create_task(trigger_ai_after_silence_ws())
-                    logger.info(f"⏱️ [WebSocket Worker] Silence timeout task scheduled!")
-                    
         else:
             logger.info("✅ Session found in this worker's active_sessions")
+        call_setup.session_available(setup)
         
         # Get agent configuration and check STT provider
         agent_config = session.agent_config
@@ -5646,25 +5541,18 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
         # Route to appropriate STT provider based on agent configuration
         if stt_provider == "assemblyai":
             # Use AssemblyAI for STT
-            from assemblyai_service import AssemblyAIStreamingService
             await handle_assemblyai_streaming(websocket, session, call_control_id, call_control_id)
             return
         elif stt_provider == "soniox":
             # Use Soniox for STT
-            from soniox_service import SonioxStreamingService
             await handle_soniox_streaming(websocket, session, call_control_id, call_control_id)
             return
-        elif stt_provider == "deepgram":
-            # Use Deepgram for STT (explicitly configured)
-            deepgram_settings = agent_config.get("settings", {}).get("deepgram_settings", {})
-            endpointing = deepgram_settings.get("endpointing", 500)
-            interim_results = deepgram_settings.get("interim_results", False)
-            punctuate = deepgram_settings.get("punctuate", True)
-            smart_format = deepgram_settings.get("smart_format", True)
-        vad_events = deepgram_settings.get("vad_events", True)
-        
-        logger.info(f"⚙️  Deepgram settings: endpointing={endpointing}ms, interim={interim_results}, punctuate={punctuate}, smart_format={smart_format}, vad_events={vad_events}")
+        elif stt_provider != "deepgram":
+            logger.error(f"❌ Unsupported STT provider: {stt_provider}")
+            await websocket.close(code=1011, reason=f"Unsupported STT provider: {stt_provider}")
+            return
         
+        # Use Deepgram for STT (explicitly configured)
         # Get user's Deepgram API key
         deepgram_api_key = await get_api_key(session.user_id, "deepgram")
         if not deepgram_api_key:
@@ -5674,63 +5562,25 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
         
         logger.info(f"🔑 Using user's Deepgram API key (first 10 chars): {deepgram_api_key[:10]}...")
         
-        # Connect to Deepgram using raw websockets (SDK has issues with v2)
-        deepgram_ws = None
+        # Connect to Deepgram using raw websockets (SDK has issues with v2);
+        # endpointing / interim / punctuate / smart_format / vad_events come from settings.deepgram_settings
+        deepgram_stt = create_stt_adapter("deepgram", deepgram_api_key, agent_config)
+        logger.info(f"⚙️  Deepgram settings: {deepgram_stt.params}")
         
         try:
-            # Build Deepgram WebSocket URL with agent-specific settings
-            # NOTE: utterance_end_ms and vad_turnoff parameters removed - cause HTTP 400 error on WebSocket API
-            deepgram_url = (
-                f"wss://api.deepgram.com/v1/listen?"
-                f"model=nova-3&"
-                f"encoding=mulaw&"
-                f"sample_rate=8000&"
-                f"channels=1&"
-                f"punctuate={'true' if punctuate else 'false'}&"
-                f"interim_results={'true' if interim_results else 'false'}&"
-                f"endpointing={endpointing}&"
-                f"vad_events={'true' if vad_events else 'false'}&"
-                f"smart_format={'true' if smart_format else 'false'}"
-            )
-            
-            logger.info(f"🔗 Deepgram URL: {deepgram_url[:150]}...")
-            
-            # Connect with user's API key
-            deepgram_ws = await websockets.connect(
-                deepgram_url,
-                extra_headers={"Authorization": f"Token {deepgram_api_key}"}
-            )
+            if not await deepgram_stt.connect():
+                await websocket.close(code=1011, reason="Deepgram connection failed")
+                return
             
-            logger.info("✅ Connected to Deepgram live streaming")
             logger.info("🚀 Starting bidirectional audio streaming...")
             
-            # Task to forward audio from Telnyx to Deepgram
+            # Task to forward audio from Telnyx to Deepgram (nothing is sent while the agent speaks)
             async def forward_telnyx_to_deepgram():
-                nonlocal is_agent_speaking
                 try:
-                    audio_packet_count = 0
                     logger.info(f"👂 Starting to listen for Telnyx media...")
-                    
-                    while True:
-                        message = await websocket.receive_text()
-                        data = json.loads(message)
-                        event = data.get("event")
-                        
-                        if event == "media":
-                            if not is_agent_speaking:
-                                media = data.get("media", {})
-                                payload = media.get("payload", "")
-                                if payload:
-                                    # Decode base64 audio and send to Deepgram
-                                    audio_bytes = base64.b64decode(payload)
-                                    await deepgram_ws.send(audio_bytes)
-                                    audio_packet_count += 1
-                                    if audio_packet_count % 100 == 0:
-                                        logger.info(f"📡 Forwarded {audio_packet_count} packets")
-                        elif event == "stop":
-                            logger.info(f"⏹️ Telnyx stream stopped")
-                            break
-                            
+                    front_end = AudioFrontEnd.for_adapter(deepgram_stt)
+                    await front_end.pump(websocket, deepgram_stt, gate=lambda: not is_agent_speaking)
+                    logger.info(f"📡 Forwarded {deepgram_stt.stats['packets']} packets")
                 except Exception as e:
                     logger.error(f"❌ Error forwarding audio: {e}")
             
@@ -5850,32 +5700,25 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
                 is_agent_speaking = False
             
             async def process_deepgram_transcripts():
-                nonlocal is_agent_speaking, transcript_buffer, last_transcript_time, processing_task
+                nonlocal transcript_buffer, last_transcript_time, processing_task
                 try:
-                    async for message in deepgram_ws:
-                        result = json.loads(message)
-                        msg_type = result.get("type")
+                    async for event in deepgram_stt.events():
+                        # Accumulate final transcripts
+                        if event.kind != STT_FINAL:
+                            continue
+                        transcript_buffer.append(event.text)
+                        last_transcript_time = asyncio.get_event_loop().time()
                         
-                        # Check if it's a transcript result
-                        if msg_type == "Results":
-                            transcript = result.get("channel", {}).get("alternatives", [{}])[0].get("transcript", "")
-                            is_final = result.get("is_final", False)
-                            
-                            # Accumulate final transcripts
-                            if transcript and is_final:
-                                transcript_buffer.append(transcript)
-                                last_transcript_time = asyncio.get_event_loop().time()
-                                
-                                # Cancel any pending processing and schedule new one
-                                if processing_task and not processing_task.done():
-                                    processing_task.cancel()
-                                    try:
-                                        await processing_task
-                                    except asyncio.CancelledError:
-                                        pass
-                                
-                                # Schedule processing with delay
-                                processing_task = asyncio.create_task(process_accumulated_transcript())
+                        # Cancel any pending processing and schedule new one
+                        if processing_task and not processing_task.done():
+                            processing_task.cancel()
+                            try:
+                                await processing_task
+                            except asyncio.CancelledError:
+                                pass
+                        
+                        # Schedule processing with delay
+                        processing_task = asyncio.create_task(process_accumulated_transcript())
                                 
                 except Exception as e:
                     logger.error(f"❌ Error processing transcripts: {e}")
@@ -5889,15 +5732,15 @@ async def telnyx_audio_stream_generic(websocket: WebSocket):
         except Exception as e:
             logger.error(f"❌ Error in streaming: {e}", exc_info=True)
         finally:
-            if deepgram_ws:
-                await deepgram_ws.close()
-                logger.info("🔌 Deepgram connection closed")
+            await deepgram_stt.close()
+            logger.info("🔌 Deepgram connection closed")
         
     except Exception as e:
         logger.error(f"❌ Error in WebSocket handler: {e}", exc_info=True)
     finally:
-        if deepgram_ws:
-            await deepgram_ws.close()
+        # The hangup webhook may land on another worker: drop this worker's build and stages here
+        if call_control_id:
+            call_setup.discard(call_control_id)
         logger.info(f"🔌 Telnyx WebSocket disconnected")
 
 
@@ -6604,7 +6447,7 @@ async def generate_audio_elevenlabs_streaming(text: str, settings: dict = None,
                 import time
                 start_time = time.time()
                 
-                async with httpx.AsyncClient(timeout=timeout_seconds) as client:
+                async with http_client_registry.session(timeout=timeout_seconds) as client:
                     client_created_time = time.time() - start_time
                     logger.info(f"   ✓ HTTP client created ({client_created_time:.3f}s)")
                     
@@ -6767,8 +6610,6 @@ async def generate_audio_cartesia(text: str, settings: dict = None, user_id: str
     """Generate audio using Cartesia Sonic TTS - Properly formatted for Telnyx"""
     try:
         import time
-        import subprocess
-        import tempfile
         import os
         
         total_start = time.time()
@@ -6823,51 +6664,26 @@ async def generate_audio_cartesia(text: str, settings: dict = None, user_id: str
         logger.info(f"✅ Cartesia: Generated {len(audio_pcm)} bytes PCM 22050Hz")
         
         # Convert PCM 22050Hz to MP3 44100Hz using ffmpeg (standard telephony conversion)
-        with tempfile.NamedTemporaryFile(suffix='.pcm', delete=False) as pcm_file:
-            pcm_file.write(audio_pcm)
-            pcm_path = pcm_file.name
+        convert_start = time.time()
         
-        mp3_path = pcm_path.replace('.pcm', '.mp3')
+        # Convert: 22050Hz PCM → 44100Hz MP3 (standard rates for quality)
+        mp3_audio = await audio_transcoder.to_mp3(
+            audio_pcm,
+            input_args=['-f', 's16le', '-ar', '22050', '-ac', '1'],
+            sample_rate=44100,
+            bitrate='128k',
+            label="cartesia_pcm_to_mp3"
+        )
         
-        convert_start = time.time()
+        convert_time = time.time() - convert_start
+        total_time = time.time() - total_start
         
-        try:
-            # Convert: 22050Hz PCM → 44100Hz MP3 (standard rates for quality)
-            subprocess.run([
-                'ffmpeg',
-                '-f', 's16le',        # 16-bit signed PCM
-                '-ar', '22050',       # Input: 22050Hz (Cartesia native)
-                '-ac', '1',           # Mono
-                '-i', pcm_path,       # Input file
-                '-ar', '44100',       # Output: 44100Hz (standard for telephony)
-                '-b:a', '128k',       # 128kbps bitrate for quality
-                '-y',                 # Overwrite
-                mp3_path              # Output file
-            ], check=True, capture_output=True, timeout=5)
-            
-            convert_time = time.time() - convert_start
-            
-            # Read MP3 file
-            with open(mp3_path, 'rb') as f:
-                mp3_audio = f.read()
-            
-            total_time = time.time() - total_start
-            
-            logger.info(f"✅ Cartesia: Converted to {len(mp3_audio)} bytes MP3 44100Hz")
-            logger.info(f"⏱️  Cartesia API time: {api_time*1000:.0f}ms")
-            logger.info(f"⏱️  Conversion time: {convert_time*1000:.0f}ms")
-            logger.info(f"⏱️  Cartesia total time: {total_time*1000:.0f}ms")
-            
-            return mp3_audio
-            
-        finally:
-            # Cleanup temp files
-            try:
-                os.remove(pcm_path)
-                if os.path.exists(mp3_path):
-                    os.remove(mp3_path)
-            except:
-                pass
+        logger.info(f"✅ Cartesia: Converted to {len(mp3_audio)} bytes MP3 44100Hz")
+        logger.info(f"⏱️  Cartesia API time: {api_time*1000:.0f}ms")
+        logger.info(f"⏱️  Conversion time: {convert_time*1000:.0f}ms")
+        logger.info(f"⏱️  Cartesia total time: {total_time*1000:.0f}ms")
+        
+        return mp3_audio
                 
     except Exception as e:
         logger.error(f"Error generating Cartesia audio: {e}")
@@ -6935,41 +6751,14 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
                 
                 logger.info(f"✅ MeloTTS generated {len(wav_bytes)} bytes WAV")
                 
-                # Convert WAV to MP3 for Telnyx compatibility
-                import io
-                import tempfile
-                import subprocess
-                
-                # Write WAV to temp file
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-                    wav_path = wav_file.name
-                    wav_file.write(wav_bytes)
-                
-                # Convert to MP3 with 8kHz sample rate for telephony
-                mp3_path = wav_path.replace('.wav', '.mp3')
-                result = subprocess.run([
-                    'ffmpeg', '-y',
-                    '-i', wav_path,
-                    '-ar', '8000',  # Resample to 8kHz (telephony standard)
-                    '-ac', '1',     # Mono
-                    '-b:a', '64k',  # 64kbps bitrate
-                    mp3_path
-                ], capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    logger.error(f"❌ ffmpeg conversion failed: {result.stderr}")
-                    os.unlink(wav_path)
+                # Convert WAV to MP3 (8kHz telephony) for Telnyx compatibility - async pipes, no temp files
+                try:
+                    mp3_audio = await audio_transcoder.to_mp3(wav_bytes, label="melo_wav_to_mp3")
+                except TranscodeError as e:
+                    logger.error(f"❌ ffmpeg conversion failed: {e}")
                     logger.warning("⚠️ Falling back to ElevenLabs")
                     return await generate_audio_elevenlabs(text, settings, user_id)
                 
-                # Read MP3 file
-                with open(mp3_path, 'rb') as f:
-                    mp3_audio = f.read()
-                
-                # Cleanup
-                os.unlink(wav_path)
-                os.unlink(mp3_path)
-                
                 logger.info(f"✅ MeloTTS converted to MP3: {len(mp3_audio)} bytes")
                 audio_bytes = mp3_audio
                 
@@ -7001,42 +6790,13 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
                 
                 # If WAV format, convert to MP3 for Telnyx compatibility
                 if response_format == "wav":
-                    import io
-                    import tempfile
-                    import subprocess
-                    
-                    # Write audio to temp file
-                    with tempfile.NamedTemporaryFile(suffix=f'.{response_format}', delete=False) as audio_file:
-                        audio_path = audio_file.name
-                        audio_file.write(audio_bytes)
-                    
-                    # Convert to MP3 with 8kHz sample rate for telephony
-                    mp3_path = audio_path.replace(f'.{response_format}', '.mp3')
-                    result = subprocess.run([
-                        'ffmpeg', '-y',
-                        '-i', audio_path,
-                        '-ar', '8000',  # Resample to 8kHz (telephony standard)
-                        '-ac', '1',     # Mono
-                        '-b:a', '64k',  # 64kbps bitrate
-                        mp3_path
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode != 0:
-                        logger.error(f"❌ ffmpeg conversion failed: {result.stderr}")
-                        os.unlink(audio_path)
+                    try:
+                        audio_bytes = await audio_transcoder.to_mp3(audio_bytes, label="dia_wav_to_mp3")
+                        logger.info(f"✅ Dia TTS converted to MP3: {len(audio_bytes)} bytes")
+                    except TranscodeError as e:
+                        logger.error(f"❌ ffmpeg conversion failed: {e}")
                         logger.warning("⚠️ Falling back to ElevenLabs")
                         audio_bytes = await generate_audio_elevenlabs(text, settings, user_id)
-                    else:
-                        # Read MP3 file
-                        with open(mp3_path, 'rb') as f:
-                            mp3_audio = f.read()
-                        
-                        # Cleanup
-                        os.unlink(audio_path)
-                        os.unlink(mp3_path)
-                        
-                        logger.info(f"✅ Dia TTS converted to MP3: {len(mp3_audio)} bytes")
-                        audio_bytes = mp3_audio
                 else:
                     # If already MP3 or other format, use as-is
                     pass  # audio_bytes already set above
@@ -7077,8 +6837,6 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
             # Use ChatTTS (Ultra-low latency conversational TTS)
             try:
                 from chattts_tts_service import ChatTTSClient
-                import subprocess
-                import tempfile
                 
                 chattts_settings = settings.get("chattts_settings", {})
                 voice = chattts_settings.get("voice", "female_1")
@@ -7113,40 +6871,9 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
                     logger.info(f"   RTF: {metadata.get('rtf')}, Processing: {metadata.get('processing_time')}s")
                     logger.info(f"   Instance: {metadata.get('instance_url', 'N/A')}")
                 
-                # Convert ChatTTS WAV (24000Hz) to MP3 (44100Hz) for Telnyx compatibility
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-                    wav_file.write(audio_bytes_wav)
-                    wav_path = wav_file.name
-                
-                mp3_path = wav_path.replace('.wav', '.mp3')
-                
-                try:
-                    # Convert: 24000Hz WAV → 8000Hz MP3 (telephony standard for PSTN/Telnyx)
-                    subprocess.run([
-                        'ffmpeg',
-                        '-i', wav_path,           # Input WAV file
-                        '-ar', '8000',            # Resample to 8000Hz for telephony
-                        '-ac', '1',               # Mono
-                        '-b:a', '64k',            # 64kbps bitrate (sufficient for telephony)
-                        '-y',                     # Overwrite output
-                        mp3_path
-                    ], check=True, capture_output=True)
-                    
-                    # Read converted MP3
-                    with open(mp3_path, 'rb') as f:
-                        audio_bytes = f.read()
-                    
-                    logger.info(f"✅ Converted to MP3 8000Hz (telephony): {len(audio_bytes)} bytes")
-                    # audio_bytes already set
-                    
-                finally:
-                    # Cleanup temp files
-                    import os
-                    try:
-                        os.unlink(wav_path)
-                        os.unlink(mp3_path)
-                    except:
-                        pass
+                # Convert: 24000Hz WAV → 8000Hz MP3 (telephony standard for PSTN/Telnyx)
+                audio_bytes = await audio_transcoder.to_mp3(audio_bytes_wav, label="chattts_wav_to_mp3")
+                logger.info(f"✅ Converted to MP3 8000Hz (telephony): {len(audio_bytes)} bytes")
                 
             except Exception as e:
                 logger.error(f"❌ ChatTTS error: {e}")
@@ -7184,49 +6911,19 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
                 audio_bytes = b''.join(audio_chunks)
                 logger.info(f"✅ Sesame WebSocket complete: {chunk_count} chunks, {len(audio_bytes)} bytes")
                 
-                # Convert raw PCM int16 24kHz to WAV format for Telnyx
-                import wave
-                import tempfile
-                import subprocess
-                
-                # Create WAV file from raw PCM
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-                    wav_path = wav_file.name
-                    with wave.open(wav_path, 'wb') as wav:
-                        wav.setnchannels(1)  # Mono
-                        wav.setsampwidth(2)  # 16-bit = 2 bytes
-                        wav.setframerate(24000)  # 24kHz
-                        wav.writeframes(audio_bytes)
-                
+                # Convert raw PCM int16 24kHz to MP3 with resampling to 8kHz for Telnyx compatibility
                 logger.info(f"🔄 Converting Sesame PCM to MP3 ({len(audio_bytes)} bytes)")
-                
-                # Convert to MP3 with resampling to 8kHz for Telnyx compatibility
-                mp3_path = wav_path.replace('.wav', '.mp3')
-                result = subprocess.run([
-                    'ffmpeg', '-y',
-                    '-i', wav_path,
-                    '-ar', '8000',  # Resample to 8kHz (Telnyx mulaw rate)
-                    '-ac', '1',     # Mono
-                    '-b:a', '64k',  # 64kbps bitrate
-                    mp3_path
-                ], capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    logger.error(f"❌ ffmpeg conversion failed: {result.stderr}")
-                    os.unlink(wav_path)
+                try:
+                    audio_bytes = await audio_transcoder.to_mp3(
+                        audio_bytes,
+                        input_args=['-f', 's16le', '-ar', '24000', '-ac', '1'],
+                        label="sesame_pcm_to_mp3"
+                    )
+                    logger.info(f"✅ Sesame audio converted to MP3: {len(audio_bytes)} bytes")
+                except TranscodeError as e:
+                    logger.error(f"❌ ffmpeg conversion failed: {e}")
                     logger.warning("⚠️ Falling back to ElevenLabs")
                     audio_bytes = await generate_audio_elevenlabs(text, settings, user_id)
-                else:
-                    # Read MP3 file
-                    with open(mp3_path, 'rb') as f:
-                        mp3_audio = f.read()
-                    
-                    # Cleanup
-                    os.unlink(wav_path)
-                    os.unlink(mp3_path)
-                    
-                    logger.info(f"✅ Sesame audio converted to MP3: {len(mp3_audio)} bytes")
-                    audio_bytes = mp3_audio
                 
             except Exception as e:
                 logger.error(f"❌ Sesame WebSocket error: {e}")
@@ -7272,39 +6969,11 @@ async def generate_tts_audio(text: str, agent_config: dict) -> bytes:
                     logger.info(f"✅ Maya TTS generated {len(audio_bytes)} bytes")
                     
                     # Convert WAV to MP3 for Telnyx compatibility
-                    import tempfile
-                    import subprocess
-                    import os  # Fix: Import os locally
-                    
-                    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as wav_file:
-                        wav_path = wav_file.name
-                        wav_file.write(audio_bytes)
-                    
-                    mp3_path = wav_path.replace('.wav', '.mp3')
-                    result = subprocess.run([
-                        'ffmpeg', '-y',
-                        '-i', wav_path,
-                        '-ar', '8000',  # Resample to 8kHz for Telnyx
-                        '-ac', '1',     # Mono
-                        '-b:a', '64k',  # 64kbps bitrate
-                        mp3_path
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode == 0:
-                        with open(mp3_path, 'rb') as f:
-                            audio_bytes = f.read()
+                    try:
+                        audio_bytes = await audio_transcoder.to_mp3(audio_bytes, label="maya_wav_to_mp3")
                         logger.info(f"✅ Maya audio converted to MP3: {len(audio_bytes)} bytes")
-                        try:
-                            os.unlink(wav_path)
-                            os.unlink(mp3_path)
-                        except Exception as e:
-                            logger.warning(f"⚠️ Failed to cleanup temp files: {e}")
-                    else:
-                        logger.error(f"❌ ffmpeg conversion failed: {result.stderr}")
-                        try:
-                            os.unlink(wav_path)
-                        except:
-                            pass
+                    except TranscodeError as e:
+                        logger.error(f"❌ ffmpeg conversion failed: {e}")
                         audio_bytes = None
                 else:
                     logger.warning("⚠️ Maya TTS returned no audio")
@@ -7408,7 +7077,7 @@ async def create_call_log(
             }]
         }
         
-        await db.call_logs.insert_one(call_log)
+        await db.call_logs.insert_one(with_search_terms(call_log))
         logger.info(f"📝 Created call log: {call_id}")
         return call_log
     except Exception as e:
@@ -7573,6 +7242,7 @@ async def finalize_call_log(call_id: str, end_reason: str = None, error_message:
                         }
                         
                         await db.campaign_calls.insert_one(campaign_call)
+                        await campaign_qc_view.refresh_call(db, campaign_id, call_id)
                         
                         # Update campaign's total_calls count
                         await db.campaigns.update_one(
@@ -7627,7 +7297,7 @@ async def finalize_call_log(call_id: str, end_reason: str = None, error_message:
                         # Send webhook asynchronously (non-blocking)
                         async def send_webhook():
                             try:
-                                async with httpx.AsyncClient(timeout=30.0) as client:
+                                async with http_client_registry.session(timeout=30.0) as client:
                                     response = await client.post(
                                         post_call_webhook_url,
                                         json=webhook_payload,
@@ -7678,30 +7348,9 @@ async def telnyx_webhook(payload: dict):
             if direction == "incoming":
                 logger.info(f"📥 Incoming call to {to_number} from {from_number}")
                 
-                # Normalize phone number for lookup (remove spaces, parentheses, dashes)
-                def normalize_phone(phone):
-                    """Normalize phone number to E.164 format for comparison"""
-                    if not phone:
-                        return ""
-                    # Remove all non-digit characters except leading +
-                    import re
-                    normalized = re.sub(r'[^\d+]', '', phone)
-                    return normalized
-                
-                normalized_to = normalize_phone(to_number)
-                logger.info(f"🔍 Looking up number: {to_number} → normalized: {normalized_to}")
-                
-                # Try exact match first, then try normalized match
-                phone_record = await db.phone_numbers.find_one({"number": to_number})
-                
-                if not phone_record:
-                    # Try to find by normalized number
-                    all_numbers = await db.phone_numbers.find().to_list(100)
-                    for num_record in all_numbers:
-                        if normalize_phone(num_record.get("number")) == normalized_to:
-                            phone_record = num_record
-                            logger.info(f"✅ Found number via normalization: {num_record.get('number')}")
-                            break
+                # O(1) routing index on the normalized number (indexed Mongo lookup on a miss)
+                phone_record = await did_router.lookup(db, to_number)
+                logger.info(f"🔍 Looking up number: {to_number} → {phone_record['number'] if phone_record else 'not found'}")
                 
                 if phone_record and phone_record.get("inbound_agent_id"):
                     inbound_agent_id = phone_record.get("inbound_agent_id")
@@ -7766,7 +7415,7 @@ async def telnyx_webhook(payload: dict):
                                 start_time=datetime.utcnow(),
                                 user_id=user_id  # CRITICAL: Associate call with correct user
                             )
-                            await db.call_logs.insert_one(call_log.dict())
+                            await db.call_logs.insert_one(with_search_terms(call_log.dict()))
                             logger.info(f"📝 Call log created for inbound call: {call_control_id} (user: {user_id})")
                         except Exception as e:
                             logger.error(f"❌ Error creating call log: {e}")
@@ -7836,6 +7485,9 @@ async def telnyx_webhook(payload: dict):
             playback_id = payload.get("data", {}).get("payload", {}).get("playback_id")
             media_url = payload.get("data", {}).get("payload", {}).get("media_url", "")
             
+            # The played file no longer needs to outlive its lease
+            playback_asset_store.release(playback_asset_store.name_from_url(media_url))
+            
             # COMFORT NOISE RESTART: Check if this is the comfort noise playback ending
             # If so, restart it to ensure continuous playback
             state = call_states.get(call_control_id)
@@ -7859,7 +7511,7 @@ async def telnyx_webhook(payload: dict):
                             if telnyx_api_key and telnyx_connection_id:
                                 telnyx_service = get_telnyx_service(api_key=telnyx_api_key, connection_id=telnyx_connection_id)
                                 backend_url = os.environ.get('BACKEND_URL', os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001'))
-                                comfort_noise_url = f"{backend_url}/api/tts-audio/comfort_noise_continuous.mp3"
+                                comfort_noise_url = playback_asset_store.url(COMFORT_NOISE_ASSET, backend_url)
                                 
                                 result = await telnyx_service.play_audio_url(
                                     call_control_id,
@@ -8073,6 +7725,9 @@ async def telnyx_webhook(payload: dict):
             agent = call_data["agent"]
             custom_variables = call_data.get("custom_variables", {})
             
+            # Tell the media socket (this worker or another) that the session is being built here
+            await call_setup.building(call_control_id)
+            
             # Extract phone numbers from webhook payload
             webhook_payload = payload.get("data", {}).get("payload", {})
             from_number = webhook_payload.get("from", "")
@@ -8128,7 +7783,7 @@ async def telnyx_webhook(payload: dict):
                     
                     async def send_call_started_webhook():
                         try:
-                            async with httpx.AsyncClient(timeout=30.0) as client:
+                            async with http_client_registry.session(timeout=30.0) as client:
                                 response = await client.post(
                                     call_started_webhook_url,
                                     json=webhook_payload,
@@ -8155,6 +7810,7 @@ async def telnyx_webhook(payload: dict):
             
             if not telnyx_api_key or not telnyx_connection_id:
                 logger.error(f"❌ Telnyx keys not found for user {user_id}")
+                await call_setup.failed(call_control_id)
                 return
             
             logger.info("🔧 Creating Telnyx service with user's keys...")
@@ -8171,7 +7827,7 @@ async def telnyx_webhook(payload: dict):
                         # Try to construct from REACT_APP_BACKEND_URL
                         backend_url = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001')
                     
-                    comfort_noise_url = f"{backend_url}/api/tts-audio/comfort_noise_continuous.mp3"
+                    comfort_noise_url = playback_asset_store.url(COMFORT_NOISE_ASSET, backend_url)
                     
                     # Start comfort noise as continuous background overlay (loops indefinitely)
                     result = await telnyx_service.play_audio_url(
@@ -8217,13 +7873,14 @@ async def telnyx_webhook(payload: dict):
                 logger.info(f"🔍 Agent ID: {agent.get('id')}, User ID: {agent.get('user_id')}")
                 
                 logger.info(f"🔧 Calling create_call_session() - START")
-                session = await create_call_session(
+                # Shared with a media socket on this worker that timed out waiting: one build, not two
+                session = await call_setup.build_once(call_control_id, lambda: create_call_session(
                     call_control_id, 
                     agent, 
                     agent_id=agent.get("id"), 
                     user_id=agent.get("user_id"), 
                     db=db
-                )
+                ))
                 logger.info(f"🔧 Calling create_call_session() - COMPLETE")
                 
                 logger.info(f"✅ Session object created: {type(session).__name__}")
@@ -8243,8 +7900,9 @@ async def telnyx_webhook(payload: dict):
                 
                 logger.info(f"✅ Session stored in worker memory (not Redis)")
                 
-                # Mark session as ready in Redis for cross-worker coordination
-                redis_service.mark_session_ready(call_control_id, ttl=3600)
+                # Mark session as ready in Redis for cross-worker coordination, and wake the media socket
+                redis_service.mark_session_ready(call_control_id, ttl=3600, owner=call_setup.worker_id)
+                await call_setup.ready(call_control_id)
                 
                 logger.info(f"🤖 AI session created for call {call_control_id}")
                 logger.info(f"📦 Custom variables injected: {custom_variables}")
@@ -8267,6 +7925,7 @@ async def telnyx_webhook(payload: dict):
             except Exception as e:
                 logger.error(f"❌ CRITICAL: Failed to create session: {e}")
                 logger.exception("Full traceback:")
+                await call_setup.failed(call_control_id)
                 # Try to hangup the call gracefully
                 try:
                     await telnyx_service.hangup_call(call_control_id)
@@ -8656,6 +8315,7 @@ async def telnyx_webhook(payload: dict):
             redis_service.delete_call_data(call_control_id)
             if call_control_id in active_telnyx_calls:
                 del active_telnyx_calls[call_control_id]
+            call_setup.discard(call_control_id)
             logger.info(f"🧹 Cleaned up call session from Redis and memory: {call_control_id}")
         
         elif event_type == "call.recording.saved":
@@ -9112,16 +8772,42 @@ async def get_call_log(call_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Serve TTS audio files
-from fastapi.responses import FileResponse
-import os
-
-@api_router.get("/tts-audio/{filename}")
-async def serve_tts_audio(filename: str):
-    """Serve generated TTS audio files"""
-    file_path = f"/tmp/{filename}"
-    if not os.path.exists(file_path):
+@api_router.api_route("/tts-audio/{filename}", methods=["GET", "HEAD"])
+async def serve_tts_audio(filename: str, request: Request):
+    """Serve playback audio from the asset store (ETag / If-None-Match / single Range)"""
+    found = playback_asset_store.stat(filename)
+    if found is None:
         raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(file_path, media_type="audio/mpeg")
+    path, st = found
+    size = st.st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": playback_asset_store.etag(st),
+        "Cache-Control": "public, max-age=3600",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    status_code = 206 if byte_range else 200
+    media_type = playback_asset_store.content_type(filename)
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status_code, media_type=media_type, headers=headers)
+    
+    return StreamingResponse(
+        playback_asset_store.iter_range(filename, path, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
 
 # Include the router in the main app
 
@@ -9137,9 +8823,20 @@ async def get_call_history(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    view: str = "summary",
+    call_id: Optional[str] = None,
+    from_number: Optional[str] = None,
+    to_number: Optional[str] = None
 ):
-    """Get call history with filters"""
+    """Get call history with filters
+
+    Pages by keyset: pass the previous response's next_cursor as cursor.
+    offset is still honoured (skip) for old clients. Rows are summary columns
+    unless view=full; the transcript and logs come from GET /call-history/{call_id}.
+    total is an estimate, cached for a short while.
+    """
     try:
         # Build query - ALWAYS filter by user_id for multi-tenant isolation
         query = {"user_id": current_user['id']}
@@ -9155,6 +8852,9 @@ async def get_call_history(
         if status:
             query["status"] = status
         
+        # call_id / phone filters match the start or end of the value (indexed search keys)
+        apply_search_filters(query, call_id=call_id, from_number=from_number, to_number=to_number)
+        
         if start_date:
             query["start_time"] = {"$gte": datetime.fromisoformat(start_date)}
         
@@ -9166,15 +8866,20 @@ async def get_call_history(
         
         logger.info(f"📞 Query: {query}")
         
-        # Get total count first
-        total_count = await db.call_logs.count_documents(query)
-        
-        # Query database - sort by created_at since start_time may not exist in all records
-        # Try start_time first, fall back to created_at
-        cursor = db.call_logs.find(query).sort("created_at", -1).skip(offset).limit(limit)
-        calls = await cursor.to_list(length=limit)
+        if offset and not cursor:
+            # Legacy offset paging (deep offsets get slow - prefer cursor)
+            projection = SUMMARY_PROJECTIONS["call_logs"] if view == "summary" else None
+            calls = await db.call_logs.find(query, projection).sort(PAGE_SORT).skip(offset).limit(limit).to_list(length=limit)
+            next_cursor = None
+            total_count = await estimated_counter.count(db.call_logs, query)
+        else:
+            try:
+                page = await paginate(db.call_logs, query, limit, cursor, view)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            calls, next_cursor, total_count = page["items"], page["next_cursor"], page["total"]
         
-        logger.info(f"📞 Found {len(calls)} calls for user (Total: {total_count})")
+        logger.info(f"📞 Found {len(calls)} calls for user (Total: ~{total_count})")
         
         # Convert ObjectId to string and datetime to ISO
         for call in calls:
@@ -9203,9 +8908,13 @@ async def get_call_history(
         return {
             "calls": calls,
             "total": total_count,
+            "total_is_estimate": True,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching call history: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -9423,26 +9132,37 @@ async def get_dashboard_analytics(current_user: dict = Depends(get_current_user)
         })
         calls_change = ((total_calls_today - yesterday_calls) / yesterday_calls * 100) if yesterday_calls > 0 else 0
         
-        # Average response time (E2E latency) - filtered by user_id
-        pipeline = [
-            {"$match": {"user_id": current_user['id'], "logs": {"$exists": True, "$ne": []}}},
-            {"$unwind": "$logs"},
-            {"$match": {"logs.message": {"$regex": "E2E latency"}}},
-            {"$limit": 100}  # Last 100 calls with latency
-        ]
+        # Average response time (user stopped speaking → first agent audio) from turn_metrics
+        turn_latency = await db.turn_metrics.aggregate([
+            {"$match": {"user_id": current_user['id'], "latency.e2e_ms": {"$exists": True}}},
+            {"$sort": {"started_at": -1}},
+            {"$limit": 1000},  # Last 1000 traced turns
+            {"$group": {"_id": None, "avg_ms": {"$avg": "$latency.e2e_ms"}}}
+        ]).to_list(length=1)
         
-        latency_calls = await db.call_logs.aggregate(pipeline).to_list(length=100)
-        latencies = []
-        for call in latency_calls:
-            try:
-                import re
-                match = re.search(r"E2E latency for this turn: (\d+)ms", call["logs"]["message"])
-                if match:
-                    latencies.append(int(match.group(1)))
-            except:
-                pass
-        
-        avg_latency = sum(latencies) / len(latencies) if latencies else 0
+        if turn_latency:
+            avg_latency = turn_latency[0]["avg_ms"] or 0
+        else:
+            # Legacy calls (before turn tracing): recover from log strings
+            pipeline = [
+                {"$match": {"user_id": current_user['id'], "logs": {"$exists": True, "$ne": []}}},
+                {"$unwind": "$logs"},
+                {"$match": {"logs.message": {"$regex": "E2E latency"}}},
+                {"$limit": 100}  # Last 100 calls with latency
+            ]
+            
+            latency_calls = await db.call_logs.aggregate(pipeline).to_list(length=100)
+            latencies = []
+            for call in latency_calls:
+                try:
+                    import re
+                    match = re.search(r"E2E latency for this turn: (\d+)ms", call["logs"]["message"])
+                    if match:
+                        latencies.append(int(match.group(1)))
+                except:
+                    pass
+            
+            avg_latency = sum(latencies) / len(latencies) if latencies else 0
         avg_latency_seconds = avg_latency / 1000  # Convert to seconds
         
         # Success rate - filtered by user_id
@@ -9514,9 +9234,6 @@ async def get_comprehensive_call_analytics(
         if agent_id:
             query["agent_id"] = agent_id
         
-        if call_id:
-            query["call_id"] = {"$regex": call_id, "$options": "i"}
-        
         if batch_call_id:
             query["batch_call_id"] = batch_call_id
         
@@ -9530,11 +9247,8 @@ async def get_comprehensive_call_analytics(
             if duration_max is not None:
                 query["duration"]["$lte"] = duration_max
         
-        if from_number:
-            query["from_number"] = {"$regex": from_number, "$options": "i"}
-        
-        if to_number:
-            query["to_number"] = {"$regex": to_number, "$options": "i"}
+        # Anchored prefix/suffix matches on the indexed search keys (call_search)
+        apply_search_filters(query, call_id=call_id, from_number=from_number, to_number=to_number)
         
         if user_sentiment:
             query["sentiment"] = user_sentiment
@@ -9707,6 +9421,34 @@ from voice_library_router import voice_library_router, load_voice_sample
 api_router.include_router(voice_library_router)  # Include under /api prefix
 logger.info("✅ Voice library router loaded")
 
+@api_router.post("/debug/log-verbosity")
+async def set_call_log_verbosity(request: dict, current_user: dict = Depends(get_current_user)):
+    """
+    Turn full hot-path logging (raw tokens, per-sentence, TTS chunks) on or off for one live call.
+    Other calls keep logging 1 in LOG_HOT_SAMPLE_EVERY of those events.
+    """
+    call_id = request.get("call_id")
+    if not call_id:
+        raise HTTPException(status_code=400, detail="call_id is required")
+    enabled = bool(request.get("enabled", True))
+    ttl_seconds = int(request.get("ttl_seconds", 600))
+
+    call_log = await db.call_logs.find_one(
+        {"$or": [{"call_id": call_id}, {"id": call_id}], "user_id": current_user["id"]},
+        {"_id": 0, "call_id": 1}
+    )
+    if not call_log:
+        raise HTTPException(status_code=404, detail="Call not found")
+    call_id = call_log.get("call_id") or call_id
+
+    call_log_control.set_verbose(call_id, enabled, ttl_seconds)
+    if enabled:
+        redis_service.set_flag(call_id, "log_verbose", "1", expire=ttl_seconds)
+    else:
+        redis_service.delete_flag(call_id, "log_verbose")
+    logger.info(f"🔊 Hot-path logging for call {call_id}: {'verbose' if enabled else 'sampled'}")
+    return {"call_id": call_id, "verbose": enabled, "ttl_seconds": ttl_seconds if enabled else 0}
+
 # Debug endpoint to test post-call automation
 @api_router.post("/debug/test-post-call-automation/{call_id}")
 async def test_post_call_automation(call_id: str, current_user: dict = Depends(get_current_user)):
@@ -10550,4 +10292,12 @@ async def save_qc_config(request: dict, current_user: dict = Depends(get_current
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await turn_tracer.stop()
+    await tts_multiplexer.close_all()
+    await http_client_registry.aclose_all()
+    await call_setup.stop()
+    await playback_asset_store.stop()
+    await call_log_control.stop()
+    kb_ingest_jobs.extractor.shutdown()
+    client.close()
+    log_pipeline.stop()
\ No newline at end of file
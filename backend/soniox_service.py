@@ -9,6 +9,7 @@ from typing import Callable, Optional
 logger = logging.getLogger(__name__)
 
 SONIOX_API_KEY = os.getenv("SONIOX_API_KEY")
+SONIOX_WS_URL = os.getenv("SONIOX_WS_URL", "wss://stt-rt.soniox.com/transcribe-websocket")
 
 
 def clean_transcript(text: str) -> str:
@@ -268,7 +269,7 @@ class SonioxStreamingService:
             language_hints: List of language codes (e.g. ["en", "es"])
             context: Custom context for improved accuracy
         """
-        url = "wss://stt-rt.soniox.com/transcribe-websocket"
+        url = SONIOX_WS_URL
         
         # Build configuration message
         config = {
@@ -0,0 +1,387 @@
+"""
+Speculative Node Openings
+While the agent is speaking (or waiting for the caller), pre-synthesize the
+opening sentence of the call-flow nodes the conversation is most likely to
+move to next, so a matching transition starts playback from prepared audio
+instead of waiting on ElevenLabs.
+
+- Likelihood = flow structure (outgoing transitions of the current node)
+  blended with per-agent historical transition frequencies from call_logs
+  (turn_complete log entries carry node_id), cached per agent
+- Only script-mode nodes are prepared: their opening is known before the
+  caller speaks. Prompt-mode nodes depend on what the caller says
+- Openings are resolved with the session's variables and split exactly like
+  the script streamer splits them, so a hit is an exact text match
+- Per-call budget (characters synthesized, clips per turn); unused clips are
+  discarded when the next turn is prepared
+- Hits, misses, wasted clips and estimated latency saved are tracked per call
+  and per worker
+
+Enable per agent with settings.speculation_settings.enabled, or
+SPECULATIVE_OPENINGS=true for all agents (call-flow agents on Soniox STT with
+persistent ElevenLabs TTS, the path that plays prepared audio).
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Candidates prepared per turn
+SPECULATION_TOP_N = int(os.environ.get("SPECULATION_TOP_N", "2"))
+# Candidates below this probability are not worth the synthesis
+SPECULATION_MIN_PROBABILITY = float(os.environ.get("SPECULATION_MIN_PROBABILITY", "0.15"))
+# Characters that may be synthesized speculatively per call (ElevenLabs bills per character)
+SPECULATION_CALL_BUDGET_CHARS = int(os.environ.get("SPECULATION_CALL_BUDGET_CHARS", "1500"))
+# Longest opening prepared (one sentence; longer openings are left to the live path)
+SPECULATION_MAX_OPENING_CHARS = 200
+
+# Recent calls per agent used for historical transition frequencies
+SPECULATION_HISTORY_CALLS = int(os.environ.get("SPECULATION_HISTORY_CALLS", "200"))
+SPECULATION_STATS_TTL = float(os.environ.get("SPECULATION_STATS_TTL", "600"))
+
+# Weight of the flow-structure prior, in pseudo-observations spread over the outgoing edges
+FLOW_PRIOR_WEIGHT = 2.0
+
+# Same split the script streamer uses (core_calling_service._process_call_flow_streaming)
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_UNRESOLVED_VARIABLE = re.compile(r'\{\{?\s*\w+\s*\}?\}')
+
+# Same markers the script streamer uses to auto-detect prompt mode
+_PROMPT_MARKERS = [
+    "## ", "### ", "instructions:", "goal:", "objective:", "**important**",
+    "you are", "your task", "rules:", "primary goal", "**no dashes"
+]
+
+# synthesize(text, voice_id) -> mulaw 8kHz audio
+Synthesizer = Callable[[str, Optional[str]], Awaitable[Optional[bytes]]]
+
+
+def is_speculation_enabled(agent_config: dict) -> bool:
+    """Agent setting speculation_settings.enabled, or SPECULATIVE_OPENINGS=true, on the Soniox + persistent TTS path"""
+    agent_config = agent_config or {}
+    if agent_config.get("agent_type", "single_prompt") != "call_flow":
+        return False
+    settings = agent_config.get("settings", {}) or {}
+    # Prepared openings are only played by the Soniox handler's persistent-TTS path;
+    # anywhere else they would be synthesized (and billed) but never used
+    if settings.get("stt_provider") != "soniox" or settings.get("tts_provider") != "elevenlabs":
+        return False
+    if not (settings.get("elevenlabs_settings", {}) or {}).get("use_persistent_tts", True):
+        return False
+    speculation_settings = settings.get("speculation_settings", {}) or {}
+    if "enabled" in speculation_settings:
+        return bool(speculation_settings["enabled"])
+    return os.environ.get("SPECULATIVE_OPENINGS", "false").lower() == "true"
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").split()).lower()
+
+
+def node_opening(node: dict, variables: Dict) -> Optional[str]:
+    """First sentence the script streamer would send for `node`, or None if it can't be known yet"""
+    if not node:
+        return None
+    node_type = node.get("type", "")
+    if node_type not in ("conversation", "ending"):
+        return None
+    node_data = node.get("data", {}) or {}
+    if node_type == "conversation":
+        content = node_data.get("script", "") or node_data.get("content", "")
+    else:
+        content = node_data.get("content", "") or node_data.get("script", "")
+
+    for var_name, var_value in (variables or {}).items():
+        content = content.replace(f"{{{{{var_name}}}}}", str(var_value))
+        content = content.replace(f"{{{var_name}}}", str(var_value))
+
+    mode = node_data.get("mode")
+    if mode is None:
+        mode = node_data.get("promptType")
+    if not mode:
+        mode = "prompt" if any(marker in content.lower() for marker in _PROMPT_MARKERS) else "script"
+    if mode != "script":
+        return None
+
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(content.strip()) if s.strip()]
+    if not sentences:
+        return None
+    opening = sentences[0]
+    if len(opening) > SPECULATION_MAX_OPENING_CHARS or _UNRESOLVED_VARIABLE.search(opening):
+        return None
+    return opening
+
+
+def transitions_from_logs(logs: List[Dict]) -> List[Tuple[str, str]]:
+    """(from_node, to_node) pairs from one call's turn_complete log entries"""
+    nodes = [entry.get("node_id") for entry in logs or []
+             if entry.get("type") == "turn_complete" and entry.get("node_id")]
+    return list(zip(nodes, nodes[1:]))
+
+
+class TransitionStats:
+    """Per-agent transition counts from recent call logs, cached for SPECULATION_STATS_TTL"""
+
+    def __init__(self, ttl: float = SPECULATION_STATS_TTL, max_calls: int = SPECULATION_HISTORY_CALLS):
+        self.ttl = ttl
+        self.max_calls = max_calls
+        self._counts: Dict[str, Tuple[float, Dict[str, Dict[str, int]]]] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    async def _load(self, db, agent_id: str) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        cursor = db.call_logs.find(
+            {"agent_id": agent_id},
+            {"_id": 0, "logs.type": 1, "logs.node_id": 1}
+        ).sort("start_time", -1).limit(self.max_calls)
+        calls = 0
+        async for doc in cursor:
+            calls += 1
+            for src, dst in transitions_from_logs(doc.get("logs")):
+                row = counts.setdefault(src, {})
+                row[dst] = row.get(dst, 0) + 1
+        logger.info(f"🔮 Loaded transition history for agent {agent_id}: {calls} calls, {len(counts)} source nodes")
+        return counts
+
+    async def get(self, db, agent_id: str) -> Dict[str, Dict[str, int]]:
+        """{from_node: {to_node: count}}; concurrent callers share one load"""
+        if db is None or not agent_id:
+            return {}
+        cached = self._counts.get(agent_id)
+        if cached and time.time() - cached[0] < self.ttl:
+            return cached[1]
+        task = self._loading.get(agent_id)
+        if task is None:
+            task = asyncio.create_task(self._load(db, agent_id))
+            self._loading[agent_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(agent_id, None))
+        try:
+            counts = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"⚠️ Transition history unavailable for agent {agent_id}: {e}")
+            counts = cached[1] if cached else {}
+        self._counts[agent_id] = (time.time(), counts)
+        return counts
+
+    def invalidate(self, agent_id: str):
+        self._counts.pop(agent_id, None)
+
+
+def rank_next_nodes(current_node: dict, history: Dict[str, int]) -> List[Tuple[str, float]]:
+    """(node_id, probability) for the likely next nodes, most likely first
+
+    Outgoing transitions of the current node share FLOW_PRIOR_WEIGHT pseudo-counts;
+    observed transitions from call logs add one count each.
+    """
+    targets = [t.get("nextNode") for t in (current_node.get("data", {}) or {}).get("transitions", []) or []]
+    targets = [t for t in targets if t]
+    weights: Dict[str, float] = {}
+    if targets:
+        prior = FLOW_PRIOR_WEIGHT / len(targets)
+        for target in targets:
+            weights[target] = weights.get(target, 0.0) + prior
+    for target, count in (history or {}).items():
+        weights[target] = weights.get(target, 0.0) + count
+    total = sum(weights.values())
+    if not total:
+        return []
+    ranked = sorted(((node_id, w / total) for node_id, w in weights.items()), key=lambda x: (-x[1], x[0]))
+    return ranked
+
+
+class PreparedOpening:
+    """One speculatively synthesized opening sentence"""
+
+    def __init__(self, node_id: str, text: str, probability: float, voice_id: Optional[str] = None):
+        self.node_id = node_id
+        self.voice_id = voice_id
+        self.text = text
+        self.key = normalize_text(text)
+        self.probability = probability
+        self.audio: Optional[bytes] = None
+        self.synth_ms = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.audio is not None
+
+
+class CallSpeculator:
+    """Prepares, serves and accounts for speculative openings on one call"""
+
+    def __init__(self, call_id: str, synthesize: Synthesizer, top_n: int = SPECULATION_TOP_N,
+                 min_probability: float = SPECULATION_MIN_PROBABILITY,
+                 budget_chars: int = SPECULATION_CALL_BUDGET_CHARS):
+        self.call_id = call_id
+        self.synthesize = synthesize
+        self.top_n = top_n
+        self.min_probability = min_probability
+        self.budget_chars = budget_chars
+        self.chars_spent = 0
+        self._prepared: Dict[str, PreparedOpening] = {}
+        self.stats = {
+            "turns": 0, "prepared": 0, "hits": 0, "misses": 0, "pending": 0,
+            "wasted": 0, "over_budget": 0, "failed": 0, "latency_saved_ms": 0,
+        }
+
+    def prepare(self, current_node: dict, flow_nodes: List[dict], variables: Dict,
+                history: Dict[str, int], voice_id: Optional[str] = None) -> List[PreparedOpening]:
+        """Discard last turn's unused clips and start synthesizing the likely openings for the next turn"""
+        self.discard()
+        self.stats["turns"] += 1
+        if not current_node:
+            return []
+        nodes_by_id = {node.get("id"): node for node in flow_nodes or []}
+        started = []
+        for node_id, probability in rank_next_nodes(current_node, history):
+            if len(started) >= self.top_n or probability < self.min_probability:
+                break
+            opening = node_opening(nodes_by_id.get(node_id), variables)
+            if not opening:
+                continue
+            prepared = PreparedOpening(node_id, opening, probability, voice_id)
+            if prepared.key in self._prepared:
+                continue  # two edges to nodes with the same opening
+            if self.chars_spent + len(opening) > self.budget_chars:
+                self.stats["over_budget"] += 1
+                continue
+            self.chars_spent += len(opening)
+            prepared.task = asyncio.create_task(self._synthesize(prepared))
+            self._prepared[prepared.key] = prepared
+            started.append(prepared)
+            self.stats["prepared"] += 1
+        if started:
+            logger.info(f"🔮 [Call {self.call_id}] Preparing {len(started)} opening(s): "
+                        + ", ".join(f"{p.node_id} ({p.probability:.0%})" for p in started))
+        return started
+
+    async def _synthesize(self, prepared: PreparedOpening):
+        started = time.time()
+        try:
+            audio = await self.synthesize(prepared.text, prepared.voice_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            audio = None
+            logger.warning(f"⚠️ [Call {self.call_id}] Speculative synthesis failed for {prepared.node_id}: {e}")
+        if not audio:
+            self.stats["failed"] += 1
+            return
+        prepared.synth_ms = int((time.time() - started) * 1000)
+        prepared.audio = audio
+
+    def take(self, sentence: str, voice_id: Optional[str] = None) -> Optional[PreparedOpening]:
+        """Prepared clip for the first sentence of a response, or None (the sentence goes to live TTS)
+
+        Must be called synchronously when the sentence is produced, before the
+        next prepare() discards this turn's clips.
+        """
+        if not self._prepared:
+            return None
+        prepared = self._prepared.pop(normalize_text(sentence), None)
+        if prepared is not None and voice_id and prepared.voice_id and voice_id != prepared.voice_id:
+            self._cancel(prepared)
+            prepared = None  # voice changed since it was prepared
+        if prepared is None:
+            self.stats["misses"] += 1
+            return None
+        if not prepared.ready:
+            # Still synthesizing: live TTS is no slower than waiting on it
+            self.stats["pending"] += 1
+            self._cancel(prepared)
+            return None
+        self.stats["hits"] += 1
+        self.stats["latency_saved_ms"] += prepared.synth_ms
+        logger.info(f"🔮 [Call {self.call_id}] Speculative HIT for node {prepared.node_id}: "
+                    f"{len(prepared.audio)} bytes ready, ~{prepared.synth_ms}ms TTS saved")
+        return prepared
+
+    def _cancel(self, prepared: PreparedOpening):
+        if prepared.task and not prepared.task.done():
+            prepared.task.cancel()
+
+    def discard(self):
+        """Drop every clip not used by now"""
+        for prepared in self._prepared.values():
+            self._cancel(prepared)
+            self.stats["wasted"] += 1
+        self._prepared.clear()
+
+    def hit_rate(self) -> Optional[float]:
+        served = self.stats["hits"] + self.stats["misses"] + self.stats["pending"]
+        return self.stats["hits"] / served if served else None
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "chars_spent": self.chars_spent, "hit_rate": self.hit_rate()}
+
+    def close(self):
+        self.discard()
+
+
+class SpeculationManager:
+    """Per-call speculators on this worker, plus worker-wide totals"""
+
+    def __init__(self):
+        self.speculators: Dict[str, CallSpeculator] = {}
+        self.transition_stats = TransitionStats()
+        self.totals: Dict[str, int] = {}
+        self.calls = 0
+
+    def create(self, call_id: str, synthesize: Synthesizer, **kwargs) -> CallSpeculator:
+        speculator = CallSpeculator(call_id, synthesize, **kwargs)
+        self.speculators[call_id] = speculator
+        self.calls += 1
+        return speculator
+
+    def get(self, call_id: str) -> Optional[CallSpeculator]:
+        return self.speculators.get(call_id)
+
+    def close(self, call_id: str) -> Optional[dict]:
+        speculator = self.speculators.pop(call_id, None)
+        if speculator is None:
+            return None
+        speculator.close()
+        stats = speculator.get_stats()
+        for key, value in speculator.stats.items():
+            self.totals[key] = self.totals.get(key, 0) + value
+        self.totals["chars_spent"] = self.totals.get("chars_spent", 0) + speculator.chars_spent
+        if stats["turns"]:
+            logger.info(f"🔮 [Call {call_id}] Speculation stats: {stats}")
+        return stats
+
+    def get_stats(self) -> dict:
+        served = self.totals.get("hits", 0) + self.totals.get("misses", 0) + self.totals.get("pending", 0)
+        return {
+            "active_calls": len(self.speculators),
+            "calls": self.calls,
+            **self.totals,
+            "hit_rate": self.totals.get("hits", 0) / served if served else None,
+        }
+
+
+def elevenlabs_synthesizer(api_key: str, default_voice_id: str, model_id: str, voice_settings: dict) -> Synthesizer:
+    """Synthesizer producing the same ulaw_8000 audio the persistent TTS session plays"""
+    from http_client_registry import http_client_registry
+
+    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
+
+    async def synthesize(text: str, voice_id: Optional[str] = None) -> Optional[bytes]:
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id or default_voice_id}/stream?output_format=ulaw_8000"
+        payload = {"text": text, "model_id": model_id, "voice_settings": voice_settings}
+        async with http_client_registry.session(timeout=10.0) as client:
+            async with client.stream("POST", url, headers=headers, json=payload) as response:
+                if response.status_code != 200:
+                    logger.warning(f"⚠️ Speculative TTS error: {response.status_code}")
+                    return None
+                return b"".join([chunk async for chunk in response.aiter_bytes()])
+
+    return synthesize
+
+
+# Global speculation manager instance
+speculation_manager = SpeculationManager()
@@ -0,0 +1,497 @@
+"""
+Streaming STT Adapters - one interface over the real-time STT providers
+behind the Telnyx media socket (Soniox, AssemblyAI, Deepgram).
+
+Each handler in server.py used to run its own media loop: base64-decode every
+packet, convert it for its provider (AssemblyAI: a scipy FFT resample of each
+20ms packet on its own) and parse the provider's messages inline.
+
+- AudioFrontEnd decodes each Telnyx media message once and fans the frame out
+  to the adapter and to local taps (VAD / early end-of-turn). 16kHz PCM is made
+  only when the adapter wants it, by one stream-continuous audioop resampler
+  (no per-packet edges, no FFT)
+- Adapters batch frames to the provider's packet size and turn provider
+  messages into SttEvent(partial | final | endpoint)
+- parse() never touches the network, so recorded provider messages can be
+  replayed through it (tests, loadtest/bench_stt_adapters.py)
+
+Event semantics, whatever the provider:
+- partial:  in-progress text of the current segment
+- final:    newly finalized text (only what this message finalized)
+- endpoint: the caller's turn is over; text is the whole utterance since the
+            previous endpoint
+"""
+import audioop
+import base64
+import binascii
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+DEEPGRAM_WS_URL = os.environ.get("DEEPGRAM_WS_URL", "wss://api.deepgram.com/v1/listen")
+
+SAMPLE_RATE = 8000
+PCM_16K_RATE = 16000
+FRAME_MS = 20
+
+# Event kinds
+PARTIAL = "partial"
+FINAL = "final"
+ENDPOINT = "endpoint"
+
+MULAW = "mulaw"
+PCM_16K = "pcm_16k"
+
+SONIOX_END_TOKEN = "<end>"
+
+
+@dataclass
+class SttEvent:
+    kind: str
+    text: str = ""
+    raw: Optional[dict] = field(default=None, repr=False)
+
+
+class AudioFrame:
+    """One caller packet: 8kHz mulaw as sent by Telnyx, plus 16kHz PCM when an adapter asked for it"""
+
+    __slots__ = ("mulaw", "pcm_16k")
+
+    def __init__(self, mulaw: bytes, pcm_16k: Optional[bytes] = None):
+        self.mulaw = mulaw
+        self.pcm_16k = pcm_16k
+
+
+class AudioFrontEnd:
+    """
+    Decode-once audio path for one media socket: Telnyx JSON → AudioFrame →
+    adapter + taps. The resampler state lives here, so 16kHz PCM is continuous
+    across packets.
+    """
+
+    def __init__(self, pcm_16k: bool = False):
+        self.pcm_16k = pcm_16k
+        self.taps: List[Callable[[AudioFrame], None]] = []
+        self._ratecv_state = None
+        self.stats = {"frames": 0, "bytes": 0, "bad_payloads": 0}
+
+    @classmethod
+    def for_adapter(cls, adapter: "StreamingSttAdapter") -> "AudioFrontEnd":
+        return cls(pcm_16k=adapter.input_format == PCM_16K)
+
+    def add_tap(self, tap: Callable[[AudioFrame], None]):
+        """Synchronous per-frame consumer (VAD, recorders); runs after the frame is sent"""
+        self.taps.append(tap)
+
+    def to_pcm_16k(self, mulaw: bytes) -> bytes:
+        pcm, self._ratecv_state = audioop.ratecv(
+            audioop.ulaw2lin(mulaw, 2), 2, 1, SAMPLE_RATE, PCM_16K_RATE, self._ratecv_state
+        )
+        return pcm
+
+    def frame(self, mulaw: bytes) -> AudioFrame:
+        self.stats["frames"] += 1
+        self.stats["bytes"] += len(mulaw)
+        return AudioFrame(mulaw, self.to_pcm_16k(mulaw) if self.pcm_16k else None)
+
+    def decode(self, data: dict) -> Optional[AudioFrame]:
+        """AudioFrame for a Telnyx media message, None for anything else"""
+        payload = (data.get("media") or {}).get("payload") if data.get("event") == "media" else None
+        if not payload:
+            return None
+        try:
+            return self.frame(base64.b64decode(payload))
+        except (binascii.Error, ValueError):
+            self.stats["bad_payloads"] += 1
+            return None
+
+    async def pump(self, websocket, adapter: "StreamingSttAdapter",
+                   gate: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Forward the caller's audio until Telnyx sends "stop" (disconnects
+        propagate to the caller). Frames go to the adapter while gate() allows it;
+        taps always see them. Returns the number of frames received.
+        """
+        received = 0
+        try:
+            while True:
+                data = json.loads(await websocket.receive_text())
+                if data.get("event") == "stop":
+                    logger.info("⏹️ Telnyx stream stopped")
+                    break
+                frame = self.decode(data)
+                if frame is None:
+                    continue
+                received += 1
+                if gate is None or gate():
+                    await adapter.send_frame(frame)
+                for tap in self.taps:
+                    tap(frame)
+        finally:
+            await adapter.flush()
+        return received
+
+
+class StreamingSttAdapter(ABC):
+    """
+    connect → send_frame* → events() → close. Subclasses set the provider name,
+    the audio they want (MULAW or PCM_16K) and how many 20ms frames go in one
+    packet, set self.model, and implement ws/_connect/_send/_close/parse.
+    """
+
+    provider = ""
+    input_format = MULAW
+    batch_frames = 1
+
+    def __init__(self, model: str = ""):
+        self.model = model  # provider model the stream transcribes with (for latency logs)
+        self._pending = bytearray()
+        self._pending_frames = 0
+        self._utterance: List[str] = []
+        self._open = False
+        self.stats = {"frames": 0, "packets": 0, PARTIAL: 0, FINAL: 0, ENDPOINT: 0, "reconnects": 0}
+
+    @property
+    @abstractmethod
+    def ws(self):
+        """The provider WebSocket events() reads from"""
+
+    @abstractmethod
+    async def _connect(self) -> bool:
+        pass
+
+    @abstractmethod
+    async def _send(self, audio: bytes):
+        pass
+
+    @abstractmethod
+    async def _close(self):
+        pass
+
+    @abstractmethod
+    def parse(self, data: dict) -> Optional[List[SttEvent]]:
+        """Events for one provider message; None once the provider has ended the session"""
+
+    async def connect(self) -> bool:
+        self._utterance = []
+        connected = await self._connect()
+        if connected and not self._open:
+            self._open = True
+            stt_streams.opened(self)
+        return connected
+
+    async def reconnect(self) -> bool:
+        """Reconnect with the same settings (the pending utterance is dropped)"""
+        self.stats["reconnects"] += 1
+        self._pending = bytearray()
+        self._pending_frames = 0
+        return await self.connect()
+
+    async def send_frame(self, frame: AudioFrame):
+        self._pending += frame.pcm_16k if self.input_format == PCM_16K else frame.mulaw
+        self._pending_frames += 1
+        self.stats["frames"] += 1
+        if self._pending_frames >= self.batch_frames:
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        audio = bytes(self._pending)
+        self._pending = bytearray()
+        self._pending_frames = 0
+        self.stats["packets"] += 1
+        await self._send(audio)
+
+    async def events(self) -> AsyncIterator[SttEvent]:
+        """Normalized events until the provider ends the session or the socket closes cleanly"""
+        async for message in self.ws:
+            if not isinstance(message, str):
+                continue
+            events = self.parse(json.loads(message))
+            if events is None:
+                return
+            for event in events:
+                self.stats[event.kind] += 1
+                yield event
+
+    async def finalize(self):
+        """Ask the provider to finalize pending audio now, where it supports that"""
+
+    async def close(self):
+        await self.flush()
+        await self._close()
+        if self._open:
+            self._open = False
+            stt_streams.closed(self)
+
+    def _final(self, text: str, raw: dict) -> SttEvent:
+        self._utterance.append(text)
+        return SttEvent(FINAL, text, raw)
+
+    def _endpoint(self, raw: dict) -> SttEvent:
+        text = " ".join(t for t in self._utterance if t).strip()
+        self._utterance = []
+        return SttEvent(ENDPOINT, text, raw)
+
+
+class SonioxAdapter(StreamingSttAdapter):
+    """Soniox real-time: 8kHz mulaw straight through, endpoint on the final <end> token"""
+
+    provider = "soniox"
+
+    def __init__(self, api_key: str, **connect_kwargs):
+        super().__init__(model=connect_kwargs.get("model", ""))
+        from soniox_service import SonioxStreamingService
+        self.service = SonioxStreamingService(api_key=api_key)
+        self.connect_kwargs = connect_kwargs
+
+    @classmethod
+    def from_settings(cls, api_key: str, settings: dict) -> "SonioxAdapter":
+        return cls(
+            api_key,
+            model=settings.get("model", "stt-rt-v3"),  # telephony-v3 is deprecated
+            audio_format=settings.get("audio_format", "mulaw"),
+            sample_rate=settings.get("sample_rate", 8000),
+            num_channels=settings.get("num_channels", 1),
+            enable_endpoint_detection=settings.get("enable_endpoint_detection", True),
+            enable_speaker_diarization=settings.get("enable_speaker_diarization", False),
+            language_hints=settings.get("language_hints", ["en"]),
+            context=settings.get("context", ""),
+        )
+
+    @property
+    def ws(self):
+        return self.service.ws
+
+    async def _connect(self) -> bool:
+        return await self.service.connect(**self.connect_kwargs)
+
+    async def _send(self, audio: bytes):
+        await self.service.send_audio(audio)
+
+    async def finalize(self):
+        await self.service.finalize_manually()
+
+    async def _close(self):
+        await self.service.close()
+
+    def parse(self, data: dict) -> Optional[List[SttEvent]]:
+        from soniox_service import clean_transcript
+        if "error_code" in data:
+            logger.error(f"❌ Soniox error: {data}")
+            return None
+        if data.get("finished"):
+            logger.info("🛑 Soniox session finished")
+            return None
+
+        final, partial, endpoint = [], [], False
+        for token in data.get("tokens", []):
+            text = token.get("text", "")
+            if token.get("is_final", False):
+                if text == SONIOX_END_TOKEN:
+                    endpoint = True
+                else:
+                    final.append(text)
+            else:
+                partial.append(text)
+
+        # Tokens are sub-word pieces: clean_transcript re-joins "H ello" → "Hello"
+        events = []
+        partial_text = clean_transcript(" ".join(partial)) if partial else ""
+        if partial_text:
+            events.append(SttEvent(PARTIAL, partial_text, data))
+        final_text = clean_transcript(" ".join(final)) if final else ""
+        if final_text:
+            events.append(self._final(final_text, data))
+        if endpoint:
+            events.append(self._endpoint(data))
+        return events
+
+
+class AssemblyAIAdapter(StreamingSttAdapter):
+    """AssemblyAI Universal Streaming v3: 16kHz PCM in 60ms packets, endpoint on the formatted end-of-turn"""
+
+    provider = "assemblyai"
+    input_format = PCM_16K
+    batch_frames = 3
+
+    def __init__(self, api_key: str, **connect_kwargs):
+        super().__init__(model="universal-streaming")
+        from assemblyai_service import AssemblyAIStreamingService
+        self.service = AssemblyAIStreamingService(api_key=api_key)
+        self.connect_kwargs = connect_kwargs
+
+    @classmethod
+    def from_settings(cls, api_key: str, settings: dict) -> "AssemblyAIAdapter":
+        return cls(
+            api_key,
+            threshold=settings.get("threshold", 0.0),
+            disable_partial_transcripts=settings.get("disable_partial_transcripts", False),
+            end_of_turn_confidence_threshold=settings.get("end_of_turn_confidence_threshold", 0.8),
+            min_end_of_turn_silence_when_confident=settings.get("min_end_of_turn_silence_when_confident", 500),
+            max_turn_silence=settings.get("max_turn_silence", 2000),
+        )
+
+    @property
+    def ws(self):
+        return self.service.ws
+
+    async def _connect(self) -> bool:
+        return await self.service.connect(**self.connect_kwargs)
+
+    async def _send(self, audio: bytes):
+        await self.service.send_audio(audio)
+
+    async def _close(self):
+        await self.service.close()
+
+    def parse(self, data: dict) -> Optional[List[SttEvent]]:
+        message_type = data.get("type")
+        if message_type in ("Termination", "SessionTerminated"):
+            logger.info("🛑 AssemblyAI session terminated")
+            return None
+        if message_type != "Turn" or not data.get("transcript"):
+            return []
+        text = data["transcript"]
+        if not data.get("end_of_turn", False):
+            return [SttEvent(PARTIAL, text, data)]
+        # The unformatted end-of-turn is followed by the formatted one; act on that
+        if not data.get("turn_is_formatted", False):
+            return []
+        return [self._final(text, data), self._endpoint(data)]
+
+
+class DeepgramAdapter(StreamingSttAdapter):
+    """Deepgram live (nova-3): 8kHz mulaw straight through, endpoint on speech_final / UtteranceEnd"""
+
+    provider = "deepgram"
+
+    def __init__(self, api_key: str, endpointing: int = 500, interim_results: bool = False,
+                 punctuate: bool = True, smart_format: bool = True, vad_events: bool = True):
+        super().__init__(model="nova-3")
+        self.api_key = api_key
+        self.params = {
+            "model": self.model,
+            "encoding": "mulaw",
+            "sample_rate": SAMPLE_RATE,
+            "channels": 1,
+            "punctuate": _flag(punctuate),
+            "interim_results": _flag(interim_results),
+            "endpointing": endpointing,
+            "vad_events": _flag(vad_events),
+            "smart_format": _flag(smart_format),
+        }
+        self._ws = None
+
+    @classmethod
+    def from_settings(cls, api_key: str, settings: dict) -> "DeepgramAdapter":
+        # utterance_end_ms and vad_turnoff are left out: the WebSocket API rejects them with HTTP 400
+        return cls(
+            api_key,
+            endpointing=settings.get("endpointing", 500),
+            interim_results=settings.get("interim_results", False),
+            punctuate=settings.get("punctuate", True),
+            smart_format=settings.get("smart_format", True),
+            vad_events=settings.get("vad_events", True),
+        )
+
+    @property
+    def ws(self):
+        return self._ws
+
+    async def _connect(self) -> bool:
+        url = f"{DEEPGRAM_WS_URL}?{urlencode(self.params)}"
+        try:
+            self._ws = await websockets.connect(url, extra_headers={"Authorization": f"Token {self.api_key}"})
+            logger.info("✅ Connected to Deepgram live streaming")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Deepgram: {e}")
+            return False
+
+    async def _send(self, audio: bytes):
+        if self._ws and not self._ws.closed:
+            try:
+                await self._ws.send(audio)
+            except Exception as e:
+                logger.error(f"❌ Error sending audio to Deepgram: {e}")
+
+    async def finalize(self):
+        if self._ws and not self._ws.closed:
+            await self._ws.send(json.dumps({"type": "Finalize"}))
+
+    async def _close(self):
+        if self._ws and not self._ws.closed:
+            try:
+                await self._ws.send(json.dumps({"type": "CloseStream"}))
+                await self._ws.close()
+            except Exception as e:
+                logger.error(f"❌ Error closing Deepgram stream: {e}")
+
+    def parse(self, data: dict) -> Optional[List[SttEvent]]:
+        message_type = data.get("type")
+        if message_type == "UtteranceEnd":
+            return [self._endpoint(data)] if self._utterance else []
+        if message_type != "Results":
+            return []
+        alternatives = (data.get("channel") or {}).get("alternatives") or [{}]
+        text = (alternatives[0].get("transcript") or "").strip()
+        events = []
+        if text:
+            events.append(self._final(text, data) if data.get("is_final") else SttEvent(PARTIAL, text, data))
+        if data.get("speech_final") and self._utterance:
+            events.append(self._endpoint(data))
+        return events
+
+
+def _flag(value: bool) -> str:
+    return "true" if value else "false"
+
+
+ADAPTERS = {
+    SonioxAdapter.provider: SonioxAdapter,
+    AssemblyAIAdapter.provider: AssemblyAIAdapter,
+    DeepgramAdapter.provider: DeepgramAdapter,
+}
+
+
+def create_stt_adapter(provider: str, api_key: str, agent_config: dict) -> StreamingSttAdapter:
+    """Adapter for an agent's stt_provider, configured from settings.<provider>_settings"""
+    adapter_class = ADAPTERS.get(provider)
+    if adapter_class is None:
+        raise ValueError(f"Unsupported streaming STT provider: {provider}")
+    settings = (agent_config.get("settings") or {}).get(f"{provider}_settings") or {}
+    return adapter_class.from_settings(api_key, settings)
+
+
+class SttStreams:
+    """Open adapter count per provider, plus totals from closed streams"""
+
+    def __init__(self):
+        self.active: Dict[str, int] = {}
+        self.totals = {"opened": 0, "frames": 0, "packets": 0, PARTIAL: 0, FINAL: 0, ENDPOINT: 0, "reconnects": 0}
+
+    def opened(self, adapter: StreamingSttAdapter):
+        self.active[adapter.provider] = self.active.get(adapter.provider, 0) + 1
+        self.totals["opened"] += 1
+
+    def closed(self, adapter: StreamingSttAdapter):
+        self.active[adapter.provider] = max(self.active.get(adapter.provider, 0) - 1, 0)
+        for key, value in adapter.stats.items():
+            self.totals[key] += value
+
+    def get_stats(self) -> dict:
+        return {"active": dict(self.active), **self.totals}
+
+
+# Global STT stream stats instance
+stt_streams = SttStreams()
@@ -10,6 +10,8 @@ import time
 import hashlib
 
 from maya_tts_service import MayaTTSService
+from audio_transcoder import audio_transcoder, TranscodeError
+from playback_assets import playback_asset_store
 logger = logging.getLogger(__name__)
 
 class TelnyxService:
@@ -514,16 +516,12 @@ class TelnyxService:
                             combined_string = f"{tts_provider}_{text}"
                             audio_hash = hashlib.md5(combined_string.encode()).hexdigest()
                             audio_filename = f"tts_{tts_provider}_{audio_hash}.mp3"
-                            audio_path = f"/tmp/{audio_filename}"
+                            playback_asset_store.put(audio_filename, audio_bytes)
                             
-                            with open(audio_path, 'wb') as f:
-                                f.write(audio_bytes)
-                            
-                            logger.info(f"✅ Generated {len(audio_bytes)} bytes, saved to {audio_path}")
+                            logger.info(f"✅ Generated {len(audio_bytes)} bytes, saved as {audio_filename}")
                             
                             # Get backend URL for serving the audio
-                            backend_url = os.environ.get('BACKEND_URL', 'https://api.virevo.ai')
-                            audio_url = f"{backend_url}/api/tts-audio/{audio_filename}"
+                            audio_url = playback_asset_store.url(audio_filename)
                             
                             logger.info(f"🔗 Using audio URL: {audio_url}")
                             
@@ -616,7 +614,6 @@ class TelnyxService:
         try:
             import time
             import hashlib
-            import os
             from maya_tts_service import MayaTTSService
             
             logger.info(f"🚀 Maya TTS Stream: '{text[:30]}...' (temp={temperature}, seed={seed})")
@@ -658,13 +655,8 @@ class TelnyxService:
             # Save to file with unique hash (include seed for cache busting if needed)
             content_hash = hashlib.md5(f"{text}_{seed}".encode()).hexdigest()
             audio_filename = f"tts_maya_{content_hash}.wav"
-            audio_path = f"/tmp/{audio_filename}"
-            
-            with open(audio_path, 'wb') as f:
-                f.write(full_audio)
-                
-            backend_url = os.environ.get('BACKEND_URL', 'https://api.virevo.ai')
-            audio_url = f"{backend_url}/api/tts-audio/{audio_filename}"
+            playback_asset_store.put(audio_filename, full_audio)
+            audio_url = playback_asset_store.url(audio_filename)
             
             # Play
             return await self.play_audio(call_control_id, audio_url)
@@ -700,7 +692,6 @@ class TelnyxService:
             import hashlib
             import os
             import time
-            import subprocess
             
             logger.info("🚀 Using WebSocket TTS (optimized - fast conversion)")
             
@@ -785,65 +776,29 @@ class TelnyxService:
             full_audio_pcm = b''.join(audio_chunks)
             logger.info(f"✅ Collected {len(audio_chunks)} chunks, total: {len(full_audio_pcm)} bytes")
             
-            # Save PCM to temporary file
             # 🔥 FIX: Include TTS provider in hash to prevent cross-provider cache collisions
             tts_provider = agent_config.get('settings', {}).get('tts_provider', 'elevenlabs')
             combined_string = f"{tts_provider}_{text}"
             audio_hash = hashlib.md5(combined_string.encode()).hexdigest()
-            pcm_path = f"/tmp/tts_ws_{tts_provider}_{audio_hash}.pcm"
-            mp3_path = f"/tmp/tts_ws_{tts_provider}_{audio_hash}.mp3"
-            
-            with open(pcm_path, 'wb') as f:
-                f.write(full_audio_pcm)
+            audio_filename = f"tts_ws_{tts_provider}_{audio_hash}.mp3"
             
-            # Convert PCM to MP3 using ffmpeg CLI (FAST - ~50ms)
+            # Convert PCM 16kHz mono → MP3 via ffmpeg pipes (no temp files)
             conversion_start = time.time()
             try:
-                # ffmpeg command: PCM 16kHz mono 16-bit → MP3
-                subprocess.run([
-                    'ffmpeg',
-                    '-f', 's16le',  # signed 16-bit little-endian PCM
-                    '-ar', '16000',  # 16kHz sample rate
-                    '-ac', '1',      # mono
-                    '-i', pcm_path,  # input PCM file
-                    '-b:a', '64k',   # 64kbps MP3 bitrate
-                    '-y',            # overwrite output
-                    mp3_path         # output MP3 file
-                ], check=True, capture_output=True, timeout=5)
-                
-                conversion_time = time.time() - conversion_start
-                logger.info(f"⚡ PCM→MP3 conversion: {conversion_time*1000:.0f}ms (ffmpeg)")
-                
-            except subprocess.TimeoutExpired:
-                logger.error("❌ ffmpeg conversion timeout")
-                return {"success": False, "error": "Audio conversion timeout"}
-            except subprocess.CalledProcessError as e:
-                logger.error(f"❌ ffmpeg conversion failed: {e.stderr.decode()}")
+                mp3_bytes = await audio_transcoder.pcm_to_mp3(full_audio_pcm, 16000, label="ws_pcm_to_mp3")
+            except TranscodeError as e:
+                logger.error(f"❌ ffmpeg conversion failed: {e}")
                 return {"success": False, "error": "Audio conversion failed"}
-            except Exception as e:
-                logger.error(f"❌ Conversion error: {e}")
-                return {"success": False, "error": str(e)}
-            
-            # Clean up PCM file
-            try:
-                os.remove(pcm_path)
-            except:
-                pass
+            logger.info(f"⚡ PCM→MP3 conversion: {(time.time() - conversion_start)*1000:.0f}ms (ffmpeg)")
             
-            # Verify MP3 was created
-            if not os.path.exists(mp3_path):
-                logger.error("❌ MP3 file not created")
-                return {"success": False, "error": "MP3 conversion failed"}
-            
-            mp3_size = os.path.getsize(mp3_path)
-            logger.info(f"✅ Generated MP3: {mp3_size} bytes")
+            playback_asset_store.put(audio_filename, mp3_bytes)
+            logger.info(f"✅ Generated MP3: {len(mp3_bytes)} bytes")
             
             tts_gen_time = time.time() - tts_start
             logger.info(f"⏱️  Total WebSocket TTS: {tts_gen_time*1000:.0f}ms (including conversion)")
             
             # Get backend URL for serving the audio
-            backend_url = os.environ.get('BACKEND_URL', 'https://api.virevo.ai')
-            audio_url = f"{backend_url}/api/tts-audio/tts_ws_{tts_provider}_{audio_hash}.mp3"
+            audio_url = playback_asset_store.url(audio_filename)
             
             logger.info(f"🔗 WebSocket audio URL: {audio_url}")
             
@@ -917,7 +872,6 @@ class TelnyxService:
             import hashlib
             import os
             import time
-            import subprocess
             
             logger.info("🚀 Using Sesame WebSocket TTS (real-time streaming)")
             
@@ -929,59 +883,36 @@ class TelnyxService:
             
             logger.info(f"🎤 Sesame Speaker ID: {speaker_id}")
             
-            # Create temp file for streaming
             audio_hash = hashlib.md5(f"{text}_{speaker_id}".encode()).hexdigest()
-            temp_pcm = f"/tmp/sesame_ws_{audio_hash}.pcm"
-            temp_mulaw = f"/tmp/sesame_ws_{audio_hash}.ulaw"
+            audio_filename = f"sesame_ws_{audio_hash}.ulaw"
             
-            # Stream audio chunks and write to PCM file
+            # Stream audio chunks (24kHz 16-bit PCM)
+            chunks = []
             chunk_count = 0
             first_chunk_time = None
             
             logger.info("📥 Streaming audio chunks from RunPod...")
             
-            with open(temp_pcm, 'wb') as f:
-                async for chunk in stream_sesame_tts(text, speaker_id):
-                    chunk_count += 1
-                    
-                    if chunk_count == 1:
-                        first_chunk_time = time.time() - tts_start
-                        logger.info(f"⚡ First chunk received in {first_chunk_time:.2f}s")
-                    
-                    f.write(chunk)
+            async for chunk in stream_sesame_tts(text, speaker_id):
+                chunk_count += 1
+                
+                if chunk_count == 1:
+                    first_chunk_time = time.time() - tts_start
+                    logger.info(f"⚡ First chunk received in {first_chunk_time:.2f}s")
+                
+                chunks.append(chunk)
             
             total_stream_time = time.time() - tts_start
             logger.info(f"✅ Streaming complete: {chunk_count} chunks in {total_stream_time:.2f}s")
             
-            # Convert PCM to μ-law (fast conversion)
+            # Convert PCM 24kHz → 8kHz μ-law in-process
             conversion_start = time.time()
-            
-            result = subprocess.run([
-                'ffmpeg', '-y',
-                '-f', 's16le',  # 16-bit PCM input
-                '-ar', '24000',  # 24kHz sample rate
-                '-ac', '1',  # Mono
-                '-i', temp_pcm,
-                '-ar', '8000',  # Resample to 8kHz for Telnyx
-                '-f', 'mulaw',  # μ-law output
-                '-ac', '1',
-                temp_mulaw
-            ], capture_output=True, text=True)
-            
+            mulaw = audio_transcoder.pcm_to_mulaw(b''.join(chunks), 24000, label="sesame_pcm_to_mulaw")
             conversion_time = time.time() - conversion_start
             logger.info(f"⚡ Audio conversion: {conversion_time:.2f}s")
             
-            if result.returncode != 0:
-                logger.error(f"❌ FFmpeg error: {result.stderr}")
-                return {"success": False, "error": "Audio conversion failed"}
-            
-            # Upload to S3 or serve locally
-            backend_url = os.environ.get('BACKEND_URL', 'https://api.virevo.ai')
-            audio_url = f"{backend_url}/api/tts-audio/sesame_ws_{audio_hash}.ulaw"
-            
-            # Copy to web-accessible location
-            web_path = f"/tmp/sesame_ws_{audio_hash}.ulaw"
-            os.system(f"cp {temp_mulaw} {web_path}")
+            playback_asset_store.put(audio_filename, mulaw)
+            audio_url = playback_asset_store.url(audio_filename)
             
             logger.info(f"🔗 Audio URL: {audio_url}")
             
@@ -1014,13 +945,6 @@ class TelnyxService:
                     logger.info(f"   - TOTAL: {total_time:.2f}s")
                     logger.info(f"✅ Sesame WebSocket TTS playing via Telnyx")
                     
-                    # Cleanup temp files after a delay
-                    try:
-                        os.remove(temp_pcm)
-                        os.remove(temp_mulaw)
-                    except:
-                        pass
-                    
                     return {"success": True}
                 else:
                     logger.error(f"❌ Telnyx playback failed: {response.status_code} - {response.text}")
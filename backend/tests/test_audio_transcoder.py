@@ -0,0 +1,45 @@
+"""
+Audio transcoder tests (in-process mulaw fast paths)
+
+Run: cd backend && python -m pytest tests/test_audio_transcoder.py -q
+"""
+import asyncio
+import audioop
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_resampler import linear_pcm_to_mulaw  # noqa: E402
+from audio_transcoder import AudioTranscoder  # noqa: E402
+
+
+def _tone(sample_rate: int, seconds: float = 1.0) -> bytes:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16).tobytes()
+
+
+def test_mulaw_round_trip_is_close():
+    pcm = _tone(8000)
+    decoded = np.frombuffer(audioop.ulaw2lin(linear_pcm_to_mulaw(pcm), 2), dtype=np.int16).astype(int)
+    original = np.frombuffer(pcm, dtype=np.int16).astype(int)
+    # G.711 quantization error at this amplitude stays within one step
+    assert np.abs(decoded - original).max() < 300
+
+
+def test_wav_fast_path_resamples_to_8khz():
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(24000)
+        wav.writeframes(_tone(24000))
+
+    transcoder = AudioTranscoder()
+    mulaw = asyncio.run(transcoder.to_mulaw(buffer.getvalue()))
+    assert len(mulaw) == 8000
+    assert transcoder.get_stats()["conversions"]["to_mulaw_wav_fast"]["count"] == 1
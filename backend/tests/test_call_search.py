@@ -0,0 +1,131 @@
+"""
+Call search key tests: normalized digit/call-id keys, anchored prefix and
+suffix filters (escaped, case-insensitive call ids), batched backfill
+
+Run: cd backend && python -m pytest tests/test_call_search.py -q
+"""
+import asyncio
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from call_search import apply_search_filters, backfill_search_terms, search_terms, with_search_terms  # noqa: E402
+
+
+def condition_matches(doc, cond):
+    patterns = cond["search_terms"]["$in"]
+    return any(p.match(t) for p in patterns for t in doc.get("search_terms", []))
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        if key == "$and":
+            if not all(condition_matches(doc, c) for c in cond):
+                return False
+        elif key == "search_terms":
+            if not condition_matches(doc, {key: cond}):
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+def test_keys_cover_international_national_and_reversed_forms():
+    terms = search_terms("v3:AbC-123", "+1 (555) 010-2030", "020 7946 0018")
+    assert {"f:15550102030", "f:5550102030", "fr:03020105551", "c:v3:abc-123", "cr:321-cba:3v"} <= set(terms)
+    assert "t:02079460018" in terms and "tr:81006497020" in terms
+    assert search_terms(None, None, None) == []
+
+
+def test_filters_match_start_or_end_only():
+    log = with_search_terms({"user_id": "u1", "call_id": "v3:AbC-123",
+                             "from_number": "+15550102030", "to_number": "+15557654321"})
+
+    def hit(**filters):
+        return matches(log, apply_search_filters({"user_id": "u1"}, **filters))
+
+    assert hit(from_number="555-010") and hit(from_number="+1555") and hit(from_number="2030")
+    assert not hit(from_number="0102")                       # middle of the number
+    assert hit(call_id="V3:abc") and hit(call_id="C-123") and not hit(call_id="abc")
+    assert hit(from_number="2030", to_number="4321") and not hit(from_number="2030", to_number="9999")
+    assert not hit(from_number="ext.")                       # no digits → nothing
+    assert not hit(call_id=".*")                             # regex characters are literal
+
+
+def test_anchored_filters_agree_with_the_old_regex_on_start_and_end_queries():
+    rng = random.Random(3)
+    logs = [with_search_terms({"user_id": "u1", "call_id": f"v3:{rng.getrandbits(48):012x}",
+                               "from_number": f"+1555{rng.randint(0, 9_999_999):07d}",
+                               "to_number": "+15550000000"}) for _ in range(1000)]
+    for log in rng.sample(logs, 25):
+        for value in (log["from_number"][-4:], log["from_number"][:7], log["call_id"][:9]):
+            field = "call_id" if value.startswith("v3") else "from_number"
+            legacy = [l for l in logs if re.search(value.replace("+", r"\+"), l[field], re.I)]
+            legacy = [l for l in legacy if l[field].lower().startswith(value.lower()) or l[field].endswith(value)]
+            anchored = [l for l in logs if matches(l, apply_search_filters({"user_id": "u1"}, **{field: value}))]
+            assert anchored == legacy and log in anchored
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class CallLogs:
+    def __init__(self, docs):
+        self.docs = docs
+        self.writes = []
+        self.indexes = []
+
+    async def create_index(self, keys, name=None):
+        self.indexes.append((keys, name))
+
+    def find(self, query, projection=None):
+        self.scans = getattr(self, "scans", 0) + 1
+        return Cursor([dict(d) for d in self.docs if "search_terms" not in d])
+
+    async def bulk_write(self, ops, ordered=True):
+        self.writes.append(len(ops))
+        by_id = {d["_id"]: d for d in self.docs}
+        for op in ops:
+            by_id[op._filter["_id"]].update(op._doc["$set"])
+
+
+class Migrations:
+    def __init__(self):
+        self.done = {}
+
+    async def find_one(self, query, projection=None):
+        return self.done.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.done[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+
+def test_backfill_writes_keys_in_batches_and_creates_the_index():
+    docs = [{"_id": i, "call_id": f"call-{i}", "from_number": f"+1555000{i:04d}", "to_number": None}
+            for i in range(2500)]
+    docs[0]["search_terms"] = ["c:call-0"]
+    db = type("DB", (), {"call_logs": CallLogs(docs), "migrations": Migrations()})()
+
+    updated = asyncio.run(backfill_search_terms(db, batch_size=1000))
+
+    assert updated == 2499 and db.call_logs.writes == [1000, 1000, 499]
+    assert db.call_logs.indexes == [([("user_id", 1), ("search_terms", 1), ("start_time", -1)], "user_search_start")]
+    assert "fr:74210005551" in docs[1247]["search_terms"]
+    assert db.migrations.done["call_logs_search_terms"]["updated"] == 2499
+    assert asyncio.run(backfill_search_terms(db)) == 0
+    assert db.call_logs.scans == 1                           # completion recorded: later starts skip the scan
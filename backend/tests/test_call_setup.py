@@ -0,0 +1,148 @@
+"""
+Call-setup rendezvous tests: two workers sharing a pub/sub bus, media socket
+on the webhook's worker or the other one, webhook failure, missed messages
+
+Measures the setup gap (media 'start' → session usable) against the old
+handoff: call-data poll every 200ms, then sleep(0.5) and rebuild.
+
+Run: cd backend && python -m pytest tests/test_call_setup.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from call_setup import CallSetupRendezvous  # noqa: E402
+
+BUILD_SECONDS = 0.05
+OLD_HANDOFF_MS = 500                          # the flat sleep alone, before any rebuild
+
+
+class LocalBus:
+    """In-process stand-in for the Redis channel, shared by both workers"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def attach(self):
+        bus = self
+
+        class Channel:
+            async def publish(self, message):
+                await asyncio.sleep(0.001)        # a network hop
+                for deliver in list(bus.subscribers):
+                    deliver(message)
+
+            async def listen(self, deliver):
+                bus.subscribers.append(deliver)
+                await asyncio.Event().wait()
+
+            async def close(self):
+                pass
+
+        return Channel()
+
+
+class Worker:
+    """One server process: its rendezvous plus its in-memory active_sessions"""
+
+    def __init__(self, name, bus):
+        self.rendezvous = CallSetupRendezvous(worker_id=name, timeout=2.0)
+        self.bus = bus
+        self.sessions = {}
+        self.builds = 0
+
+    async def start(self):
+        await self.rendezvous.start(self.bus.attach())
+        await asyncio.sleep(0)
+
+    async def create_session(self, call_id):
+        self.builds += 1
+        await asyncio.sleep(BUILD_SECONDS)
+        self.sessions[call_id] = f"session@{self.rendezvous.worker_id}"
+        return self.sessions[call_id]
+
+    async def webhook_answered(self, call_id, fail=False):
+        await self.rendezvous.building(call_id)
+        await asyncio.sleep(0.02)             # recording start, call-log update...
+        if fail:
+            await self.rendezvous.failed(call_id)
+            return
+        await self.rendezvous.build_once(call_id, lambda: self.create_session(call_id))
+        await self.rendezvous.ready(call_id)
+
+    async def media_socket(self, call_id):
+        setup = await self.rendezvous.wait_for_session(call_id)
+        session = self.sessions.get(call_id)
+        if session is None:
+            session = await self.rendezvous.build_once(call_id, lambda: self.create_session(call_id))
+        self.rendezvous.session_available(setup)
+        return setup, session
+
+
+def run_call(webhook_worker, media_worker, fail=False, media_first=True):
+    async def scenario():
+        a, b = webhook_worker, media_worker
+        await a.start()
+        if b is not a:
+            await b.start()
+        media = asyncio.create_task(b.media_socket("call-1"))
+        if not media_first:
+            await asyncio.sleep(0.3)
+        await a.webhook_answered("call-1", fail=fail)
+        return await media
+
+    return asyncio.run(scenario())
+
+
+def test_same_worker_waits_for_the_webhook_session_and_builds_once():
+    bus = LocalBus()
+    a = Worker("worker-a", bus)
+    setup, session = run_call(a, a)
+
+    assert setup.status == "local" and session == "session@worker-a"
+    assert a.builds == 1                                  # no second build on the answer path
+    gap = a.rendezvous.get_stats()["setup_gap_ms_p50"]
+    assert gap < OLD_HANDOFF_MS / 2, gap                  # ~build time, no poll granularity
+
+
+def test_other_worker_starts_its_own_build_as_soon_as_it_hears_building():
+    bus = LocalBus()
+    a, b = Worker("worker-a", bus), Worker("worker-b", bus)
+    setup, session = run_call(a, b)
+
+    assert setup.status == "remote" and setup.owner == "worker-a"
+    assert session == "session@worker-b"
+    assert (a.builds, b.builds) == (1, 1)                 # one per process that needs it
+    assert setup.waited_ms < 100                          # woke on 'building', not after a timeout
+    assert b.rendezvous.get_stats()["setup_gap_ms_p50"] < OLD_HANDOFF_MS
+
+
+def test_webhook_failure_and_late_media_socket():
+    bus = LocalBus()
+    a = Worker("worker-a", bus)
+    setup, session = run_call(a, a, fail=True)
+    assert setup.status == "failed" and session == "session@worker-a" and a.builds == 1
+
+    # Media socket connects after the webhook already finished: resolves without waiting
+    bus = LocalBus()
+    a, b = Worker("worker-a", bus), Worker("worker-b", bus)
+    setup, _ = run_call(a, b, media_first=False)
+    assert setup.status == "remote" and b.builds == 1
+
+
+def test_missed_message_is_recovered_from_the_persisted_owner():
+    rendezvous = CallSetupRendezvous(worker_id="worker-b", timeout=3.0)
+    owners = {}
+    rendezvous.owner_source = owners.get
+
+    async def scenario():
+        waiter = asyncio.create_task(rendezvous.wait_for_session("call-9"))
+        await asyncio.sleep(0.1)
+        owners["call-9"] = "worker-a"                    # ready key written, pub/sub message lost
+        return await waiter
+
+    setup = asyncio.run(scenario())
+    assert setup.status == "remote" and setup.owner == "worker-a"
+    assert setup.waited_ms < 2000
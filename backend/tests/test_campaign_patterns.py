@@ -0,0 +1,237 @@
+"""
+Campaign pattern accumulator tests: incremental folds (in any order, with
+re-analysis and removals) equal a full recompute and the patterns the old
+full walk produced; sketch behaviour past capacity; sample refill
+
+Run: cd backend && python -m pytest tests/test_campaign_patterns.py -q
+"""
+import asyncio
+import os
+import random
+import sys
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_patterns import CampaignPatternAccumulator, PatternState, TopK, call_digest  # noqa: E402
+
+
+def lookup(doc, dotted):
+    for part in dotted.split("."):
+        doc = (doc or {}).get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        value = lookup(doc, key)
+        if isinstance(value, list) and not isinstance(cond, list):
+            if cond not in value:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class Collection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+
+    def find(self, query, projection=None):
+        return Cursor([dict(d) for d in self.docs if matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if matches(d, query)), None)
+
+    async def find_one_and_update(self, query, update, projection=None):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        before = dict(doc) if doc else None
+        if doc is not None:
+            doc.update(update["$set"])
+        return before
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return type("Result", (), {"matched_count": 0})()
+            doc = {k: v for k, v in query.items() if k != "version"}
+            self.docs.append(doc)
+        doc.update(update.get("$set", {}))
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        return type("Result", (), {"matched_count": 1})()
+
+    async def delete_one(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+
+class FakeDB(dict):
+    def __init__(self):
+        super().__init__()
+        self.campaign_calls = Collection()
+        self["campaign_pattern_state"] = Collection()
+
+
+ISSUES = ["talked over the caller", "skipped discovery", "no clear next step", "price too early"]
+POSITIVES = ["warm greeting", "used caller's name", "confirmed appointment"]
+SUGGESTIONS = {"tone": "Soften the opener", "clarity": "State the offer in one sentence"}
+
+
+def synthetic_results(rng):
+    analyses = []
+    for turn in range(1, rng.randint(2, 6)):
+        quality = rng.choice(["good", "excellent", "poor", "needs_improvement"] if turn != 2 else
+                             ["poor", "needs_improvement", "needs_improvement", "good"])
+        analysis = {"turn_number": turn, "quality": quality,
+                    "issues": rng.sample(ISSUES, rng.randint(0, 2)),
+                    "positives": rng.sample(POSITIVES, rng.randint(1, 3))}
+        if rng.random() < 0.4:
+            sugg_type = rng.choice(sorted(SUGGESTIONS))
+            analysis["prompt_suggestions"] = {"type": sugg_type, "suggestion": SUGGESTIONS[sugg_type]}
+        analyses.append(analysis)
+    return {"node_analyses": analyses}
+
+
+def legacy_patterns(calls, total_calls):
+    """The full walk detect_campaign_patterns used to do (ids, timestamps and evidence left out)"""
+    all_issues, all_positives = [], []
+    quality_by_turn, suggestions_by_type = defaultdict(list), defaultdict(list)
+    analyzed = 0
+    for call in calls:
+        results = call.get("script_qc_results")
+        if not results:
+            continue
+        analyzed += 1
+        for analysis in results.get("node_analyses", []):
+            turn = analysis.get("turn_number", 0)
+            quality_by_turn[turn].append(analysis.get("quality", "good"))
+            all_issues.extend(analysis.get("issues", []))
+            all_positives.extend(analysis.get("positives", []))
+            sugg = analysis.get("prompt_suggestions")
+            if sugg:
+                suggestions_by_type[sugg.get("type", "unknown")].append(sugg.get("suggestion", ""))
+    patterns = set()
+    if analyzed < 2:
+        return patterns
+    for turn, qualities in quality_by_turn.items():
+        poor = qualities.count("poor") + qualities.count("needs_improvement")
+        if poor >= len(qualities) * 0.6:
+            patterns.add(("bottleneck", f"Turn {turn} consistently underperforms across {poor}/{len(qualities)} calls",
+                          round(poor / len(qualities), 6)))
+    for issue, count in Counter(all_issues).most_common(5):
+        if count >= 3:
+            patterns.add(("recurring_issue", f"Recurring issue: {issue}", round(min(count / total_calls, 1.0), 6)))
+    for sugg_type, suggestions in suggestions_by_type.items():
+        if len(suggestions) >= 3:
+            patterns.add(("improvement_opportunity", f"Multiple calls need {sugg_type}: {suggestions[0][:100]}...",
+                          round(min(len(suggestions) / total_calls, 1.0), 6)))
+    for positive, count in Counter(all_positives).most_common(3):
+        if count >= total_calls * 0.7:
+            patterns.add(("success", f"Consistent success: {positive}", round(count / total_calls, 6)))
+    return patterns
+
+
+def summarize(patterns):
+    return {(p["pattern_type"], p["description"], round(p["confidence_score"], 6)) for p in patterns}
+
+
+def test_incremental_state_equals_full_recompute_on_synthetic_campaigns():
+    for seed in range(12):
+        rng = random.Random(seed)
+        db = FakeDB()
+        acc = CampaignPatternAccumulator()
+        calls = db.campaign_calls.docs
+
+        async def scenario():
+            ids = [f"call-{i:03d}" for i in range(rng.randint(3, 60))]
+            for call_id in ids:
+                calls.append({"campaign_id": "c1", "call_id": call_id})
+            order = ids[:]
+            rng.shuffle(order)
+            for call_id in order:                                   # analyses finish in any order
+                if rng.random() < 0.85:
+                    results = synthetic_results(rng)
+                    next(c for c in calls if c["call_id"] == call_id)["script_qc_results"] = results
+                    await acc.fold_call(db, "c1", call_id, results)
+            for call_id in rng.sample(ids, len(ids) // 4):          # re-analysis
+                results = synthetic_results(rng)
+                next(c for c in calls if c["call_id"] == call_id)["script_qc_results"] = results
+                await acc.fold_call(db, "c1", call_id, results)
+            for call_id in rng.sample(ids, len(ids) // 5):          # removed from the campaign
+                await acc.fold_call(db, "c1", call_id, None)
+                calls[:] = [c for c in calls if c["call_id"] != call_id]
+            consistent = await acc.check(db, "c1")
+            state = await acc.load(db, "c1")
+            recomputed = await acc.compute(db, "c1")
+            return consistent, state, recomputed
+
+        consistent, state, recomputed = asyncio.run(scenario())
+        assert consistent, seed
+        assert state.to_doc() == recomputed.to_doc()
+        total = len(calls)
+        incremental = summarize(state.patterns("c1", total))
+        assert incremental == legacy_patterns(calls, total), seed
+        bottlenecks = [p for p in state.patterns("c1", total) if p["pattern_type"] == "bottleneck"]
+        assert all(0 < len(p["evidence_calls"]) <= 5 for p in bottlenecks)
+
+
+def test_sketch_keeps_heavy_hitters_past_capacity_and_merges():
+    sketch = TopK(capacity=16)               # keeps anything above N/16 ~ 41
+    for i in range(500):
+        sketch.add(f"one-off {i}")
+        if i % 5 == 0:
+            sketch.add("skipped discovery")
+        if i % 10 == 0:
+            sketch.add("no clear next step")
+    top = dict(sketch.most_common(2))
+    assert set(top) == {"skipped discovery", "no clear next step"}
+    assert top["skipped discovery"] - sketch.errors["skipped discovery"] <= 100 <= top["skipped discovery"]
+
+    a, b = TopK(capacity=8), TopK(capacity=8)
+    for item in ["x"] * 5 + ["y"] * 3:
+        a.add(item)
+    for item in ["x"] * 2 + ["z"] * 4:
+        b.add(item)
+    assert dict(a.merge(b).most_common(3)) == {"x": 7, "z": 4, "y": 3}
+
+
+def test_removed_sample_is_refilled_from_digests():
+    db = FakeDB()
+    acc = CampaignPatternAccumulator()
+    poor_turn = {"node_analyses": [{"turn_number": 2, "quality": "poor"}]}
+
+    async def scenario():
+        for i in range(8):
+            db.campaign_calls.docs.append({"campaign_id": "c1", "call_id": f"call-{i}", "script_qc_results": poor_turn})
+            await acc.fold_call(db, "c1", f"call-{i}", poor_turn)
+        await acc.fold_call(db, "c1", "call-0", None)
+        return await acc.load(db, "c1")
+
+    state = asyncio.run(scenario())
+    assert [e[0] for e in state.samples["bottleneck:2"]] == [f"call-{i}" for i in range(1, 6)]
+    assert acc.get_stats()["refills"] == 1
+    assert call_digest("x", None) is None and PatternState().patterns("c1", 10) == []
@@ -0,0 +1,156 @@
+"""
+Campaign QC view tests: reconciliation with call_logs, counters kept by row
+refreshes matching a full rebuild, backfill past the old 1000-call cap with
+batched call_logs reads
+
+Run: cd backend && python -m pytest tests/test_campaign_qc_view.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_qc_view import SUMMARY_COUNTERS, CampaignQCView, reconcile, summarize  # noqa: E402
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$nin" in cond and value in cond["$nin"]:
+                return False
+            if "$ne" in cond and value == cond["$ne"]:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class Collection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+        self.reads = 0
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        docs = [dict(d) for d in self.docs if matches(d, query)]
+
+        async def gen():
+            for d in docs:
+                yield d
+        return gen()
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return next((dict(d) for d in self.docs if matches(d, query)), None)
+
+    async def find_one_and_update(self, query, update, upsert=False, projection=None):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        before = dict(doc) if doc else None
+        if doc is None and upsert:
+            doc = {**query, **update.get("$setOnInsert", {})}
+            self.docs.append(doc)
+        if doc is not None:
+            doc.update(update.get("$set", {}))
+            for key in update.get("$unset", {}):
+                doc.pop(key, None)
+        return before
+
+    async def find_one_and_delete(self, query, projection=None):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc:
+            self.docs.remove(doc)
+        return doc
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs = [d for d in self.docs if not matches(d, query)] + [dict(doc)]
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+    async def update_one(self, query, update):
+        doc = next((d for d in self.docs if matches(d, query)), None)
+        if doc is None:
+            return
+        for key, value in update.get("$inc", {}).items():
+            parent, _, leaf = key.partition(".")
+            doc.setdefault(parent, {})
+            doc[parent][leaf] = doc[parent].get(leaf, 0) + value
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+
+
+class FakeDB(dict):
+    def __init__(self, campaign_calls=(), call_logs=()):
+        super().__init__()
+        self.campaigns = Collection([{"id": "c1"}])
+        self.campaign_calls = Collection(campaign_calls)
+        self.call_logs = Collection(call_logs)
+        self["campaign_qc_view"] = Collection()
+
+
+def script(node_name="Greeting"):
+    return {"node_analyses": [{"node_name": node_name}],
+            "bulk_suggestions": {"summary": {"total_turns": 4, "good_quality": 3}}}
+
+
+def test_reconcile_prefers_call_log_results_with_real_node_names():
+    call = {"call_id": "a", "analysis_status": "completed", "script_qc_results": script("Turn 1"),
+            "tech_qc_results": {"analysis_summary": {"average_total_latency": 900}}}
+    row = reconcile(call, {"script_qc_results": script("Greeting")})
+    assert row["merged_from_call_log"] == ["script_qc_results"]
+    assert row["has_script_qc"] and row["script_summary"]["good_quality"] == 3
+    assert row["tech_summary"]["avg_latency"] == 900 and not row["has_tech_qc"]
+    assert "tonality_summary" not in row
+
+
+def test_row_refreshes_keep_the_summary_equal_to_a_rebuild():
+    db = FakeDB(call_logs=[{"call_id": "b", "script_qc_results": script()}])
+    view = CampaignQCView()
+    calls = db.campaign_calls.docs
+
+    async def scenario():
+        for call_id in ("a", "b", "c"):
+            calls.append({"campaign_id": "c1", "call_id": call_id, "analysis_status": "pending"})
+            await view.refresh_call(db, "c1", call_id)
+        calls[0].update(analysis_status="analyzing")
+        await view.refresh_call(db, "c1", "a")
+        calls[0].update(script_qc_results=script(), tonality_qc_results={"overall_tone": "warm"})
+        await view.refresh_call(db, "c1", "a")
+        calls[0].update(analysis_status="completed")
+        await view.refresh_call(db, "c1", "a")
+        calls[2].update(analysis_status="failed", analysis_error="no transcript")
+        await view.refresh_call(db, "c1", "c")
+        await view.refresh_call(db, "c1", "c")                        # idempotent
+        del calls[1]
+        await view.refresh_call(db, "c1", "b")                        # left the campaign
+        incremental = {**dict.fromkeys(SUMMARY_COUNTERS, 0), **db.campaigns.docs[0]["qc_summary"]}
+        rebuilt = await view.rebuild_campaign(db, "c1")
+        return incremental, rebuilt
+
+    incremental, rebuilt = asyncio.run(scenario())
+    assert incremental == rebuilt
+    assert rebuilt["total_calls"] == 2 and rebuilt["analyzed"] == 1 and rebuilt["failed"] == 1
+    assert rebuilt["script_analyzed"] == 1 and rebuilt["tonality_analyzed"] == 1
+    rows = {r["call_id"]: r for r in db["campaign_qc_view"].docs}
+    assert set(rows) == {"a", "c"} and rows["c"]["analysis_error"] == "no transcript"
+
+
+def test_backfill_covers_every_call_with_batched_call_log_reads():
+    calls = [{"campaign_id": "c1", "call_id": f"call-{i:04d}", "analysis_status": "completed",
+              "script_qc_results": script("Turn 1" if i % 2 else "Greeting")} for i in range(1500)]
+    logs = [{"call_id": f"call-{i:04d}", "script_qc_results": script()} for i in range(1, 1500, 2)]
+    db = FakeDB(calls, logs)
+    view = CampaignQCView()
+
+    totals = asyncio.run(view.rebuild_campaign(db, "c1", batch_size=200))
+
+    assert totals["total_calls"] == 1500                                # no 1000-call cap
+    assert totals == summarize(db["campaign_qc_view"].docs)
+    assert db.call_logs.reads == 8                                      # one $in per batch, not per call
+    assert db.campaigns.docs[0]["qc_summary"] == totals
+    merged = [r for r in db["campaign_qc_view"].docs if r["merged_from_call_log"]]
+    assert len(merged) == 750
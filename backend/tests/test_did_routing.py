@@ -0,0 +1,109 @@
+"""
+Inbound DID routing index tests: startup build + backfill, O(1) hits,
+indexed fallback for numbers added elsewhere, CRUD upkeep
+
+Run: cd backend && python -m pytest tests/test_did_routing.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from did_routing import DIDRouter  # noqa: E402
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        if isinstance(cond, dict) and "$nin" in cond:
+            if doc.get(key) in cond["$nin"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class FakePhoneNumbers:
+    def __init__(self, docs):
+        self.docs = docs
+        self.find_ones = []
+        self.indexes = []
+
+    async def create_index(self, key, name=None):
+        self.indexes.append(name)
+
+    def find(self, query, projection=None):
+        async def gen():
+            for doc in list(self.docs):
+                yield dict(doc)
+        return gen()
+
+    async def find_one(self, query, projection=None):
+        self.find_ones.append(query)
+        if "number_e164" in query and "number_e164" not in self.indexes:
+            raise AssertionError("fallback must use the indexed field")
+        return next((dict(d) for d in self.docs if matches(d, query)), None)
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            for doc in self.docs:
+                if matches(doc, op._filter):
+                    doc.update(op._doc["$set"])
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.phone_numbers = FakePhoneNumbers(docs)
+
+
+def number(i, raw, agent="agent-1", user="u1"):
+    return {"id": f"pn-{i}", "number": raw, "user_id": user, "inbound_agent_id": agent, "inbound_agent_name": "Ava"}
+
+
+def test_build_indexes_every_number_and_backfills_e164():
+    # 150 numbers: the old find().to_list(100) scan never saw the last 50
+    docs = [number(i, f"(555) 010-{i:04d}") for i in range(150)]
+    db = FakeDB(docs)
+    router = DIDRouter()
+
+    async def scenario():
+        await router.build(db)
+        return await router.lookup(db, "+15550100149")
+
+    route = asyncio.run(scenario())
+    assert route == {"phone_number_id": "pn-149", "number": "(555) 010-0149", "user_id": "u1",
+                     "inbound_agent_id": "agent-1", "inbound_agent_name": "Ava"}
+    assert db.phone_numbers.find_ones == []                 # answered from memory
+    assert all(d["number_e164"].startswith("+1555010") for d in docs)
+    assert router.get_stats()["numbers"] == 150
+
+
+def test_fallback_picks_up_numbers_from_other_workers_and_crud_keeps_index_current():
+    db = FakeDB([number(1, "+15550000001")])
+    router = DIDRouter(ttl=60, negative_ttl=60)
+
+    async def scenario():
+        await router.build(db)
+        # Added through another worker: not in this worker's index yet
+        db.phone_numbers.docs.append({**number(2, "+1 555 000 0002", agent="agent-2"), "number_e164": "+15550000002"})
+        first = await router.lookup(db, "+15550000002")
+        again = await router.lookup(db, "+15550000002")
+        unknown = await router.lookup(db, "+15559999999")
+        unknown_again = await router.lookup(db, "+15559999999")
+
+        # Reassigned and then deleted through this worker's endpoints
+        updated = {**db.phone_numbers.docs[0], "inbound_agent_id": "agent-9"}
+        router.remove(db.phone_numbers.docs[0]["number"])
+        router.upsert(updated)
+        reassigned = await router.lookup(db, "+1 (555) 000-0001")
+        router.remove("+15550000001")
+        db.phone_numbers.docs.pop(0)
+        deleted = await router.lookup(db, "+15550000001")
+        return first, again, unknown, unknown_again, reassigned, deleted
+
+    first, again, unknown, unknown_again, reassigned, deleted = asyncio.run(scenario())
+    assert first["inbound_agent_id"] == "agent-2" and again == first
+    assert unknown is None and unknown_again is None
+    assert reassigned["inbound_agent_id"] == "agent-9"
+    assert deleted is None
+    assert router.stats == {"hits": 3, "fallbacks": 3, "misses": 2}
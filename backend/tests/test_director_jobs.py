@@ -0,0 +1,153 @@
+"""
+Director evolution job tests: concurrent variant evaluation, progress,
+cancellation, artifact store
+
+Run: cd backend && python -m pytest tests/test_director_jobs.py -q
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import director_service  # noqa: E402
+from director_artifacts import ArtifactStore  # noqa: E402
+from director_jobs import DirectorJobManager  # noqa: E402
+from director_service import DirectorService  # noqa: E402
+
+TTS_SECONDS = 0.2
+
+
+class FakeJobsCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def _match(self, doc, query):
+        for key, cond in query.items():
+            if isinstance(cond, dict) and "$nin" in cond:
+                if doc.get(key) in cond["$nin"]:
+                    return False
+            elif doc.get(key) != cond:
+                return False
+        return True
+
+    async def insert_one(self, doc):
+        self.docs[doc["job_id"]] = dict(doc)
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs.values():
+            if self._match(doc, query):
+                return dict(doc)
+        return None
+
+    async def update_one(self, query, update):
+        for doc in self.docs.values():
+            if self._match(doc, query):
+                doc.update(update["$set"])
+                return
+
+    async def find_one_and_update(self, query, update):
+        for doc in self.docs.values():
+            if self._match(doc, query):
+                before = dict(doc)
+                doc.update(update["$set"])
+                return before
+        return None
+
+
+class FakeDB:
+    def __init__(self):
+        self.director_jobs = FakeJobsCollection()
+
+
+class FakeDirector(DirectorService):
+    """No API keys (fallback mutations/judge); TTS takes TTS_SECONDS and returns real bytes"""
+
+    def __init__(self):
+        super().__init__(user_id="u1")
+        self.db = FakeDB()
+        self.config = {"settings": {}, "call_flow": [{"id": "n1", "label": "Greeting", "data": {"content": 'Agent says: "Hi there!"'}}]}
+        self.saved = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_sandbox_config(self, sandbox_id):
+        return self.config
+
+    async def _save_sandbox_config(self, sandbox_id, config):
+        self.saved = config
+
+    async def _run_streaming_test(self, node_data, scenario, voice_id=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(TTS_SECONDS)
+        self.in_flight -= 1
+        return f"mp3:{node_data['_variant_type']}".encode(), node_data["_speech_only"], 0.1
+
+
+def _use_store(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path))
+    monkeypatch.setattr(director_service, "artifact_store", store)
+    return store
+
+
+def test_artifact_store_is_content_addressed(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    name = store.put(b"audio-bytes", ".mp3")
+    assert store.put(b"audio-bytes", ".mp3") == name
+    assert open(store.resolve(name), "rb").read() == b"audio-bytes"
+    assert store.url(name) == f"/api/director/artifacts/{name}"
+    assert store.content_type(name) == "audio/mpeg"
+    assert store.resolve("../../etc/passwd") is None
+    assert store.resolve("0" * 64 + ".mp3") is None
+
+
+def test_variants_of_a_generation_are_evaluated_concurrently(tmp_path, monkeypatch):
+    store = _use_store(tmp_path, monkeypatch)
+    service = FakeDirector()
+    progress = []
+
+    async def on_progress(p, log):
+        progress.append(p)
+
+    started = time.perf_counter()
+    result = asyncio.run(service.evolve_node("sb1", "n1", generations=2, on_progress=on_progress))
+    elapsed = time.perf_counter() - started
+
+    assert service.max_in_flight == 3
+    assert elapsed < 2 * TTS_SECONDS * 2  # sequential would be 2 gens × 3 variants × TTS
+    variants = result["generations"][0]["variants"]
+    assert [v["variant_type"] for v in variants] == ["Diplomat", "The Closer", "The Empath"]
+    assert all("audio_base64" not in v for v in variants)
+    name = variants[0]["audio_url"].rsplit("/", 1)[1]
+    assert open(store.resolve(name), "rb").read() == b"mp3:Diplomat"
+    assert progress[-1]["variants_done"] == progress[-1]["variants_total"] == 6
+    assert service.saved is not None
+
+
+def test_job_reports_progress_and_can_be_cancelled(tmp_path, monkeypatch):
+    _use_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(director_service, "DIRECTOR_EVAL_CONCURRENCY", 1)
+
+    async def scenario():
+        manager = DirectorJobManager()
+        done_service = FakeDirector()
+        job = await manager.start(done_service, "sb1", "n1", generations=1)
+        await manager._tasks[job["job_id"]]
+        completed = await manager.get(done_service, job["job_id"])
+
+        service = FakeDirector()
+        job = await manager.start(service, "sb1", "n1", generations=3)
+        await asyncio.sleep(TTS_SECONDS * 1.5)
+        running = await manager.get(service, job["job_id"])
+        await manager.cancel(service, job["job_id"])
+        await asyncio.sleep(0.05)
+        return completed, running, await manager.get(service, job["job_id"]), service
+
+    completed, running, cancelled, service = asyncio.run(scenario())
+    assert completed["status"] == "completed" and completed["result"]["best_variant"]["audio_url"]
+    assert running["status"] == "running" and running["progress"]["variants_done"] == 1
+    assert len(running["generations"][0]["variants"]) == 1
+    assert cancelled["status"] == "cancelled" and cancelled["cancel_requested"] is True
+    assert service.saved is None  # sandbox untouched
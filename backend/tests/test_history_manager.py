@@ -0,0 +1,131 @@
+"""
+Conversation history windowing tests: incremental token counts, verbatim
+tail under budget, background rolling summary, rollback handling
+
+Run: cd backend && python -m pytest tests/test_history_manager.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history_manager  # noqa: E402
+from history_manager import ConversationHistory, SUMMARY_PREFIX  # noqa: E402
+
+
+def make_history(turns: int, words: int = 20):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"user turn {i} " + "word " * words})
+        messages.append({"role": "assistant", "content": f"agent turn {i} " + "word " * words, "_node_id": "n1"})
+    return messages
+
+
+def test_only_new_messages_are_counted(monkeypatch):
+    counted = []
+    real_count = history_manager.count_tokens
+
+    def counting(text):
+        counted.append(text)
+        return real_count(text)
+
+    monkeypatch.setattr(history_manager, "count_tokens", counting)
+    history = ConversationHistory()
+    messages = make_history(5)
+    history.total_tokens(messages)
+    assert len(counted) == 10
+
+    messages.append({"role": "user", "content": "one more"})
+    history.total_tokens(messages)
+    assert len(counted) == 11
+
+    del messages[-3:]  # rollback (e.g. a discarded early response)
+    messages.append({"role": "user", "content": "replacement"})
+    history.total_tokens(messages)
+    assert len(counted) == 12
+
+
+def test_window_keeps_recent_turns_and_rolls_summary_off_the_critical_path():
+    history = ConversationHistory(budget_tokens=10_000, keep_turns=3)
+    messages = make_history(10)
+    calls = []
+
+    async def summarize(previous, chunk):
+        calls.append((previous, len(chunk)))
+        await asyncio.sleep(0.01)
+        return f"summary v{len(calls)}"
+
+    async def scenario():
+        # Before any summary exists, nothing is dropped
+        summary, tail = history.window(messages)
+        assert summary is None and len(tail) == 20
+
+        task = history.schedule_summary(messages, summarize)
+        assert history.schedule_summary(messages, summarize) is None  # one at a time
+        await task
+
+        summary_msgs, tail = history.llm_messages(messages)
+        assert summary_msgs == [{"role": "system", "content": SUMMARY_PREFIX + "summary v1"}]
+        assert len(tail) == 6 and tail[0]["content"].startswith("user turn 7")
+        assert all("_node_id" not in m for m in tail)
+
+        # Two more turns: not enough new messages for another summary yet
+        messages.extend(make_history(1))
+        assert history.schedule_summary(messages, summarize) is None
+        messages.extend(make_history(1))
+        await history.schedule_summary(messages, summarize)
+        return calls
+
+    calls = asyncio.run(scenario())
+    assert calls == [("", 14), ("summary v1", 4)]
+    assert history.summarized_upto == 18
+
+
+def test_budget_limits_tail_and_rewrite_invalidates_summary():
+    history = ConversationHistory(budget_tokens=100, keep_turns=10, hard_limit_tokens=100)
+    messages = make_history(6, words=30)
+
+    async def summarize(previous, chunk):
+        return "older stuff"
+
+    summary, tail = history.window(messages)
+    assert summary is None and sum(history._sync(messages)[-len(tail):]) <= 100  # hard limit drops unsummarized
+
+    async def roll():
+        await history.schedule_summary(messages, summarize)
+
+    asyncio.run(roll())
+    summary, tail = history.window(messages)
+    assert summary == "older stuff" and len(tail) < len(messages)
+
+    text = history.transcript(messages, max_messages=4, user_label="User", assistant_label="Assistant")
+    assert text.startswith("(Earlier: older stuff)\nUser: ") or text.startswith("(Earlier: older stuff)\nAssistant: ")
+
+    messages[:] = make_history(2)  # history replaced (reload): summary no longer applies
+    summary, tail = history.window(messages)
+    assert summary is None and history.summarized_upto == 0
+
+
+def test_summary_uses_a_model_of_the_selected_provider():
+    from types import SimpleNamespace
+
+    from core_calling_service import CallSession
+
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Caller asked about pricing."))])
+
+    # A Grok model left on the agent after switching its provider to OpenAI
+    session = CallSession("v3:summary", {"settings": {"llm_provider": "openai"}, "model": "grok-3"})
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def get_client(provider=None):
+        return client
+    session.get_llm_client_for_session = get_client
+
+    summary = asyncio.run(session._summarize_history("", make_history(2)))
+    assert summary == "Caller asked about pricing."
+    assert requests[0]["model"] == "gpt-4-turbo"
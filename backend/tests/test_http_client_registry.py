@@ -0,0 +1,134 @@
+"""
+HTTP client registry tests against a local keep-alive HTTP server
+
+Run: cd backend && python -m pytest tests/test_http_client_registry.py -q
+"""
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client_registry import HTTPClientRegistry  # noqa: E402
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"chunk" * 4
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CookieHandler(BaseHTTPRequestHandler):
+    """Sets a session cookie for the tenant in the path and echoes the Cookie header back"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = self.headers.get("Cookie", "").encode()
+        self.send_response(200)
+        self.send_header("Set-Cookie", f"session={self.path.strip('/')}; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sessions_reuse_pooled_connection():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/echo"
+
+    async def scenario():
+        registry = HTTPClientRegistry()
+        for i in range(5):
+            # Each iteration mimics the old `async with httpx.AsyncClient(...)` per request
+            async with registry.session(timeout=5.0) as client:
+                response = await client.post(url, content=f"ping {i}".encode())
+                assert response.text == f"ping {i}"
+
+        stats = registry.get_stats()["hosts"]["127.0.0.1"]
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 4
+        assert len(registry.clients) == 1
+        await registry.aclose_all()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.shutdown()
+
+
+def test_idle_origins_are_evicted_and_streams_hold_their_slot():
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler) for _ in range(4)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/echo" for server in servers]
+
+    async def scenario():
+        registry = HTTPClientRegistry(max_origins=2)
+        pinned = registry.get_client(urls[0])                  # e.g. handed to an LLM SDK
+        async with registry.session(timeout=5.0) as client:
+            async with client.stream("GET", urls[1]) as response:
+                # Streams count against the host like requests do, and keep their origin open
+                assert registry.get_stats()["hosts"]["127.0.0.1"]["in_flight"] == 1
+                for url in urls[2:]:
+                    await client.post(url, content=b"ping")
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+            assert body == b"chunk" * 4
+            await client.post(urls[2], content=b"ping")
+
+        origins = list(registry.clients)
+        assert len(origins) == 2 and registry.evicted == 3       # urls[2] once mid-stream, then urls[1] and urls[3]
+        assert registry.clients.get(origins[0]) is pinned
+        assert origins[1].endswith(str(servers[2].server_address[1]))
+        assert not registry.semaphores.keys() - set(origins)
+        await asyncio.gather(*registry._closing)             # evicted clients are closed in the background
+        await registry.aclose_all()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_cookies_are_not_shared_between_tenants_on_one_origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CookieHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    async def scenario():
+        registry = HTTPClientRegistry()
+        async with registry.session(timeout=5.0) as client:
+            first = await client.post(f"{base}/tenant-a", json={"event": "call.started"})
+            second = await client.post(f"{base}/tenant-b", json={"event": "call.started"})
+        assert first.cookies.get("session") == "tenant-a"      # still readable on the response
+        assert second.text == ""                               # tenant-a's cookie not replayed
+        assert len(registry.get_client(base).cookies) == 0
+        await registry.aclose_all()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.shutdown()
@@ -0,0 +1,217 @@
+"""
+KB extraction worker tests: PDF/DOCX/TXT extraction and limits, capped
+spooled uploads, job lifecycle with source- and content-hash dedupe, and a
+real process-pool round trip
+
+Run: cd backend && python -m pytest tests/test_kb_extraction.py -q
+"""
+import asyncio
+import hashlib
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from starlette.datastructures import UploadFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kb_extraction import (  # noqa: E402
+    KbExtractionError, KbExtractor, KbIngestJobs, UploadTooLarge, content_hash, extract_file_text, html_to_text,
+    spool_upload,
+)
+from loadtest.documents import make_docx, make_pdf  # noqa: E402
+
+
+class Collection:
+    def __init__(self):
+        self.docs = []
+        self.indexes = []
+
+    @staticmethod
+    def _match(doc, query):
+        def matches(value, cond):
+            if isinstance(cond, dict) and "$in" in cond:
+                return value in cond["$in"]
+            if isinstance(cond, dict) and "$lt" in cond:
+                return value is not None and value < cond["$lt"]
+            return value == cond
+        return all(matches(doc.get(k), v) for k, v in query.items())
+
+    async def create_index(self, keys, **kwargs):
+        self.indexes.append((keys, kwargs))
+
+    async def update_many(self, query, update):
+        matched = [doc for doc in self.docs if self._match(doc, query)]
+        for doc in matched:
+            doc.update(update["$set"])
+        return SimpleNamespace(modified_count=len(matched))
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if self._match(d, query)), None)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if self._match(doc, query):
+                doc.update(update["$set"])
+                return
+
+
+class FakeDB:
+    def __init__(self):
+        self.knowledge_base = Collection()
+        self.kb_ingest_jobs = Collection()
+
+
+class InlineExtractor(KbExtractor):
+    """Runs extraction in the test's thread instead of spawning workers"""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+def upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_extracts_pdf_docx_txt_and_enforces_page_limit(tmp_path):
+    pdf = write(tmp_path, "a.pdf", make_pdf(3, lines_per_page=5))
+    text = extract_file_text(pdf, "pdf")
+    assert "Page 1" in text and "Page 3" in text
+    assert extract_file_text(pdf, "pdf", max_chars=20) == text[:20]
+    with pytest.raises(KbExtractionError, match="3 pages"):
+        extract_file_text(pdf, "pdf", max_pages=2)
+
+    assert len(extract_file_text(write(tmp_path, "a.docx", make_docx(4)), "docx").splitlines()) == 4
+    assert extract_file_text(write(tmp_path, "a.txt", "héllo".encode()), "txt") == "héllo"
+    with pytest.raises(KbExtractionError):
+        extract_file_text(pdf, "xlsx")
+
+    html = "<html><style>p{}</style><script>var x=1;</script><p>Open  9-5</p>\n<b>Mon</b></html>"
+    assert html_to_text(html) == "Open 9-5 Mon"
+    assert content_hash("a  b\n c ") == content_hash("a b c")
+
+
+def test_spool_upload_hashes_and_caps_size():
+    data = os.urandom(3 * 1024 * 1024 + 5)
+    path, size, digest = asyncio.run(spool_upload(upload(data, "x.pdf"), suffix=".pdf"))
+    try:
+        assert size == len(data) and open(path, "rb").read() == data
+        assert digest == hashlib.sha256(data).hexdigest()
+    finally:
+        os.unlink(path)
+
+    spooled_before = set(os.listdir(os.path.dirname(path)))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(upload(data, "x.pdf"), max_bytes=1024 * 1024))
+    assert set(os.listdir(os.path.dirname(path))) == spooled_before     # partial spool removed
+
+
+def test_jobs_store_once_and_dedupe_reuploads():
+    db = FakeDB()
+    jobs = KbIngestJobs(extractor=InlineExtractor())
+    reindexed = []
+
+    async def reindex(agent_id, user_id):
+        reindexed.append((agent_id, user_id))
+
+    async def ingest(data: bytes, filename: str):
+        path, size, digest = await spool_upload(upload(data, filename))
+        job = await jobs.start_file(db, "u1", "a1", path, filename, size, digest, reindex=reindex)
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.01)
+            job = await jobs.get(db, "u1", job["job_id"])
+        assert not os.path.exists(path)
+        return job
+
+    async def scenario():
+        first = await ingest(b"Hours: 9 to 5\nRefunds within 30 days", "faq.txt")
+        again = await ingest(b"Hours: 9 to 5\nRefunds within 30 days", "faq.txt")
+        reflowed = await ingest(b"Hours:  9 to 5 Refunds within 30 days\n", "faq-v2.txt")
+        empty = await ingest(b"   \n", "blank.txt")
+        return first, again, reflowed, empty
+
+    first, again, reflowed, empty = asyncio.run(scenario())
+
+    assert first["status"] == "completed" and first["result"]["duplicate"] is False
+    assert first["result"]["content_length"] == 36 and first["result"]["source_name"] == "faq.txt"
+    assert again["status"] == "completed" and again["result"] == {**first["result"], "duplicate": True}
+    assert reflowed["result"]["duplicate"] is True and reflowed["result"]["id"] == first["result"]["id"]
+    assert empty["status"] == "failed" and "No text" in empty["error"]
+    assert len(db.knowledge_base.docs) == 1 and reindexed == [("a1", "u1")]
+    assert jobs.stats["duplicates"] == 2
+    assert asyncio.run(jobs.get(db, "u2", first["job_id"])) is None
+
+
+def test_process_pool_extracts_and_rejects_over_limit_pdf(tmp_path, monkeypatch):
+    import kb_extraction
+    monkeypatch.setattr(kb_extraction, "KB_MAX_PDF_PAGES", 4)
+    extractor = KbExtractor(max_workers=1)
+
+    async def scenario():
+        ok = await extractor.extract_file(write(tmp_path, "ok.pdf", make_pdf(4, lines_per_page=3)), "pdf")
+        with pytest.raises(KbExtractionError, match="limit 4"):
+            await extractor.extract_file(write(tmp_path, "big.pdf", make_pdf(5, lines_per_page=3)), "pdf")
+        return ok
+
+    try:
+        assert "Page 4" in asyncio.run(scenario())
+    finally:
+        extractor.shutdown()
+    assert extractor.stats["extracted"] == 1 and extractor.stats["failed"] == 1
+
+
+def test_timed_out_extraction_frees_its_worker():
+    extractor = KbExtractor(max_workers=1, timeout=2)
+
+    async def scenario():
+        await extractor.run(abs, -1)                      # warm the pool (spawn start-up)
+        worker = next(iter(extractor._pool._processes.values()))
+        with pytest.raises(KbExtractionError, match="longer than"):
+            await extractor.run(time.sleep, 60)           # a parse that never finishes
+        worker.join(timeout=5)
+        return worker, await extractor.run(abs, -3)       # the only slot is free again
+
+    try:
+        worker, result = asyncio.run(scenario())
+    finally:
+        extractor.shutdown()
+    assert not worker.is_alive() and result == 3
+    assert extractor.stats["timeouts"] == 1 and extractor.stats["pool_restarts"] == 1
+    assert extractor.stats["failed"] == 0 and extractor.stats["extracted"] == 2
+
+
+def test_job_indexes_and_interrupted_jobs_fail_at_startup():
+    db = FakeDB()
+    jobs = KbIngestJobs(extractor=InlineExtractor())
+    now = datetime.utcnow()
+    db.kb_ingest_jobs.docs = [
+        {"job_id": "kb_dead", "status": "running", "updated_at": now - timedelta(hours=1)},
+        {"job_id": "kb_queued", "status": "queued", "updated_at": now - timedelta(hours=1)},
+        {"job_id": "kb_live", "status": "running", "updated_at": now},            # another worker's, in progress
+        {"job_id": "kb_done", "status": "completed", "updated_at": now - timedelta(hours=1)},
+    ]
+
+    async def scenario():
+        await jobs.ensure_indexes(db)
+        return await jobs.fail_stale_jobs(db)
+
+    assert asyncio.run(scenario()) == 2
+    status = {d["job_id"]: d["status"] for d in db.kb_ingest_jobs.docs}
+    assert status == {"kb_dead": "failed", "kb_queued": "failed", "kb_live": "running", "kb_done": "completed"}
+    assert db.kb_ingest_jobs.docs[0]["finished_at"] and "restart" in db.kb_ingest_jobs.docs[0]["error"]
+    indexes = {keys: opts for keys, opts in db.kb_ingest_jobs.indexes}
+    assert indexes["job_id"]["unique"] is True
+    assert indexes["finished_at"]["expireAfterSeconds"] > 0
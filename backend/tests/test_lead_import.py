@@ -0,0 +1,214 @@
+"""
+Bulk lead import pipeline tests: phone normalization, streamed CSV chunks,
+upsert batching and per-row error reporting
+
+Run: cd backend && python -m pytest tests/test_lead_import.py -q
+Benchmark (local mongod): cd backend && python -m loadtest.bench_lead_import --rows 100000
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import BulkWriteError  # noqa: E402
+
+import lead_import  # noqa: E402
+from lead_import import import_csv_file, normalize_phone  # noqa: E402
+
+
+class BulkResult:
+    def __init__(self, details):
+        self.bulk_api_result = details
+
+
+class FakeLeads:
+    """Upserts keyed on (user_id, phone), like the unique index; records each bulk_write"""
+
+    def __init__(self, fail_phone=None):
+        self.docs = {}
+        self.batches = []
+        self.fail_phone = fail_phone
+
+    async def bulk_write(self, ops, ordered=True):
+        assert ordered is False
+        self.batches.append(len(ops))
+        upserted, matched, errors = 0, 0, []
+        for i, op in enumerate(ops):
+            key = (op._filter["user_id"], op._filter["phone"])
+            if key[1] == self.fail_phone:
+                errors.append({"index": i, "code": 121, "errmsg": "Document failed validation"})
+                continue
+            if key in self.docs:
+                matched += 1
+                self.docs[key].update(op._doc.get("$set", {}))
+            else:
+                upserted += 1
+                self.docs[key] = {**op._doc.get("$setOnInsert", {}), **op._doc.get("$set", {})}
+        details = {"nUpserted": upserted, "nMatched": matched, "writeErrors": errors}
+        if errors:
+            raise BulkWriteError(details)
+        return BulkResult(details)
+
+
+class FakeDB:
+    def __init__(self, **kwargs):
+        self.leads = FakeLeads(**kwargs)
+
+
+def test_normalize_phone_to_e164():
+    assert normalize_phone("(555) 123-4567") == "+15551234567"
+    assert normalize_phone("1-555-123-4567") == "+15551234567"
+    assert normalize_phone("+44 20 7946 0958") == "+442079460958"
+    assert normalize_phone("0044 20 7946 0958") == "+442079460958"
+    assert normalize_phone("555-1234") is None
+    assert normalize_phone("") is None
+
+
+def test_csv_import_streams_chunks_and_reports_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(lead_import, "CRM_IMPORT_CHUNK_SIZE", 3)
+    path = tmp_path / "leads.csv"
+    path.write_text(
+        "﻿name,email,phone,tags\n"
+        "Ann,ann@x.com,(555) 000-0001,\"a, b\"\n"
+        "Bob,,555.000.0002,\n"
+        "Bad,,n/a,\n"
+        "Ann again,,+1 555 000 0001,\n"
+        "Cat,,555-000-0003,\n"
+        "Dan,,555-000-0004,\n"
+        "Eve,,555-000-0005,\n"
+    )
+    db = FakeDB(fail_phone="+15550000005")
+    db.leads.docs[("u1", "+15550000004")] = {"name": "Dan (existing)"}
+    progress = []
+
+    async def on_progress(report):
+        progress.append(report.progress())
+
+    report = asyncio.run(import_csv_file(db, "u1", str(path), on_progress=on_progress))
+
+    assert db.leads.batches == [2, 2, 1]           # 3 rows per chunk, minus invalid/repeated
+    assert report.progress() == {"rows": 7, "imported": 3, "updated": 0, "skipped": 2, "failed": 2}
+    assert [(e["row"], e["error"]) for e in report.errors] == [
+        (4, "invalid phone number"), (8, "Document failed validation"),
+    ]
+    assert db.leads.docs[("u1", "+15550000001")]["tags"] == ["a", "b"]
+    assert db.leads.docs[("u1", "+15550000004")] == {"name": "Dan (existing)"}
+    assert [p["rows"] for p in progress] == [3, 6, 7]
+
+
+def test_import_without_skip_duplicates_updates_existing_leads():
+    from crm_models import LeadImportItem
+
+    db = FakeDB()
+    db.leads.docs[("u1", "+15550000001")] = {"name": "Old", "status": "qualified"}
+    items = [LeadImportItem(name="New", phone="555 000 0001", tags=["vip"]),
+             LeadImportItem(name="Other", phone="555 000 0002")]
+    report = asyncio.run(lead_import.import_items(db, "u1", items, skip_duplicates=False))
+
+    assert (report.imported, report.updated, report.skipped) == (1, 1, 0)
+    existing = db.leads.docs[("u1", "+15550000001")]
+    assert existing["name"] == "New" and existing["tags"] == ["vip"]
+    assert existing["status"] == "qualified"       # lead state is never overwritten by an import
+
+
+class FakeCollection:
+    """List-backed collection with the queries backfill_lead_phones makes"""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+        self.scans = 0
+
+    @staticmethod
+    def _match(doc, query):
+        for key, cond in query.items():
+            value = doc.get(key)
+            if isinstance(cond, dict) and "$in" in cond:
+                if value not in cond["$in"]:
+                    return False
+            elif isinstance(cond, dict) and "$not" in cond:
+                if cond["$not"].search(value or ""):
+                    return False
+            elif value != cond:
+                return False
+        return True
+
+    async def find(self, query, projection=None):
+        self.scans += 1
+        for doc in list(self.docs):
+            if self._match(doc, query):
+                yield dict(doc)
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if self._match(d, query)), None)
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if self._match(doc, query):
+                doc.update(update["$set"])
+                return
+        if upsert:
+            self.docs.append({**query, **update["$set"]})
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if self._match(doc, query):
+                doc.update(update["$set"])
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not self._match(d, query)]
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            await self.update_one(op._filter, op._doc)
+
+    async def drop_index(self, name):
+        pass
+
+    async def create_index(self, keys, **kwargs):
+        phones = [(d["user_id"], d["phone"]) for d in self.docs]
+        assert len(phones) == len(set(phones)), "duplicate (user_id, phone) left behind"
+
+
+class MigrationDB:
+    def __init__(self, leads, appointments=()):
+        self.leads = FakeCollection(leads)
+        self.appointments = FakeCollection(appointments)
+        self.call_analytics = FakeCollection()
+        self.migrations = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def test_legacy_phones_are_normalized_and_duplicates_merged():
+    db = MigrationDB(
+        leads=[
+            {"id": "new", "user_id": "u1", "phone": "+15551234567", "name": "Ann", "email": None,
+             "tags": ["imported"], "created_at": "2026-03-01T00:00:00"},
+            {"id": "old-1", "user_id": "u1", "phone": "(555) 123-4567", "name": "Ann B", "email": "ann@x.com",
+             "tags": ["vip"], "custom_fields": {"plan": "gold"}, "created_at": "2025-01-01T00:00:00"},
+            {"id": "old-2", "user_id": "u1", "phone": "5551234567", "name": "A", "tags": [],
+             "created_at": "2025-02-01T00:00:00"},
+            {"id": "solo", "user_id": "u1", "phone": "555.000.0002", "name": "Bob"},
+            {"id": "other-tenant", "user_id": "u2", "phone": "5551234567", "name": "Cat"},
+            {"id": "bad", "user_id": "u1", "phone": "n/a", "name": "Dan"},
+        ],
+        appointments=[{"id": "appt", "lead_id": "old-2"}],
+    )
+    stats = asyncio.run(lead_import.backfill_lead_phones(db))
+
+    assert stats == {"normalized": 4, "merged": 2, "invalid": 1}
+    leads = {d["id"]: d for d in db.leads.docs}
+    assert set(leads) == {"new", "solo", "other-tenant", "bad"}
+    kept = leads["new"]                              # the E.164 lead survives, filled from its duplicates
+    assert kept["name"] == "Ann" and kept["email"] == "ann@x.com"
+    assert kept["tags"] == ["imported", "vip"] and kept["custom_fields"] == {"plan": "gold"}
+    assert leads["solo"]["phone"] == "+15550000002" and leads["other-tenant"]["phone"] == "+15551234567"
+    assert leads["bad"]["phone"] == "n/a"
+    assert db.appointments.docs[0]["lead_id"] == "new"
+
+    # Recorded once: the next start doesn't scan leads again
+    scans = db.leads.scans
+    assert asyncio.run(lead_import.backfill_lead_phones(db)) is None
+    assert db.leads.scans == scans
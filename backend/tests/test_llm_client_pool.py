@@ -0,0 +1,49 @@
+"""
+LLM client pool tests (no network)
+
+Run: cd backend && python -m pytest tests/test_llm_client_pool.py -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client_pool import LLMClientPool  # noqa: E402
+from http_client_registry import http_client_registry  # noqa: E402
+
+
+def test_clients_are_isolated_per_tenant_key():
+    pool = LLMClientPool(max_size=10)
+    tenant_a = pool.get_client("grok", "key-a")
+    tenant_b = pool.get_client("grok", "key-b")
+
+    assert tenant_a is not tenant_b
+    assert tenant_a.api_key == "key-a"
+    assert tenant_b.api_key == "key-b"
+    assert pool.get_client("grok", "key-a") is tenant_a
+    assert pool.get_stats()["hits"] == 1
+
+
+def test_clients_share_transport_per_origin():
+    pool = LLMClientPool(max_size=10)
+    tenant_a = pool.get_client("grok", "key-a")
+    tenant_b = pool.get_client("grok", "key-b")
+    openai_client = pool.get_client("openai", "key-a")
+
+    shared = http_client_registry.get_client("https://api.x.ai")
+    assert tenant_a._client is shared
+    assert tenant_b._client is shared
+    assert openai_client._client is not shared
+    assert str(openai_client.base_url).startswith("https://api.openai.com")
+
+
+def test_lru_eviction():
+    pool = LLMClientPool(max_size=2)
+    first = pool.get_client("openai", "k1")
+    pool.get_client("openai", "k2")
+    pool.get_client("openai", "k1")
+    pool.get_client("openai", "k3")
+
+    assert len(pool.clients) == 2
+    assert pool.evictions == 1
+    assert pool.get_client("openai", "k1") is first
@@ -0,0 +1,104 @@
+"""
+Load test fakes: each fake must speak the protocol our real clients expect
+
+Run: cd backend && python -m pytest tests/test_loadtest_fakes.py -q
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest.audio import FRAME_MS, frames, is_voiced, silence, synth_speech  # noqa: E402
+from loadtest.fake_elevenlabs import FakeElevenLabsServer  # noqa: E402
+from loadtest.fake_soniox import FakeSonioxServer  # noqa: E402
+from loadtest.fake_telnyx import FakeTelnyxMediaSocket  # noqa: E402
+from loadtest.metrics import percentile  # noqa: E402
+
+
+def test_fake_soniox_endpoints_after_speech():
+    import soniox_service
+
+    async def scenario():
+        fake = FakeSonioxServer(["what does it cost"], endpoint_ms=200, idle_close_s=0.3)
+        await fake.start()
+        soniox_service.SONIOX_WS_URL = fake.url
+        stt = soniox_service.SonioxStreamingService(api_key="test")
+        assert await stt.connect()
+
+        finals, endpoints = [], []
+
+        async def on_final(text, data):
+            finals.append(text)
+
+        async def on_endpoint():
+            endpoints.append(time.time())
+
+        receiver = asyncio.create_task(stt.receive_messages(on_final_transcript=on_final, on_endpoint_detected=on_endpoint))
+        for frame in frames(synth_speech(600) + silence(400)):
+            await stt.send_audio(frame)
+        await asyncio.wait_for(receiver, timeout=5)
+        await fake.stop()
+        return finals, endpoints, fake.endpoints_sent
+
+    finals, endpoints, sent = asyncio.run(scenario())
+    assert finals == ["what does it cost"]
+    assert len(endpoints) == 1 and sent == 1
+
+
+def test_fake_elevenlabs_streams_audio_after_flush():
+    import elevenlabs_ws_service
+
+    async def scenario():
+        fake = FakeElevenLabsServer(ttfb_ms=50, chunk_ms=100, chunk_interval_ms=0)
+        await fake.start()
+        elevenlabs_ws_service.ELEVENLABS_WS_BASE_URL = fake.url
+        tts = elevenlabs_ws_service.ElevenLabsWebSocketService("test")
+        assert await tts.connect("voice", output_format="ulaw_8000")
+        start = time.time()
+        await tts.send_text("Hello there.", flush=True)
+        chunks, first_at = [], None
+        while sum(len(c) for c in chunks) < 800:
+            message = json.loads(await tts.websocket.recv())
+            if message.get("audio"):
+                first_at = first_at or time.time()
+                chunks.append(base64.b64decode(message["audio"]))
+        await tts.close()
+        await fake.stop()
+        return chunks, first_at - start
+
+    chunks, ttfb = asyncio.run(scenario())
+    assert all(len(c) == 800 for c in chunks)  # 100ms of 8kHz mulaw
+    assert ttfb >= 0.05
+
+
+def test_fake_caller_paces_frames_and_measures_turn_latency():
+    async def scenario():
+        caller = FakeTelnyxMediaSocket("call-1", ["yes please"], ms_per_word=200,
+                                       initial_silence_ms=100, think_ms=0, agent_idle_ms=100)
+        voiced, sent_at = 0, []
+        start = time.time()
+        agent_started = False
+        while True:
+            try:
+                message = json.loads(await caller.receive_text())
+            except Exception:
+                break
+            sent_at.append(time.time())
+            if is_voiced(base64.b64decode(message["media"]["payload"])):
+                voiced += 1
+            elif caller.turns[0].speech_end and not agent_started:
+                agent_started = True
+                for _ in range(3):
+                    await caller.send_text(json.dumps({"event": "media", "media": {"payload": ""}}))
+        return caller, voiced, time.time() - start
+
+    caller, voiced, elapsed = asyncio.run(scenario())
+    assert voiced == 400 // FRAME_MS
+    # 100ms lead-in + 400ms speech + agent reply + 100ms idle, at real-time pace
+    assert elapsed >= 0.6
+    assert caller.turns[0].latency_ms is not None and caller.turns[0].latency_ms < 100
+    assert percentile(caller.frame_lateness_ms, 50) < FRAME_MS
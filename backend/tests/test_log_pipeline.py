@@ -0,0 +1,108 @@
+"""
+Non-blocking logging tests: bounded queue with drop counter, deferred and
+lazy formatting, per-call runtime verbosity vs sampling
+
+Run: cd backend && python -m pytest tests/test_log_pipeline.py -q
+Benchmark: cd backend && python -m loadtest.bench_logging
+"""
+import io
+import logging
+import os
+import queue
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_pipeline import CallLogControl, DroppingQueueHandler, LogPipeline  # noqa: E402
+
+
+def make_logger(name, handler):
+    log = logging.getLogger(name)
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=3))
+    log = make_logger("test_log_pipeline.drops", handler)
+
+    for i in range(10):
+        log.info("packet %d", i)
+
+    assert handler.enqueued == 3 and handler.dropped == 7
+    kept = [handler.queue.get_nowait() for _ in range(3)]
+    # Immutable %-args are left for the listener thread to format
+    assert kept[0].msg == "packet %d" and kept[0].args == (0,)
+    assert kept[2].getMessage() == "packet 2"
+
+
+def test_mutable_args_and_fields_are_rendered_on_the_caller():
+    handler = DroppingQueueHandler(queue.Queue())
+    log = make_logger("test_log_pipeline.fields", handler)
+    control = CallLogControl(sample_every=1)
+    evaluated = []
+    tokens = ["he", "llo"]
+
+    control.hot(log, "call-1", "tokens %s", tokens, count=lambda: evaluated.append(1) or len(tokens))
+    tokens.append("!")                                    # mutated after the call: must not leak in
+
+    record = handler.queue.get_nowait()
+    assert record.msg == "tokens ['he', 'llo']" and record.args is None
+    assert record.fields == "count=2" and evaluated == [1]
+    assert record.call_id == "call-1"
+
+
+def test_hot_path_is_sampled_unless_the_call_is_verbose():
+    handler = DroppingQueueHandler(queue.Queue())
+    log = make_logger("test_log_pipeline.sampling", handler)
+    shared_flags = {"call-remote": True}
+    lookups = []
+    control = CallLogControl(sample_every=10)
+    control.flag_source = lambda cids: lookups.append(cids) or [c for c in cids if shared_flags.get(c)]
+    built = []
+
+    for i in range(100):
+        control.hot(log, "call-quiet", "token %d", i, text=lambda i=i: built.append(i) or i)
+    control.set_verbose("call-debug", True, ttl=60)
+    for i in range(100):
+        control.hot(log, "call-debug", "token %d", i)
+    control.hot(log, "call-remote", "token %d", 0)
+    control.refresh()                                    # background refresher: verbose set on another worker
+    for i in range(1, 20):
+        control.hot(log, "call-remote", "token %d", i)
+
+    by_call = {}
+    while not handler.queue.empty():
+        record = handler.queue.get_nowait()
+        by_call[record.call_id] = by_call.get(record.call_id, 0) + 1
+    assert by_call == {"call-quiet": 10, "call-debug": 100, "call-remote": 20}
+    assert built == list(range(0, 100, 10))              # skipped events never built their fields
+    assert control.stats["sampled_out"] == 90
+    assert lookups == [["call-quiet", "call-remote"]]    # one batched lookup, never from hot()
+
+    control.set_verbose("call-debug", False)
+    assert not control.is_verbose("call-debug")
+    control.end_call("call-remote")
+    assert not control.is_verbose("call-remote")
+
+
+def test_pipeline_writes_from_the_listener_thread():
+    stream = io.StringIO()
+    pipeline = LogPipeline()
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        pipeline.configure(level=logging.INFO, fmt="%(levelname)s %(message)s", stream=stream)
+        logging.getLogger("test_log_pipeline.listener").info("hello %s", "world", extra={"fields": "k=v"})
+        pipeline.stop()                                   # drains the queue
+    finally:
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        for h in saved_handlers:
+            root.addHandler(h)
+        root.setLevel(saved_level)
+
+    assert "INFO hello world | k=v" in stream.getvalue()
+    assert pipeline.get_stats()["dropped"] == 0
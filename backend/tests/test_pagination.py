@@ -0,0 +1,135 @@
+"""
+Keyset pagination tests: opaque cursors, stable pages across created_at ties
+and concurrent inserts, summary projections, cached estimated totals
+
+Run: cd backend && python -m pytest tests/test_pagination.py -q
+Benchmark (local mongod): cd backend && python -m loadtest.bench_pagination --rows 1000000
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import (  # noqa: E402
+    EstimatedCounter, InvalidCursor, decode_cursor, encode_cursor, fetch_page, paginate,
+)
+
+
+def matches(doc, query):
+    for key, cond in query.items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+        elif isinstance(cond, dict):
+            if "$lt" in cond and not doc.get(key) < cond["$lt"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs, projection):
+        self.docs, self.projection = docs, projection
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        docs = self.docs[:length]
+        included = {k for k, v in (self.projection or {}).items() if v and k != "_id"}
+        if included:
+            docs = [{k: v for k, v in d.items() if k in included} for d in docs]
+        return docs
+
+
+class FakeCollection:
+    def __init__(self, name, docs=()):
+        self.name = name
+        self.docs = list(docs)
+        self.counts = 0
+
+    def find(self, query, projection=None):
+        return FakeCursor([d for d in self.docs if matches(d, query)], projection)
+
+    async def count_documents(self, query):
+        self.counts += 1
+        return sum(1 for d in self.docs if matches(d, query))
+
+
+def call_log(i, created_at, user_id="u1"):
+    return {"id": f"call-{i:04d}", "user_id": user_id, "created_at": created_at, "call_id": f"v3:{i}",
+            "status": "completed", "transcript": [{"role": "user", "text": "hi"}] * 20, "logs": [{}] * 50}
+
+
+def test_cursor_is_opaque_and_validated():
+    ts = datetime(2026, 5, 1, 12, 30, 0, 123000)
+    cursor = encode_cursor(ts, "call-0001")
+    assert "call-0001" not in cursor and "2026" not in cursor
+    assert decode_cursor(cursor) == (ts, "call-0001")
+    assert decode_cursor(encode_cursor("2026-05-01", "x")) == ("2026-05-01", "x")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_pages_cover_every_row_once_despite_ties_and_new_inserts():
+    base = datetime(2026, 5, 1)
+    # Many rows share a created_at: the id tiebreaker must keep pages disjoint
+    docs = [call_log(i, base + timedelta(seconds=i // 4)) for i in range(103)]
+    docs.append(call_log(999, base, user_id="other"))
+    calls = FakeCollection("call_logs", docs)
+
+    async def walk():
+        seen, cursor, pages = [], None, 0
+        while True:
+            items, cursor = await fetch_page(calls, {"user_id": "u1"}, limit=10, cursor=cursor)
+            seen.extend(d["id"] for d in items)
+            pages += 1
+            if pages == 2:
+                calls.docs.append(call_log(500, base + timedelta(days=1)))  # newer than the cursor
+            if cursor is None:
+                return seen, pages
+
+    seen, pages = asyncio.run(walk())
+    assert pages == 11
+    assert len(seen) == len(set(seen)) == 103             # no duplicates, no gaps, no foreign rows
+    assert seen == sorted(seen, key=lambda i: next(d["created_at"] for d in docs if d["id"] == i), reverse=True)
+
+
+def test_summary_projection_and_cached_estimated_total(monkeypatch):
+    import pagination
+
+    base = datetime(2026, 5, 1)
+    calls = FakeCollection("call_logs", [call_log(i, base + timedelta(minutes=i)) for i in range(30)])
+    counter = EstimatedCounter(ttl=60)
+    monkeypatch.setattr(pagination, "estimated_counter", counter)
+
+    async def scenario():
+        first = await paginate(calls, {"user_id": "u1"}, limit=20)
+        second = await paginate(calls, {"user_id": "u1"}, limit=20, cursor=first["next_cursor"])
+        full = await paginate(calls, {"user_id": "u1"}, limit=5, view="full")
+        return first, second, full
+
+    first, second, full = asyncio.run(scenario())
+    assert len(first["items"]) == 20 and len(second["items"]) == 10 and second["next_cursor"] is None
+    assert "transcript" not in first["items"][0] and first["items"][0]["call_id"] == "v3:29"
+    assert "transcript" in full["items"][0]
+    assert first["total"] == second["total"] == 30 and first["total_is_estimate"]
+    assert calls.counts == 1                              # one count_documents for every page
+
+    counter.invalidate("call_logs", "u1")
+    asyncio.run(counter.count(calls, {"user_id": "u1"}))
+    assert calls.counts == 2
@@ -0,0 +1,153 @@
+"""
+Playback asset store tests: name validation, atomic writes, leases and
+in-flight references, TTL expiry, and a soak run that stays under the quota
+
+Run: cd backend && python -m pytest tests/test_playback_assets.py -q
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playback_assets import PlaybackAssetStore  # noqa: E402
+
+
+def disk_usage(root):
+    return sum(os.path.getsize(os.path.join(root, n)) for n in os.listdir(root))
+
+
+def age(store, name, seconds):
+    path = store.path(name)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_names_are_confined_to_the_store(tmp_path):
+    store = PlaybackAssetStore(root=str(tmp_path))
+    assert store.path("tts_elevenlabs_ab12.mp3") == str(tmp_path / "tts_elevenlabs_ab12.mp3")
+    for bad in ("../etc/passwd", "..mp3", ".tmp-x.mp3", "a/b.mp3", "notes.txt", ""):
+        assert store.path(bad) is None
+    with pytest.raises(ValueError):
+        store.put("../x.mp3", b"x")
+    url = store.url("sesame_ws_1.ulaw", "https://api.example.com")
+    assert url == "https://api.example.com/api/tts-audio/sesame_ws_1.ulaw"
+    assert store.name_from_url(url) == "sesame_ws_1.ulaw"
+    assert store.name_from_url("https://cdn.example.com/hold.mp3") is None
+
+
+def test_put_replaces_atomically_and_serves_ranges(tmp_path):
+    store = PlaybackAssetStore(root=str(tmp_path))
+    store.put("a.mp3", b"old contents")
+    path, before = store.stat("a.mp3")
+    store.put("a.mp3", bytes(range(200)))
+    _, after = store.stat("a.mp3")
+    assert [n for n in os.listdir(tmp_path) if n.startswith(".tmp-")] == []
+    assert store.etag(before) != store.etag(after)
+
+    async def read(start, end):
+        return b"".join([c async for c in store.iter_range("a.mp3", path, start, end, chunk_size=64)])
+
+    assert asyncio.run(read(10, 149)) == bytes(range(10, 150))
+    assert store.stat("missing.mp3") is None and store.stats["not_found"] == 1
+
+
+def test_leases_and_references_hold_files_past_ttl(tmp_path):
+    store = PlaybackAssetStore(root=str(tmp_path), ttl=60, lease=600)
+    store.put("leased.mp3", b"x" * 10)
+    store.put("played.mp3", b"x" * 10)
+    store.put("idle.mp3", b"x" * 10, hold=False)
+    store.put("noise.mp3", b"x" * 10, hold=False, pin=True)
+    for name in ("leased.mp3", "played.mp3", "idle.mp3", "noise.mp3"):
+        age(store, name, 120)
+    store.release(store.name_from_url("https://api.example.com/api/tts-audio/played.mp3"))
+
+    with store.reference("idle.mp3"):
+        store.sweep()
+        assert sorted(os.listdir(tmp_path)) == ["idle.mp3", "leased.mp3", "noise.mp3"]
+    store.sweep()
+    assert sorted(os.listdir(tmp_path)) == ["leased.mp3", "noise.mp3"]
+
+    store.sweep(now=time.time() + 700)                       # lease ran out, no playback.ended
+    assert os.listdir(tmp_path) == ["noise.mp3"] and store.stats["expired"] == 3
+
+
+def test_put_over_quota_wakes_the_sweeper_instead_of_scanning_inline(tmp_path):
+    store = PlaybackAssetStore(root=str(tmp_path), quota_bytes=64 * 1024, ttl=3600, lease=600, min_age=0)
+
+    async def scenario():
+        await store.start(interval=3600)
+        await asyncio.sleep(0.05)                            # startup sweep
+        sweeps = store.stats["sweeps"]
+        for i in range(12):
+            store.put(f"tts_{i:02d}.mp3", b"a" * 8 * 1024, hold=False)
+        inline = store.stats["sweeps"] - sweeps              # put() returned without a directory scan
+        for _ in range(100):
+            if store.stats["sweeps"] > sweeps:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await store.stop()
+        return inline, store.stats["sweeps"] - sweeps
+
+    inline, background = asyncio.run(scenario())
+    assert inline == 0 and background >= 1
+    assert disk_usage(tmp_path) <= 64 * 1024
+
+
+def test_soak_disk_usage_stays_under_quota(tmp_path):
+    quota = 256 * 1024
+    store = PlaybackAssetStore(root=str(tmp_path), quota_bytes=quota, ttl=3600, lease=600, min_age=0)
+    rng = random.Random(5)
+    store.put("comfort_noise_continuous.mp3", b"n" * 32 * 1024, hold=False, pin=True)
+    in_flight = []
+    peak = 0
+    for i in range(3000):
+        name = f"tts_provider_{i:05d}.mp3"
+        store.put(name, os.urandom(rng.randint(2, 12) * 1024))
+        in_flight.append(name)
+        if len(in_flight) > 8:                               # playback.ended for the oldest
+            store.release(in_flight.pop(0))
+        peak = max(peak, disk_usage(tmp_path))
+
+    assert peak <= quota + 12 * 1024
+    assert disk_usage(tmp_path) <= quota
+    assert all(os.path.exists(store.path(n)) for n in in_flight + ["comfort_noise_continuous.mp3"])
+    assert store.stats["evicted"] > 2500 and store.stats["over_quota"] == 0
+    assert store.stats["sweeps"] < 1000                       # not one directory scan per put
+
+
+def test_persistent_rest_playback_stores_sentences_for_real_call_ids(tmp_path, monkeypatch):
+    import persistent_tts_service
+    from persistent_tts_service import PersistentTTSSession
+
+    store = PlaybackAssetStore(root=str(tmp_path))
+    monkeypatch.setattr(persistent_tts_service, "playback_asset_store", store)
+
+    async def pcm_to_mp3(pcm, rate, label=None):
+        return b"mp3:" + pcm
+
+    monkeypatch.setattr(persistent_tts_service.audio_transcoder, "pcm_to_mp3", pcm_to_mp3)
+
+    class FakeTelnyx:
+        def __init__(self):
+            self.urls = []
+
+        async def play_audio_url(self, call_control_id, audio_url):
+            self.urls.append(audio_url)
+            return {"success": True}
+
+    telnyx = FakeTelnyx()
+    call_control_id = "v3:AbC-1_xYz9QwErTy-ab12cd34ef56"
+    session = PersistentTTSSession(call_control_id, "key", "voice", telnyx_service=telnyx)
+    for num, sentence in enumerate(["Hi there.", "How can I help?"], start=1):
+        asyncio.run(session._play_audio_chunk(sentence, None, b"\x00\x01" * 160, "pcm", num, num == 1))
+
+    names = [store.name_from_url(url) for url in telnyx.urls]
+    assert len(set(names)) == 2 and all(store.valid_name(n) for n in names)
+    assert all(n.startswith("tts_persistent_") and ":" not in n for n in names)
+    assert open(store.path(names[0]), "rb").read() == b"mp3:" + b"\x00\x01" * 160
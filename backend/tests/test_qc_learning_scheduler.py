@@ -0,0 +1,185 @@
+"""
+QC learning scheduler tests: a burst of outcome updates becomes one session,
+triggers during a run fold into exactly one follow-up, and a session only
+reflects on outcomes that arrived after the last learned playbook
+
+Run: cd backend && python -m pytest tests/test_qc_learning_scheduler.py -q
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import qc_learning_service  # noqa: E402
+from qc_learning_models import QCPlaybook  # noqa: E402
+from qc_learning_service import LearningOrchestrator, LearningScheduler  # noqa: E402
+
+
+def recording_runner(delay=0.0):
+    runs = []
+
+    async def runner(qc_agent_id, user_id, trigger, session_id):
+        runs.append((qc_agent_id, session_id))
+        await asyncio.sleep(delay)
+        return object()
+    return runs, runner
+
+
+def test_burst_of_triggers_runs_one_session():
+    runs, runner = recording_runner()
+    scheduler = LearningScheduler(debounce=0.05, max_delay=1.0, runner=runner)
+
+    async def scenario():
+        ids = []
+        for _ in range(20):                              # a CRM import marking outcomes
+            ids.append(scheduler.schedule("qa-1", "u1"))
+            await asyncio.sleep(0.005)
+        other = scheduler.schedule("qa-2", "u1")
+        await asyncio.sleep(0.2)
+        return ids, other
+
+    ids, other = asyncio.run(scenario())
+    assert len(set(ids)) == 1                            # every caller got the same session id
+    assert sorted(runs) == sorted([("qa-1", ids[0]), ("qa-2", other)])
+    assert scheduler.get_stats()["coalesced"] == 19
+
+
+def test_triggers_during_a_run_fold_into_one_follow_up():
+    runs, runner = recording_runner(delay=0.1)
+    scheduler = LearningScheduler(debounce=0.01, max_delay=0.05, runner=runner)
+
+    async def scenario():
+        first = scheduler.schedule("qa-1", "u1")
+        await asyncio.sleep(0.05)                        # session is running now
+        during = [scheduler.schedule("qa-1", "u1") for _ in range(10)]
+        await asyncio.sleep(0.4)
+        return first, during
+
+    first, during = asyncio.run(scenario())
+    assert len(set(during)) == 1 and during[0] != first
+    assert [sid for _, sid in runs] == [first, during[0]]
+    assert scheduler.get_stats()["running"] == 0 and scheduler.get_stats()["pending"] == 0
+
+
+def test_lease_held_elsewhere_is_retried():
+    attempts = []
+
+    async def runner(qc_agent_id, user_id, trigger, session_id):
+        attempts.append(session_id)
+        return None if len(attempts) == 1 else object()
+
+    scheduler = LearningScheduler(debounce=0.02, max_delay=1.0, runner=runner)
+
+    async def scenario():
+        sid = scheduler.schedule("qa-1", "u1")
+        await asyncio.sleep(0.2)
+        return sid
+
+    sid = asyncio.run(scenario())
+    assert attempts == [sid, sid] and scheduler.get_stats()["lease_busy"] == 1
+
+
+# --- incremental reflection -------------------------------------------------
+
+def matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$ne" in cond and value == cond["$ne"]:
+                return False
+            if "$gt" in cond and not (value is not None and value > cond["$gt"]):
+                return False
+            if "$lte" in cond and not (value is not None and value <= cond["$lte"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else list(self.docs)
+
+
+class Collection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+        self.queries = []
+
+    def find(self, query=None, projection=None):
+        self.queries.append(query or {})
+        return Cursor([dict(d) for d in self.docs if matches(d, query or {})])
+
+    async def find_one(self, query, projection=None, sort=None):
+        found = await self.find(query).sort(*sort[0]).to_list() if sort else await self.find(query).to_list()
+        return found[0] if found else None
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update):
+        pass
+
+    async def update_many(self, query, update):
+        for d in self.docs:
+            if d.get("id") in query["id"]["$in"]:
+                d.update(update["$set"])
+
+
+class FakeDB:
+    def __init__(self, logs, playbooks=()):
+        self.qc_agents = Collection([{"id": "qa-1", "user_id": "u1", "agent_type": "tonality"}])
+        self.qc_analysis_logs = Collection(logs)
+        self.qc_playbooks = Collection(playbooks)
+        self.qc_patterns = Collection()
+        self.qc_learning_sessions = Collection()
+
+
+def test_session_reflects_only_on_outcomes_since_the_last_playbook(monkeypatch):
+    learned_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    logs = [{"id": f"log-{i}", "qc_agent_id": "qa-1", "is_training_data": True,
+             "actual_outcome": "showed" if i % 2 else "no_show",
+             "predictions": {"show_likelihood": 0.8},
+             "outcome_updated_at": learned_at + timedelta(days=1 if i >= 40 else -1)}
+            for i in range(43)]
+    db = FakeDB(logs, [{"id": "pb-1", "qc_agent_id": "qa-1", "user_id": "u1", "agent_type": "tonality",
+                        "version": 1, "is_current": True, "learned_through": learned_at}])
+    monkeypatch.setattr(qc_learning_service, "db", db)
+    seen = {}
+
+    async def reflect(self, qc_agent_id, agent_type, analysis_logs, existing_patterns=None, accuracy_data=None):
+        seen["logs"] = [l["id"] for l in analysis_logs]
+        seen["accuracy"] = accuracy_data
+        return {"patterns": [], "accuracy": accuracy_data}
+
+    async def generate_playbook(self, qc_agent_id, agent_type, patterns, current_playbook, accuracy_data,
+                                recent_analyses):
+        return QCPlaybook(qc_agent_id=qc_agent_id, user_id="", agent_type=agent_type, version=2)
+
+    async def api_key(self, user_id, provider):
+        return "key"
+
+    monkeypatch.setattr(qc_learning_service.ReflectionBrain, "reflect", reflect)
+    monkeypatch.setattr(qc_learning_service.TrainingBrain, "generate_playbook", generate_playbook)
+    monkeypatch.setattr(LearningOrchestrator, "_get_api_key", api_key)
+
+    session = asyncio.run(LearningOrchestrator(db).run_learning_session("qa-1", "u1", session_id="s-1"))
+
+    assert session.success and session.id == "s-1"
+    assert sorted(seen["logs"]) == ["log-40", "log-41", "log-42"]
+    assert seen["accuracy"]["total"] == 43                # accuracy still spans the full history
+    new_playbook = db.qc_playbooks.docs[-1]
+    assert new_playbook["learned_through"] > learned_at
+    reviewed = [d["id"] for d in db.qc_analysis_logs.docs if d.get("has_been_reviewed")]
+    assert sorted(reviewed) == ["log-40", "log-41", "log-42"]
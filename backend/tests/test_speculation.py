@@ -0,0 +1,172 @@
+"""
+Speculative node opening tests: likelihood from flow + call-log history,
+opening resolution, per-call budget, hit/miss/waste accounting and playback
+from prepared audio
+
+Run: cd backend && python -m pytest tests/test_speculation.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speculation import (  # noqa: E402
+    CallSpeculator, TransitionStats, is_speculation_enabled, node_opening, rank_next_nodes,
+    transitions_from_logs,
+)
+
+
+def script_node(node_id, script, mode="script", transitions=()):
+    return {"id": node_id, "type": "conversation", "data": {
+        "script": script, "mode": mode, "transitions": [{"nextNode": t} for t in transitions],
+    }}
+
+
+FLOW = [
+    script_node("greet", "Hi there.", transitions=("pricing", "booking", "faq")),
+    script_node("pricing", "Great question, {{name}}. Our plans start at forty dollars."),
+    script_node("booking", "Let's get you booked in! What day works?"),
+    script_node("faq", "## Instructions: answer the caller's question", mode=None),
+]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self.docs:
+                await asyncio.sleep(0)
+                yield doc
+        return gen()
+
+
+class FakeCallLogs:
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return FakeCursor([d for d in self.docs if d["agent_id"] == query["agent_id"]])
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.call_logs = FakeCallLogs(docs)
+
+
+def turn_logs(*node_ids):
+    return [{"type": "turn_complete", "node_id": n} for n in node_ids] + [{"type": "latency_breakdown", "node_id": "x"}]
+
+
+def test_history_outweighs_flow_prior_and_openings_resolve():
+    assert transitions_from_logs(turn_logs("greet", "booking", "booking")) == [("greet", "booking"), ("booking", "booking")]
+
+    ranked = rank_next_nodes(FLOW[0], {})
+    assert [p for _, p in ranked] == [1 / 3] * 3  # structure only: edges share the prior
+
+    ranked = rank_next_nodes(FLOW[0], {"booking": 6, "pricing": 1})
+    assert ranked[0][0] == "booking" and ranked[0][1] > 0.7
+    assert ranked[-1][0] == "faq"
+
+    assert node_opening(FLOW[2], {}) == "Let's get you booked in!"
+    assert node_opening(FLOW[1], {}) is None                     # {{name}} not known yet
+    assert node_opening(FLOW[1], {"name": "Sam"}) == "Great question, Sam."
+    assert node_opening(FLOW[3], {}) is None                     # auto-detected prompt mode
+
+
+def test_prepare_take_and_budget_accounting():
+    synthesized = []
+
+    async def synthesize(text, voice_id):
+        synthesized.append((text, voice_id))
+        await asyncio.sleep(0.01)
+        return b"\xff" * 800
+
+    async def scenario():
+        speculator = CallSpeculator("call-1", synthesize, top_n=2, min_probability=0.1, budget_chars=70)
+        variables = {"name": "Sam"}
+
+        prepared = speculator.prepare(FLOW[0], FLOW, variables, {"booking": 3, "pricing": 2}, voice_id="v1")
+        assert [p.node_id for p in prepared] == ["booking", "pricing"]
+        assert speculator.take("Let's get you booked in!", "v1") is None  # still synthesizing
+        await asyncio.gather(*(p.task for p in prepared), return_exceptions=True)
+
+        hit = speculator.take("Great  question, Sam.", "v1")
+        assert hit and hit.node_id == "pricing" and hit.audio
+
+        # Next turn: budget (70 chars) allows one more opening, then nothing
+        prepared = speculator.prepare(FLOW[0], FLOW, variables, {"booking": 3}, voice_id="v1")
+        assert [p.node_id for p in prepared] == ["booking"]
+        await prepared[0].task
+        assert speculator.take("Something the LLM said.", "v1") is None
+        speculator.prepare(FLOW[0], FLOW, variables, {"booking": 3}, voice_id="v1")
+        assert speculator.stats["over_budget"] >= 1
+        speculator.close()
+        return speculator.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 1 and stats["pending"] == 1 and stats["misses"] == 1
+    assert stats["wasted"] == 1                       # the unused booking clip from turn two
+    assert stats["chars_spent"] <= 70 and stats["latency_saved_ms"] >= 10
+    assert stats["hit_rate"] == 1 / 3
+    assert ("Great question, Sam.", "v1") in synthesized
+
+
+def test_transition_history_is_loaded_once_and_cached():
+    db = FakeDB([
+        {"agent_id": "a1", "logs": turn_logs("greet", "booking")},
+        {"agent_id": "a1", "logs": turn_logs("greet", "booking", "done")},
+        {"agent_id": "a1", "logs": turn_logs("greet", "pricing")},
+        {"agent_id": "a2", "logs": turn_logs("greet", "faq")},
+    ])
+    stats = TransitionStats(ttl=60)
+
+    async def scenario():
+        return await asyncio.gather(stats.get(db, "a1"), stats.get(db, "a1"))
+
+    first, second = asyncio.run(scenario())
+    assert first is second and db.call_logs.finds == 1
+    assert first == {"greet": {"booking": 2, "pricing": 1}, "booking": {"done": 1}}
+    asyncio.run(stats.get(db, "a1"))
+    assert db.call_logs.finds == 1
+
+
+def test_prepared_audio_is_queued_without_elevenlabs():
+    from persistent_tts_service import PersistentTTSSession
+
+    session = PersistentTTSSession(call_control_id="call-1", api_key="k", voice_id="v1")
+
+    async def scenario():
+        ok = await session.stream_sentence("Let's get you booked in!", is_first=True, prepared_audio=b"\x7f" * 160)
+        return ok, session.audio_queue.get_nowait()
+
+    ok, item = asyncio.run(scenario())
+    assert ok and session.ws_service is None          # never connected, never asked ElevenLabs
+    assert item["audio_data"] == b"\x7f" * 160 and item["format"] == "mulaw" and item["is_first"]
+    assert session.is_waiting_for_first_audio_of_response
+
+
+def test_speculation_only_runs_where_prepared_audio_is_played():
+    def agent(**settings):
+        return {"agent_type": "call_flow", "settings": {
+            "stt_provider": "soniox", "tts_provider": "elevenlabs",
+            "speculation_settings": {"enabled": True}, **settings,
+        }}
+
+    assert is_speculation_enabled(agent())
+    assert not is_speculation_enabled(agent(stt_provider="assemblyai"))
+    assert not is_speculation_enabled(agent(stt_provider="deepgram"))
+    assert not is_speculation_enabled(agent(elevenlabs_settings={"use_persistent_tts": False}))
+    assert not is_speculation_enabled(agent(tts_provider="cartesia"))
+    assert not is_speculation_enabled({**agent(), "agent_type": "single_prompt"})
@@ -0,0 +1,105 @@
+"""
+Streaming response tests: single-prompt and call-flow turns stream every
+sentence through stream_callback (hot-path logging included) and return the
+full response
+
+Run: cd backend && python -m pytest tests/test_streaming_callbacks.py -q
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_calling_service import CallSession  # noqa: E402
+from log_pipeline import call_log_control  # noqa: E402
+
+REPLY = ["Sure thing. ", "Our plans start ", "at forty dollars. ", "Anything else?"]
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+
+        async def stream():
+            for text in REPLY:
+                await asyncio.sleep(0)
+                yield chunk(text)
+        return stream()
+
+
+def session(agent_config):
+    call = CallSession("v3:test-call", {"settings": {"llm_provider": "openai"}, **agent_config})
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def get_client(provider=None):
+        return client
+    call.get_llm_client_for_session = get_client
+    return call, completions
+
+
+async def stream_turn(process, text):
+    spoken = []
+
+    async def stream_callback(sentence):
+        spoken.append(sentence)
+    full = await process(text, stream_callback)
+    return full, spoken
+
+
+def test_single_prompt_streams_each_sentence():
+    call, completions = session({"system_prompt": "You are a sales agent."})
+    full, spoken = asyncio.run(stream_turn(call._process_single_prompt_streaming, "What does it cost?"))
+
+    assert full == "".join(REPLY)
+    assert spoken == ["Sure thing.", "Our plans start at forty dollars.", "Anything else?"]
+    assert len(completions.requests) == 1 and completions.requests[0]["stream"] is True
+    assert call.agent_speaking
+    call_log_control.end_call(call.call_id)
+
+
+def test_call_flow_prompt_node_streams_each_sentence():
+    call, completions = session({"call_flow": [
+        {"id": "start", "type": "start", "data": {"whoSpeaksFirst": "user"}},
+        {"id": "pricing", "type": "conversation", "data": {
+            "mode": "prompt", "script": "Answer the caller's pricing question.", "transitions": [],
+        }},
+    ]})
+    call.conversation_history = [{"role": "user", "content": "What does it cost?"}]
+    full, spoken = asyncio.run(stream_turn(call._process_call_flow_streaming, "What does it cost?"))
+
+    assert full == "".join(REPLY)
+    assert spoken == ["Sure thing.", "Our plans start at forty dollars.", "Anything else?"]
+    assert len(completions.requests) == 1
+    call_log_control.end_call(call.call_id)
+
+
+def test_speculation_is_scheduled_only_for_committed_turns():
+    call, _ = session({"agent_type": "call_flow", "call_flow": [
+        {"id": "start", "type": "start", "data": {"whoSpeaksFirst": "user"}},
+        {"id": "pricing", "type": "conversation", "data": {
+            "mode": "prompt", "script": "Answer the caller's pricing question.", "transitions": [],
+        }},
+    ]})
+    scheduled = []
+    call.schedule_speculation = lambda: scheduled.append(call.current_node_id)
+
+    async def speak(sentence):
+        pass
+
+    asyncio.run(call.process_user_input("What does it cost?", speak, speculative=True))
+    assert scheduled == []      # an early run must not replace the clip prepared for this node
+    call.schedule_turn_background_work()    # EarlyResponse.commit()
+    assert len(scheduled) == 1
+    asyncio.run(call.process_user_input("And per year?", speak))
+    assert len(scheduled) == 2
+    call_log_control.end_call(call.call_id)
@@ -0,0 +1,121 @@
+"""
+Streaming STT adapter tests: the shared audio front end, recorded provider
+turns normalized to partial/final/endpoint events, and each adapter streaming
+through the front end against a fake provider socket
+
+Run: cd backend && python -m pytest tests/test_stt_adapters.py -q
+"""
+import asyncio
+import audioop
+import base64
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stt_adapters  # noqa: E402
+from loadtest.audio import frames  # noqa: E402
+from loadtest.fake_stt import RECORDED_TURNS, FakeSttServer, turn_audio  # noqa: E402
+from stt_adapters import (  # noqa: E402
+    ENDPOINT, FINAL, PARTIAL, AudioFrontEnd, create_stt_adapter, stt_streams,
+)
+
+PROVIDERS = ("soniox", "assemblyai", "deepgram")
+
+
+def media(frame: bytes) -> str:
+    return json.dumps({"event": "media", "media": {"track": "inbound", "payload": base64.b64encode(frame).decode()}})
+
+
+class TelnyxSocket:
+    """The receive side of a Telnyx media stream: start, media frames, stop"""
+
+    def __init__(self, mulaw: bytes):
+        self.messages = [json.dumps({"event": "start"})] + [media(f) for f in frames(mulaw)] + [json.dumps({"event": "stop"})]
+
+    async def receive_text(self):
+        await asyncio.sleep(0)
+        return self.messages.pop(0)
+
+
+def adapter(provider):
+    return create_stt_adapter(provider, "test-key", {"settings": {f"{provider}_settings": {}}})
+
+
+def test_front_end_decodes_once_and_resamples_continuously():
+    audio = turn_audio(1)
+    front = AudioFrontEnd(pcm_16k=True)
+    decoded = [front.decode(json.loads(media(f))) for f in frames(audio)]
+    assert b"".join(f.mulaw for f in decoded) == audio
+    # Same bytes as resampling the whole call at once: no per-packet edges
+    # (the resampler's one-sample delay only shortens the very first frame)
+    assert [len(f.pcm_16k) for f in decoded[:2]] == [638, 640]
+    whole, _ = audioop.ratecv(audioop.ulaw2lin(audio, 2), 2, 1, 8000, 16000, None)
+    assert b"".join(f.pcm_16k for f in decoded) == whole
+
+    assert front.decode({"event": "start"}) is None
+    assert front.decode({"event": "media", "media": {"payload": "not base64!"}}) is None
+    assert front.stats["bad_payloads"] == 1 and front.stats["frames"] == 50
+    assert AudioFrontEnd().frame(b"\xff" * 160).pcm_16k is None  # mulaw-only adapters skip the resampler
+
+
+def test_recorded_turns_normalize_to_the_same_events():
+    expected = {
+        "soniox": [(PARTIAL, "What"), (PARTIAL, "does it"), (FINAL, "What"), (FINAL, "does it cost?")],
+        "assemblyai": [(PARTIAL, "what"), (PARTIAL, "what does it"), (FINAL, "What does it cost?")],
+        "deepgram": [(PARTIAL, "what"), (FINAL, "What does"), (FINAL, "it cost?")],
+    }
+    for provider in PROVIDERS:
+        stt = adapter(provider)
+        for turn in range(2):
+            events = [e for _, message in RECORDED_TURNS[provider] for e in stt.parse(message)]
+            assert [(e.kind, e.text) for e in events] == expected[provider] + [(ENDPOINT, "What does it cost?")], provider
+
+    assert adapter("soniox").parse({"tokens": [], "finished": True}) is None
+    assert adapter("soniox").parse({"error_code": 408, "error_message": "timeout"}) is None
+    assert adapter("assemblyai").parse({"type": "Termination"}) is None
+    assert adapter("deepgram").parse({"type": "UtteranceEnd"}) == []   # nothing pending, no empty endpoint
+    assert [adapter(p).model for p in PROVIDERS] == ["stt-rt-v3", "universal-streaming", "nova-3"]
+
+
+def test_adapters_stream_through_front_end_to_fake_sockets(monkeypatch):
+    import assemblyai_service
+    import soniox_service
+
+    async def scenario(provider):
+        fake = FakeSttServer(provider)
+        await fake.start()
+        monkeypatch.setattr(soniox_service, "SONIOX_WS_URL", fake.url)
+        monkeypatch.setattr(assemblyai_service, "ASSEMBLYAI_WS_URL", fake.url)
+        monkeypatch.setattr(stt_adapters, "DEEPGRAM_WS_URL", fake.url)
+
+        stt = adapter(provider)
+        assert await stt.connect()
+        assert stt_streams.active[provider] == 1
+
+        async def collect():
+            return [e async for e in stt.events()]
+
+        collector = asyncio.create_task(collect())
+        front = AudioFrontEnd.for_adapter(stt)
+        tapped = []
+        front.add_tap(lambda frame: tapped.append(frame))
+        received = await front.pump(TelnyxSocket(turn_audio(2)), stt)
+        await asyncio.sleep(0.05)
+        await stt.close()
+        events = await asyncio.wait_for(collector, timeout=5)
+        await fake.stop()
+        return stt, fake, received, len(tapped), events
+
+    for provider in PROVIDERS:
+        stt, fake, received, tapped, events = asyncio.run(scenario(provider))
+        assert received == tapped == 100
+        assert [e.text for e in events if e.kind == ENDPOINT] == ["What does it cost?"] * 2, provider
+        if provider == "assemblyai":
+            # 60ms of 16kHz PCM per packet, the remainder flushed at stop
+            assert len(fake.packets) == 34 and fake.packets[1:] == [1920] * 32 + [640]
+        else:
+            assert fake.packets == [160] * 100             # 20ms of mulaw, straight through
+        assert stt.stats["frames"] == 100 and stt.stats[ENDPOINT] == 2
+        assert stt_streams.active[provider] == 0
@@ -0,0 +1,170 @@
+"""
+Tonality preprocessing tests: agent turns cut by transcript timestamps anchored
+to the first voiced frame, silence trimming, bounded concurrent clip analysis
+merged into the whole-recording schema
+
+Run: cd backend && python -m pytest tests/test_tonality_preprocessing.py -q
+"""
+import asyncio
+import io
+import os
+import sys
+import wave
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_tonality_service import AudioTonalityAnalyzer, merge_segment_analyses  # noqa: E402
+from tonality_preprocessing import (  # noqa: E402
+    TonalityPreprocessor, TonalitySegment, agent_turn_spans, decode_wav, encode_wav, trim_silence,
+)
+
+RATE = 8000
+
+
+def tone(seconds, pitch=180.0):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * pitch * t) * 8000).astype(np.int16)
+
+
+def gap(seconds):
+    return np.zeros(int(RATE * seconds), dtype=np.int16)
+
+
+def synthetic_call():
+    """2s of ringing, greeting 0-3s, user 4-6s, agent 7-11s with a 2s pause inside, user 12-13s"""
+    samples = np.concatenate([
+        gap(2), tone(3), gap(1), tone(2, 240), gap(1), tone(1.5), gap(2), tone(1.5), gap(1), tone(1, 240), gap(1),
+    ])
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    transcript = [
+        {"role": "assistant", "text": "Hi, this is Ava from Acme.", "timestamp": base.isoformat()},
+        {"role": "user", "text": "Hi.", "timestamp": (base + timedelta(seconds=4)).isoformat()},
+        {"role": "assistant", "text": "I'm calling about your quote.", "timestamp": base + timedelta(seconds=7)},
+        {"role": "user", "text": "Sure.", "timestamp": (base + timedelta(seconds=12)).isoformat() + "Z"},
+    ]
+    return encode_wav(samples, RATE), transcript
+
+
+def test_agent_turns_are_anchored_to_the_first_voice_and_trimmed():
+    wav, transcript = synthetic_call()
+    spans = agent_turn_spans(transcript, duration=16.0, anchor=2.0)
+    assert [(i, s, e) for i, s, e, _ in spans] == [(0, 2.0, 6.0), (2, 9.0, 14.0)]
+
+    preprocessor = TonalityPreprocessor(sample_rate=RATE, codec="wav")
+    segments = asyncio.run(preprocessor.prepare(wav, transcript))
+
+    assert [s.turn_index for s in segments] == [0, 2]
+    assert abs(segments[0].speech_seconds - 3.0) < 0.05                 # leading/trailing silence dropped
+    assert abs(segments[1].speech_seconds - (1.5 + 0.4 + 1.5)) < 0.05    # 2s pause shortened to 400ms
+    samples, rate = decode_wav(segments[1].audio)
+    assert rate == RATE and len(samples) == int(segments[1].speech_seconds * RATE)
+    assert sum(len(s.audio) for s in segments) < len(wav) / 2
+
+
+def dual_channel_call():
+    """Caller on the left (says "Hello?" before the greeting), agent on the right; user entries stamped at speech end"""
+    caller = np.concatenate([gap(1), tone(0.6, 240), gap(3.9), tone(1.5, 240), gap(5), tone(1, 240), gap(1)])
+    agent = np.concatenate([gap(2), tone(3, 180), gap(3), tone(3, 180), gap(3)])
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    transcript = [
+        {"role": "assistant", "text": "Hi, this is Ava from Acme.", "timestamp": base.isoformat()},
+        {"role": "user", "text": "Hi, who is this?", "timestamp": (base + timedelta(seconds=5)).isoformat()},
+        {"role": "assistant", "text": "I'm calling about your quote.", "timestamp": (base + timedelta(seconds=6)).isoformat()},
+        {"role": "user", "text": "Sure.", "timestamp": (base + timedelta(seconds=11)).isoformat()},
+    ]
+    return np.stack([caller, agent], axis=1), transcript
+
+
+def dominant_hz(clip):
+    spectrum = np.abs(np.fft.rfft(clip.astype(np.float64)))
+    return np.fft.rfftfreq(len(clip), 1 / RATE)[spectrum.argmax()]
+
+
+def test_only_the_agent_leg_of_a_dual_channel_recording_is_clipped():
+    stereo, transcript = dual_channel_call()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(stereo.astype(np.int16).tobytes())
+
+    class StereoTranscoder:
+        """ffmpeg path (compressed recordings): hands back interleaved 2-channel PCM"""
+        async def run_ffmpeg(self, data, input_args, output_args, label="", timeout=None):
+            assert output_args[output_args.index("-ac") + 1] == "2"
+            return stereo.astype(np.int16).tobytes()
+
+    for recording, transcoder in ((buffer.getvalue(), None), (b"ID3 compressed", StereoTranscoder())):
+        preprocessor = TonalityPreprocessor(transcoder=transcoder, sample_rate=RATE, codec="wav")
+        segments = asyncio.run(preprocessor.prepare(recording, transcript))
+
+        assert [(s.turn_index, s.start) for s in segments] == [(0, 2.0), (2, 8.0)]   # anchored on the agent's greeting
+        for segment in segments:
+            samples, _ = decode_wav(segment.audio)
+            assert abs(segment.speech_seconds - 3.0) < 0.05      # the caller's next utterance isn't in the clip
+            assert dominant_hz(samples) == 180.0
+
+
+def test_recording_without_timestamps_falls_back_to_windows():
+    wav, transcript = synthetic_call()
+    for entry in transcript:
+        del entry["timestamp"]
+    preprocessor = TonalityPreprocessor(sample_rate=RATE, codec="wav")
+    segments = asyncio.run(preprocessor.prepare(wav, transcript))
+    assert [s.turn_index for s in segments] == [None]
+    assert preprocessor.get_stats()["windowed"] == 1
+    assert len(trim_silence(gap(3), RATE)) == 0
+
+
+def test_clips_are_analyzed_with_bounded_concurrency_and_merged():
+    wav = encode_wav(np.concatenate([np.concatenate([tone(2), gap(1)]) for _ in range(6)]), RATE)
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    transcript = [{"role": "assistant" if i % 2 == 0 else "user", "text": f"turn {i}",
+                   "timestamp": (base + timedelta(seconds=1.5 * i)).isoformat()} for i in range(12)]
+    analyzer = AudioTonalityAnalyzer(
+        api_key="key", max_concurrency=2, preprocessor=TonalityPreprocessor(sample_rate=RATE, codec="wav")
+    )
+    in_flight, peak, prompts = [0], [0], []
+
+    async def fake_segment(audio_data, audio_format, system_prompt, analysis_prompt, context=None):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        prompts.append(analysis_prompt)
+        n = len(prompts)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return {"success": True, "raw_response": "{}", "analysis": {
+            "overall_assessment": {"primary_emotion": "calm", "engagement_level": 6 + n % 2},
+            "flags": {"frustration_detected": n == 3, "rapport_established": True},
+            "recommendations": {"pacing_suggestions": ["slow down"]},
+            "emotional_journey": [{"timestamp_description": "start", "emotion_shift": "warmer"}],
+        }}
+
+    analyzer.analyze_audio_segment = fake_segment
+    result = asyncio.run(analyzer.analyze_recording(wav, "wav", "system", "whole", transcript=transcript))
+
+    assert result["success"] and result["segments_analyzed"] == 6 and peak[0] == 2
+    analysis = result["analysis"]
+    assert analysis["overall_assessment"]["primary_emotion"] == "calm"
+    assert analysis["overall_assessment"]["engagement_level"] == 6.5
+    assert analysis["flags"] == {"frustration_detected": True, "rapport_established": True}
+    assert analysis["recommendations"]["pacing_suggestions"] == ["slow down"]
+    assert len(analysis["emotional_journey"]) == 6
+    assert analysis["emotional_journey"][1]["timestamp_description"].startswith("0:03 (agent turn 2)")
+    assert all("only the agent's speech" in p for p in prompts)
+
+
+def test_failed_clips_do_not_sink_the_merge():
+    segments = [TonalitySegment(index=i, start=i * 5.0, end=i * 5.0 + 3, audio=b"x" * 10, audio_format="wav",
+                                speech_seconds=3.0, turn_index=i * 2) for i in range(3)]
+    results = [{"success": True, "analysis": {"quality_scores": {"overall_quality": 8}}, "raw_response": "{}"},
+               {"success": False, "error": "API error: 500"},
+               {"success": True, "analysis": {"quality_scores": {"overall_quality": 6}}, "raw_response": "{}"}]
+    merged = merge_segment_analyses(segments, results)
+    assert merged["success"] and merged["segments_failed"] == 1
+    assert merged["analysis"]["quality_scores"]["overall_quality"] == 7.0
+    assert merge_segment_analyses(segments[:1], results[1:2])["error"] == "API error: 500"
@@ -0,0 +1,171 @@
+"""
+TTS Multiplexer tests against a local fake ElevenLabs multi-context WebSocket server
+
+Run: cd backend && python -m pytest tests/test_tts_multiplexer.py -q
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tts_multiplexer  # noqa: E402
+
+
+class FakeElevenLabsServer:
+    """Echoes each flushed context's text back as 'audio' tagged with its contextId"""
+
+    def __init__(self, audio_delay: float = 0.0):
+        self.audio_delay = audio_delay
+        self.connections = 0
+        self.closed_contexts = []
+        self.server = None
+        self.port = None
+
+    async def handler(self, websocket):
+        self.connections += 1
+        buffers = {}
+        async for raw in websocket:
+            msg = json.loads(raw)
+            context_id = msg.get("context_id")
+            if msg.get("close_socket"):
+                break
+            if msg.get("close_context"):
+                self.closed_contexts.append(context_id)
+                buffers.pop(context_id, None)
+                continue
+            buffers[context_id] = buffers.get(context_id, "") + msg.get("text", "")
+            if msg.get("flush"):
+                text = buffers.pop(context_id, "").strip()
+                if self.audio_delay:
+                    await asyncio.sleep(self.audio_delay)
+                for word in text.split():
+                    await websocket.send(json.dumps({
+                        "audio": base64.b64encode(word.encode()).decode(),
+                        "contextId": context_id
+                    }))
+                await websocket.send(json.dumps({"isFinal": True, "contextId": context_id}))
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        tts_multiplexer.ELEVENLABS_WS_BASE_URL = f"ws://127.0.0.1:{self.port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def _collector():
+    received = []
+
+    def handler(audio, is_final):
+        if not is_final:
+            received.append(audio.decode())
+    return received, handler
+
+
+def test_calls_share_connection_and_audio_is_routed_per_context():
+    async def scenario():
+        async with FakeElevenLabsServer() as server:
+            mux = tts_multiplexer.ElevenLabsTTSMultiplexer()
+            received_a, handler_a = _collector()
+            received_b, handler_b = _collector()
+
+            ctx_a = await mux.open_context("call-a", "key", "voice", handler_a)
+            ctx_b = await mux.open_context("call-b", "key", "voice", handler_b)
+            assert ctx_a.connection is ctx_b.connection
+
+            await ctx_a.send_text("hello from a")
+            await ctx_b.send_text("hi from b")
+            await ctx_a.flush()
+            await ctx_b.flush()
+            await asyncio.sleep(0.2)
+
+            assert received_a == ["hello", "from", "a"]
+            assert received_b == ["hi", "from", "b"]
+            assert server.connections == 1
+
+            await mux.close_all()
+
+    asyncio.run(scenario())
+
+
+def test_new_connection_opened_when_contexts_exhausted():
+    async def scenario():
+        async with FakeElevenLabsServer() as server:
+            mux = tts_multiplexer.ElevenLabsTTSMultiplexer()
+            limit = tts_multiplexer.MAX_CONTEXTS_PER_CONNECTION
+            contexts = [
+                await mux.open_context(f"call-{i}", "key", "voice", lambda a, f: None)
+                for i in range(limit + 1)
+            ]
+            assert server.connections == 2
+            assert mux.get_stats()["active_contexts"] == limit + 1
+
+            await contexts[0].close()
+            assert mux.get_stats()["active_contexts"] == limit
+            await mux.close_all()
+
+    asyncio.run(scenario())
+
+
+def test_slow_handshake_does_not_block_other_voices():
+    async def scenario():
+        async with FakeElevenLabsServer() as server:
+            mux = tts_multiplexer.ElevenLabsTTSMultiplexer()
+            release_slow = asyncio.Event()
+            connect = tts_multiplexer.MultiplexedConnection.connect
+
+            async def gated_connect(connection):
+                if connection.voice_id == "slow":
+                    await release_slow.wait()
+                return await connect(connection)
+
+            tts_multiplexer.MultiplexedConnection.connect = gated_connect
+            try:
+                slow = [asyncio.create_task(mux.open_context(f"slow-{i}", "key", "slow", lambda a, f: None))
+                        for i in range(3)]
+                await asyncio.sleep(0.05)
+
+                fast = await asyncio.wait_for(mux.open_context("fast", "key", "fast", lambda a, f: None), 2)
+                assert fast.connected and not any(t.done() for t in slow)
+
+                release_slow.set()
+                contexts = await asyncio.gather(*slow)
+                assert len({id(c.connection) for c in contexts}) == 1    # one shared handshake
+                assert server.connections == 2 and mux.get_stats()["connections_opened"] == 2
+            finally:
+                tts_multiplexer.MultiplexedConnection.connect = connect
+            await mux.close_all()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_drops_late_audio_and_closes_context():
+    async def scenario():
+        async with FakeElevenLabsServer(audio_delay=0.1) as server:
+            mux = tts_multiplexer.ElevenLabsTTSMultiplexer()
+            received, handler = _collector()
+            ctx = await mux.open_context("call-x", "key", "voice", handler)
+
+            old_context_id = ctx.context_id
+            await ctx.send_text("interrupted sentence")
+            await ctx.flush()
+            await ctx.cancel()
+            assert ctx.context_id != old_context_id
+
+            await ctx.send_text("next response")
+            await ctx.flush()
+            await asyncio.sleep(0.4)
+
+            assert received == ["next", "response"]
+            assert old_context_id in server.closed_contexts
+            await mux.close_all()
+
+    asyncio.run(scenario())
@@ -0,0 +1,116 @@
+"""
+Turn tracing tests (span math, Prometheus text, batched writes)
+
+Run: cd backend && python -m pytest tests/test_turn_tracing.py -q
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turn_tracing import TurnTracer  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.batches = []
+        self.indexes = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+
+    async def create_index(self, keys):
+        self.indexes.append(keys)
+
+
+class FakeDB:
+    def __init__(self):
+        self.turn_metrics = FakeCollection()
+
+
+def _trace_turn(tracer, call_id, t0):
+    tracer.start_turn(call_id, user_id="u1", user_audio_end=t0, stt_final=t0 + 0.2)
+    tracer.mark(call_id, "llm_request", t0 + 0.25)
+    tracer.mark(call_id, "llm_first_token", t0 + 0.55)
+    tracer.mark(call_id, "llm_first_token", t0 + 0.9)  # later marks don't overwrite
+    tracer.mark(call_id, "tts_request", t0 + 0.6)
+    tracer.mark(call_id, "tts_first_byte", t0 + 0.75)
+    tracer.mark(call_id, "first_audio_sent", t0 + 0.8)
+    tracer.mark(call_id, "llm_complete", t0 + 1.2)
+    return tracer.finish_turn(call_id, node_label="Greeting", kb_ms=0)
+
+
+def test_spans_are_numeric_fields():
+    tracer = TurnTracer()
+    doc = _trace_turn(tracer, "call-1", 1000.0)
+
+    latency = doc["latency"]
+    assert latency["stt_ms"] == 200
+    assert latency["llm_ttft_ms"] == 300
+    assert latency["tts_ttfb_ms"] == 150
+    assert latency["response_ms"] == 600
+    assert latency["e2e_ms"] == 800
+    assert latency["dead_air_ms"] == 800
+    assert doc["turn_index"] == 1 and doc["user_id"] == "u1" and doc["node_label"] == "Greeting"
+    assert tracer.current("call-1") is None
+
+
+def test_prometheus_histogram_output():
+    tracer = TurnTracer()
+    for i in range(3):
+        _trace_turn(tracer, f"call-{i}", 1000.0)
+
+    text = tracer.render_prometheus()
+    assert '# TYPE virevo_turn_latency_ms histogram' in text
+    assert 'virevo_turn_latency_ms_bucket{span="e2e",le="750"} 0' in text
+    assert 'virevo_turn_latency_ms_bucket{span="e2e",le="1000"} 3' in text
+    assert 'virevo_turn_latency_ms_count{span="llm_ttft"} 3' in text
+    assert 'virevo_turn_latency_recent_ms{span="e2e",quantile="0.95"} 800' in text
+
+
+def test_turns_are_written_in_batches():
+    async def scenario():
+        tracer = TurnTracer()
+        db = FakeDB()
+        await tracer.start(db)
+        for i in range(5):
+            _trace_turn(tracer, "call-1", 1000.0 + i)
+        assert db.turn_metrics.batches == []  # buffered, not one write per turn
+        await tracer.stop()
+        assert len(db.turn_metrics.batches) == 1
+        assert [d["turn_index"] for d in db.turn_metrics.batches[0]] == [1, 2, 3, 4, 5]
+
+    asyncio.run(scenario())
+
+
+def test_turn_stays_open_until_first_audio():
+    tracer = TurnTracer()
+    tracer.start_turn("call-1", user_audio_end=1000.0, stt_final=1000.2)
+    tracer.mark("call-1", "llm_request", 1000.25)
+    assert tracer.finish_turn("call-1", node_label="Short") is None  # text handed to TTS, no audio yet
+
+    tracer.mark("call-1", "tts_first_byte", 1000.5)  # marks after the text is out still land
+    tracer.mark("call-1", "first_audio_sent", 1000.6)
+    assert tracer.current("call-1") is None
+    doc = tracer._buffer[-1]
+    assert doc["latency"]["e2e_ms"] == 600 and doc["latency"]["response_ms"] == 400
+    assert doc["marks"]["tts_first_byte"] == 500 and doc["node_label"] == "Short"
+    assert tracer.histograms["e2e"].count == 1
+
+
+def test_finished_turn_without_audio_closes_on_next_turn_or_call_end():
+    tracer = TurnTracer()
+    tracer.start_turn("call-1", user_audio_end=1000.0, stt_final=1000.2)
+    tracer.finish_turn("call-1")
+    tracer.start_turn("call-1", user_audio_end=1005.0)
+    assert [d["turn_index"] for d in tracer._buffer] == [1]
+
+    tracer.finish_turn("call-1")
+    tracer.end_call("call-1")
+    assert [d["turn_index"] for d in tracer._buffer] == [1, 2]
+
+    tracer.start_turn("call-2", user_audio_end=1000.0)   # never answered: discarded
+    tracer.start_turn("call-2", user_audio_end=1003.0)
+    tracer.end_call("call-2")
+    assert len(tracer._buffer) == 2
@@ -0,0 +1,151 @@
+"""
+Local VAD / early end-of-turn tests
+
+Run: cd backend && python -m pytest tests/test_turn_vad.py -q
+Evaluation on recordings: cd backend && python -m loadtest.vad_eval <files>
+"""
+import asyncio
+import audioop
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from early_response import EarlyResponse  # noqa: E402
+from loadtest.audio import FRAME_MS, frames, synth_speech  # noqa: E402
+from turn_vad import (  # noqa: E402
+    EndOfTurnDetector, StreamingVAD,
+    PROBABLE_END_OF_TURN, SPEECH_END, SPEECH_RESUMED, SPEECH_START,
+)
+
+
+def noise(duration_ms: int, amplitude: int = 150, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    pcm = b"".join(rng.randint(-amplitude, amplitude).to_bytes(2, "little", signed=True)
+                   for _ in range(8 * duration_ms))
+    return audioop.lin2ulaw(pcm, 2)
+
+
+def feed(detector, audio: bytes, start_ts: float = 0.0):
+    events = []
+    ts = start_ts
+    for frame in frames(audio):
+        ts += FRAME_MS / 1000
+        event = detector.process(frame, ts)
+        if event:
+            events.append((event, round(ts, 2)))
+    return events, ts
+
+
+def test_vad_tracks_speech_over_background_noise():
+    vad = StreamingVAD()
+    events, _ = feed(vad, noise(1000) + synth_speech(800) + noise(600))
+    assert [e for e, _ in events] == [SPEECH_START, SPEECH_END]
+    start_ts, end_ts = events[0][1], events[1][1]
+    assert 1.0 <= start_ts <= 1.1        # onset within two frames of speech
+    assert abs(vad.last_voiced_at - 1.8) <= 0.04
+    assert end_ts - 1.8 >= 0.19           # hangover before declaring the end
+    assert -75 < vad.noise_floor < -40    # floor adapted to the noise, not the speech
+
+
+def test_probable_end_fires_after_silence_and_detects_resumption():
+    detector = EndOfTurnDetector(silence_ms=300)
+    detector.set_final("what does it cost")
+    events, ts = feed(detector, noise(500) + synth_speech(600) + noise(400))
+    probable = [t for e, t in events if e == PROBABLE_END_OF_TURN]
+    assert len(probable) == 1 and abs(probable[0] - (1.1 + 0.3)) <= 0.04
+
+    events, _ = feed(detector, synth_speech(300), start_ts=ts)
+    assert events[0][0] == SPEECH_RESUMED
+
+
+def test_probable_end_waits_for_a_complete_phrase():
+    detector = EndOfTurnDetector(silence_ms=300)
+    detector.set_partial("I was thinking that")
+    events, _ = feed(detector, noise(300) + synth_speech(600) + noise(600))
+    assert PROBABLE_END_OF_TURN not in [e for e, _ in events]
+
+
+def test_reset_turn_forgets_the_previous_speech_end():
+    detector = EndOfTurnDetector(silence_ms=300)
+    detector.set_final("what does it cost")
+    feed(detector, noise(300) + synth_speech(600) + noise(400))
+    assert detector.last_speech_end is not None
+    detector.reset_turn()
+    assert detector.last_speech_end is None and detector.transcript == ""
+
+
+class _Session:
+    """Just the state EarlyResponse snapshots, plus a streaming process_user_input and the deferred side effects"""
+
+    def __init__(self):
+        self.conversation_history = [{"role": "assistant", "content": "Hi!"}]
+        self.current_node_id = "start"
+        self.current_node_label = "Start"
+        self.session_variables = {"customer_name": ""}
+        self.should_end_call = False
+        self.last_message_was_checkin = False
+        self.checkin_count = 0
+        self.is_processing = False
+        self.agent_speaking = False
+        self.silence_start_time = 100.0
+        self.hold_on_detected = True
+        self.max_checkins_reached = True
+        self.side_effects = []
+
+    async def intercept_barge_in(self, text):
+        self.side_effects.append("barge_in")
+
+    def schedule_turn_background_work(self):
+        self.side_effects.append("background")
+
+    async def process_user_input(self, text, stream_callback=None, speculative=False):
+        self.is_processing = True
+        if not speculative:
+            await self.intercept_barge_in(text)
+        self.conversation_history.append({"role": "user", "content": text})
+        self.current_node_id = "pricing"
+        for sentence in ["It is ten dollars.", "Want me to sign you up?"]:
+            await asyncio.sleep(0.01)
+            self.agent_speaking, self.silence_start_time = True, None   # mark_agent_speaking_start
+            await stream_callback(sentence)
+        self.hold_on_detected = self.max_checkins_reached = False   # reset_silence_tracking
+        self.conversation_history.append({"role": "assistant", "content": "..."})
+        if not speculative:
+            self.schedule_turn_background_work()
+        self.is_processing = False
+        return {"text": "It is ten dollars. Want me to sign you up?"}
+
+
+def test_early_response_buffers_until_commit_and_rolls_back_on_cancel():
+    async def scenario():
+        session = _Session()
+        early = EarlyResponse(session, "What does it cost?")
+        await asyncio.sleep(0.015)  # first sentence generated, not spoken yet
+        spoken = []
+
+        async def speak(sentence):
+            spoken.append(sentence)
+            session.side_effects.append("spoken")
+
+        assert early.matches("what does it cost")
+        assert session.side_effects == []   # nothing irreversible while speculative
+        result = await early.commit(speak)
+        committed = (spoken, result["text"], len(session.conversation_history), session.side_effects)
+
+        session = _Session()
+        early = EarlyResponse(session, "What does it cost?")
+        await asyncio.sleep(0.015)
+        await early.cancel("speech resumed")
+        return committed, session
+
+    (spoken, text, history_len, side_effects), session = asyncio.run(scenario())
+    assert spoken == ["It is ten dollars.", "Want me to sign you up?"]
+    assert text.startswith("It is ten dollars") and history_len == 3
+    assert side_effects == ["barge_in", "spoken", "spoken", "background"]
+    assert session.side_effects == []
+    assert session.hold_on_detected is True and session.max_checkins_reached is True
+    assert session.conversation_history == [{"role": "assistant", "content": "Hi!"}]
+    assert session.current_node_id == "start" and session.is_processing is False
+    assert session.agent_speaking is False and session.silence_start_time == 100.0
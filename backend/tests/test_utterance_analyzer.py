@@ -0,0 +1,201 @@
+"""
+Utterance analyzer tests: results must match the original per-module regex loops
+
+Run: cd backend && python -m pytest tests/test_utterance_analyzer.py -q
+Benchmark: cd backend && python tests/test_utterance_analyzer.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kb_router import SIMPLE_CHAT_PATTERNS, FACTUAL_QUESTION_PATTERNS, needs_knowledge_base  # noqa: E402
+from preprocessing_layer import DISC_PATTERNS, OBJECTION_PATTERNS, detect_objection_type  # noqa: E402
+from voicemail_detector import (  # noqa: E402
+    VOICEMAIL_PATTERNS, IVR_PATTERNS, GATEKEEPER_PATTERNS,
+    VoicemailDetector, detect_gatekeeper, detect_voicemail_or_ivr,
+)
+from instant_pattern_matcher import PATTERN_LIBRARY, match_pattern  # noqa: E402
+from utterance_analyzer import HOLD_ON_PHRASES, UtteranceAnalyzer  # noqa: E402
+
+
+UTTERANCES = [
+    "yeah",
+    "no thanks, not interested",
+    "hmm?",
+    "Hello, who is this?",
+    "How much does this cost?",
+    "Who is the founder of the company?",
+    "Is this legit or is it a scam?",
+    "I need to think about it, call me later",
+    "What is this about exactly?",
+    "hold on, let me grab a pen",
+    "I'm busy right now but tell me about the product and the pricing details",
+    "The person you are trying to reach is not available. At the tone, please record your message.",
+    "Thank you for calling. For sales press 1. For support press 2. Stay on the line for the main menu.",
+    "This call is being screened. Press 5 to connect to the caller.",
+    "To accept this call press 9",
+    "well I was thinking that maybe we could go over the numbers and see why it works for people like me",
+    "",
+]
+
+
+# --- Original implementations (uncompiled loops), kept as the reference ---
+
+def legacy_needs_kb(message):
+    if not message or len(message.strip()) < 2:
+        return (False, "empty_message")
+    lower = message.lower().strip()
+    for p in SIMPLE_CHAT_PATTERNS:
+        if re.search(p, lower, re.IGNORECASE):
+            return (False, "simple_chat")
+    for p in FACTUAL_QUESTION_PATTERNS:
+        if re.search(p, lower, re.IGNORECASE):
+            return (True, "factual_question")
+    if len(lower.split()) < 10:
+        return (False, "short_message")
+    return (True, "default_long")
+
+
+def legacy_objection(text):
+    text = text.lower()
+    for name, p in OBJECTION_PATTERNS:
+        if re.search(p, text):
+            return name
+    return None
+
+
+def legacy_disc_counts(text):
+    return {style: len(re.findall(p, text.lower())) for style, p in DISC_PATTERNS.items()}
+
+
+def legacy_hold_on(text):
+    return any(p in text.lower() for p in HOLD_ON_PHRASES)
+
+
+def legacy_gatekeeper(transcript):
+    if not transcript or len(transcript.strip()) < 10:
+        return False, None
+    lower = transcript.lower()
+    for p in GATEKEEPER_PATTERNS:
+        m = re.search(p, lower)
+        if m:
+            return True, (m.group(1) if m.groups() else "1")
+    return False, None
+
+
+def legacy_voicemail_counts(transcript):
+    if not transcript or len(transcript.strip()) < 10:
+        return 0, 0
+    lower = transcript.lower()
+    return (
+        sum(1 for p in VOICEMAIL_PATTERNS if re.search(p, lower)),
+        sum(1 for p in IVR_PATTERNS if re.search(p, lower)),
+    )
+
+
+def legacy_instant_scores(text):
+    lower = text.lower()
+    scores = {}
+    for name, data in PATTERN_LIBRARY.items():
+        score = sum(10 for p in data["patterns"] if re.search(p, lower))
+        score += sum(5 for b in data.get("confidence_boost", []) if b in lower)
+        scores[name] = score
+    return scores
+
+
+def legacy_turn(text):
+    """Everything the old code paths computed for one turn"""
+    return (
+        legacy_needs_kb(text),
+        legacy_objection(text),
+        legacy_disc_counts(text),
+        legacy_hold_on(text),
+        legacy_gatekeeper(text),
+        legacy_voicemail_counts(text),
+        legacy_instant_scores(text),
+    )
+
+
+# --- Tests ---
+
+def test_features_match_original_functions():
+    analyzer = UtteranceAnalyzer()
+    for text in UTTERANCES:
+        f = analyzer.analyze(text)
+        assert (f.kb_needed, f.kb_reason) == legacy_needs_kb(text), text
+        assert f.objection_type == legacy_objection(text), text
+        assert f.disc_counts == legacy_disc_counts(text), text
+        assert f.hold_on == legacy_hold_on(text), text
+        assert (f.gatekeeper_digit is not None, f.gatekeeper_digit) == legacy_gatekeeper(text), text
+        assert (f.voicemail_matches, f.ivr_matches) == legacy_voicemail_counts(text), text
+        assert f.instant_scores == legacy_instant_scores(text), text
+
+
+def test_public_functions_keep_their_results():
+    assert needs_knowledge_base("yeah sure") == (False, "simple_chat")
+    assert needs_knowledge_base("What does the product cost?") == (True, "factual_question")
+    assert detect_objection_type("Is this a scam?") == "trust"
+    assert detect_gatekeeper("Press 5 to connect to the caller") == (True, "5")
+    assert detect_voicemail_or_ivr("Please leave a message after the beep")[:2] == (True, "voicemail")
+    assert match_pattern("How much does this cost?")["pattern_name"] == "price_cost"
+
+
+def test_incremental_scanner_matches_full_rescan():
+    detector = VoicemailDetector({"voicemail_detection": {"disconnect_on_detection": False}})
+    chunks = [
+        "Hi you have reached",
+        "the voice mail of John. I am not",
+        "available right now, please leave a",
+        "message after the beep",
+    ]
+    for chunk in chunks:
+        _, detection_type, confidence = detector.analyze_transcript(chunk)
+        expected = detect_voicemail_or_ivr(detector.accumulated_transcript, {})
+        assert (detection_type, confidence) == expected[1:]
+        assert (detector.scanner.voicemail_matches, detector.scanner.ivr_matches) == \
+            legacy_voicemail_counts(detector.accumulated_transcript)
+
+
+def test_analysis_is_cached_per_utterance():
+    analyzer = UtteranceAnalyzer()
+    first = analyzer.analyze("How much does this cost?")
+    assert analyzer.analyze("How much does this cost?") is first
+    assert analyzer.get_stats()["hits"] == 1
+
+
+# --- Benchmark ---
+
+def benchmark(rounds: int = 2000):
+    turns = [t for t in UTTERANCES if t]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in turns:
+            legacy_turn(text)
+    legacy_us = (time.perf_counter() - start) / (rounds * len(turns)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        analyzer = UtteranceAnalyzer()  # no cache hits: measures the scan itself
+        for text in turns:
+            analyzer.analyze(text)
+    analyzer_us = (time.perf_counter() - start) / (rounds * len(turns)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        analyzer = UtteranceAnalyzer()
+        for text in turns:
+            for _ in range(4):  # KB router + hold-on + gatekeeper + instant matcher
+                analyzer.analyze(text)
+    shared_us = (time.perf_counter() - start) / (rounds * len(turns)) * 1e6
+
+    print(f"Original loops (one pass each):    {legacy_us:8.1f} µs/turn")
+    print(f"Single-pass analyzer (cold):       {analyzer_us:8.1f} µs/turn  ({legacy_us / analyzer_us:.1f}x)")
+    print(f"Analyzer, 4 consumers per turn:    {shared_us:8.1f} µs/turn")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,178 @@
+"""
+Voice-library blob store tests: content-addressed dedupe, ranged streaming,
+release with the last referencing sample, inline-audio migration, speaker LRU
+
+Run: cd backend && python -m pytest tests/test_voice_blob_store.py -q
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice_blob_store import (  # noqa: E402
+    RangeNotSatisfiable, SpeakerCache, VoiceBlobStore, migrate_inline_audio, parse_range,
+)
+
+
+class FakeGridOut:
+    def __init__(self, data):
+        self.data, self.length, self.pos = data, len(data), 0
+        self.reads = []
+
+    def seek(self, pos):
+        self.pos = pos
+
+    async def read(self, size=-1):
+        end = self.length if size < 0 else self.pos + size
+        chunk = self.data[self.pos:end]
+        self.pos += len(chunk)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+class FakeList:
+    def __init__(self, items):
+        self.items = items
+
+    async def to_list(self, length):
+        return list(self.items)
+
+
+class FakeBucket:
+    def __init__(self):
+        self.files = {}
+        self.uploads = 0
+
+    def find(self, query, limit=0):
+        return FakeList([SimpleNamespace(_id=name) for name in self.files if name == query["filename"]])
+
+    async def upload_from_stream(self, name, data, metadata=None):
+        self.uploads += 1
+        self.files[name] = bytes(data)
+
+    async def open_download_stream_by_name(self, name):
+        from gridfs.errors import NoFile
+        if name not in self.files:
+            raise NoFile(name)
+        return FakeGridOut(self.files[name])
+
+    async def delete(self, file_id):
+        del self.files[file_id]
+
+
+class FakeVoiceLibrary:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def create_index(self, keys, name=None):
+        pass
+
+    def find(self, query, projection=None):
+        async def gen():
+            for d in list(self.docs):
+                if "audio_data" in d:
+                    yield {"id": d["id"]}
+        return gen()
+
+    async def find_one(self, query, projection=None):
+        for d in self.docs:
+            if all(d.get(k) == v for k, v in query.items()):
+                return dict(d)
+        return None
+
+    async def update_one(self, query, update):
+        for d in self.docs:
+            if d["id"] == query["id"]:
+                d.update(update["$set"])
+                for k in update.get("$unset", {}):
+                    d.pop(k, None)
+
+
+class FakeDB(dict):
+    def __init__(self, docs=()):
+        super().__init__()
+        self.voice_library = FakeVoiceLibrary(list(docs))
+        self["voice_library"] = self.voice_library
+
+
+def make_store():
+    store = VoiceBlobStore()
+    bucket = FakeBucket()
+    store.bucket = lambda db: bucket
+    return store, bucket
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-1000", 100) == (50, 99)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_dedupe_ranged_reads_and_release_with_last_reference():
+    store, bucket = make_store()
+    audio = bytes(range(256)) * 4000                      # ~1MB
+    db = FakeDB()
+
+    async def scenario():
+        first = await store.put(db, audio, "audio/wav")
+        second = await store.put(db, audio, "audio/wav")  # same voice uploaded twice
+        grid_out = await store.open(db, first)
+        parts = [c async for c in store.iter_range(grid_out, 1000, 300_999, chunk_size=64 * 1024)]
+        db.voice_library.docs.append({"id": "s2", "blob_sha256": first})
+        kept = await store.release(db, first)            # s2 still references it
+        db.voice_library.docs.clear()
+        released = await store.release(db, first)
+        return first, second, grid_out, parts, kept, released, await store.open(db, first)
+
+    first, second, grid_out, parts, kept, released, gone = asyncio.run(scenario())
+    assert first == second and bucket.uploads == 1
+    assert b"".join(parts) == audio[1000:301_000]
+    assert max(grid_out.reads) <= 64 * 1024               # streamed, never the whole blob
+    assert kept is False and released is True and gone is None
+
+
+def test_inline_audio_is_migrated_out_of_documents():
+    store, bucket = make_store()
+    db = FakeDB([{"id": "s1", "format": "wav", "audio_data": b"RIFF" + b"\x00" * 20_000},
+                 {"id": "s2", "format": "mp3", "blob_sha256": "abc"}])
+
+    moved = asyncio.run(migrate_inline_audio(db, store))
+    assert moved == 1
+    doc = db.voice_library.docs[0]
+    assert "audio_data" not in doc and bucket.files[doc["blob_sha256"]].startswith(b"RIFF")
+
+
+def test_speaker_cache_is_shared_size_capped_and_user_checked():
+    cache = SpeakerCache(max_bytes=250, ttl=60)
+    loads = []
+
+    def loader(sample_id, owner, size):
+        async def load():
+            loads.append(sample_id)
+            await asyncio.sleep(0.01)
+            return owner, b"x" * size
+        return load
+
+    async def scenario():
+        # Ten calls start on the same cloned voice at once: one Mongo read
+        results = await asyncio.gather(*(cache.get_or_load("v1", None, loader("v1", "u1", 100)) for _ in range(10)))
+        again = await cache.get_or_load("v1", "u1", loader("v1", "u1", 100))
+        foreign = await cache.get_or_load("v1", "u2", loader("v1", "u1", 100))
+        await cache.get_or_load("v2", None, loader("v2", "u1", 100))
+        await cache.get_or_load("v3", None, loader("v3", "u1", 100))   # over the cap: v1 is oldest
+        return results, again, foreign
+
+    results, again, foreign = asyncio.run(scenario())
+    assert all(r == b"x" * 100 for r in results) and again == b"x" * 100
+    assert foreign is None                                 # another tenant's sample id
+    assert loads == ["v1", "v2", "v3"]
+    assert cache.get("v1") is None and cache.bytes == 200
+    assert cache.stats["evictions"] == 1
@@ -0,0 +1,320 @@
+"""
+Tonality Audio Preprocessing
+Turns a call recording into short agent-only clips for the audio model, instead
+of uploading the whole file in one request (which failed past the 25MB API
+limit and left nothing to run in parallel).
+
+- Recordings are decoded locally to 16kHz mono PCM (plain WAV in-process,
+  anything else through the shared ffmpeg transcoder). Calls are recorded
+  dual-channel, so only the agent's leg (TONALITY_AGENT_CHANNEL) is kept: the
+  caller is neither in the clips nor picked up as the first-voice anchor
+- Agent turns are located from transcript timestamps, anchored to the first
+  voiced frame of the recording (the greeting), so ringing time before answer
+  doesn't shift every turn; each turn runs until the next transcript entry and
+  is capped at TONALITY_SEGMENT_MAX_SECONDS
+- Each clip has its leading/trailing silence dropped and long pauses shortened,
+  then is re-encoded as low-bitrate mono MP3 (WAV when ffmpeg is unavailable)
+- At most TONALITY_MAX_SEGMENTS clips per call, spread evenly over it
+- Without usable timestamps the trimmed recording is cut into fixed windows
+"""
+import asyncio
+import io
+import logging
+import os
+import wave
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_resampler import resample_audio_poly
+from audio_transcoder import TranscodeError, audio_transcoder
+
+logger = logging.getLogger(__name__)
+
+TONALITY_SAMPLE_RATE = int(os.environ.get("TONALITY_SAMPLE_RATE", "16000"))
+TONALITY_SEGMENT_CODEC = os.environ.get("TONALITY_SEGMENT_CODEC", "mp3")
+TONALITY_SEGMENT_BITRATE = os.environ.get("TONALITY_SEGMENT_BITRATE", "32k")
+TONALITY_SEGMENT_MAX_SECONDS = float(os.environ.get("TONALITY_SEGMENT_MAX_SECONDS", "30"))
+TONALITY_SEGMENT_MIN_SECONDS = 0.8
+TONALITY_MAX_SEGMENTS = int(os.environ.get("TONALITY_MAX_SEGMENTS", "12"))
+
+# Channel of a dual-channel recording that carries the agent (0 = left, 1 = right)
+TONALITY_AGENT_CHANNEL = int(os.environ.get("TONALITY_AGENT_CHANNEL", "1"))
+
+# Silence detection on 20ms frames; pauses longer than MAX_PAUSE_MS are shortened to it
+SILENCE_FRAME_MS = 20
+SILENCE_THRESHOLD_DBFS = float(os.environ.get("TONALITY_SILENCE_DBFS", "-40"))
+MAX_PAUSE_MS = 400
+
+AGENT_ROLES = ("assistant", "agent")
+
+
+@dataclass
+class TonalitySegment:
+    """One clip sent to the audio model"""
+    index: int
+    start: float                      # seconds into the recording
+    end: float
+    audio: bytes
+    audio_format: str
+    speech_seconds: float             # clip length after silence trimming
+    turn_index: Optional[int] = None  # transcript index of the agent turn (None for fixed windows)
+    text: str = ""
+
+    def describe(self) -> Dict:
+        return {
+            "index": self.index, "turn_index": self.turn_index,
+            "start": round(self.start, 2), "end": round(self.end, 2),
+            "speech_seconds": round(self.speech_seconds, 2), "bytes": len(self.audio),
+            "format": self.audio_format,
+        }
+
+
+def decode_wav(data: bytes, channel: Optional[int] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    16-bit PCM WAV → (mono int16 samples, sample rate); None if ffmpeg is needed
+
+    Multi-channel audio keeps only `channel` when given (mixed down otherwise)
+    """
+    if data[:4] != b"RIFF":
+        return None
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+                return None
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    samples = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)
+        if channel is not None and channel < channels:
+            samples = np.ascontiguousarray(samples[:, channel])
+        else:
+            samples = samples.mean(axis=1).astype(np.int16)
+    return samples, sample_rate
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def voiced_frames(samples: np.ndarray, sample_rate: int, threshold_dbfs: float = SILENCE_THRESHOLD_DBFS) -> np.ndarray:
+    """Boolean mask over SILENCE_FRAME_MS frames: True where the frame's RMS is above the threshold"""
+    frame = max(1, sample_rate * SILENCE_FRAME_MS // 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+    frames = samples[: count * frame].astype(np.float64).reshape(count, frame)
+    rms = np.sqrt((frames ** 2).mean(axis=1))
+    threshold = 32768.0 * 10 ** (threshold_dbfs / 20)
+    return rms > threshold
+
+
+def first_voice_seconds(samples: np.ndarray, sample_rate: int) -> Optional[float]:
+    mask = voiced_frames(samples, sample_rate)
+    hits = np.flatnonzero(mask)
+    return float(hits[0]) * SILENCE_FRAME_MS / 1000 if len(hits) else None
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, max_pause_ms: int = MAX_PAUSE_MS) -> np.ndarray:
+    """Drop leading/trailing silence and shorten pauses longer than max_pause_ms"""
+    mask = voiced_frames(samples, sample_rate)
+    hits = np.flatnonzero(mask)
+    if not len(hits):
+        return samples[:0]
+    frame = max(1, sample_rate * SILENCE_FRAME_MS // 1000)
+    max_pause = max(1, max_pause_ms // SILENCE_FRAME_MS)
+    keep = []
+    silent_run = 0
+    for i in range(hits[0], hits[-1] + 1):
+        if mask[i]:
+            silent_run = 0
+        else:
+            silent_run += 1
+            if silent_run > max_pause:
+                continue
+        keep.append(i)
+    return samples[: len(mask) * frame].reshape(len(mask), frame)[keep].reshape(-1)
+
+
+def to_datetime(value) -> Optional[datetime]:
+    """Transcript timestamps are datetimes or ISO strings depending on the writer"""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def agent_turn_spans(
+    transcript: Optional[List[Dict]],
+    duration: float,
+    anchor: float = 0.0,
+    max_seconds: float = TONALITY_SEGMENT_MAX_SECONDS,
+    min_seconds: float = TONALITY_SEGMENT_MIN_SECONDS,
+) -> List[Tuple[int, float, float, str]]:
+    """
+    (transcript index, start, end, text) of every agent turn, in recording seconds
+
+    The first timestamped entry is placed at `anchor` (the first voiced frame);
+    a turn ends at the next entry's timestamp, the recording's end or after
+    max_seconds, whichever comes first.
+    """
+    stamped = [(i, to_datetime(t.get("timestamp"))) for i, t in enumerate(transcript or [])]
+    stamped = [(i, ts) for i, ts in stamped if ts is not None]
+    if not stamped:
+        return []
+    origin = stamped[0][1]
+    offsets = [(i, anchor + (ts - origin).total_seconds()) for i, ts in stamped]
+    spans = []
+    for n, (i, start) in enumerate(offsets):
+        if (transcript[i].get("role") or "").lower() not in AGENT_ROLES:
+            continue
+        next_start = offsets[n + 1][1] if n + 1 < len(offsets) else duration
+        start = max(0.0, start)
+        end = min(next_start, duration, start + max_seconds)
+        if end - start >= min_seconds:
+            spans.append((i, start, end, transcript[i].get("text", "")))
+    return spans
+
+
+def fixed_windows(duration: float, window: float = TONALITY_SEGMENT_MAX_SECONDS) -> List[Tuple[None, float, float, str]]:
+    spans, start = [], 0.0
+    while start < duration:
+        spans.append((None, start, min(duration, start + window), ""))
+        start += window
+    return spans
+
+
+def spread(spans: List, limit: int) -> List:
+    """Keep at most `limit` spans, evenly spaced over the call (first and last included)"""
+    if len(spans) <= limit:
+        return spans
+    if limit <= 1:
+        return spans[:limit]
+    step = (len(spans) - 1) / (limit - 1)
+    return [spans[round(k * step)] for k in range(limit)]
+
+
+class TonalityPreprocessor:
+    """
+    Decodes, segments, trims and re-encodes recordings for tonality analysis
+    """
+
+    def __init__(
+        self,
+        transcoder=None,
+        sample_rate: int = TONALITY_SAMPLE_RATE,
+        codec: str = TONALITY_SEGMENT_CODEC,
+        bitrate: str = TONALITY_SEGMENT_BITRATE,
+        max_segments: int = TONALITY_MAX_SEGMENTS,
+        agent_channel: Optional[int] = TONALITY_AGENT_CHANNEL,
+    ):
+        self.transcoder = transcoder or audio_transcoder
+        self.agent_channel = agent_channel
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.bitrate = bitrate
+        self.max_segments = max_segments
+        self.stats = {"recordings": 0, "segments": 0, "bytes_in": 0, "bytes_out": 0,
+                      "windowed": 0, "wav_fallbacks": 0}
+
+    async def decode(self, audio_bytes: bytes) -> np.ndarray:
+        """Recording → mono int16 samples of the agent's leg at self.sample_rate (raises TranscodeError)"""
+        decoded = decode_wav(audio_bytes, channel=self.agent_channel)
+        if decoded is not None:
+            samples, rate = decoded
+            if rate == self.sample_rate:
+                return samples
+            pcm = await asyncio.to_thread(resample_audio_poly, samples.tobytes(), rate, self.sample_rate)
+            return np.frombuffer(pcm, dtype=np.int16)
+        # Two output channels either way (mono input is duplicated), then keep the agent's
+        channels = 1 if self.agent_channel is None else 2
+        pcm = await self.transcoder.run_ffmpeg(
+            audio_bytes, [], ["-ar", str(self.sample_rate), "-ac", str(channels), "-f", "s16le"],
+            label="tonality_decode", timeout=60.0
+        )
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if channels == 1:
+            return samples
+        samples = samples[: len(samples) - len(samples) % 2].reshape(-1, 2)
+        return np.ascontiguousarray(samples[:, min(self.agent_channel, 1)])
+
+    def cut(self, samples: np.ndarray, transcript: Optional[List[Dict]]) -> List[Tuple]:
+        """Agent-turn spans with their trimmed samples (fixed windows without timestamps)"""
+        duration = len(samples) / self.sample_rate
+        anchor = first_voice_seconds(samples, self.sample_rate)
+        if anchor is None:
+            return []
+        spans = agent_turn_spans(transcript, duration, anchor=anchor)
+        if not spans:
+            self.stats["windowed"] += 1
+            spans = fixed_windows(duration)
+        clips = []
+        for turn_index, start, end, text in spans:
+            clip = trim_silence(samples[int(start * self.sample_rate): int(end * self.sample_rate)], self.sample_rate)
+            if len(clip) >= TONALITY_SEGMENT_MIN_SECONDS * self.sample_rate:
+                clips.append((turn_index, start, end, text, clip))
+        return spread(clips, self.max_segments)
+
+    async def encode(self, clip: np.ndarray) -> Tuple[bytes, str]:
+        if self.codec == "mp3":
+            try:
+                audio = await self.transcoder.pcm_to_mp3(
+                    clip.tobytes(), sample_rate=self.sample_rate, bitrate=self.bitrate, label="tonality_encode"
+                )
+                return audio, "mp3"
+            except TranscodeError as e:
+                if not self.stats["wav_fallbacks"]:
+                    logger.warning(f"⚠️ Tonality clips fall back to WAV (MP3 encode failed: {e})")
+                self.stats["wav_fallbacks"] += 1
+        return encode_wav(clip, self.sample_rate), "wav"
+
+    async def prepare(self, audio_bytes: bytes, transcript: Optional[List[Dict]] = None) -> List[TonalitySegment]:
+        """
+        Recording → agent-only clips ready for upload
+
+        Raises:
+            TranscodeError if the recording can't be decoded
+        """
+        samples = await self.decode(audio_bytes)
+        clips = await asyncio.to_thread(self.cut, samples, transcript)
+        segments = []
+        for index, (turn_index, start, end, text, clip) in enumerate(clips):
+            audio, audio_format = await self.encode(clip)
+            segments.append(TonalitySegment(
+                index=index, start=start, end=end, audio=audio, audio_format=audio_format,
+                speech_seconds=len(clip) / self.sample_rate, turn_index=turn_index, text=text,
+            ))
+        self.stats["recordings"] += 1
+        self.stats["segments"] += len(segments)
+        self.stats["bytes_in"] += len(audio_bytes)
+        self.stats["bytes_out"] += sum(len(s.audio) for s in segments)
+        logger.info(
+            f"🎧 Tonality preprocessing: {len(audio_bytes)} bytes → {len(segments)} clips, "
+            f"{sum(len(s.audio) for s in segments)} bytes"
+        )
+        return segments
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
+
+
+# Global tonality preprocessor instance
+tonality_preprocessor = TonalityPreprocessor()
@@ -0,0 +1,460 @@
+"""
+ElevenLabs Multi-Context TTS Multiplexer
+Shares a small pool of ElevenLabs multi-stream-input WebSockets across many calls.
+Each call owns a context_id on a shared connection and returned audio is routed
+back to the owning call by contextId, so 300 calls no longer need 300 sockets,
+300 keep-alive tasks and 300 receiver loops.
+
+Enable with ELEVENLABS_TTS_MULTIPLEX=true (falls back to dedicated sockets otherwise)
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# Base URL is configurable so the multiplexer can be pointed at a local fake server
+ELEVENLABS_WS_BASE_URL = os.environ.get("ELEVENLABS_WS_BASE_URL", "wss://api.elevenlabs.io")
+
+# ElevenLabs caps concurrent contexts per multi-context connection
+MAX_CONTEXTS_PER_CONNECTION = int(os.environ.get("ELEVENLABS_MUX_MAX_CONTEXTS", "5"))
+
+# Seconds ElevenLabs waits for text on a context before closing it (max 180)
+INACTIVITY_TIMEOUT = int(os.environ.get("ELEVENLABS_MUX_INACTIVITY_TIMEOUT", "180"))
+
+# One keep-alive loop per shared connection (not per call)
+KEEPALIVE_INTERVAL = 15.0
+
+# Close a shared connection once it has had no contexts for this long
+IDLE_CONNECTION_TTL = 60.0
+
+# Audio handler signature: handler(audio_bytes, is_final)
+AudioHandler = Callable[[Optional[bytes], bool], None]
+
+
+def is_multiplex_enabled() -> bool:
+    """Check if shared multi-context TTS connections are enabled"""
+    return os.environ.get("ELEVENLABS_TTS_MULTIPLEX", "false").lower() == "true"
+
+
+class _ContextState:
+    """Routing entry for one context on a shared connection"""
+
+    def __init__(self, handler: AudioHandler, voice_settings: Optional[dict]):
+        self.handler = handler
+        self.voice_settings = voice_settings
+        self.initialized = False
+        self.last_activity = time.time()
+
+
+class MultiplexedConnection:
+    """
+    One ElevenLabs multi-stream-input WebSocket shared by several calls
+    Voice, model and output format are fixed per connection (they live in the URL)
+    """
+
+    def __init__(self, api_key: str, voice_id: str, model_id: str, output_format: str):
+        self.api_key = api_key
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.output_format = output_format
+        self.websocket = None
+        self.connected = False
+        self.contexts: Dict[str, _ContextState] = {}
+        self.empty_since: Optional[float] = time.time()
+        self._send_lock = asyncio.Lock()
+        self._receiver_task: Optional[asyncio.Task] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.chunks_routed = 0
+        self.chunks_dropped = 0
+
+    @property
+    def uri(self) -> str:
+        return (
+            f"{ELEVENLABS_WS_BASE_URL}/v1/text-to-speech/{self.voice_id}/multi-stream-input"
+            f"?model_id={self.model_id}&output_format={self.output_format}"
+            f"&inactivity_timeout={INACTIVITY_TIMEOUT}&enable_ssml_parsing=true"
+        )
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.connected and len(self.contexts) < MAX_CONTEXTS_PER_CONNECTION
+
+    async def connect(self) -> bool:
+        """Open the shared socket and start its receiver and keep-alive loops"""
+        try:
+            logger.info(f"🔌 [TTS Mux] Opening shared ElevenLabs connection: voice={self.voice_id}, model={self.model_id}")
+            self.websocket = await websockets.connect(
+                self.uri,
+                extra_headers={"xi-api-key": self.api_key},
+                ping_interval=20,
+                ping_timeout=10
+            )
+            self.connected = True
+            self._receiver_task = asyncio.create_task(self._receiver_loop())
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+            logger.info(f"✅ [TTS Mux] Shared connection ready ({self.uri.split('?')[0]})")
+            return True
+        except Exception as e:
+            logger.error(f"❌ [TTS Mux] Failed to open shared connection: {e}")
+            self.connected = False
+            return False
+
+    def register(self, context_id: str, handler: AudioHandler, voice_settings: Optional[dict]):
+        """Route audio for context_id to handler (context is created lazily on first text)"""
+        self.contexts[context_id] = _ContextState(handler, voice_settings)
+        self.empty_since = None
+
+    def unregister(self, context_id: str) -> bool:
+        """Stop routing audio for context_id. Late audio for it is dropped."""
+        removed = self.contexts.pop(context_id, None) is not None
+        if not self.contexts and self.empty_since is None:
+            self.empty_since = time.time()
+        return removed
+
+    async def _send(self, message: dict) -> bool:
+        if not self.connected or not self.websocket:
+            return False
+        try:
+            async with self._send_lock:
+                await self.websocket.send(json.dumps(message))
+            return True
+        except Exception as e:
+            logger.error(f"❌ [TTS Mux] Send failed, marking connection dead: {e}")
+            self.connected = False
+            return False
+
+    async def send_text(
+        self,
+        context_id: str,
+        text: str,
+        try_trigger_generation: bool = True,
+        flush: bool = False,
+        voice_settings: Optional[Dict] = None
+    ) -> bool:
+        """Send text for a context. The first message of a context carries its voice settings."""
+        state = self.contexts.get(context_id)
+        if state is None:
+            logger.warning(f"⚠️ [TTS Mux] send_text for unknown context {context_id}")
+            return False
+
+        message = {"text": text, "context_id": context_id}
+        if not state.initialized:
+            if state.voice_settings:
+                message["voice_settings"] = state.voice_settings
+            message["generation_config"] = {"chunk_length_schedule": [120, 160, 250, 290]}
+            state.initialized = True
+        if voice_settings:
+            message["voice_settings"] = voice_settings
+        if try_trigger_generation and text:
+            message["try_trigger_generation"] = True
+        if flush:
+            message["flush"] = True
+
+        state.last_activity = time.time()
+        return await self._send(message)
+
+    async def close_context(self, context_id: str) -> bool:
+        """Stop generation for a context server-side and drop any audio still in flight"""
+        state = self.contexts.get(context_id)
+        self.unregister(context_id)
+        if state is None or not state.initialized:
+            # Nothing was ever sent on this context, ElevenLabs doesn't know about it
+            return True
+        return await self._send({"context_id": context_id, "close_context": True})
+
+    async def _receiver_loop(self):
+        """Single receiver for all contexts on this socket, routes by contextId"""
+        try:
+            async for message in self.websocket:
+                try:
+                    data = json.loads(message)
+                except json.JSONDecodeError as e:
+                    logger.error(f"❌ [TTS Mux] Invalid JSON from ElevenLabs: {e}")
+                    continue
+
+                context_id = data.get("contextId") or data.get("context_id")
+                state = self.contexts.get(context_id) if context_id else None
+
+                if data.get("audio"):
+                    if state is None:
+                        # Cancelled (barge-in) or released context - discard
+                        self.chunks_dropped += 1
+                        continue
+                    self.chunks_routed += 1
+                    state.last_activity = time.time()
+                    try:
+                        state.handler(base64.b64decode(data["audio"]), False)
+                    except Exception as e:
+                        logger.error(f"❌ [TTS Mux] Audio handler error for context {context_id}: {e}")
+
+                if data.get("isFinal") and state is not None:
+                    try:
+                        state.handler(None, True)
+                    except Exception as e:
+                        logger.error(f"❌ [TTS Mux] Final handler error for context {context_id}: {e}")
+
+                if "error" in data:
+                    logger.debug(f"📍 [TTS Mux] ElevenLabs signal for {context_id}: {data.get('error')}")
+
+        except asyncio.CancelledError:
+            pass
+        except websockets.exceptions.ConnectionClosed as e:
+            logger.warning(f"⚠️ [TTS Mux] Shared connection closed: {e}")
+        except Exception as e:
+            logger.error(f"❌ [TTS Mux] Receiver loop crashed: {e}")
+        finally:
+            self.connected = False
+
+    async def _keepalive_loop(self):
+        """
+        Keep idle contexts alive (ElevenLabs closes contexts that receive no text)
+        Also closes the socket once nobody has used it for IDLE_CONNECTION_TTL
+        """
+        try:
+            while self.connected:
+                await asyncio.sleep(KEEPALIVE_INTERVAL)
+                if not self.connected:
+                    break
+
+                if self.empty_since and time.time() - self.empty_since > IDLE_CONNECTION_TTL:
+                    logger.info(f"💤 [TTS Mux] Closing idle shared connection (voice={self.voice_id})")
+                    await self.close()
+                    break
+
+                now = time.time()
+                for context_id, state in list(self.contexts.items()):
+                    if state.initialized and now - state.last_activity >= KEEPALIVE_INTERVAL:
+                        # Empty text keeps a multi-context alive without generating audio
+                        await self._send({"text": "", "context_id": context_id})
+                        state.last_activity = now
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ [TTS Mux] Keep-alive loop error: {e}")
+
+    async def close(self):
+        """Close the shared socket"""
+        self.connected = False
+        if self._keepalive_task and self._keepalive_task is not asyncio.current_task():
+            self._keepalive_task.cancel()
+        if self.websocket:
+            try:
+                await self.websocket.send(json.dumps({"close_socket": True}))
+            except Exception:
+                pass
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+        if self._receiver_task:
+            self._receiver_task.cancel()
+        self.contexts.clear()
+
+
+class MultiplexedTTSContext:
+    """
+    A call's handle on a shared connection
+    Duck-types ElevenLabsWebSocketService (connected/send_text/close) so
+    PersistentTTSSession.stream_sentence works unchanged
+    """
+
+    def __init__(
+        self,
+        multiplexer: "ElevenLabsTTSMultiplexer",
+        connection: MultiplexedConnection,
+        owner_id: str,
+        handler: AudioHandler,
+        voice_settings: Optional[dict]
+    ):
+        self.multiplexer = multiplexer
+        self.connection = connection
+        self.owner_id = owner_id
+        self.handler = handler
+        self.voice_settings = voice_settings
+        self.generation = 0
+        self.context_id = self._next_context_id()
+        self.closed = False
+        connection.register(self.context_id, handler, voice_settings)
+
+    def _next_context_id(self) -> str:
+        self.generation += 1
+        return f"{self.owner_id[:24]}-{self.generation}-{uuid.uuid4().hex[:6]}"
+
+    @property
+    def connected(self) -> bool:
+        return not self.closed and self.connection.connected
+
+    async def send_text(
+        self,
+        text: str,
+        voice_settings: Optional[Dict] = None,
+        try_trigger_generation: bool = True,
+        flush: bool = False
+    ) -> bool:
+        if not self.connected:
+            return False
+        return await self.connection.send_text(
+            self.context_id,
+            text,
+            try_trigger_generation=try_trigger_generation,
+            flush=flush,
+            voice_settings=voice_settings
+        )
+
+    async def flush(self) -> bool:
+        """Flush buffered text for this context only"""
+        return await self.send_text("", try_trigger_generation=False, flush=True)
+
+    def cancel_nowait(self) -> Optional[asyncio.Task]:
+        """
+        Barge-in: stop routing the current context immediately and rotate to a fresh one.
+        The close_context message is sent in the background.
+        """
+        old_context_id = self.context_id
+        old_state = self.connection.contexts.get(old_context_id)
+        self.connection.unregister(old_context_id)
+
+        self.context_id = self._next_context_id()
+        if not self.closed:
+            self.connection.register(self.context_id, self.handler, self.voice_settings)
+
+        if old_state is not None and old_state.initialized and self.connection.connected:
+            return asyncio.create_task(
+                self.connection._send({"context_id": old_context_id, "close_context": True})
+            )
+        return None
+
+    async def cancel(self) -> bool:
+        """Barge-in: cancel generation of the current context and rotate to a fresh one"""
+        task = self.cancel_nowait()
+        if task:
+            return await task
+        return True
+
+    async def close(self):
+        """Release this context back to the multiplexer"""
+        if self.closed:
+            return
+        self.closed = True
+        await self.multiplexer.release(self)
+
+
+class ElevenLabsTTSMultiplexer:
+    """
+    Pool of shared multi-context connections keyed by (api key, voice, model, output format)
+    """
+
+    def __init__(self):
+        self.pools: Dict[Tuple[str, str, str, str], List[MultiplexedConnection]] = {}
+        self._lock = asyncio.Lock()
+        self._connecting: Dict[Tuple[str, str, str, str], asyncio.Task] = {}
+        self.contexts_opened = 0
+        self.connections_opened = 0
+
+    @staticmethod
+    def _pool_key(api_key: str, voice_id: str, model_id: str, output_format: str) -> Tuple[str, str, str, str]:
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        return (key_hash, voice_id, model_id, output_format)
+
+    async def open_context(
+        self,
+        owner_id: str,
+        api_key: str,
+        voice_id: str,
+        handler: AudioHandler,
+        model_id: str = "eleven_flash_v2_5",
+        output_format: str = "ulaw_8000",
+        voice_settings: Optional[dict] = None
+    ) -> Optional[MultiplexedTTSContext]:
+        """
+        Attach a call to a shared connection with spare capacity (opening one if needed)
+
+        Returns:
+            MultiplexedTTSContext or None if no connection could be established
+        """
+        key = self._pool_key(api_key, voice_id, model_id, output_format)
+
+        while True:
+            async with self._lock:
+                pool = self.pools.setdefault(key, [])
+                # Drop dead connections
+                pool[:] = [c for c in pool if c.connected]
+
+                connection = next((c for c in pool if c.has_capacity), None)
+                if connection is not None:
+                    context = MultiplexedTTSContext(self, connection, owner_id, handler, voice_settings)
+                    self.contexts_opened += 1
+                    break
+
+                # One handshake per pool key; concurrent opens for the same voice wait on it
+                pending = self._connecting.get(key)
+                if pending is None:
+                    connection = MultiplexedConnection(api_key, voice_id, model_id, output_format)
+                    pending = asyncio.create_task(self._connect(key, connection))
+                    self._connecting[key] = pending
+
+            # The handshake runs outside the lock so it never stalls other voices' opens
+            if not await asyncio.shield(pending):
+                return None
+
+        logger.info(
+            f"🔀 [TTS Mux] Call {owner_id[:20]}... → context {context.context_id} "
+            f"({len(connection.contexts)}/{MAX_CONTEXTS_PER_CONNECTION} on connection, {len(pool)} connections for voice)"
+        )
+        return context
+
+    async def _connect(self, key: Tuple[str, str, str, str], connection: MultiplexedConnection) -> bool:
+        """Open a new shared connection and publish it to its pool once it is ready"""
+        try:
+            connected = await connection.connect()
+        finally:
+            async with self._lock:
+                self._connecting.pop(key, None)
+                if connection.connected:
+                    self.pools.setdefault(key, []).append(connection)
+                    self.connections_opened += 1
+        return connected
+
+    async def release(self, context: MultiplexedTTSContext):
+        """Close a call's context; the shared connection stays up for other calls"""
+        try:
+            await context.connection.close_context(context.context_id)
+        except Exception as e:
+            logger.debug(f"[TTS Mux] close_context on release failed: {e}")
+        logger.info(f"🔀 [TTS Mux] Released context for call {context.owner_id[:20]}...")
+
+    def get_stats(self) -> dict:
+        """Connection/context counts and routing counters"""
+        connections = [c for pool in self.pools.values() for c in pool]
+        return {
+            "enabled": is_multiplex_enabled(),
+            "connections": sum(1 for c in connections if c.connected),
+            "active_contexts": sum(len(c.contexts) for c in connections),
+            "max_contexts_per_connection": MAX_CONTEXTS_PER_CONNECTION,
+            "connections_opened": self.connections_opened,
+            "contexts_opened": self.contexts_opened,
+            "chunks_routed": sum(c.chunks_routed for c in connections),
+            "chunks_dropped": sum(c.chunks_dropped for c in connections),
+        }
+
+    async def close_all(self):
+        """Close every shared connection (server shutdown)"""
+        for pool in self.pools.values():
+            for connection in pool:
+                await connection.close()
+        self.pools.clear()
+
+
+# Global multiplexer instance
+tts_multiplexer = ElevenLabsTTSMultiplexer()
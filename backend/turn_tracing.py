@@ -0,0 +1,340 @@
+"""
+Per-Turn Latency Tracing
+Structured spans for every conversational turn instead of the ad-hoc
+`latency_tracker` dict and log strings parsed after the fact.
+
+Stages are marked by call id from wherever they happen (Soniox handler,
+CallSession, PersistentTTSSession) - the first mark of a stage wins, so retries
+and later sentences don't overwrite the turn's "first" timestamps:
+
+    user_audio_end → stt_final → llm_request → llm_first_token → llm_complete
+                                 tts_request → tts_first_byte → first_audio_sent
+
+finish_turn() is called once the response text is out; the turn is closed when
+its first audio has been sent (or on the call's next turn / call end), so the
+response and e2e spans of short turns aren't lost.
+
+Finished turns are:
+- folded into in-memory histograms exposed as Prometheus text on /metrics
+- buffered and written in batches to the `turn_metrics` collection
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Batched writes to turn_metrics
+TURN_METRICS_BATCH_SIZE = int(os.environ.get("TURN_METRICS_BATCH_SIZE", "50"))
+TURN_METRICS_FLUSH_INTERVAL = float(os.environ.get("TURN_METRICS_FLUSH_INTERVAL", "5"))
+TURN_METRICS_MAX_BUFFER = int(os.environ.get("TURN_METRICS_MAX_BUFFER", "5000"))
+
+# Turns never finished (call dropped mid-turn) are discarded after this many seconds
+TURN_TTL_SECONDS = 120
+
+# Histogram buckets (ms)
+LATENCY_BUCKETS_MS = [50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+
+# Rolling window used for the recent-percentile gauges
+RECENT_WINDOW = 1000
+RECENT_QUANTILES = [0.5, 0.9, 0.95, 0.99]
+
+# Derived span name → (start stage, end stage)
+SPANS = {
+    "stt": ("user_audio_end", "stt_final"),
+    "llm_ttft": ("llm_request", "llm_first_token"),
+    "llm_total": ("llm_request", "llm_complete"),
+    "tts_ttfb": ("tts_request", "tts_first_byte"),
+    "response": ("stt_final", "first_audio_sent"),
+    "e2e": ("user_audio_end", "first_audio_sent"),
+    # How far ahead of the STT endpoint an early (VAD-triggered) response started
+    "early_lead": ("early_start", "stt_final"),
+}
+
+
+class TurnTrace:
+    """Timestamps (time.time()) for one user turn"""
+
+    def __init__(self, call_id: str, turn_index: int, **fields):
+        self.call_id = call_id
+        self.turn_index = turn_index
+        self.fields = fields
+        self.marks: Dict[str, float] = {}
+        self.created_at = time.time()
+        self.finish_fields: Optional[dict] = None   # set by finish_turn(), closed on first audio
+
+    def mark(self, stage: str, ts: Optional[float] = None):
+        if stage not in self.marks:
+            self.marks[stage] = ts if ts is not None else time.time()
+
+    def span_ms(self, span: str) -> Optional[int]:
+        start_stage, end_stage = SPANS[span]
+        start, end = self.marks.get(start_stage), self.marks.get(end_stage)
+        if start is None or end is None or end < start:
+            return None
+        return int(round((end - start) * 1000))
+
+    def spans(self) -> Dict[str, int]:
+        return {span: ms for span in SPANS if (ms := self.span_ms(span)) is not None}
+
+
+class _Histogram:
+    """Cumulative Prometheus-style histogram plus a recent window for percentiles"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[int] = deque(maxlen=RECENT_WINDOW)
+
+    def observe(self, value_ms: int):
+        self.count += 1
+        self.total += value_ms
+        self.recent.append(value_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value_ms <= bound:
+                self.bucket_counts[i] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return float(ordered[min(int(q * len(ordered)), len(ordered) - 1)])
+
+
+class TurnTracer:
+    """
+    Tracks the active turn per call, aggregates histograms, batches turn_metrics writes
+    """
+
+    def __init__(self):
+        self.active: Dict[str, TurnTrace] = {}
+        self.turn_counters: Dict[str, int] = {}
+        self.histograms: Dict[str, _Histogram] = {span: _Histogram() for span in SPANS}
+        self.turns_total = 0
+        self.dropped_total = 0
+        self.written_total = 0
+        self._buffer: List[dict] = []
+        self._db = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_event: Optional[asyncio.Event] = None
+
+    # ── Span API ────────────────────────────────────────────────────
+
+    def start_turn(self, call_id: str, **fields) -> TurnTrace:
+        """
+        Begin a new turn for the call. A previous turn already finished is closed
+        without its first audio; one never finished (no response) is discarded.
+
+        Args:
+            call_id: Telnyx call_control_id
+            fields: Extra document fields (user_id, agent_id, ...) and
+                    initial marks passed as `<stage>=<timestamp>`
+        """
+        marks = {k: fields.pop(k) for k in list(fields) if k in _STAGES}
+        index = self.turn_counters.get(call_id, 0) + 1
+        self.turn_counters[call_id] = index
+        self._close_finished(call_id)
+        trace = TurnTrace(call_id, index, **fields)
+        for stage, ts in marks.items():
+            if ts:
+                trace.mark(stage, ts)
+        self.active[call_id] = trace
+        return trace
+
+    def mark(self, call_id: str, stage: str, ts: Optional[float] = None):
+        """Record a stage on the call's active turn (no-op if no turn is open)"""
+        trace = self.active.get(call_id)
+        if trace is not None:
+            trace.mark(stage, ts)
+            if stage == "first_audio_sent" and trace.finish_fields is not None:
+                self._close(call_id)
+
+    def current(self, call_id: str) -> Optional[TurnTrace]:
+        return self.active.get(call_id)
+
+    def finish_turn(self, call_id: str, **fields) -> Optional[dict]:
+        """
+        The response for the active turn has been handed to TTS. The turn is closed
+        now if its first audio is already out, otherwise on the first_audio_sent mark.
+
+        Returns:
+            The turn_metrics document if the turn was closed now, else None
+        """
+        trace = self.active.get(call_id)
+        if trace is None:
+            return None
+        trace.finish_fields = fields
+        if "first_audio_sent" in trace.marks:
+            return self._close(call_id)
+        return None
+
+    def _close_finished(self, call_id: str):
+        trace = self.active.get(call_id)
+        if trace is not None and trace.finish_fields is not None:
+            self._close(call_id)
+
+    def _close(self, call_id: str) -> Optional[dict]:
+        """Fold the turn into histograms and queue it for turn_metrics"""
+        trace = self.active.pop(call_id, None)
+        if trace is None:
+            return None
+        fields = dict(trace.finish_fields or {})
+
+        spans = trace.spans()
+        for span, ms in spans.items():
+            self.histograms[span].observe(ms)
+        self.turns_total += 1
+
+        t0 = trace.marks.get("user_audio_end") or trace.marks.get("stt_final") or trace.created_at
+        latency = {f"{span}_ms": ms for span, ms in spans.items()}
+        # Field names understood by QC's parse_logs_array_for_latency
+        if "e2e" in spans:
+            latency["dead_air_ms"] = spans["e2e"]
+        if "llm_total" in spans:
+            latency["llm_ms"] = spans["llm_total"]
+        if "tts_ttfb" in spans:
+            latency["tts_first_chunk_ms"] = spans["tts_ttfb"]
+        for key in ("transition_ms", "kb_ms"):
+            if key in fields:
+                latency[key] = fields.pop(key)
+
+        doc = {
+            "id": str(uuid.uuid4()),
+            "call_id": call_id,
+            "turn_index": trace.turn_index,
+            "type": "turn_complete",
+            "started_at": datetime.utcfromtimestamp(t0),
+            **trace.fields,
+            **fields,
+            "latency": latency,
+            "marks": {stage: int(round((ts - t0) * 1000)) for stage, ts in trace.marks.items()},
+        }
+        self._enqueue(doc)
+        return doc
+
+    def end_call(self, call_id: str):
+        """Close a finished turn still waiting for audio and forget per-call state (call ended)"""
+        self._close_finished(call_id)
+        self.active.pop(call_id, None)
+        self.turn_counters.pop(call_id, None)
+
+    # ── Persistence ─────────────────────────────────────────────────
+
+    def _enqueue(self, doc: dict):
+        if len(self._buffer) >= TURN_METRICS_MAX_BUFFER:
+            self._buffer.pop(0)
+            self.dropped_total += 1
+        self._buffer.append(doc)
+        if len(self._buffer) >= TURN_METRICS_BATCH_SIZE and self._flush_event is not None:
+            self._flush_event.set()
+
+    async def flush(self):
+        """Write buffered turns with one insert_many"""
+        if not self._buffer or self._db is None:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await self._db.turn_metrics.insert_many(batch, ordered=False)
+            self.written_total += len(batch)
+        except Exception as e:
+            self.dropped_total += len(batch)
+            logger.error(f"❌ Failed to write {len(batch)} turn_metrics docs: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=TURN_METRICS_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            self._expire_stale_turns()
+            await self.flush()
+
+    def _expire_stale_turns(self):
+        cutoff = time.time() - TURN_TTL_SECONDS
+        for call_id in [cid for cid, t in self.active.items() if t.created_at < cutoff]:
+            self._close_finished(call_id)
+            self.active.pop(call_id, None)
+
+    async def start(self, db):
+        """Bind the database, ensure indexes and start the batch writer (server startup)"""
+        self._db = db
+        self._flush_event = asyncio.Event()
+        try:
+            await db.turn_metrics.create_index([("call_id", 1), ("turn_index", 1)])
+            await db.turn_metrics.create_index([("user_id", 1), ("started_at", -1)])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create turn_metrics indexes: {e}")
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("📊 Turn tracer started (batch writes to turn_metrics)")
+
+    async def stop(self):
+        """Flush remaining turns and stop the writer (server shutdown)"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # ── Export ──────────────────────────────────────────────────────
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition (this worker's turns)"""
+        lines = [
+            "# HELP virevo_turn_latency_ms Per-turn latency spans in milliseconds",
+            "# TYPE virevo_turn_latency_ms histogram",
+        ]
+        for span, hist in self.histograms.items():
+            for bound, count in zip(LATENCY_BUCKETS_MS, hist.bucket_counts):
+                lines.append(f'virevo_turn_latency_ms_bucket{{span="{span}",le="{bound}"}} {count}')
+            lines.append(f'virevo_turn_latency_ms_bucket{{span="{span}",le="+Inf"}} {hist.count}')
+            lines.append(f'virevo_turn_latency_ms_sum{{span="{span}"}} {hist.total:.0f}')
+            lines.append(f'virevo_turn_latency_ms_count{{span="{span}"}} {hist.count}')
+
+        lines.append(f"# HELP virevo_turn_latency_recent_ms Percentiles over the last {RECENT_WINDOW} turns")
+        lines.append("# TYPE virevo_turn_latency_recent_ms gauge")
+        for span, hist in self.histograms.items():
+            for q in RECENT_QUANTILES:
+                value = hist.quantile(q)
+                if value is not None:
+                    lines.append(f'virevo_turn_latency_recent_ms{{span="{span}",quantile="{q}"}} {value:.0f}')
+
+        lines += [
+            "# HELP virevo_turns_total Turns traced",
+            "# TYPE virevo_turns_total counter",
+            f"virevo_turns_total {self.turns_total}",
+            "# HELP virevo_turn_metrics_dropped_total turn_metrics docs dropped (buffer full or write failed)",
+            "# TYPE virevo_turn_metrics_dropped_total counter",
+            f"virevo_turn_metrics_dropped_total {self.dropped_total}",
+            "# HELP virevo_active_turns Turns currently open",
+            "# TYPE virevo_active_turns gauge",
+            f"virevo_active_turns {len(self.active)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> dict:
+        return {
+            "turns_total": self.turns_total,
+            "active_turns": len(self.active),
+            "buffered": len(self._buffer),
+            "written": self.written_total,
+            "dropped": self.dropped_total,
+            "p50_ms": {span: h.quantile(0.5) for span, h in self.histograms.items()},
+            "p95_ms": {span: h.quantile(0.95) for span, h in self.histograms.items()},
+        }
+
+
+_STAGES = {stage for pair in SPANS.values() for stage in pair} | {"processing_start"}
+
+# Global tracer instance
+turn_tracer = TurnTracer()
@@ -0,0 +1,251 @@
+"""
+Local Streaming VAD + Early End-of-Turn Detection
+Runs on the decoded 20ms mulaw frames in forward_telnyx_to_soniox, so the end of
+the caller's speech is known locally instead of only when Soniox sends <end>.
+
+- StreamingVAD: frame energy (dBFS) + zero-crossing rate against an adaptive
+  noise floor, with onset frames, hangover and start/stop hysteresis
+- EndOfTurnDetector: VAD + latest transcript → PROBABLE_END_OF_TURN once the
+  caller has been silent for `silence_ms` after enough speech and the transcript
+  doesn't end mid-phrase; SPEECH_RESUMED if they keep talking afterwards
+
+The probable end lets CallSession start LLM generation early (see
+early_response.py); Soniox's <end> still decides whether that response is used.
+"""
+import audioop
+import math
+import os
+from typing import Optional
+
+FRAME_MS = 20
+
+# Events
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+PROBABLE_END_OF_TURN = "probable_end_of_turn"
+SPEECH_RESUMED = "speech_resumed"
+
+# VAD defaults (tuned on 8kHz telephony audio with loadtest/vad_eval.py)
+START_DB_ABOVE_FLOOR = 10.0   # frame must be this far above the floor to count as speech
+STOP_DB_ABOVE_FLOOR = 6.0     # ...and stays speech until it falls below this (hysteresis)
+MIN_SPEECH_DBFS = -50.0       # absolute gate: quieter frames are never speech
+MAX_VOICED_ZCR = 0.45         # broadband noise crosses zero more often than voiced speech
+STRONG_SPEECH_DB = 20.0       # loud frames count regardless of ZCR (fricatives)
+ONSET_FRAMES = 2              # 40ms of speech to enter the speech state
+HANGOVER_FRAMES = 10          # 200ms of non-speech to leave it
+
+NOISE_FLOOR_INIT_DBFS = -60.0
+NOISE_FLOOR_MIN_DBFS = -80.0
+NOISE_FLOOR_MAX_DBFS = -30.0
+NOISE_FLOOR_FALL = 0.2        # floor follows quieter frames quickly...
+NOISE_FLOOR_RISE = 0.01       # ...and louder background slowly
+
+# End-of-turn defaults
+EARLY_TURN_SILENCE_MS = int(os.environ.get("EARLY_TURN_SILENCE_MS", "300"))
+EARLY_TURN_MIN_SPEECH_MS = 200
+
+# A turn that ends on one of these is probably not finished
+CONTINUATION_WORDS = {
+    "and", "but", "or", "so", "because", "cause", "if", "then", "um", "uh", "uhm", "er",
+    "like", "the", "a", "an", "to", "of", "for", "with", "my", "your", "is", "was",
+    "i", "i'm", "we", "you", "that", "which", "when", "just", "well",
+}
+
+
+def frame_features(mulaw: bytes):
+    """(energy dBFS, zero-crossing rate) of one mulaw frame"""
+    pcm = audioop.ulaw2lin(mulaw, 2)
+    samples = max(len(pcm) // 2, 1)
+    rms = audioop.rms(pcm, 2)
+    energy_db = 20 * math.log10(max(rms, 1) / 32768)
+    zcr = audioop.cross(pcm, 2) / samples
+    return energy_db, zcr
+
+
+class StreamingVAD:
+    """
+    Frame-by-frame speech/non-speech state machine with an adaptive noise floor
+    """
+
+    def __init__(
+        self,
+        start_db: float = START_DB_ABOVE_FLOOR,
+        stop_db: float = STOP_DB_ABOVE_FLOOR,
+        onset_frames: int = ONSET_FRAMES,
+        hangover_frames: int = HANGOVER_FRAMES,
+        min_speech_dbfs: float = MIN_SPEECH_DBFS,
+        max_voiced_zcr: float = MAX_VOICED_ZCR,
+    ):
+        self.start_db = start_db
+        self.stop_db = stop_db
+        self.onset_frames = onset_frames
+        self.hangover_frames = hangover_frames
+        self.min_speech_dbfs = min_speech_dbfs
+        self.max_voiced_zcr = max_voiced_zcr
+
+        self.noise_floor = NOISE_FLOOR_INIT_DBFS
+        self.in_speech = False
+        self.speech_started_at: Optional[float] = None
+        self.last_voiced_at: Optional[float] = None  # end of the last speech frame
+        self.frames = 0
+        self._onset = 0
+        self._hangover = 0
+
+    def _is_voiced(self, energy_db: float, zcr: float, threshold_db: float) -> bool:
+        if energy_db < self.min_speech_dbfs:
+            return False
+        above = energy_db - self.noise_floor
+        if above >= STRONG_SPEECH_DB:
+            return True
+        return above >= threshold_db and zcr <= self.max_voiced_zcr
+
+    def _update_floor(self, energy_db: float):
+        rate = NOISE_FLOOR_FALL if energy_db < self.noise_floor else NOISE_FLOOR_RISE
+        self.noise_floor += rate * (energy_db - self.noise_floor)
+        self.noise_floor = min(max(self.noise_floor, NOISE_FLOOR_MIN_DBFS), NOISE_FLOOR_MAX_DBFS)
+
+    def process(self, mulaw: bytes, ts: float) -> Optional[str]:
+        """
+        Feed one frame received at `ts` (time.time()).
+        Returns SPEECH_START / SPEECH_END on state changes, else None.
+        """
+        self.frames += 1
+        energy_db, zcr = frame_features(mulaw)
+        frame_end = ts
+        frame_start = ts - len(mulaw) / 8000
+
+        if not self.in_speech:
+            if self._is_voiced(energy_db, zcr, self.start_db):
+                self._onset += 1
+                if self._onset >= self.onset_frames:
+                    self.in_speech = True
+                    self._hangover = 0
+                    self.speech_started_at = frame_start - (self.onset_frames - 1) * FRAME_MS / 1000
+                    self.last_voiced_at = frame_end
+                    return SPEECH_START
+            else:
+                self._onset = 0
+                self._update_floor(energy_db)
+            return None
+
+        if self._is_voiced(energy_db, zcr, self.stop_db):
+            self._hangover = 0
+            self.last_voiced_at = frame_end
+            return None
+
+        self._hangover += 1
+        if self._hangover >= self.hangover_frames:
+            self.in_speech = False
+            self._onset = 0
+            return SPEECH_END
+        return None
+
+
+class EndOfTurnDetector:
+    """
+    Turns VAD state + the running transcript into end-of-turn hints for one call
+    """
+
+    def __init__(
+        self,
+        silence_ms: int = EARLY_TURN_SILENCE_MS,
+        min_speech_ms: int = EARLY_TURN_MIN_SPEECH_MS,
+        require_transcript: bool = True,
+        vad: Optional[StreamingVAD] = None,
+    ):
+        self.silence_s = silence_ms / 1000
+        self.min_speech_s = min_speech_ms / 1000
+        self.require_transcript = require_transcript
+        self.vad = vad or StreamingVAD()
+
+        self.final_text = ""
+        self.partial_text = ""
+        self.speech_s = 0.0         # speech in the current turn
+        self.fired = False          # PROBABLE_END_OF_TURN already emitted this turn
+        self.last_speech_end: Optional[float] = None
+
+        self.probable_ends = 0
+        self.resumed = 0
+
+    @classmethod
+    def from_agent_config(cls, agent_config: dict) -> "EndOfTurnDetector":
+        settings = (agent_config or {}).get("settings", {}).get("early_turn_settings", {}) or {}
+        return cls(
+            silence_ms=settings.get("silence_ms", EARLY_TURN_SILENCE_MS),
+            min_speech_ms=settings.get("min_speech_ms", EARLY_TURN_MIN_SPEECH_MS),
+        )
+
+    # ── Transcript updates (from the STT callbacks) ─────────────────
+
+    def set_partial(self, text: str):
+        self.partial_text = text or ""
+
+    def set_final(self, text: str):
+        """Finalized transcript so far (the previous partial is now part of it)"""
+        self.final_text = text or ""
+        self.partial_text = ""
+
+    @property
+    def transcript(self) -> str:
+        return f"{self.final_text} {self.partial_text}".strip()
+
+    def transcript_looks_complete(self) -> bool:
+        text = self.transcript
+        if not text:
+            return not self.require_transcript
+        last_word = text.split()[-1].strip(".,!?;:-").lower()
+        return last_word not in CONTINUATION_WORDS and not text.endswith(("-", ","))
+
+    def reset_turn(self):
+        """The STT endpoint arrived: start a new turn"""
+        self.final_text = ""
+        self.partial_text = ""
+        self.speech_s = 0.0
+        self.fired = False
+        self.last_speech_end = None
+
+    # ── Audio ───────────────────────────────────────────────────────
+
+    def process(self, mulaw: bytes, ts: float) -> Optional[str]:
+        event = self.vad.process(mulaw, ts)
+
+        if event == SPEECH_START:
+            if self.fired:
+                self.fired = False
+                self.resumed += 1
+                return SPEECH_RESUMED
+            return SPEECH_START
+
+        if event == SPEECH_END:
+            self.last_speech_end = self.vad.last_voiced_at
+            if self.vad.speech_started_at is not None and self.vad.last_voiced_at is not None:
+                self.speech_s += self.vad.last_voiced_at - self.vad.speech_started_at
+
+        if (
+            not self.fired
+            and not self.vad.in_speech
+            and self.last_speech_end is not None
+            and self.speech_s >= self.min_speech_s
+            and ts - self.last_speech_end >= self.silence_s
+            and self.transcript_looks_complete()
+        ):
+            self.fired = True
+            self.probable_ends += 1
+            return PROBABLE_END_OF_TURN
+
+        return event
+
+    def get_stats(self) -> dict:
+        return {
+            "probable_ends": self.probable_ends,
+            "resumed": self.resumed,
+            "noise_floor_dbfs": round(self.vad.noise_floor, 1),
+        }
+
+
+def is_early_turn_enabled(agent_config: dict) -> bool:
+    """Agent setting early_turn_settings.enabled, or EARLY_TURN_DETECTION=true for all agents"""
+    settings = (agent_config or {}).get("settings", {}).get("early_turn_settings", {}) or {}
+    if "enabled" in settings:
+        return bool(settings["enabled"])
+    return os.environ.get("EARLY_TURN_DETECTION", "false").lower() == "true"
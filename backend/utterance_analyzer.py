@@ -0,0 +1,235 @@
+"""
+Single-Pass Utterance Analyzer
+One compiled scan per user turn instead of a dozen uncompiled `re.search` loops
+(KB router, DISC/objection preprocessing, voicemail/IVR/gatekeeper, hold-on,
+instant pattern matcher).
+
+- Every pattern set is compiled once into a combined alternation that acts as a
+  gate: one C-level scan decides whether any pattern in the set can match, and
+  individual patterns are only resolved on a hit
+- analyze() returns one UtteranceFeatures record per turn and caches it by text,
+  so every consumer that looks at the same utterance shares the same scan
+- TranscriptScanner tracks voicemail/IVR hits over a growing transcript and only
+  re-tests patterns that haven't matched yet
+"""
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from kb_router import SIMPLE_CHAT_PATTERNS, FACTUAL_QUESTION_PATTERNS
+from preprocessing_layer import DISC_PATTERNS, OBJECTION_PATTERNS
+from voicemail_detector import VOICEMAIL_PATTERNS, IVR_PATTERNS, GATEKEEPER_PATTERNS
+from instant_pattern_matcher import PATTERN_LIBRARY
+
+logger = logging.getLogger(__name__)
+
+HOLD_ON_PHRASES = [
+    "hold on", "wait", "one moment", "give me a second",
+    "hang on", "just a sec", "one sec", "hold please"
+]
+
+# Feature records kept per worker (keyed by utterance text)
+FEATURE_CACHE_SIZE = 512
+
+# Voicemail/IVR/gatekeeper ignore transcripts shorter than this
+MIN_DETECTION_LENGTH = 10
+
+
+class PatternSet:
+    """
+    A list of regexes compiled once, plus a combined alternation used as a gate
+    """
+
+    def __init__(self, patterns: List[str], flags: int = 0):
+        self.patterns = list(patterns)
+        self.flags = flags
+        self.compiled = [re.compile(p, flags) for p in self.patterns]
+        self.gate = self._combine(tuple(range(len(self.patterns))))
+        self._subset_gate = lru_cache(maxsize=64)(self._combine)
+
+    def _combine(self, indices: Tuple[int, ...]) -> Optional["re.Pattern"]:
+        if not indices:
+            return None
+        return re.compile("|".join(f"(?:{self.patterns[i]})" for i in indices), self.flags)
+
+    def any(self, text: str) -> bool:
+        return self.gate.search(text) is not None
+
+    def first(self, text: str) -> Optional[Tuple[int, "re.Match"]]:
+        """First pattern in list order that matches (same result as looping re.search)"""
+        if not self.gate.search(text):
+            return None
+        for i, regex in enumerate(self.compiled):
+            match = regex.search(text)
+            if match:
+                return i, match
+        return None
+
+    def matching(self, text: str, exclude: FrozenSet[int] = frozenset()) -> List[int]:
+        """Indices of every pattern that matches, skipping `exclude`"""
+        remaining = tuple(i for i in range(len(self.patterns)) if i not in exclude)
+        gate = self._subset_gate(remaining)
+        if gate is None or not gate.search(text):
+            return []
+        return [i for i in remaining if self.compiled[i].search(text)]
+
+
+# Compiled once per worker
+SIMPLE_CHAT = PatternSet(SIMPLE_CHAT_PATTERNS, re.IGNORECASE)
+FACTUAL_QUESTION = PatternSet(FACTUAL_QUESTION_PATTERNS, re.IGNORECASE)
+OBJECTIONS = PatternSet([p for _, p in OBJECTION_PATTERNS])
+OBJECTION_TYPES = [name for name, _ in OBJECTION_PATTERNS]
+DISC = {style: re.compile(p) for style, p in DISC_PATTERNS.items()}
+VOICEMAIL = PatternSet(VOICEMAIL_PATTERNS)
+IVR = PatternSet(IVR_PATTERNS)
+GATEKEEPER = PatternSet(GATEKEEPER_PATTERNS)
+HOLD_ON = re.compile("|".join(re.escape(p) for p in HOLD_ON_PHRASES))
+INSTANT = {
+    name: (PatternSet(data["patterns"]), data.get("confidence_boost", []))
+    for name, data in PATTERN_LIBRARY.items()
+}
+
+
+@dataclass
+class UtteranceFeatures:
+    """Everything the per-turn consumers need to know about one utterance"""
+    text: str
+    word_count: int = 0
+    kb_needed: bool = False
+    kb_reason: str = "empty_message"
+    objection_type: Optional[str] = None
+    disc_counts: Dict[str, int] = field(default_factory=lambda: {"D": 0, "I": 0, "S": 0, "C": 0})
+    hold_on: bool = False
+    instant_scores: Dict[str, int] = field(default_factory=dict)
+    voicemail_matches: int = 0
+    ivr_matches: int = 0
+    gatekeeper_digit: Optional[str] = None
+    gatekeeper_pattern: Optional[str] = None
+
+
+def _kb_decision(message_lower: str, word_count: int) -> Tuple[bool, str]:
+    """Same decision order as kb_router.needs_knowledge_base"""
+    if len(message_lower) < 2:
+        return False, "empty_message"
+    if SIMPLE_CHAT.any(message_lower):
+        return False, "simple_chat"
+    if FACTUAL_QUESTION.any(message_lower):
+        return True, "factual_question"
+    if word_count < 10:
+        return False, "short_message"
+    return True, "default_long"
+
+
+def _gatekeeper(text_lower: str) -> Tuple[Optional[str], Optional[str]]:
+    hit = GATEKEEPER.first(text_lower)
+    if not hit:
+        return None, None
+    index, match = hit
+    digit = match.group(1) if match.groups() else "1"
+    return digit, GATEKEEPER.patterns[index]
+
+
+class UtteranceAnalyzer:
+    """
+    Builds (and caches) one UtteranceFeatures record per utterance
+    """
+
+    def __init__(self, cache_size: int = FEATURE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, UtteranceFeatures]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def analyze(self, text: str) -> UtteranceFeatures:
+        """Feature record for `text` (computed once, then served from cache)"""
+        text = text or ""
+        features = self._cache.get(text)
+        if features is not None:
+            self._cache.move_to_end(text)
+            self.hits += 1
+            return features
+
+        self.misses += 1
+        features = self._compute(text)
+        self._cache[text] = features
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return features
+
+    def _compute(self, text: str) -> UtteranceFeatures:
+        lower = text.lower()
+        stripped = lower.strip()
+        features = UtteranceFeatures(text=text, word_count=len(stripped.split()))
+
+        features.kb_needed, features.kb_reason = _kb_decision(stripped, features.word_count)
+
+        hit = OBJECTIONS.first(lower)
+        if hit:
+            features.objection_type = OBJECTION_TYPES[hit[0]]
+
+        features.disc_counts = {style: len(regex.findall(lower)) for style, regex in DISC.items()}
+        features.hold_on = HOLD_ON.search(lower) is not None
+
+        for name, (pattern_set, boosts) in INSTANT.items():
+            score = 10 * len(pattern_set.matching(lower))
+            score += 5 * sum(1 for boost in boosts if boost in lower)
+            features.instant_scores[name] = score
+
+        if len(stripped) >= MIN_DETECTION_LENGTH:
+            features.voicemail_matches = len(VOICEMAIL.matching(lower))
+            features.ivr_matches = len(IVR.matching(lower))
+            features.gatekeeper_digit, features.gatekeeper_pattern = _gatekeeper(lower)
+
+        return features
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class TranscriptScanner:
+    """
+    Voicemail/IVR pattern hits over a transcript that only grows.
+    A match in the existing text stays a match after appending, so each append
+    only re-tests the patterns that haven't matched yet.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.word_count = 0
+        self.voicemail_hits: set = set()
+        self.ivr_hits: set = set()
+
+    def append(self, chunk: str) -> str:
+        """Append a transcript chunk (space separated) and rescan; returns the full text"""
+        self.text = (self.text + " " + (chunk or "")).strip()
+        self.word_count += len((chunk or "").split())
+        if len(self.text) < MIN_DETECTION_LENGTH:
+            return self.text
+
+        lower = self.text.lower()
+        if len(self.voicemail_hits) < len(VOICEMAIL.patterns):
+            self.voicemail_hits.update(VOICEMAIL.matching(lower, frozenset(self.voicemail_hits)))
+        if len(self.ivr_hits) < len(IVR.patterns):
+            self.ivr_hits.update(IVR.matching(lower, frozenset(self.ivr_hits)))
+        return self.text
+
+    @property
+    def voicemail_matches(self) -> int:
+        return len(self.voicemail_hits) if len(self.text) >= MIN_DETECTION_LENGTH else 0
+
+    @property
+    def ivr_matches(self) -> int:
+        return len(self.ivr_hits) if len(self.text) >= MIN_DETECTION_LENGTH else 0
+
+
+# Global analyzer instance
+utterance_analyzer = UtteranceAnalyzer()
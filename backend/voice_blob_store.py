@@ -0,0 +1,211 @@
+"""
+Voice Library Blob Store
+Sample audio lives in GridFS, named by its SHA-256, instead of inline in
+voice_library documents; documents keep metadata plus blob_sha256.
+
+- Identical uploads are stored once; a blob is removed with its last sample
+- Reads stream GridFS chunks and honour byte ranges (preview seeking)
+- SpeakerCache: size-capped LRU of speaker reference audio shared by every
+  call on the worker, so Maya/Sesame cloning stops re-reading the sample
+  from Mongo per utterance
+- migrate_inline_audio moves audio_data of pre-existing samples into the store
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VOICE_BLOB_BUCKET = "voice_blobs"
+STREAM_CHUNK_SIZE = 255 * 1024  # GridFS default chunk size
+# Decoded speaker references kept per worker (bytes), and how long before re-checking Mongo
+SPEAKER_CACHE_MAX_BYTES = int(os.environ.get("SPEAKER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SPEAKER_CACHE_TTL = 600.0
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single `bytes=` range, None for a full response"""
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None  # multipart ranges: serve the whole file
+    first, _, last = spec.partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+class VoiceBlobStore:
+    """Write-once GridFS blobs keyed by content hash"""
+
+    def __init__(self, bucket_name: str = VOICE_BLOB_BUCKET):
+        self.bucket_name = bucket_name
+        self._buckets: Dict[int, object] = {}
+
+    def bucket(self, db):
+        bucket = self._buckets.get(id(db))
+        if bucket is None:
+            from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+            bucket = AsyncIOMotorGridFSBucket(db, bucket_name=self.bucket_name)
+            self._buckets[id(db)] = bucket
+        return bucket
+
+    async def put(self, db, data: bytes, content_type: str = "application/octet-stream") -> str:
+        """Store data (no-op if already present); returns its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        bucket = self.bucket(db)
+        existing = await bucket.find({"filename": digest}, limit=1).to_list(1)
+        if not existing:
+            await bucket.upload_from_stream(digest, data, metadata={"content_type": content_type})
+        return digest
+
+    async def open(self, db, digest: str):
+        """GridOut for a blob (has .length, .seek, .read), or None"""
+        from gridfs.errors import NoFile
+        try:
+            return await self.bucket(db).open_download_stream_by_name(digest)
+        except NoFile:
+            return None
+
+    async def read(self, db, digest: str) -> Optional[bytes]:
+        grid_out = await self.open(db, digest)
+        return await grid_out.read() if grid_out is not None else None
+
+    async def iter_range(self, grid_out, start: int, end: int,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) a chunk at a time"""
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def release(self, db, digest: str, collection: str = "voice_library") -> bool:
+        """Delete a blob once no sample references it; returns True if deleted"""
+        if not digest or await db[collection].find_one({"blob_sha256": digest}, {"_id": 1}):
+            return False
+        bucket = self.bucket(db)
+        for f in await bucket.find({"filename": digest}).to_list(None):
+            await bucket.delete(f._id)
+        return True
+
+
+class SpeakerCache:
+    """Size-capped LRU of speaker reference audio, keyed by voice sample id"""
+
+    def __init__(self, max_bytes: int = SPEAKER_CACHE_MAX_BYTES, ttl: float = SPEAKER_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str], bytes]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _lookup(self, sample_id: str) -> Optional[Tuple[Optional[str], bytes]]:
+        entry = self._entries.get(sample_id)
+        if entry is None:
+            return None
+        loaded_at, owner, audio = entry
+        if time.time() - loaded_at > self.ttl:
+            self.evict(sample_id)  # deleted on another worker? re-check Mongo
+            return None
+        self._entries.move_to_end(sample_id)
+        return owner, audio
+
+    def get(self, sample_id: str, user_id: Optional[str] = None) -> Optional[bytes]:
+        found = self._lookup(sample_id)
+        if found is None or (user_id and found[0] != user_id):
+            return None
+        return found[1]
+
+    def put(self, sample_id: str, user_id: Optional[str], audio: bytes):
+        self.evict(sample_id)
+        if len(audio) > self.max_bytes:
+            return
+        self._entries[sample_id] = (time.time(), user_id, audio)
+        self.bytes += len(audio)
+        while self.bytes > self.max_bytes:
+            _, (_, _, old) = self._entries.popitem(last=False)
+            self.bytes -= len(old)
+            self.stats["evictions"] += 1
+
+    def evict(self, sample_id: str):
+        entry = self._entries.pop(sample_id, None)
+        if entry:
+            self.bytes -= len(entry[2])
+
+    async def get_or_load(self, sample_id: str, user_id: Optional[str],
+                          load: Callable[[], Awaitable[Optional[Tuple[Optional[str], bytes]]]]) -> Optional[bytes]:
+        """Cached audio, or one shared load for concurrent callers; load returns (owner_user_id, audio)"""
+        found = self._lookup(sample_id)
+        if found is not None:
+            self.stats["hits"] += 1
+            owner, audio = found
+            return None if user_id and owner != user_id else audio
+        self.stats["misses"] += 1
+        task = self._loading.get(sample_id)
+        if task is None:
+            task = asyncio.create_task(load())
+            self._loading[sample_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(sample_id, None))
+        loaded = await asyncio.shield(task)
+        if not loaded:
+            return None
+        owner, audio = loaded
+        if sample_id not in self._entries:
+            self.put(sample_id, owner, audio)
+        if user_id and owner != user_id:
+            return None
+        return audio
+
+    def get_stats(self) -> dict:
+        return {"samples": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes, **self.stats}
+
+
+async def migrate_inline_audio(db, store: Optional[VoiceBlobStore] = None) -> int:
+    """Move audio_data of samples that predate the blob store into it"""
+    store = store or voice_blob_store
+    await db.voice_library.create_index([("user_id", 1), ("created_at", -1)], name="user_created")
+    await db.voice_library.create_index("blob_sha256", name="blob_sha256")
+    moved = 0
+    async for doc in db.voice_library.find({"audio_data": {"$exists": True}}, {"_id": 0, "id": 1}):
+        sample = await db.voice_library.find_one({"id": doc["id"]}, {"_id": 0, "audio_data": 1, "format": 1})
+        if not sample or not sample.get("audio_data"):
+            continue
+        digest = await store.put(db, bytes(sample["audio_data"]), f"audio/{sample.get('format', 'wav')}")
+        await db.voice_library.update_one(
+            {"id": doc["id"]}, {"$set": {"blob_sha256": digest}, "$unset": {"audio_data": ""}}
+        )
+        moved += 1
+    if moved:
+        logger.info(f"🎤 Moved {moved} inline voice samples to the blob store")
+    return moved
+
+
+# Global voice blob store and speaker cache instances
+voice_blob_store = VoiceBlobStore()
+speaker_cache = SpeakerCache()
@@ -6,20 +6,27 @@ Endpoints:
 - POST /voice-library - Upload new voice sample
 - GET /voice-library/{id} - Get voice details
 - DELETE /voice-library/{id} - Delete voice sample
-- GET /voice-library/{id}/audio - Stream audio preview
+- GET /voice-library/{id}/audio - Stream audio preview (supports Range)
+
+Audio lives in the content-addressed blob store (voice_blob_store); documents
+hold metadata and blob_sha256 only.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 import uuid
-import io
 import logging
 
+from voice_blob_store import voice_blob_store, speaker_cache, parse_range, RangeNotSatisfiable
+
 logger = logging.getLogger(__name__)
 
+# Everything but the audio: listing and detail views never pull sample bytes
+METADATA_PROJECTION = {"_id": 0, "audio_data": 0}
+
 voice_library_router = APIRouter(prefix="/voice-library", tags=["Voice Library"])
 
 
@@ -100,6 +107,24 @@ def validate_audio_file(filename: str, file_size: int) -> tuple[bool, str]:
     return True, ext
 
 
+def audio_media_type(file_format: str) -> str:
+    return "audio/mpeg" if file_format == "mp3" else f"audio/{file_format}"
+
+
+async def ensure_blob(db, sample: dict) -> Optional[str]:
+    """Digest of a sample's audio, moving legacy inline audio_data to the blob store on first use"""
+    if sample.get("blob_sha256"):
+        return sample["blob_sha256"]
+    legacy = await db.voice_library.find_one({"id": sample["id"]}, {"_id": 0, "audio_data": 1})
+    if not legacy or not legacy.get("audio_data"):
+        return None
+    digest = await voice_blob_store.put(db, bytes(legacy["audio_data"]), audio_media_type(sample.get("format", "wav")))
+    await db.voice_library.update_one(
+        {"id": sample["id"]}, {"$set": {"blob_sha256": digest}, "$unset": {"audio_data": ""}}
+    )
+    return digest
+
+
 # ============ ENDPOINTS ============
 
 @voice_library_router.get("", response_model=List[VoiceSampleResponse])
@@ -112,7 +137,7 @@ async def list_voice_samples(request: Request):
         current_user = await get_current_user(request)
         
         samples = await db.voice_library.find(
-            {"user_id": current_user['id']}
+            {"user_id": current_user['id']}, METADATA_PROJECTION
         ).sort("created_at", -1).to_list(100)
         
         return [
@@ -183,6 +208,9 @@ async def upload_voice_sample(
                 detail="Voice library limit reached (20 voices). Delete some before uploading more."
             )
         
+        # Audio goes to the blob store (stored once per distinct content); the record keeps its digest
+        blob_sha256 = await voice_blob_store.put(db, file_content, audio_media_type(file_format))
+        
         # Create voice sample record
         sample_id = str(uuid.uuid4())
         sample = {
@@ -193,7 +221,7 @@ async def upload_voice_sample(
             "file_size": file_size,
             "duration_seconds": duration,
             "format": file_format,
-            "audio_data": file_content,  # Store binary data directly (for small files)
+            "blob_sha256": blob_sha256,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
@@ -230,7 +258,7 @@ async def get_voice_sample(sample_id: str, request: Request):
         sample = await db.voice_library.find_one({
             "id": sample_id,
             "user_id": current_user['id']
-        })
+        }, METADATA_PROJECTION)
         
         if not sample:
             raise HTTPException(status_code=404, detail="Voice sample not found")
@@ -260,14 +288,18 @@ async def delete_voice_sample(sample_id: str, request: Request):
         
         current_user = await get_current_user(request)
         
-        result = await db.voice_library.delete_one({
+        deleted = await db.voice_library.find_one_and_delete({
             "id": sample_id,
             "user_id": current_user['id']
-        })
+        }, projection={"_id": 0, "blob_sha256": 1})
         
-        if result.deleted_count == 0:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Voice sample not found")
         
+        speaker_cache.evict(sample_id)
+        # Other samples may share the same audio; the blob goes with the last one
+        await voice_blob_store.release(db, deleted.get("blob_sha256"))
+        
         logger.info(f"🗑️ Voice sample deleted: {sample_id}")
         
         return {"success": True, "message": "Voice sample deleted"}
@@ -281,7 +313,7 @@ async def delete_voice_sample(sample_id: str, request: Request):
 
 @voice_library_router.get("/{sample_id}/audio")
 async def get_voice_audio(sample_id: str, request: Request):
-    """Stream the audio file for preview"""
+    """Stream the audio file for preview (Range requests supported for seeking)"""
     try:
         from server import db, get_current_user
         
@@ -290,27 +322,42 @@ async def get_voice_audio(sample_id: str, request: Request):
         sample = await db.voice_library.find_one({
             "id": sample_id,
             "user_id": current_user['id']
-        })
+        }, METADATA_PROJECTION)
         
         if not sample:
             raise HTTPException(status_code=404, detail="Voice sample not found")
         
-        audio_data = sample.get('audio_data')
-        if not audio_data:
+        digest = await ensure_blob(db, sample)
+        grid_out = await voice_blob_store.open(db, digest) if digest else None
+        if grid_out is None:
             raise HTTPException(status_code=404, detail="Audio data not found")
         
         file_format = sample.get('format', 'wav')
-        media_type = f"audio/{file_format}"
-        if file_format == 'mp3':
-            media_type = "audio/mpeg"
+        size = grid_out.length
+        headers = {
+            "Content-Disposition": f'inline; filename="{sample["name"]}.{file_format}"',
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{digest}"',
+            "Cache-Control": "private, max-age=86400",
+        }
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        
+        start, end = byte_range or (0, size - 1)
+        headers["Content-Length"] = str(end - start + 1)
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
         
         return StreamingResponse(
-            io.BytesIO(audio_data),
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f'inline; filename="{sample["name"]}.{file_format}"',
-                "Content-Length": str(len(audio_data))
-            }
+            voice_blob_store.iter_range(grid_out, start, end),
+            status_code=206 if byte_range else 200,
+            media_type=audio_media_type(file_format),
+            headers=headers
         )
         
     except HTTPException:
@@ -325,7 +372,8 @@ async def get_voice_audio(sample_id: str, request: Request):
 async def load_voice_sample(sample_id: str, user_id: str = None) -> Optional[bytes]:
     """
     Load voice sample audio data by ID.
-    Called by telnyx_service.py when speaker_wav_id is set.
+    Called by telnyx_service.py / the Maya TTS session when speaker_wav_id is set.
+    Served from the worker's speaker cache after the first load.
     
     Args:
         sample_id: The voice sample ID
@@ -337,19 +385,21 @@ async def load_voice_sample(sample_id: str, user_id: str = None) -> Optional[byt
     try:
         from server import db
         
-        query = {"id": sample_id}
-        # If user_id provided, also filter by user for security
-        if user_id:
-            query["user_id"] = user_id
-        
-        sample = await db.voice_library.find_one(query)
-        
-        if sample and 'audio_data' in sample:
-            logger.info(f"🎤 Loaded voice sample: {sample.get('name')} ({len(sample['audio_data'])} bytes)")
-            return sample['audio_data']
-        
-        logger.warning(f"⚠️ Voice sample not found: {sample_id}")
-        return None
+        async def load():
+            sample = await db.voice_library.find_one({"id": sample_id}, METADATA_PROJECTION)
+            if not sample:
+                return None
+            digest = await ensure_blob(db, sample)
+            audio = await voice_blob_store.read(db, digest) if digest else None
+            if audio is None:
+                return None
+            logger.info(f"🎤 Loaded voice sample: {sample.get('name')} ({len(audio)} bytes)")
+            return sample.get("user_id"), audio
+        
+        audio = await speaker_cache.get_or_load(sample_id, user_id, load)
+        if audio is None:
+            logger.warning(f"⚠️ Voice sample not found: {sample_id}")
+        return audio
         
     except Exception as e:
         logger.error(f"Error loading voice sample {sample_id}: {e}")
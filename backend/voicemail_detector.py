@@ -3,7 +3,6 @@ Voicemail and IVR Detection Module
 Real-time pattern matching for voicemail greetings and IVR systems.
 Zero-latency detection runs in parallel with call processing.
 """
-import re
 import logging
 from typing import Dict, Tuple
 
@@ -90,14 +89,11 @@ def detect_gatekeeper(transcript: str) -> Tuple[bool, str]:
     if not transcript or len(transcript.strip()) < 10:
         return False, None
     
-    transcript_lower = transcript.lower()
-    
-    for pattern in GATEKEEPER_PATTERNS:
-        match = re.search(pattern, transcript_lower)
-        if match:
-            digit = match.group(1) if match.groups() else "1"
-            logger.info(f"🚪 Gatekeeper detected! Pattern: {pattern}, Digit to press: {digit}")
-            return True, digit
+    from utterance_analyzer import utterance_analyzer
+    features = utterance_analyzer.analyze(transcript)
+    if features.gatekeeper_digit:
+        logger.info(f"🚪 Gatekeeper detected! Pattern: {features.gatekeeper_pattern}, Digit to press: {features.gatekeeper_digit}")
+        return True, features.gatekeeper_digit
     
     return False, None
 
@@ -118,25 +114,15 @@ def detect_voicemail_or_ivr(transcript: str, context: Dict = None) -> Tuple[bool
     if not transcript or len(transcript.strip()) < 10:
         return False, "none", 0.0
     
-    transcript_lower = transcript.lower()
-    
-    # Check voicemail patterns
-    voicemail_matches = 0
-    for pattern in VOICEMAIL_PATTERNS:
-        if re.search(pattern, transcript_lower):
-            voicemail_matches += 1
-            logger.debug(f"Voicemail pattern matched: {pattern}")
-    
-    # Check IVR patterns
-    ivr_matches = 0
-    for pattern in IVR_PATTERNS:
-        if re.search(pattern, transcript_lower):
-            ivr_matches += 1
-            logger.debug(f"IVR pattern matched: {pattern}")
-    
-    # Additional heuristics
-    word_count = len(transcript.split())
-    
+    from utterance_analyzer import utterance_analyzer
+    features = utterance_analyzer.analyze(transcript)
+    return score_detection(features.voicemail_matches, features.ivr_matches, len(transcript.split()), context)
+
+
+def score_detection(voicemail_matches: int, ivr_matches: int, word_count: int, context: Dict = None) -> Tuple[bool, str, float]:
+    """
+    Turn pattern hit counts into (is_detected, detection_type, confidence)
+    """
     # Long monologue (>50 words) without interaction is suspicious
     is_long_monologue = word_count > 50
     
@@ -201,7 +187,9 @@ class VoicemailDetector:
         self.settings = agent_settings.get("voicemail_detection", {})
         self.enabled = self.settings.get("enabled", True)
         self.use_llm_detection = self.settings.get("use_llm_detection", True)
+        from utterance_analyzer import TranscriptScanner
         self.accumulated_transcript = ""
+        self.scanner = TranscriptScanner()  # Incremental pattern hits over accumulated_transcript
         self.detection_made = False
         self.detection_type = None
         self.call_start_time = None
@@ -223,9 +211,8 @@ class VoicemailDetector:
         if self.detection_made:
             return False, self.detection_type, 0.0
         
-        # Accumulate transcript
-        self.accumulated_transcript += " " + new_transcript
-        self.accumulated_transcript = self.accumulated_transcript.strip()
+        # Accumulate transcript (only patterns that haven't matched yet are re-tested)
+        self.accumulated_transcript = self.scanner.append(new_transcript)
         
         # Build context
         import time
@@ -234,8 +221,10 @@ class VoicemailDetector:
             context["call_duration_seconds"] = time.time() - call_start_time
         
         # Run detection
-        is_detected, detection_type, confidence = detect_voicemail_or_ivr(
-            self.accumulated_transcript, 
+        is_detected, detection_type, confidence = score_detection(
+            self.scanner.voicemail_matches,
+            self.scanner.ivr_matches,
+            self.scanner.word_count,
             context
         )
         
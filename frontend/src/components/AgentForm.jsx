@@ -11,6 +11,9 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { useToast } from '../hooks/use-toast';
 import AutoQCSettings from './AutoQCSettings';
 
+// Give up polling a KB job after this long (a backend restart can leave it "running")
+const KB_JOB_TIMEOUT_MS = 5 * 60 * 1000;
+
 const AgentForm = () => {
   const navigate = useNavigate();
   const { id } = useParams();
@@ -185,6 +188,24 @@ const AgentForm = () => {
     }
   };
 
+  // KB uploads and URLs are extracted as background jobs: poll until the item is stored
+  const waitForKbJob = async (job) => {
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const deadline = Date.now() + KB_JOB_TIMEOUT_MS;
+    let current = job;
+    while (current.status === 'queued' || current.status === 'running') {
+      if (Date.now() > deadline) {
+        throw new Error('Extraction is taking too long - check the knowledge base again in a few minutes');
+      }
+      await sleep(1000);
+      current = (await kbAPI.job(id, job.job_id)).data;
+    }
+    if (current.status === 'failed') {
+      throw new Error(current.error || 'Extraction failed');
+    }
+    return current.result;
+  };
+
   // Handle file upload
   const handleFileUpload = async (e) => {
     const file = e.target.files?.[0];
@@ -207,17 +228,20 @@ const AgentForm = () => {
       const formData = new FormData();
       formData.append('file', file);
 
-      await kbAPI.upload(id, formData);
+      const response = await kbAPI.upload(id, formData);
+      const item = await waitForKbJob(response.data);
       toast({
         title: "Success",
-        description: `File "${file.name}" uploaded successfully`
+        description: item.duplicate
+          ? `File "${file.name}" is already in the knowledge base`
+          : `File "${file.name}" uploaded successfully`
       });
       fetchKbItems();
     } catch (error) {
       console.error('Error uploading file:', error);
       toast({
         title: "Error",
-        description: "Failed to upload file",
+        description: error.response?.data?.detail || error.message || "Failed to upload file",
         variant: "destructive"
       });
     } finally {
@@ -232,7 +256,8 @@ const AgentForm = () => {
 
     try {
       setAddingUrl(true);
-      await kbAPI.addUrl(id, urlInput);
+      const response = await kbAPI.addUrl(id, urlInput);
+      await waitForKbJob(response.data);
       toast({
         title: "Success",
         description: "Website content added successfully"
@@ -243,7 +268,7 @@ const AgentForm = () => {
       console.error('Error adding URL:', error);
       toast({
         title: "Error",
-        description: "Failed to add URL",
+        description: error.response?.data?.detail || error.message || "Failed to add URL",
         variant: "destructive"
       });
     } finally {
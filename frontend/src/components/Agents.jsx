@@ -33,8 +33,8 @@ const Agents = () => {
 
   const fetchAgents = async () => {
     try {
-      const response = await agentAPI.list();
-      setAgents(response.data);
+      const response = await agentAPI.summaries();
+      setAgents(response.data.agents);
     } catch (error) {
       console.error('Error fetching agents:', error);
       toast({
@@ -53,11 +53,12 @@ const CRM = () => {
       if (statusFilter) params.append('status', statusFilter);
       if (sourceFilter) params.append('source', sourceFilter);
       params.append('limit', '100');
+      params.append('view', 'summary');
 
       const response = await axios.get(`${BACKEND_URL}/api/crm/leads?${params.toString()}`, {
         withCredentials: true
       });
-      setLeads(response.data);
+      setLeads(response.data.leads);
     } catch (error) {
       console.error('Error fetching leads:', error);
       toast({
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Phone, Download, Trash2, Filter, Calendar, Search, Zap } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 import CallDetailModal from './CallDetailModal';
@@ -11,6 +11,8 @@ const Calls = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalCalls, setTotalCalls] = useState(0);
   const [limit] = useState(50);
+  // pageCursors.current[i] = cursor that fetches page i + 1 (page 1 has none)
+  const pageCursors = useRef([null]);
   const [filters, setFilters] = useState({
     agent_id: '',
     direction: '',
@@ -67,34 +69,30 @@ const Calls = () => {
       setLoading(true);
       const params = {};
 
-      // Only use server-side pagination when no advanced filters are active
-      if (!hasAdvancedFilters) {
-        params.limit = limit;
-        params.offset = (currentPage - 1) * limit;
-      } else {
-        // Fetch all calls when advanced filters are active for proper client-side filtering
-        params.limit = 10000; // Large number to get all calls
-        params.offset = 0;
-      }
-
       if (filters.agent_id) params.agent_id = filters.agent_id;
       if (filters.direction) params.direction = filters.direction;
       if (filters.status) params.status = filters.status;
       if (filters.start_date) params.start_date = filters.start_date;
       if (filters.end_date) params.end_date = filters.end_date;
 
-      const response = await analyticsAPI.callHistory(params);
-
-      // Handle both paginated and legacy responses
-      if (response.data.calls) {
-        setCalls(response.data.calls);
-        setTotalCalls(response.data.total);
-      } else if (Array.isArray(response.data)) {
-        setCalls(response.data);
-        setTotalCalls(response.data.length);
+      if (!hasAdvancedFilters) {
+        // Server-side keyset pagination: each page carries the cursor for the next one
+        const cursor = pageCursors.current[currentPage - 1];
+        const response = await analyticsAPI.callHistory({ ...params, limit, ...(cursor ? { cursor } : {}) });
+        pageCursors.current[currentPage] = response.data.next_cursor || null;
+        setCalls(response.data.calls || []);
+        setTotalCalls(response.data.total || 0);
       } else {
-        setCalls([]);
-        setTotalCalls(0);
+        // Walk every page when advanced filters are active (client-side filtering)
+        const allCalls = [];
+        let cursor = null;
+        do {
+          const response = await analyticsAPI.callHistory({ ...params, limit: 500, ...(cursor ? { cursor } : {}) });
+          allCalls.push(...(response.data.calls || []));
+          cursor = response.data.next_cursor;
+        } while (cursor);
+        setCalls(allCalls);
+        setTotalCalls(allCalls.length);
       }
     } catch (error) {
       console.error('Error fetching calls:', error);
@@ -118,6 +116,7 @@ const Calls = () => {
   };
 
   const applyFilters = () => {
+    pageCursors.current = [null]; // Cursors belong to the old filter
     setCurrentPage(1); // Reset to first page
     fetchCalls();
     fetchAnalytics();
@@ -154,6 +153,8 @@ const Calls = () => {
       operator: 'contains',
       value: ''
     });
+    pageCursors.current = [null];
+    setCurrentPage(1);
     setTimeout(() => {
       fetchCalls();
       fetchAnalytics();
@@ -680,7 +681,7 @@ const Calls = () => {
             </button>
             <button
               onClick={() => setCurrentPage(prev => prev + 1)}
-              disabled={currentPage * limit >= getDisplayTotalCount()}
+              disabled={currentPage * limit >= getDisplayTotalCount() || (!hasAdvancedFilters && !pageCursors.current[currentPage])}
               className="px-4 py-2 bg-gray-800 border border-gray-700 rounded text-sm font-medium text-white hover:bg-gray-700 disabled:opacity-50 disabled:cursor-not-allowed"
             >
               Next
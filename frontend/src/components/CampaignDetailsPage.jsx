@@ -35,6 +35,17 @@ import { Card, CardContent, CardHeader, CardTitle } from './ui/card';
 import { Badge } from './ui/badge';
 import CampaignReportView from './CampaignReportView';
 
+// Refresh rows from a re-fetched first page without dropping pages loaded with "Load more"
+const mergeQcResultsPage = (previous, page) => {
+  if (!previous?.calls || previous.calls.length <= (page.calls?.length || 0)) return page;
+  const refreshed = new Map((page.calls || []).map(call => [call.call_id, call]));
+  return {
+    ...page,
+    calls: previous.calls.map(call => refreshed.get(call.call_id) || call),
+    next_cursor: previous.next_cursor
+  };
+};
+
 const CampaignDetailsPage = () => {
   const { campaignId } = useParams();
   const navigate = useNavigate();
@@ -55,6 +66,7 @@ const CampaignDetailsPage = () => {
   // QC Results tab state
   const [qcResults, setQcResults] = useState(null);
   const [loadingQcResults, setLoadingQcResults] = useState(false);
+  const [loadingMoreQcResults, setLoadingMoreQcResults] = useState(false);
   const [resettingAll, setResettingAll] = useState(false);
   const [resettingCallId, setResettingCallId] = useState(null);
   const [batchAnalysisPolling, setBatchAnalysisPolling] = useState(false);
@@ -100,13 +112,10 @@ const CampaignDetailsPage = () => {
         try {
           const response = await qcEnhancedAPI.getCampaignQCResults(campaignId);
           const data = response.data;
-          setQcResults(data);
+          setQcResults(previous => mergeQcResultsPage(previous, data));
           
-          // Check if batch analysis is complete (no calls in "analyzing" status)
-          const stillAnalyzing = data.calls?.some(call => call.analysis_status === 'analyzing');
-          const hasPending = data.calls?.some(call => call.analysis_status === 'pending');
-          
-          if (!stillAnalyzing && !hasPending) {
+          // Check if batch analysis is complete (campaign-wide status, not just the rows on this page)
+          if (data.batch_analysis_status !== 'running') {
             // Analysis complete - stop polling
             setBatchAnalysisPolling(false);
             toast({
@@ -144,6 +153,27 @@ const CampaignDetailsPage = () => {
     }
   };
 
+  const loadMoreQcResults = async () => {
+    if (!qcResults?.next_cursor) return;
+    try {
+      setLoadingMoreQcResults(true);
+      const response = await qcEnhancedAPI.getCampaignQCResults(campaignId, { cursor: qcResults.next_cursor });
+      setQcResults(previous => ({
+        ...response.data,
+        calls: [...(previous?.calls || []), ...(response.data.calls || [])]
+      }));
+    } catch (error) {
+      console.error('Error loading more QC results:', error);
+      toast({
+        title: 'Error',
+        description: 'Failed to load more QC results',
+        variant: 'destructive'
+      });
+    } finally {
+      setLoadingMoreQcResults(false);
+    }
+  };
+
   const resetAllAnalysis = async () => {
     if (!window.confirm('Are you sure you want to reset all QC analysis for this campaign? This will clear all Script, Tech, and Tonality results.')) {
       return;
@@ -1714,13 +1744,13 @@ const CampaignDetailsPage = () => {
                     </div>
                     
                     {/* Batch Analysis Status */}
-                    {(batchAnalysisPolling || qcResults.batch_analysis_status === 'running' || qcResults.calls?.some(c => c.analysis_status === 'analyzing')) && (
+                    {(batchAnalysisPolling || qcResults.batch_analysis_status === 'running') && (
                       <div className="bg-purple-900/20 border border-purple-700/30 rounded-lg p-4">
                         <div className="flex items-center gap-2 text-purple-300">
                           <Loader2 className="animate-spin" size={16} />
                           <span>
                             Analyzing calls... 
-                            ({qcResults.calls?.filter(c => c.analysis_status === 'completed').length || 0} / {qcResults.calls?.length || 0} complete)
+                            ({qcResults.batch_analysis_completed || 0} / {qcResults.batch_analysis_total || 0} complete)
                           </span>
                           <span className="text-xs text-gray-500 ml-2">Auto-refreshing every 3s</span>
                         </div>
@@ -1729,8 +1759,8 @@ const CampaignDetailsPage = () => {
                           <div 
                             className="bg-purple-500 h-2 rounded-full transition-all duration-300"
                             style={{ 
-                              width: `${qcResults.calls?.length > 0 
-                                ? (qcResults.calls.filter(c => c.analysis_status === 'completed').length / qcResults.calls.length) * 100 
+                              width: `${qcResults.batch_analysis_total > 0 
+                                ? (qcResults.batch_analysis_completed / qcResults.batch_analysis_total) * 100 
                                 : 0}%` 
                             }}
                           />
@@ -1739,7 +1769,7 @@ const CampaignDetailsPage = () => {
                     )}
                     
                     {/* Completed status */}
-                    {!batchAnalysisPolling && !qcResults.calls?.some(c => c.analysis_status === 'analyzing') && qcResults.summary?.analyzed > 0 && (
+                    {!batchAnalysisPolling && qcResults.batch_analysis_status !== 'running' && qcResults.summary?.analyzed > 0 && (
                       <div className="bg-green-900/20 border border-green-700/30 rounded-lg p-4">
                         <div className="flex items-center gap-2 text-green-300">
                           <CheckCircle size={16} />
@@ -1856,6 +1886,23 @@ const CampaignDetailsPage = () => {
                       </table>
                     </div>
                     
+                    {qcResults.next_cursor && (
+                      <div className="flex items-center justify-center gap-3">
+                        <span className="text-sm text-gray-400">
+                          Showing {qcResults.calls?.length || 0} of {qcResults.summary?.total_calls || 0} calls
+                        </span>
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={loadMoreQcResults}
+                          disabled={loadingMoreQcResults}
+                        >
+                          {loadingMoreQcResults ? <Loader2 className="animate-spin mr-2" size={14} /> : null}
+                          Load more
+                        </Button>
+                      </div>
+                    )}
+                    
                     {(!qcResults.calls || qcResults.calls.length === 0) && (
                       <div className="text-center py-12 text-gray-400">
                         <Sparkles size={48} className="mx-auto mb-4 opacity-30" />
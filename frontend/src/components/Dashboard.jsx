@@ -18,12 +18,12 @@ const Dashboard = () => {
     const fetchData = async () => {
       try {
         const [agentsRes, callsRes, analyticsRes] = await Promise.all([
-          agentAPI.list(),
+          agentAPI.summaries(),
           analyticsAPI.callHistory({ limit: 10 }),
           analyticsAPI.dashboardAnalytics()
         ]);
 
-        setAgents(agentsRes.data);
+        setAgents(agentsRes.data.agents);
         // Handle both paginated (object with calls array) and legacy (array) responses
         const callsData = callsRes.data.calls || (Array.isArray(callsRes.data) ? callsRes.data : []);
         setRecentCalls(callsData);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Play, Activity, GitBranch, Mic, Save, Shield, AlertCircle, Loader2, RefreshCw, Zap } from 'lucide-react';
 import { Card } from './ui/card';
 import { Button } from './ui/button';
@@ -56,6 +56,8 @@ const DirectorTab = () => {
     const [evolutionProgress, setEvolutionProgress] = useState('');
     const [evolutionResults, setEvolutionResults] = useState([]);
     const [evolutionError, setEvolutionError] = useState(null);
+    const activeJobRef = useRef(null);
+    const cancelRequestedRef = useRef(false);
 
     const [promoting, setPromoting] = useState(false);
 
@@ -132,8 +134,11 @@ const DirectorTab = () => {
         }
     };
 
-    const evolveNode = async (nodeId, nodeName) => {
-        const { ok, data } = await safeFetch(`${API_BASE}/api/director/evolve`, {
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+    // Evolution runs as a background job: start it, then poll until it finishes
+    const evolveNode = async (nodeId, nodeName, progressPrefix = '') => {
+        const { ok, data } = await safeFetch(`${API_BASE}/api/director/evolve/jobs`, {
             method: 'POST',
             credentials: 'include',
             headers: { 'Content-Type': 'application/json' },
@@ -146,12 +151,52 @@ const DirectorTab = () => {
         if (!ok) {
             throw new Error(data.detail || `Evolution failed for ${nodeName}`);
         }
-        return { nodeId, nodeName, ...data };
+        activeJobRef.current = data.job_id;
+
+        try {
+            while (true) {
+                await sleep(1500);
+                const poll = await safeFetch(`${API_BASE}/api/director/evolve/jobs/${data.job_id}`, {
+                    credentials: 'include'
+                });
+                if (!poll.ok) {
+                    throw new Error(poll.data.detail || `Lost track of evolution for ${nodeName}`);
+                }
+                const job = poll.data;
+                const p = job.progress || {};
+                setEvolutionProgress(
+                    `${progressPrefix}${nodeName}: gen ${p.generation || 0}/${p.generations || 0}, ` +
+                    `${p.variants_done || 0}/${p.variants_total || 0} variants`
+                );
+                if (job.status === 'completed') {
+                    return { nodeId, nodeName, success: true, ...job.result };
+                }
+                if (job.status === 'cancelled') {
+                    throw new Error(`Evolution cancelled for ${nodeName}`);
+                }
+                if (job.status === 'failed') {
+                    throw new Error(job.error || `Evolution failed for ${nodeName}`);
+                }
+            }
+        } finally {
+            activeJobRef.current = null;
+        }
+    };
+
+    const handleCancelEvolution = async () => {
+        cancelRequestedRef.current = true;
+        const jobId = activeJobRef.current;
+        if (!jobId) return;
+        await safeFetch(`${API_BASE}/api/director/evolve/jobs/${jobId}/cancel`, {
+            method: 'POST',
+            credentials: 'include'
+        });
     };
 
     const handleEvolveSingle = async () => {
         if (!selectedNode || !sandboxId) return;
         setEvolving(true);
+        cancelRequestedRef.current = false;
         setEvolutionError(null);
         setEvolutionResults([]);
         setEvolutionProgress(`Evolving ${selectedNode.label}...`);
@@ -171,6 +216,7 @@ const DirectorTab = () => {
     const handleEvolveAll = async () => {
         if (!sandboxId || nodes.length === 0) return;
         setEvolvingAll(true);
+        cancelRequestedRef.current = false;
         setEvolutionError(null);
         setEvolutionResults([]);
 
@@ -178,11 +224,12 @@ const DirectorTab = () => {
 
         try {
             for (let i = 0; i < nodes.length; i++) {
+                if (cancelRequestedRef.current) break;
                 const node = nodes[i];
                 setEvolutionProgress(`Evolving node ${i + 1}/${nodes.length}: ${node.label}`);
 
                 try {
-                    const result = await evolveNode(node.id, node.label);
+                    const result = await evolveNode(node.id, node.label, `${i + 1}/${nodes.length} `);
                     results.push(result);
                 } catch (nodeErr) {
                     results.push({
@@ -334,6 +381,16 @@ const DirectorTab = () => {
                             </Button>
                         </div>
 
+                        {(evolving || evolvingAll) && (
+                            <Button
+                                onClick={handleCancelEvolution}
+                                variant="outline"
+                                className="mt-4 w-full border-red-500/50 text-red-300 hover:bg-red-900/30"
+                            >
+                                Cancel Evolution
+                            </Button>
+                        )}
+
                         {evolutionError && (
                             <div className="mt-4 bg-red-900/30 border border-red-500/50 p-3 rounded-lg text-red-300 text-sm flex items-center gap-2">
                                 <AlertCircle size={16} />
@@ -480,11 +537,12 @@ const DirectorTab = () => {
                                                             </div>
 
                                                             {/* Audio Playback */}
-                                                            {variant.audio_base64 && variant.audio_base64 !== 'U0lNVUxBVEVEX0FVRElP' && (
+                                                            {variant.audio_url && (
                                                                 <audio
                                                                     controls
+                                                                    preload="none"
                                                                     className="w-full h-8"
-                                                                    src={`data:audio/mpeg;base64,${variant.audio_base64}`}
+                                                                    src={`${API_BASE}${variant.audio_url}`}
                                                                 />
                                                             )}
 
@@ -508,11 +566,12 @@ const DirectorTab = () => {
                                             <div className="bg-green-900/30 border border-green-500 p-4 rounded-lg mt-4">
                                                 <h4 className="text-green-400 font-bold mb-2">🏆 Winner: {result.best_variant.variant_type}</h4>
                                                 <p className="text-gray-300 text-sm mb-2">{result.best_variant.content}</p>
-                                                {result.best_variant.audio_base64 && result.best_variant.audio_base64 !== 'U0lNVUxBVEVEX0FVRElP' && (
+                                                {result.best_variant.audio_url && (
                                                     <audio
                                                         controls
+                                                        preload="none"
                                                         className="w-full"
-                                                        src={`data:audio/mpeg;base64,${result.best_variant.audio_base64}`}
+                                                        src={`${API_BASE}${result.best_variant.audio_url}`}
                                                     />
                                                 )}
                                             </div>
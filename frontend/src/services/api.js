@@ -22,6 +22,8 @@ const apiClient = axios.create({
 export const agentAPI = {
   create: (data) => apiClient.post('/agents', data),
   list: () => apiClient.get('/agents'),
+  // Summary rows only (no flows/prompts) - for list views
+  summaries: (params) => apiClient.get('/agents', { params: { view: 'summary', limit: 500, ...params } }),
   get: (id) => apiClient.get(`/agents/${id}`),
   update: (id, data) => apiClient.put(`/agents/${id}`, data),
   delete: (id) => apiClient.delete(`/agents/${id}`),
@@ -114,7 +116,7 @@ export const qcEnhancedAPI = {
   getCampaignAutoSettings: (campaignId) => apiClient.get(`/qc/enhanced/campaigns/${campaignId}/auto-settings`),
 
   // Campaign QC Results - get all analyzed calls and their results
-  getCampaignQCResults: (campaignId) => apiClient.get(`/qc/enhanced/campaigns/${campaignId}/qc-results`),
+  getCampaignQCResults: (campaignId, params = {}) => apiClient.get(`/qc/enhanced/campaigns/${campaignId}/qc-results`, { params }),
 
   // QC Analysis
   analyzeTech: (data) => apiClient.post('/qc/enhanced/analyze/tech', data),
@@ -232,6 +234,7 @@ export const kbAPI = {
     headers: { 'Content-Type': 'multipart/form-data' }
   }),
   addUrl: (agentId, url) => apiClient.post(`/agents/${agentId}/kb/url?url=${encodeURIComponent(url)}`),
+  job: (agentId, jobId) => apiClient.get(`/agents/${agentId}/kb/jobs/${jobId}`),
   delete: (agentId, kbId) => apiClient.delete(`/agents/${agentId}/kb/${kbId}`),
 };
 